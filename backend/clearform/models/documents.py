@@ -150,6 +150,7 @@ class DocumentVaultResponse(BaseModel):
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Keyset cursor for the next page (None on last page)
 
 
 # ============================================================================
@@ -26,6 +26,7 @@ from clearform.models.documents import (
 )
 from clearform.services.document_service import document_service
 from clearform.routes.auth import get_current_clearform_user
+from utils.pagination import InvalidCursorError
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +104,7 @@ async def get_vault(
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor from previous page); page is legacy"),
     user = Depends(get_current_clearform_user),
 ):
     """Get user's document vault with filters."""
@@ -128,10 +130,13 @@ async def get_vault(
             document_type=doc_type,
             status=doc_status,
             search=search,
+            cursor=cursor,
         )
         
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Failed to get vault: {e}")
         raise HTTPException(status_code=500, detail="Failed to get vault")
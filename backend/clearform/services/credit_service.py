@@ -6,12 +6,20 @@ Handles all credit operations:
 - Expiry tracking (FIFO)
 - Subscription grants
 - Purchase processing
+- Balance reconciliation against the transaction log
+
+Concurrency: every balance change is a single conditional atomic update on
+clearform_users ($inc, with a credit_balance >= amount guard for deductions), so
+concurrent generations for the same user cannot overdraw or lose updates. FIFO
+consumption of expiry batches is applied in one bulk_write of guarded $inc updates.
 """
 
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+from pymongo import ReturnDocument, UpdateOne
+
 from database import database
 from clearform.models.credits import (
     CreditTransaction,
@@ -25,6 +33,15 @@ from clearform.models.user import ClearFormUser
 
 logger = logging.getLogger(__name__)
 
+# Expiry batches read per FIFO pass, and passes before giving up under contention
+FIFO_SCAN_LIMIT = 50
+FIFO_MAX_ATTEMPTS = 5
+# Recent deduction pass tags ("<transaction_id>:<pass>") kept on each expiry batch (to resolve
+# partially applied bulk writes)
+CONSUMED_BY_KEEP = 20
+
+RECONCILIATION_COLLECTION = "clearform_credit_reconciliations"
+
 
 class CreditService:
     """Credit economy management service."""
@@ -130,13 +147,20 @@ class CreditService:
         
         db = self._get_db()
         
-        # Get current balance
-        user = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0})
+        # Atomic increment; balance_after comes from the updated document
+        user = await db.clearform_users.find_one_and_update(
+            {"user_id": user_id},
+            {
+                "$inc": {"credit_balance": amount, "lifetime_credits_purchased": amount},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            },
+            projection={"_id": 0, "credit_balance": 1},
+            return_document=ReturnDocument.AFTER,
+        )
         if not user:
             raise ValueError(f"User {user_id} not found")
         
-        current_balance = user.get("credit_balance", 0)
-        new_balance = current_balance + amount
+        new_balance = user.get("credit_balance", 0)
         
         # Create transaction
         transaction = CreditTransaction(
@@ -160,18 +184,6 @@ class CreditService:
             expires_at=transaction.expires_at,
         )
         
-        # Update user balance and record transaction
-        await db.clearform_users.update_one(
-            {"user_id": user_id},
-            {
-                "$set": {
-                    "credit_balance": new_balance,
-                    "updated_at": datetime.now(timezone.utc),
-                },
-                "$inc": {"lifetime_credits_purchased": amount}
-            }
-        )
-        
         await db.clearform_credit_transactions.insert_one(transaction.model_dump())
         await db.clearform_credit_expiry.insert_one(expiry.model_dump())
         
@@ -197,40 +209,26 @@ class CreditService:
         
         db = self._get_db()
         
-        # Get current balance
-        user = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0})
+        # Reserve + commit in one conditional update: only succeeds while balance >= amount
+        user = await db.clearform_users.find_one_and_update(
+            {"user_id": user_id, "credit_balance": {"$gte": amount}},
+            {
+                "$inc": {"credit_balance": -amount, "lifetime_credits_used": amount},
+                "$set": {"updated_at": datetime.now(timezone.utc)},
+            },
+            projection={"_id": 0, "credit_balance": 1},
+            return_document=ReturnDocument.AFTER,
+        )
         if not user:
-            raise ValueError(f"User {user_id} not found")
-        
-        current_balance = user.get("credit_balance", 0)
-        
-        if current_balance < amount:
-            logger.warning(f"Insufficient credits for user {user_id}. Has {current_balance}, needs {amount}")
+            existing = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0, "credit_balance": 1})
+            if not existing:
+                raise ValueError(f"User {user_id} not found")
+            logger.warning(
+                f"Insufficient credits for user {user_id}. Has {existing.get('credit_balance', 0)}, needs {amount}"
+            )
             return None, False
         
-        new_balance = current_balance - amount
-        
-        # FIFO: Deduct from oldest expiry batches first
-        remaining_to_deduct = amount
-        expiry_cursor = db.clearform_credit_expiry.find({
-            "user_id": user_id,
-            "expired": False,
-            "remaining_amount": {"$gt": 0}
-        }, {"_id": 0}).sort("expires_at", 1)  # Oldest first
-        
-        async for expiry in expiry_cursor:
-            if remaining_to_deduct <= 0:
-                break
-            
-            deduct_from_this = min(expiry["remaining_amount"], remaining_to_deduct)
-            new_remaining = expiry["remaining_amount"] - deduct_from_this
-            
-            await db.clearform_credit_expiry.update_one(
-                {"expiry_id": expiry["expiry_id"]},
-                {"$set": {"remaining_amount": new_remaining}}
-            )
-            
-            remaining_to_deduct -= deduct_from_this
+        new_balance = user.get("credit_balance", 0)
         
         # Create transaction
         transaction = CreditTransaction(
@@ -243,23 +241,74 @@ class CreditService:
             description=description,
         )
         
-        # Update user balance
-        await db.clearform_users.update_one(
-            {"user_id": user_id},
-            {
-                "$set": {
-                    "credit_balance": new_balance,
-                    "updated_at": datetime.now(timezone.utc),
-                },
-                "$inc": {"lifetime_credits_used": amount}
-            }
-        )
+        # FIFO: consume oldest expiry batches first
+        unconsumed = await self._consume_expiry_fifo(user_id, amount, transaction.transaction_id)
+        if unconsumed:
+            logger.warning(
+                f"FIFO expiry consumption short by {unconsumed} credit(s) for user {user_id} "
+                f"(transaction {transaction.transaction_id}); reconciler will report drift"
+            )
         
         await db.clearform_credit_transactions.insert_one(transaction.model_dump())
         
         logger.info(f"Deducted {amount} credits from user {user_id}. New balance: {new_balance}")
         return transaction, True
     
+    async def _consume_expiry_fifo(self, user_id: str, amount: int, transaction_id: str) -> int:
+        """Decrement expiry batches oldest-first by amount. Returns credits left unconsumed.
+        
+        Each pass plans takes from the oldest batches and applies them in one bulk_write of
+        guarded $inc updates (remaining_amount >= take), tagging each batch with the
+        transaction id and pass number. If a concurrent deduction wins a batch, only the batches
+        tagged by this pass are counted and the shortfall is planned again from fresh state.
+        """
+        db = self._get_db()
+        remaining = amount
+        for attempt in range(FIFO_MAX_ATTEMPTS):
+            if remaining <= 0:
+                break
+            batches = await db.clearform_credit_expiry.find(
+                {"user_id": user_id, "expired": False, "remaining_amount": {"$gt": 0}},
+                {"_id": 0, "expiry_id": 1, "remaining_amount": 1},
+            ).sort("expires_at", 1).to_list(FIFO_SCAN_LIMIT)
+            if not batches:
+                break
+            
+            plan: List[Tuple[str, int]] = []
+            left = remaining
+            for batch in batches:
+                take = min(batch["remaining_amount"], left)
+                plan.append((batch["expiry_id"], take))
+                left -= take
+                if left <= 0:
+                    break
+            
+            # Per-pass tag: a batch updated in an earlier pass must not be counted again
+            pass_tag = f"{transaction_id}:{attempt}"
+            ops = [
+                UpdateOne(
+                    {"expiry_id": expiry_id, "expired": False, "remaining_amount": {"$gte": take}},
+                    {
+                        "$inc": {"remaining_amount": -take},
+                        "$push": {"consumed_by": {"$each": [pass_tag], "$slice": -CONSUMED_BY_KEEP}},
+                    },
+                )
+                for expiry_id, take in plan
+            ]
+            result = await db.clearform_credit_expiry.bulk_write(ops, ordered=False)
+            if result.modified_count == len(plan):
+                remaining = left
+                continue
+            
+            # Partially applied: count only the batches this pass updated
+            applied = await db.clearform_credit_expiry.find(
+                {"expiry_id": {"$in": [eid for eid, _ in plan]}, "consumed_by": pass_tag},
+                {"_id": 0, "expiry_id": 1},
+            ).to_list(len(plan))
+            applied_ids = {row["expiry_id"] for row in applied}
+            remaining -= sum(take for eid, take in plan if eid in applied_ids)
+        return max(remaining, 0)
+    
     async def check_balance(self, user_id: str, required_amount: int) -> bool:
         """Check if user has sufficient credits."""
         db = self._get_db()
@@ -292,45 +341,49 @@ class CreditService:
         
         async for expiry in expired_cursor:
             user_id = expiry["user_id"]
-            expired_amount = expiry["remaining_amount"]
             
-            # Get current balance
-            user = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0})
-            if not user:
+            # Claim the batch atomically; the pre-update document gives the exact amount expired
+            claimed = await db.clearform_credit_expiry.find_one_and_update(
+                {"expiry_id": expiry["expiry_id"], "expired": False},
+                {"$set": {"expired": True, "remaining_amount": 0}},
+                projection={"_id": 0, "remaining_amount": 1},
+                return_document=ReturnDocument.BEFORE,
+            )
+            if not claimed or claimed.get("remaining_amount", 0) <= 0:
                 continue
+            expired_amount = claimed["remaining_amount"]
             
-            current_balance = user.get("credit_balance", 0)
-            new_balance = max(0, current_balance - expired_amount)
+            # Atomic decrement floored at zero (pipeline update)
+            user = await db.clearform_users.find_one_and_update(
+                {"user_id": user_id},
+                [{
+                    "$set": {
+                        "credit_balance": {
+                            "$max": [0, {"$subtract": [{"$ifNull": ["$credit_balance", 0]}, expired_amount]}]
+                        },
+                        "lifetime_credits_expired": {
+                            "$add": [{"$ifNull": ["$lifetime_credits_expired", 0]}, expired_amount]
+                        },
+                        "updated_at": now,
+                    }
+                }],
+                projection={"_id": 0, "credit_balance": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if not user:
+                continue
             
             # Create expiry transaction
             transaction = CreditTransaction(
                 user_id=user_id,
                 transaction_type=CreditTransactionType.EXPIRY,
                 amount=-expired_amount,
-                balance_after=new_balance,
+                balance_after=user.get("credit_balance", 0),
                 reference_id=expiry["expiry_id"],
                 reference_type="credit_expiry",
                 description=f"Credits expired: {expired_amount} credits",
             )
             
-            # Update expiry record
-            await db.clearform_credit_expiry.update_one(
-                {"expiry_id": expiry["expiry_id"]},
-                {"$set": {"expired": True, "remaining_amount": 0}}
-            )
-            
-            # Update user balance
-            await db.clearform_users.update_one(
-                {"user_id": user_id},
-                {
-                    "$set": {
-                        "credit_balance": new_balance,
-                        "updated_at": now,
-                    },
-                    "$inc": {"lifetime_credits_expired": expired_amount}
-                }
-            )
-            
             await db.clearform_credit_transactions.insert_one(transaction.model_dump())
             
             users_affected.add(user_id)
@@ -343,6 +396,56 @@ class CreditService:
             "total_credits_expired": total_expired,
         }
     
+    async def reconcile_balances(self, user_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Compare each user's credit_balance with the transaction log (scheduled job).
+        
+        Ledger balance = sum of transaction amounts; expiry balance = sum of remaining_amount
+        on unexpired batches. Report-only: drift is logged and stored in
+        clearform_credit_reconciliations for review, balances are not rewritten.
+        """
+        db = self._get_db()
+        match: Dict[str, Any] = {"user_id": {"$in": user_ids}} if user_ids else {}
+        
+        ledger: Dict[str, int] = {}
+        async for row in db.clearform_credit_transactions.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$user_id", "total": {"$sum": "$amount"}}},
+        ]):
+            ledger[row["_id"]] = row["total"]
+        
+        batches: Dict[str, int] = {}
+        async for row in db.clearform_credit_expiry.aggregate([
+            {"$match": {**match, "expired": False}},
+            {"$group": {"_id": "$user_id", "total": {"$sum": "$remaining_amount"}}},
+        ]):
+            batches[row["_id"]] = row["total"]
+        
+        checked = 0
+        drift: List[Dict[str, Any]] = []
+        async for user in db.clearform_users.find(match, {"_id": 0, "user_id": 1, "credit_balance": 1}):
+            checked += 1
+            balance = user.get("credit_balance", 0)
+            ledger_balance = ledger.get(user["user_id"], 0)
+            expiry_balance = batches.get(user["user_id"], 0)
+            if balance != ledger_balance or balance != expiry_balance:
+                drift.append({
+                    "user_id": user["user_id"],
+                    "credit_balance": balance,
+                    "ledger_balance": ledger_balance,
+                    "expiry_balance": expiry_balance,
+                })
+        
+        report = {
+            "checked_at": datetime.now(timezone.utc),
+            "users_checked": checked,
+            "users_drifted": len(drift),
+            "drift": drift[:500],
+        }
+        if drift:
+            logger.warning(f"Credit reconciliation: {len(drift)} of {checked} user(s) drifted from the ledger")
+        await db[RECONCILIATION_COLLECTION].insert_one(dict(report))
+        return report
+    
     async def grant_subscription_credits(self, user_id: str, amount: int, subscription_id: str) -> CreditTransaction:
         """Grant monthly subscription credits."""
         return await self.add_credits(
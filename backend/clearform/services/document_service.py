@@ -9,6 +9,7 @@ import logging
 import json
 
 from database import database
+from utils.pagination import cached_count, keyset_filter, keyset_sort, next_cursor_for
 from clearform.models.documents import (
     ClearFormDocument,
     ClearFormDocumentType,
@@ -323,8 +324,13 @@ Output the CV in markdown format with proper sections (Summary, Experience, Educ
         document_type: Optional[ClearFormDocumentType] = None,
         status: Optional[ClearFormDocumentStatus] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> DocumentVaultResponse:
-        """Get user's document vault with pagination and filters."""
+        """Get user's document vault with pagination and filters.
+        
+        When cursor is given ("" for the first page), pages by (created_at, document_id)
+        keyset and uses a cached total; page is the legacy offset mode.
+        """
         db = self._get_db()
         
         query = {"user_id": user_id}
@@ -344,18 +350,29 @@ Output the CV in markdown format with proper sections (Summary, Experience, Educ
                 {"tags": {"$in": [search.lower()]}},
             ]
         
-        # Get total count
-        total = await db.clearform_documents.count_documents(query)
+        if cursor is not None:
+            total = await cached_count(db.clearform_documents, query)
+            skip = 0
+            find_cursor = db.clearform_documents.find(
+                keyset_filter(query, cursor, "created_at", "document_id"),
+                {"_id": 0}
+            ).sort(keyset_sort("created_at", "document_id")).limit(page_size)
+        else:
+            # Get total count
+            total = await db.clearform_documents.count_documents(query)
+            
+            # Get paginated results
+            skip = (page - 1) * page_size
+            find_cursor = db.clearform_documents.find(
+                query,
+                {"_id": 0}
+            ).sort(keyset_sort("created_at", "document_id")).skip(skip).limit(page_size)
         
-        # Get paginated results
-        skip = (page - 1) * page_size
-        cursor = db.clearform_documents.find(
-            query,
-            {"_id": 0}
-        ).sort("created_at", -1).skip(skip).limit(page_size)
+        docs = await find_cursor.to_list(length=page_size)
+        next_cursor = next_cursor_for(docs, page_size, "created_at", "document_id")
         
         items = []
-        async for doc in cursor:
+        for doc in docs:
             items.append(DocumentVaultItem(
                 document_id=doc["document_id"],
                 document_type=doc["document_type"],
@@ -373,7 +390,8 @@ Output the CV in markdown format with proper sections (Summary, Experience, Educ
             total=total,
             page=page,
             page_size=page_size,
-            has_more=(skip + len(items)) < total,
+            has_more=next_cursor is not None if cursor is not None else (skip + len(items)) < total,
+            next_cursor=next_cursor,
         )
     
     async def archive_document(self, user_id: str, document_id: str) -> bool:
@@ -8,6 +8,8 @@ from typing import Optional, Dict, Any, List
 import logging
 import re
 
+from pymongo import ReturnDocument
+
 from database import database
 from clearform.models.organizations import (
     Organization,
@@ -451,10 +453,10 @@ class OrganizationService:
         description: str,
         reference_id: Optional[str] = None,
     ) -> int:
-        """Add credits to organization pool."""
+        """Add credits to organization pool (atomic $inc; returns the new balance)."""
         db = self._get_db()
         
-        result = await db.clearform_organizations.update_one(
+        org = await db.clearform_organizations.find_one_and_update(
             {"org_id": org_id},
             {
                 "$inc": {
@@ -462,12 +464,12 @@ class OrganizationService:
                     "lifetime_credits_purchased": amount,
                 },
                 "$set": {"updated_at": datetime.now(timezone.utc)}
-            }
+            },
+            projection={"_id": 0, "credit_balance": 1},
+            return_document=ReturnDocument.AFTER,
         )
         
-        if result.modified_count > 0:
-            org = await self.get_organization(org_id)
-            
+        if org:
             await audit_service.log(
                 action=AuditAction.CREDITS_GRANTED,
                 org_id=org_id,
@@ -488,13 +490,15 @@ class OrganizationService:
         description: str,
         reference_id: Optional[str] = None,
     ) -> bool:
-        """Deduct credits from organization pool."""
-        db = self._get_db()
+        """Deduct credits from organization pool.
         
-        # Check balance
-        org = await self.get_organization(org_id)
-        if not org or org.get("credit_balance", 0) < amount:
-            return False
+        The balance check and decrement are one conditional update (credit_balance >= amount),
+        so concurrent deductions from the shared pool cannot overdraw it.
+        """
+        if amount <= 0:
+            raise ValueError("Amount must be positive for deduction")
+        
+        db = self._get_db()
         
         # Check member credit limit
         member = await self.get_member(org_id, user_id)
@@ -502,7 +506,7 @@ class OrganizationService:
             # TODO: Track monthly usage per member
             pass
         
-        result = await db.clearform_organizations.update_one(
+        org = await db.clearform_organizations.find_one_and_update(
             {"org_id": org_id, "credit_balance": {"$gte": amount}},
             {
                 "$inc": {
@@ -510,10 +514,12 @@ class OrganizationService:
                     "lifetime_credits_used": amount,
                 },
                 "$set": {"updated_at": datetime.now(timezone.utc)}
-            }
+            },
+            projection={"_id": 0, "credit_balance": 1},
+            return_document=ReturnDocument.AFTER,
         )
         
-        if result.modified_count > 0:
+        if org:
             await audit_service.log(
                 action=AuditAction.CREDITS_DEDUCTED,
                 user_id=user_id,
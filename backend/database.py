@@ -5,26 +5,279 @@ import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
 
+from utils.mongo_indexes import ensure_indexes, index
+from services.query_profiler import query_profiler
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 logger = logging.getLogger(__name__)
 
+# Core indexes (built by Database._create_indexes / the startup manifest; see services/startup_manifest.py)
+CORE_INDEXES = [
+    # Client indexes - CRN (customer_reference) is critical for search
+    # Use sparse=True to allow multiple null values
+    index("clients", "customer_reference", unique=True, sparse=True, tolerate_errors=True),
+
+    index("clients", "email", unique=True, tolerate_errors=True),
+
+    index("clients", "client_id", unique=True),
+    index("clients", "full_name"),  # For name search
+    index("clients", "billing_plan"),  # Plan filter (admin clients list)
+    index("clients", "subscription_status"),  # Status filter (admin clients list)
+    index("clients", [("created_at", -1), ("client_id", -1)]),  # Keyset pagination (admin clients list)
+
+    # Client search index (admin search): multikey edge n-grams + one doc per client
+    index("client_search_index", "client_id", unique=True),
+    index("client_search_index", "prefixes"),
+
+    # Property indexes - for postcode search
+    index("properties", "postcode"),
+    index("properties", "client_id"),
+    index("properties", "property_id", unique=True),
+    index("properties", "compliance_status"),
+
+    # Requirement expiry transition index (daily jobs read only due transitions; reminders by expiry range)
+    index("requirements", "next_transition_at"),
+    index("requirements", [("client_id", 1), ("effective_expiry_at", 1)]),
+
+    # Documents - pending verification admin list (status + uploaded_at; client_id filter)
+    index("documents", [("status", 1), ("uploaded_at", 1)]),
+    index("documents", [("client_id", 1), ("status", 1), ("uploaded_at", 1)]),
+
+    # Portal user indexes
+    index("portal_users", "auth_email", unique=True, tolerate_errors=True),
+
+    index("portal_users", "client_id"),
+    index("portal_users", "portal_user_id", unique=True),
+
+    # Audit log indexes - for timeline queries and email-delivery
+    index("audit_logs", [("client_id", 1), ("timestamp", -1)]),
+    index("audit_logs", [("action", 1), ("timestamp", -1)]),
+    index("audit_logs", "timestamp"),
+    index("audit_logs", [("timestamp", -1), ("audit_id", -1)]),  # Keyset pagination
+    index("audit_logs", "action"),
+
+    # Message log indexes - for email-delivery admin view and orchestrator
+    index("message_logs", [("created_at", -1)]),
+    index("message_logs", [("created_at", -1), ("message_id", -1)]),  # Keyset pagination
+    index("message_logs", [("status", 1), ("created_at", -1)]),
+    index("message_logs", [("channel", 1), ("created_at", -1)]),
+    index("message_logs", [("template_alias", 1), ("created_at", -1)]),
+    index("message_logs", [("client_id", 1), ("created_at", -1)]),
+    index("message_logs", [("template_key", 1), ("created_at", -1)]),
+    index("message_logs", "provider_message_id", sparse=True),
+    index("message_logs", "idempotency_key", unique=True, sparse=True, tolerate_errors=True),
+    # Notification templates (template_key -> gating + email alias)
+    index("notification_templates", "template_key", unique=True),
+    # Notification retry queue (outbox pattern)
+    index("notification_retry_queue", [("status", 1), ("next_run_at", 1)]),
+    index("notification_retry_queue", "message_id"),
+    # Compliance score history indexes - for trend queries
+    index("compliance_score_history", [("client_id", 1), ("date_key", -1)]),
+    index("compliance_score_history", [("client_id", 1), ("date_key", 1)], unique=True, tolerate_errors=True),
+    # Property-level score history (event-driven)
+    index("property_compliance_score_history", [("property_id", 1), ("created_at", -1)]),
+    index("property_compliance_score_history", [("client_id", 1), ("created_at", -1)]),
+    # Property daily score snapshots (score trend 90-day chart per property)
+    index("property_score_daily", [("client_id", 1), ("property_id", 1), ("date", 1)], unique=True),
+    index("property_score_daily", [("client_id", 1), ("date", -1)]),
+    index("property_score_daily", [("property_id", 1), ("date", -1)]),
+    # Async compliance recalc queue (Option B)
+    index("compliance_recalc_queue", [("property_id", 1), ("correlation_id", 1)], unique=True, tolerate_errors=True),
+    index("compliance_recalc_queue", [("status", 1), ("next_run_at", 1)]),
+    index("compliance_recalc_queue", [("property_id", 1), ("status", 1)]),
+    # Compliance recalc SLA alerts (dedupe by property + alert type)
+    index("compliance_sla_alerts", [("property_id", 1), ("alert_type", 1)], unique=True, tolerate_errors=True),
+    index("compliance_sla_alerts", [("active", 1), ("last_detected_at", -1)]),
+    index("compliance_sla_alerts", [("severity", 1)]),
+    # Score events - audit-grade log for score trend and "What Changed" (client dashboard)
+    index("score_events", [("client_id", 1), ("created_at", -1)]),
+    index("score_events", [("client_id", 1), ("event_type", 1), ("created_at", -1)]),
+    # Score ledger - enterprise statement-of-account for score changes (before/after, drivers, trigger)
+    index("score_ledger_events", [("client_id", 1), ("created_at", -1)]),
+    index("score_ledger_events", [("client_id", 1), ("property_id", 1), ("created_at", -1)]),
+    index("score_ledger_events", [("client_id", 1), ("trigger_type", 1), ("created_at", -1)]),
+    # Job runs - observability: every automation execution (for SLA watchdog and admin dashboard)
+    index("job_runs", [("job_name", 1), ("created_at", -1)]),
+    index("job_runs", [("status", 1), ("created_at", -1)]),
+    index("job_runs", "created_at"),
+    # Incidents - system-wide P0/P1/P2 with ack/resolve workflow
+    index("incidents", [("status", 1), ("created_at", -1)]),
+    index("incidents", [("severity", 1), ("status", 1)]),
+    index("incidents", "created_at"),
+    # Operations & Compliance: module feature flags per client
+    index("client_feature_flags", [("client_id", 1), ("flag_key", 1)], unique=True),
+    index("client_feature_flags", "client_id"),
+    # Provisioning status per property/module (compliance, maintenance)
+    index("provisioning_status", [("client_id", 1), ("property_id", 1), ("module_name", 1)], unique=True),
+    index("provisioning_status", [("client_id", 1), ("module_name", 1)]),
+    # Contractors (Ops: client-scoped or system-wide)
+    index("contractors", "contractor_id", unique=True),
+    index("contractors", "client_id"),
+    index("contractors", [("vetted", 1), ("client_id", 1)]),
+    # Work orders (maintenance workflows: tenant/client report → assign contractor → SLA)
+    index("work_orders", "work_order_id", unique=True),
+    index("work_orders", [("client_id", 1), ("created_at", -1)]),
+    index("work_orders", [("client_id", 1), ("status", 1)]),
+    index("work_orders", [("property_id", 1), ("created_at", -1)]),
+    index("work_orders", "contractor_id", sparse=True),
+    # Property assets + maintenance events (predictive maintenance)
+    index("property_assets", [("property_id", 1), ("asset_id", 1)], unique=True),
+    index("property_assets", "property_id"),
+    index("maintenance_events", "event_id", unique=True),
+    index("maintenance_events", [("property_id", 1), ("occurred_at", -1)]),
+    index("maintenance_events", [("client_id", 1), ("occurred_at", -1)]),
+    # Predictive insights cache (scheduled job writes; API can read when fresh)
+    index("predictive_insights_cache", "client_id", unique=True),
+    index("predictive_insights_cache", "updated_at"),
+    # Orders (intake → payment → workflow): idempotency by Stripe session
+    index("orders", "pricing.stripe_checkout_session_id", unique=True, sparse=True, tolerate_errors=True),
+    index("orders", "source_draft_id", unique=True),
+    index("orders", [("status", 1), ("created_at", -1)]),
+    index("orders", "order_ref", unique=True),
+    index("orders", [("created_at", -1), ("order_id", -1)]),  # Keyset pagination (pipeline)
+    # Leads - admin list keyset pagination
+    index("leads", [("created_at", -1), ("lead_id", -1)]),
+
+    # Submissions: contact, talent, partnership (list/dedupe/audit)
+    index("contact_submissions", "submission_id", unique=True),
+    index("contact_submissions", [("email_normalized", 1), ("created_at", -1)]),
+    index("contact_submissions", [("dedupe_key", 1), ("created_at", -1)]),
+    index("contact_submissions", "created_at"),
+    index("contact_submissions", "status"),
+    index("talent_pool", "submission_id", unique=True),
+    index("talent_pool", [("email_normalized", 1), ("created_at", -1)]),
+    index("talent_pool", [("dedupe_key", 1), ("created_at", -1)]),
+    index("talent_pool", "created_at"),
+    index("talent_pool", "status"),
+    index("partnership_enquiries", "enquiry_id", unique=True),
+    index("partnership_enquiries", [("email_normalized", 1), ("created_at", -1)]),
+    index("partnership_enquiries", [("dedupe_key", 1), ("created_at", -1)]),
+    index("partnership_enquiries", "created_at"),
+    index("partnership_enquiries", "status"),
+    # Risk check leads (conversion demo; no client/provisioning)
+    index("risk_leads", "lead_id", unique=True),
+    index("risk_leads", "created_at"),
+    index("risk_leads", "email"),
+    index("risk_leads", "risk_band"),
+    index("risk_leads", "status"),
+    # Tenant portal: messages and certificate requests (landlord notification flow)
+    index("tenant_messages", [("client_id", 1), ("created_at", -1)]),
+    index("tenant_messages", "message_id", unique=True),
+    index("tenant_requests", [("client_id", 1), ("created_at", -1)]),
+    index("tenant_requests", "request_id", unique=True),
+    index("tenant_requests", [("client_id", 1), ("status", 1)]),
+
+    # OTP codes - one active per (phone_hash, purpose); no raw phone stored.
+    # If the collection has a legacy unique index on (phone_e164, purpose), drop it:
+    #   db.otp_codes.dropIndex("phone_e164_1_purpose_1")
+    # Otherwise upserts can raise DuplicateKeyError when phone_e164 is absent (null).
+    index("otp_codes", [("phone_hash", 1), ("purpose", 1)], unique=True, tolerate_errors=True),
+    index("otp_codes", "expires_at"),
+    # Step-up tokens - one-time use; validate by token_hash + user_id
+    index("step_up_tokens", "token_hash"),
+    index("step_up_tokens", [("user_id", 1), ("expires_at", 1)]),
+
+    # Intake uploads - for migration and list by session
+    index("intake_uploads", "intake_session_id"),
+    index("intake_uploads", [("intake_session_id", 1), ("status", 1)]),
+    # Stripe webhook idempotency - duplicate event_id must not process twice
+    index("stripe_events", "event_id", unique=True, tolerate_errors=True),
+    # Async webhook consumer: per-key heads of QUEUED / PROCESSING events
+    index("stripe_events", [("status", 1), ("stripe_created", 1), ("received_at", 1)]),
+    # Normalized payments (Revenue Analytics) - idempotency and date queries
+    index("payments", "stripe_event_id", unique=True, sparse=True, tolerate_errors=True),
+    index("payments", "created_at"),
+    index("payments", [("client_id", 1), ("created_at", -1)]),
+    index("payments", "stripe_charge_id", sparse=True),
+    index("payments", "stripe_invoice_id", sparse=True),
+    # MRR snapshots for NRR (Executive Overview)
+    index("mrr_snapshots", "period", unique=True, tolerate_errors=True),
+    # Provisioning jobs - idempotency by checkout_session_id
+    index("provisioning_jobs", "job_id", unique=True),
+    index("provisioning_jobs", "checkout_session_id", unique=True, tolerate_errors=True),
+    index("provisioning_jobs", "client_id"),
+    index("provisioning_jobs", "status"),
+    # Analytics events - conversion funnel and operational metrics (passive logging)
+    index("analytics_events", [("event", 1), ("ts", -1)]),
+    index("analytics_events", [("client_id", 1), ("ts", -1)]),
+    index("analytics_events", [("lead_id", 1), ("ts", -1)]),
+    index("analytics_events", "ts"),
+    index("analytics_events", "idempotency_key", unique=True, sparse=True, tolerate_errors=True),
+    # Requirements catalog (data-driven compliance definitions)
+    index("requirements_catalog", "code", unique=True),
+    index("requirements_catalog", "category"),
+    index("requirements_catalog", "criticality"),
+    # Requirements (instance state) - ensure efficient lookups
+    index("requirements", [("client_id", 1), ("property_id", 1)]),
+    index("requirements", [("property_id", 1), ("requirement_type", 1)]),
+    # Assistant chat (Compliance Vault Assistant)
+    index("assistant_conversations", [("client_id", 1), ("last_activity_at", -1)]),
+    index("assistant_conversations", "conversation_id", unique=True),
+    index("assistant_messages", [("conversation_id", 1), ("created_at", 1)]),
+    index("assistant_messages", [("client_id", 1), ("created_at", -1)]),
+    # Mongo command profiler: flagged request / job profiles, kept 7 days
+    index("query_profiles", "key"),
+    index("query_profiles", [("flags", 1), ("created_at", -1)]),
+    index("query_profiles", "created_at", expireAfterSeconds=7 * 24 * 3600),
+    # Partitioned job shards: lease claims, per-run rollup, 30-day cleanup
+    index("job_shards", [("status", 1), ("available_at", 1)]),
+    index("job_shards", [("job_run_id", 1), ("shard_index", 1)]),
+    index("job_shards", "created_at", expireAfterSeconds=30 * 24 * 3600),
+    # Order pipeline work items (_id = order_id): priority claims and expired-lease reclaims
+    index("order_pipeline_queue", [("status", 1), ("priority", -1), ("order_created_at", 1)]),
+    index("order_pipeline_queue", [("status", 1), ("lease_expires_at", 1)]),
+    # Document extraction queue (worker mode claims PENDING records oldest first)
+    index("extracted_documents", [("status", 1), ("audit.created_at", 1)]),
+    # Shared rate limit counters (utils.rate_limiter): one doc per key/window, dropped after 2 windows
+    index("rate_limit_counters", "expires_at", expireAfterSeconds=0),
+    # Bulk property import jobs: status polling by job_id (scoped to the client)
+    index("property_import_jobs", "job_id", unique=True, tolerate_errors=True),
+    index("property_import_jobs", [("client_id", 1), ("created_at", -1)]),
+    # ICS feed: per-client artifacts (invalidated by client_id) and subscription token lookup
+    index("calendar_feeds", "client_id"),
+    index("calendar_feed_tokens", "token_hash", unique=True, tolerate_errors=True),
+    index("calendar_feed_tokens", [("client_id", 1), ("revoked_at", 1)]),
+    # Rendered artifact cache: LRU eviction scan
+    index("artifact_cache", "last_accessed_at"),
+    # Score history retention: tier reads by day, downsampling by bucket, archive segment lookup
+    index("score_history_rollups", [("collection", 1), ("client_id", 1), ("last_date", 1)]),
+    index("score_history_rollups", [("collection", 1), ("client_id", 1), ("granularity", 1), ("bucket", 1)]),
+    index("score_history_archive.files", [("metadata.collection", 1), ("metadata.client_id", 1), ("metadata.last_at", 1)]),
+    index("score_change_log", [("client_id", 1), ("property_id", 1), ("created_at", -1)]),
+]
+
+
+def _pool_options() -> dict:
+    """Optional pool sizing (MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE); driver defaults otherwise."""
+    options = {}
+    for env_name, option in (("MONGO_MAX_POOL_SIZE", "maxPoolSize"), ("MONGO_MIN_POOL_SIZE", "minPoolSize")):
+        value = (os.environ.get(env_name) or "").strip()
+        if value.isdigit():
+            options[option] = int(value)
+    return options
+
+
 class Database:
     client: AsyncIOMotorClient = None
     db = None
     
-    async def connect(self):
+    async def connect(self, create_indexes: bool = True):
+        """Connect and ping. create_indexes=False leaves index/seed work to the caller (API startup manifest)."""
         try:
             mongo_url = os.environ['MONGO_URL']
-            self.client = AsyncIOMotorClient(mongo_url)
+            self.client = AsyncIOMotorClient(
+                mongo_url, event_listeners=query_profiler.client_listeners(), **_pool_options()
+            )
             self.db = self.client[os.environ['DB_NAME']]
             # Verify connection
             await self.db.command("ping")
             logger.info(f"Connected to MongoDB: {os.environ['DB_NAME']}")
             
             # Create indexes for efficient search and lookups
-            await self._create_indexes()
+            if create_indexes:
+                await self._create_indexes()
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
@@ -38,257 +291,23 @@ class Database:
         return self.db
     
     async def _create_indexes(self):
-        """Create MongoDB indexes for efficient queries."""
+        """Create core MongoDB indexes (concurrently) and seed reference data."""
         try:
-            # Client indexes - CRN (customer_reference) is critical for search
-            # Use sparse=True to allow multiple null values
-            try:
-                await self.db.clients.create_index("customer_reference", unique=True, sparse=True)
-            except Exception:
-                pass  # Index may already exist with different options
-            
-            try:
-                await self.db.clients.create_index("email", unique=True)
-            except Exception:
-                pass
-            
-            await self.db.clients.create_index("client_id", unique=True)
-            await self.db.clients.create_index("full_name")  # For name search
-            await self.db.clients.create_index("billing_plan")  # Plan filter (admin clients list)
-            await self.db.clients.create_index("subscription_status")  # Status filter (admin clients list)
-
-            # Property indexes - for postcode search
-            await self.db.properties.create_index("postcode")
-            await self.db.properties.create_index("client_id")
-            await self.db.properties.create_index("property_id", unique=True)
-            await self.db.properties.create_index("compliance_status")
-            
-            # Documents - pending verification admin list (status + uploaded_at; client_id filter)
-            await self.db.documents.create_index([("status", 1), ("uploaded_at", 1)])
-            await self.db.documents.create_index([("client_id", 1), ("status", 1), ("uploaded_at", 1)])
-            
-            # Portal user indexes
-            try:
-                await self.db.portal_users.create_index("auth_email", unique=True)
-            except Exception:
-                pass
-            
-            await self.db.portal_users.create_index("client_id")
-            await self.db.portal_users.create_index("portal_user_id", unique=True)
-            
-            # Audit log indexes - for timeline queries and email-delivery
-            await self.db.audit_logs.create_index([("client_id", 1), ("timestamp", -1)])
-            await self.db.audit_logs.create_index([("action", 1), ("timestamp", -1)])
-            await self.db.audit_logs.create_index("timestamp")
-            await self.db.audit_logs.create_index("action")
-            
-            # Message log indexes - for email-delivery admin view and orchestrator
-            await self.db.message_logs.create_index([("created_at", -1)])
-            await self.db.message_logs.create_index([("status", 1), ("created_at", -1)])
-            await self.db.message_logs.create_index([("channel", 1), ("created_at", -1)])
-            await self.db.message_logs.create_index([("template_alias", 1), ("created_at", -1)])
-            await self.db.message_logs.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.message_logs.create_index([("template_key", 1), ("created_at", -1)])
-            await self.db.message_logs.create_index("provider_message_id", sparse=True)
-            try:
-                await self.db.message_logs.create_index("idempotency_key", unique=True, sparse=True)
-            except Exception:
-                pass
-            # Notification templates (template_key -> gating + email alias)
-            await self.db.notification_templates.create_index("template_key", unique=True)
-            # Notification retry queue (outbox pattern)
-            await self.db.notification_retry_queue.create_index([("status", 1), ("next_run_at", 1)])
-            await self.db.notification_retry_queue.create_index("message_id")
-            await self._seed_notification_templates()
-            # Compliance score history indexes - for trend queries
-            await self.db.compliance_score_history.create_index([("client_id", 1), ("date_key", -1)])
-            try:
-                await self.db.compliance_score_history.create_index(
-                    [("client_id", 1), ("date_key", 1)], 
-                    unique=True
-                )
-            except Exception:
-                pass  # Index may already exist
-            # Property-level score history (event-driven)
-            await self.db.property_compliance_score_history.create_index([("property_id", 1), ("created_at", -1)])
-            await self.db.property_compliance_score_history.create_index([("client_id", 1), ("created_at", -1)])
-            # Property daily score snapshots (score trend 90-day chart per property)
-            await self.db.property_score_daily.create_index([("client_id", 1), ("property_id", 1), ("date", 1)], unique=True)
-            await self.db.property_score_daily.create_index([("client_id", 1), ("date", -1)])
-            await self.db.property_score_daily.create_index([("property_id", 1), ("date", -1)])
-            # Async compliance recalc queue (Option B)
-            try:
-                await self.db.compliance_recalc_queue.create_index(
-                    [("property_id", 1), ("correlation_id", 1)],
-                    unique=True
-                )
-            except Exception:
-                pass
-            await self.db.compliance_recalc_queue.create_index([("status", 1), ("next_run_at", 1)])
-            await self.db.compliance_recalc_queue.create_index([("property_id", 1), ("status", 1)])
-            # Compliance recalc SLA alerts (dedupe by property + alert type)
-            try:
-                await self.db.compliance_sla_alerts.create_index(
-                    [("property_id", 1), ("alert_type", 1)],
-                    unique=True
-                )
-            except Exception:
-                pass
-            await self.db.compliance_sla_alerts.create_index([("active", 1), ("last_detected_at", -1)])
-            await self.db.compliance_sla_alerts.create_index([("severity", 1)])
-            # Score events - audit-grade log for score trend and "What Changed" (client dashboard)
-            await self.db.score_events.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.score_events.create_index([("client_id", 1), ("event_type", 1), ("created_at", -1)])
-            # Score ledger - enterprise statement-of-account for score changes (before/after, drivers, trigger)
-            await self.db.score_ledger_events.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.score_ledger_events.create_index([("client_id", 1), ("property_id", 1), ("created_at", -1)])
-            await self.db.score_ledger_events.create_index([("client_id", 1), ("trigger_type", 1), ("created_at", -1)])
-            # Job runs - observability: every automation execution (for SLA watchdog and admin dashboard)
-            await self.db.job_runs.create_index([("job_name", 1), ("created_at", -1)])
-            await self.db.job_runs.create_index([("status", 1), ("created_at", -1)])
-            await self.db.job_runs.create_index("created_at")
-            # Incidents - system-wide P0/P1/P2 with ack/resolve workflow
-            await self.db.incidents.create_index([("status", 1), ("created_at", -1)])
-            await self.db.incidents.create_index([("severity", 1), ("status", 1)])
-            await self.db.incidents.create_index("created_at")
-            # Operations & Compliance: module feature flags per client
-            await self.db.client_feature_flags.create_index([("client_id", 1), ("flag_key", 1)], unique=True)
-            await self.db.client_feature_flags.create_index("client_id")
-            # Provisioning status per property/module (compliance, maintenance)
-            await self.db.provisioning_status.create_index([("client_id", 1), ("property_id", 1), ("module_name", 1)], unique=True)
-            await self.db.provisioning_status.create_index([("client_id", 1), ("module_name", 1)])
-            # Contractors (Ops: client-scoped or system-wide)
-            await self.db.contractors.create_index("contractor_id", unique=True)
-            await self.db.contractors.create_index("client_id")
-            await self.db.contractors.create_index([("vetted", 1), ("client_id", 1)])
-            # Work orders (maintenance workflows: tenant/client report → assign contractor → SLA)
-            await self.db.work_orders.create_index("work_order_id", unique=True)
-            await self.db.work_orders.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.work_orders.create_index([("client_id", 1), ("status", 1)])
-            await self.db.work_orders.create_index([("property_id", 1), ("created_at", -1)])
-            await self.db.work_orders.create_index("contractor_id", sparse=True)
-            # Property assets + maintenance events (predictive maintenance)
-            await self.db.property_assets.create_index([("property_id", 1), ("asset_id", 1)], unique=True)
-            await self.db.property_assets.create_index("property_id")
-            await self.db.maintenance_events.create_index("event_id", unique=True)
-            await self.db.maintenance_events.create_index([("property_id", 1), ("occurred_at", -1)])
-            await self.db.maintenance_events.create_index([("client_id", 1), ("occurred_at", -1)])
-            # Predictive insights cache (scheduled job writes; API can read when fresh)
-            await self.db.predictive_insights_cache.create_index("client_id", unique=True)
-            await self.db.predictive_insights_cache.create_index("updated_at")
-            # Orders (intake → payment → workflow): idempotency by Stripe session
-            try:
-                await self.db.orders.create_index("pricing.stripe_checkout_session_id", unique=True, sparse=True)
-            except Exception:
-                pass
-            await self.db.orders.create_index("source_draft_id", unique=True)
-            await self.db.orders.create_index([("status", 1), ("created_at", -1)])
-            await self.db.orders.create_index("order_ref", unique=True)
-
-            # Submissions: contact, talent, partnership (list/dedupe/audit)
-            await self.db.contact_submissions.create_index("submission_id", unique=True)
-            await self.db.contact_submissions.create_index([("email_normalized", 1), ("created_at", -1)])
-            await self.db.contact_submissions.create_index([("dedupe_key", 1), ("created_at", -1)])
-            await self.db.contact_submissions.create_index("created_at")
-            await self.db.contact_submissions.create_index("status")
-            await self.db.talent_pool.create_index("submission_id", unique=True)
-            await self.db.talent_pool.create_index([("email_normalized", 1), ("created_at", -1)])
-            await self.db.talent_pool.create_index([("dedupe_key", 1), ("created_at", -1)])
-            await self.db.talent_pool.create_index("created_at")
-            await self.db.talent_pool.create_index("status")
-            await self.db.partnership_enquiries.create_index("enquiry_id", unique=True)
-            await self.db.partnership_enquiries.create_index([("email_normalized", 1), ("created_at", -1)])
-            await self.db.partnership_enquiries.create_index([("dedupe_key", 1), ("created_at", -1)])
-            await self.db.partnership_enquiries.create_index("created_at")
-            await self.db.partnership_enquiries.create_index("status")
-            # Risk check leads (conversion demo; no client/provisioning)
-            await self.db.risk_leads.create_index("lead_id", unique=True)
-            await self.db.risk_leads.create_index("created_at")
-            await self.db.risk_leads.create_index("email")
-            await self.db.risk_leads.create_index("risk_band")
-            await self.db.risk_leads.create_index("status")
-            # Tenant portal: messages and certificate requests (landlord notification flow)
-            await self.db.tenant_messages.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.tenant_messages.create_index("message_id", unique=True)
-            await self.db.tenant_requests.create_index([("client_id", 1), ("created_at", -1)])
-            await self.db.tenant_requests.create_index("request_id", unique=True)
-            await self.db.tenant_requests.create_index([("client_id", 1), ("status", 1)])
-
-            # OTP codes - one active per (phone_hash, purpose); no raw phone stored.
-            # If the collection has a legacy unique index on (phone_e164, purpose), drop it:
-            #   db.otp_codes.dropIndex("phone_e164_1_purpose_1")
-            # Otherwise upserts can raise DuplicateKeyError when phone_e164 is absent (null).
-            try:
-                await self.db.otp_codes.create_index(
-                    [("phone_hash", 1), ("purpose", 1)],
-                    unique=True,
-                )
-            except Exception:
-                pass
-            await self.db.otp_codes.create_index("expires_at")
-            # Step-up tokens - one-time use; validate by token_hash + user_id
-            await self.db.step_up_tokens.create_index("token_hash")
-            await self.db.step_up_tokens.create_index([("user_id", 1), ("expires_at", 1)])
-
-            # Intake uploads - for migration and list by session
-            await self.db.intake_uploads.create_index("intake_session_id")
-            await self.db.intake_uploads.create_index([("intake_session_id", 1), ("status", 1)])
-            # Stripe webhook idempotency - duplicate event_id must not process twice
-            try:
-                await self.db.stripe_events.create_index("event_id", unique=True)
-            except Exception:
-                pass
-            # Normalized payments (Revenue Analytics) - idempotency and date queries
-            if hasattr(self.db, "payments"):
-                try:
-                    await self.db.payments.create_index("stripe_event_id", unique=True, sparse=True)
-                except Exception:
-                    pass
-                await self.db.payments.create_index("created_at")
-                await self.db.payments.create_index([("client_id", 1), ("created_at", -1)])
-                await self.db.payments.create_index("stripe_charge_id", sparse=True)
-                await self.db.payments.create_index("stripe_invoice_id", sparse=True)
-            # MRR snapshots for NRR (Executive Overview)
-            if hasattr(self.db, "mrr_snapshots"):
-                try:
-                    await self.db.mrr_snapshots.create_index("period", unique=True)
-                except Exception:
-                    pass
-            # Provisioning jobs - idempotency by checkout_session_id
-            await self.db.provisioning_jobs.create_index("job_id", unique=True)
-            try:
-                await self.db.provisioning_jobs.create_index("checkout_session_id", unique=True)
-            except Exception:
-                pass
-            await self.db.provisioning_jobs.create_index("client_id")
-            await self.db.provisioning_jobs.create_index("status")
-            # Analytics events - conversion funnel and operational metrics (passive logging)
-            await self.db.analytics_events.create_index([("event", 1), ("ts", -1)])
-            await self.db.analytics_events.create_index([("client_id", 1), ("ts", -1)])
-            await self.db.analytics_events.create_index([("lead_id", 1), ("ts", -1)])
-            await self.db.analytics_events.create_index("ts")
-            try:
-                await self.db.analytics_events.create_index("idempotency_key", unique=True, sparse=True)
-            except Exception:
-                pass
-            # Requirements catalog (data-driven compliance definitions)
-            await self.db.requirements_catalog.create_index("code", unique=True)
-            await self.db.requirements_catalog.create_index("category")
-            await self.db.requirements_catalog.create_index("criticality")
-            # Requirements (instance state) - ensure efficient lookups
-            await self.db.requirements.create_index([("client_id", 1), ("property_id", 1)])
-            await self.db.requirements.create_index([("property_id", 1), ("requirement_type", 1)])
-            # Assistant chat (Compliance Vault Assistant)
-            await self.db.assistant_conversations.create_index([("client_id", 1), ("last_activity_at", -1)])
-            await self.db.assistant_conversations.create_index("conversation_id", unique=True)
-            await self.db.assistant_messages.create_index([("conversation_id", 1), ("created_at", 1)])
-            await self.db.assistant_messages.create_index([("client_id", 1), ("created_at", -1)])
-            await self._seed_requirements_catalog()
-            logger.info("MongoDB indexes created/verified")
+            result = await ensure_indexes(self.db, CORE_INDEXES)
+            await self.seed_reference_data()
+            logger.info(
+                "MongoDB indexes created/verified (%s ok, %s tolerated, %s failed)",
+                result["created"], result["tolerated"], result["failed"],
+            )
         except Exception as e:
             # Indexes may already exist, log but don't fail
             logger.warning(f"Index creation note: {e}")
 
+    async def seed_reference_data(self):
+        """Seed notification templates and the requirements catalog (idempotent upserts)."""
+        await self._seed_notification_templates()
+        await self._seed_requirements_catalog()
+
     async def _seed_requirements_catalog(self):
         """Seed requirements_catalog for data-driven compliance (idempotent by code)."""
         from datetime import datetime, timezone
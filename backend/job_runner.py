@@ -1,14 +1,20 @@
 """
 Shared job runner for scheduled background jobs.
-Used by server (scheduler) and admin (manual run).
+Used by the scheduler (job_schedule.py: API lifespan or worker.py) and admin (manual run).
 Each run_* returns a dict with "message" (and optionally "count") for admin toast.
 Job execution is persisted via job_run_service for observability and SLA watchdog.
+Per-client batch jobs are split into hash shards that any worker can claim (services.partitioned_jobs).
 """
 import logging
+import time
 import traceback
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Callable, Awaitable
 
+from services.partitioned_jobs import Shard, current_job_run_id, partitioned_job, run_partitioned
+from services.query_profiler import query_profiler
+from utils.metrics import JOB_RUN_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,12 +37,19 @@ async def run_instrumented(
     if not fn:
         raise ValueError(f"Unknown job_id: {job_id}")
     job_run_id = await start_job_run(job_id, run_type, triggered_by=triggered_by)
+    token = current_job_run_id.set(job_run_id)
+    profile = None
+    started = time.perf_counter()
+    status = "success"
     try:
-        result = await fn()
+        # Mongo commands of the run are profiled under its job_run_id (when the profiler is on)
+        with query_profiler.scope("job", job_run_id, job_id) as profile:
+            result = await fn()
         count = result.get("count") if isinstance(result, dict) else None
         await finish_job_run_success(job_run_id, affected_clients_count=count)
         return result
     except Exception as e:
+        status = "failed"
         await finish_job_run_failure(
             job_run_id,
             error_code=type(e).__name__,
@@ -44,6 +57,16 @@ async def run_instrumented(
             stack_trace=traceback.format_exc(),
         )
         raise
+    finally:
+        current_job_run_id.reset(token)
+        JOB_RUN_SECONDS.observe(time.perf_counter() - started, job_id, status)
+        await query_profiler.finish(profile)
+
+
+async def run_scheduled_job(job_id: str) -> dict:
+    """Scheduler entry point. Registered by textual reference ("job_runner:run_scheduled_job") with
+    job_id as its argument, so jobs pickle into the shared MongoDB job store."""
+    return await run_instrumented(job_id, "schedule", triggered_by=None)
 
 
 def make_instrumented(job_id: str, run_type: str = "schedule"):
@@ -53,14 +76,22 @@ def make_instrumented(job_id: str, run_type: str = "schedule"):
     return _run
 
 
-async def run_daily_reminders():
+@partitioned_job("daily_reminders")
+async def daily_reminders_shard(shard: Shard) -> int:
+    from services.jobs import JobScheduler
+    job_scheduler = JobScheduler()
+    await job_scheduler.connect()
     try:
-        from services.jobs import JobScheduler
-        job_scheduler = JobScheduler()
-        await job_scheduler.connect()
-        count = await job_scheduler.send_daily_reminders()
+        return await job_scheduler.send_daily_reminders(shard=shard)
+    finally:
         await job_scheduler.close()
-        logger.info(f"Daily reminders job completed: {count} reminders sent")
+
+
+async def run_daily_reminders():
+    try:
+        result = await run_partitioned("daily_reminders")
+        count = result["count"]
+        logger.info(f"Daily reminders job completed: {count} reminders sent ({result['shards']} shards)")
         return {"message": f"Daily reminders sent: {count}", "count": count}
     except Exception as e:
         logger.error(f"Daily reminders job failed: {e}")
@@ -81,28 +112,44 @@ async def run_pending_verification_digest():
         raise
 
 
-async def run_monthly_digests():
+@partitioned_job("monthly_digest")
+async def monthly_digest_shard(shard: Shard) -> int:
+    from services.jobs import JobScheduler
+    job_scheduler = JobScheduler()
+    await job_scheduler.connect()
     try:
-        from services.jobs import JobScheduler
-        job_scheduler = JobScheduler()
-        await job_scheduler.connect()
-        count = await job_scheduler.send_monthly_digests()
+        return await job_scheduler.send_monthly_digests(shard=shard)
+    finally:
         await job_scheduler.close()
-        logger.info(f"Monthly digest job completed: {count} digests sent")
+
+
+async def run_monthly_digests():
+    try:
+        result = await run_partitioned("monthly_digest")
+        count = result["count"]
+        logger.info(f"Monthly digest job completed: {count} digests sent ({result['shards']} shards)")
         return {"message": f"Monthly digests sent: {count}", "count": count}
     except Exception as e:
         logger.error(f"Monthly digest job failed: {e}")
         raise
 
 
-async def run_compliance_status_check():
+@partitioned_job("compliance_status_check")
+async def compliance_status_check_shard(shard: Shard) -> int:
+    from services.jobs import JobScheduler
+    job_scheduler = JobScheduler()
+    await job_scheduler.connect()
     try:
-        from services.jobs import JobScheduler
-        job_scheduler = JobScheduler()
-        await job_scheduler.connect()
-        count = await job_scheduler.check_compliance_status_changes()
+        return await job_scheduler.check_compliance_status_changes(shard=shard)
+    finally:
         await job_scheduler.close()
-        logger.info(f"Compliance status check completed: {count} alerts sent")
+
+
+async def run_compliance_status_check():
+    try:
+        result = await run_partitioned("compliance_status_check")
+        count = result["count"]
+        logger.info(f"Compliance status check completed: {count} alerts sent ({result['shards']} shards)")
         return {"message": f"Compliance alerts sent: {count}", "count": count}
     except Exception as e:
         logger.error(f"Compliance status check failed: {e}")
@@ -120,17 +167,57 @@ async def run_scheduled_reports():
         raise
 
 
+@partitioned_job("compliance_score_snapshots")
+async def compliance_score_snapshots_shard(shard: Shard) -> int:
+    from services.compliance_trending import capture_all_client_snapshots
+    result = await capture_all_client_snapshots(shard=shard)
+    if result["error_count"] and not result["total_clients"]:
+        raise RuntimeError(result["errors"][0]["error"] if result["errors"] else "Snapshot shard failed")
+    return result["success_count"]
+
+
 async def run_compliance_score_snapshots():
     try:
-        from services.compliance_trending import capture_all_client_snapshots
-        result = await capture_all_client_snapshots()
-        logger.info(f"Compliance score snapshots completed: {result['success_count']}/{result['total_clients']} clients")
-        return {"message": f"Compliance score snapshots: {result['success_count']}/{result['total_clients']} clients"}
+        result = await run_partitioned("compliance_score_snapshots")
+        logger.info(f"Compliance score snapshots completed: {result['count']} clients ({result['shards']} shards)")
+        return {"message": f"Compliance score snapshots: {result['count']} clients", "count": result["count"]}
     except Exception as e:
         logger.error(f"Compliance score snapshots job failed: {e}")
         raise
 
 
+@partitioned_job("score_history_retention")
+async def score_history_retention_shard(shard: Shard) -> int:
+    from services.score_history_retention import run_retention
+    result = await run_retention(shard=shard)
+    if result["error_count"] and result["error_count"] == result["clients"]:
+        raise RuntimeError(result["errors"][0]["error"])
+    return result["archived"]
+
+
+async def run_score_history_retention():
+    """Roll up, archive and drop score history rows past the raw retention window."""
+    try:
+        result = await run_partitioned("score_history_retention")
+        logger.info(f"Score history retention completed: {result['count']} rows archived ({result['shards']} shards)")
+        return {"message": f"Score history retention: {result['count']} rows archived", "count": result["count"]}
+    except Exception as e:
+        logger.error(f"Score history retention job failed: {e}")
+        raise
+
+
+async def run_log_archival():
+    """Move message_logs / audit_logs rows past their hot window to compressed archive segments."""
+    from services.log_archive import run_log_archival as archive_logs
+    try:
+        results = await archive_logs()
+        count = sum(results.values())
+        return {"message": f"Log archival: {count} rows archived ({results})", "count": count}
+    except Exception as e:
+        logger.error(f"Log archival job failed: {e}")
+        raise
+
+
 # Backoff seconds: attempt 1 => +10s, 2 => +30s, 3 => +2m, 4 => +10m, >=5 => DEAD
 COMPLIANCE_RECALC_BACKOFF = [10, 30, 120, 600]
 
@@ -289,52 +376,17 @@ async def run_compliance_recalc_worker():
 
 
 async def run_expiry_rollover_recalc():
-    """Daily job: enqueue compliance recalc for properties whose requirements' due_date
-    crossed expiry/expiring_soon thresholds. Worker will run recalc.
+    """Daily job: apply due requirement transitions (next_transition_at <= now) and enqueue
+    compliance recalc for the affected properties. Worker will run recalc.
     """
     try:
         from database import database
-        from datetime import timedelta
-        from services.compliance_recalc_queue import (
-            enqueue_compliance_recalc,
-            TRIGGER_EXPIRY_JOB,
-            ACTOR_SYSTEM,
-        )
+        from services.requirement_transitions import process_due_transitions
 
         db = database.get_db()
-        now = datetime.now(timezone.utc)
-        window_start = (now - timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        window_end = (now + timedelta(days=31)).replace(hour=23, minute=59, second=59, microsecond=999000)
-        window_start_iso = window_start.isoformat()
-        window_end_iso = window_end.isoformat()
-        date_str = now.strftime("%Y-%m-%d")
-
-        cursor = db.requirements.find(
-            {"due_date": {"$gte": window_start_iso, "$lte": window_end_iso}},
-            {"property_id": 1}
-        )
-        property_ids = set()
-        async for doc in cursor:
-            property_ids.add(doc["property_id"])
-
-        count = 0
-        for property_id in property_ids:
-            prop = await db.properties.find_one({"property_id": property_id}, {"client_id": 1})
-            if not prop:
-                continue
-            correlation_id = f"EXPIRY_JOB:{property_id}:{date_str}"
-            enqueued = await enqueue_compliance_recalc(
-                property_id=property_id,
-                client_id=prop["client_id"],
-                trigger_reason=TRIGGER_EXPIRY_JOB,
-                actor_type=ACTOR_SYSTEM,
-                actor_id=None,
-                correlation_id=correlation_id,
-            )
-            if enqueued:
-                count += 1
-
-        logger.info(f"Expiry rollover enqueued: {count} properties")
+        result = await process_due_transitions(db, correlation_prefix="EXPIRY_JOB")
+        count = result["enqueued"]
+        logger.info(f"Expiry rollover enqueued: {count} properties ({result['processed']} due requirements)")
         return {"message": f"Expiry rollover: {count} properties enqueued", "count": count}
     except Exception as e:
         logger.error(f"Expiry rollover job failed: {e}")
@@ -400,14 +452,14 @@ async def run_stuck_order_detection():
 
 
 async def run_queued_order_processing():
+    """Safety net for the event-driven order pipeline: enqueue paid orders that were missed."""
     try:
-        from services.workflow_automation_service import workflow_automation_service
-        result = await workflow_automation_service.process_queued_orders(limit=5)
-        results = result.get("results", {})
-        processed = results.get("processed", 0)
-        if processed > 0:
-            return {"message": f"Queued order processing: {processed} processed"}
-        return {"message": "Queued order processing: no orders to process"}
+        from services.order_pipeline_queue import sweep_pipeline_orders
+        result = await sweep_pipeline_orders()
+        enqueued = result.get("enqueued", 0)
+        if enqueued > 0:
+            return {"message": f"Queued order processing: {enqueued} enqueued for the order pipeline", "count": enqueued}
+        return {"message": "Queued order processing: no orders to enqueue"}
     except Exception as e:
         logger.error(f"Queue processing job failed: {e}")
         raise
@@ -524,6 +576,17 @@ async def run_notification_retry_worker():
         raise
 
 
+async def run_extraction_queue_worker():
+    """Run PENDING document extractions (worker mode: the API enqueues, the worker process extracts)."""
+    try:
+        from services.document_extraction_service import process_extraction_queue
+        processed = await process_extraction_queue()
+        return {"message": f"Processed {processed} document extractions", "count": processed}
+    except Exception as e:
+        logger.error(f"Extraction queue worker failed: {e}")
+        raise
+
+
 async def run_pending_payment_lifecycle():
     """
     Daily task: mark lifecycle_status pending_payment -> abandoned if created_at older than 14 days
@@ -620,8 +683,9 @@ async def run_risk_lead_nurture_processing():
     return {"message": f"Risk lead nurture: {sent} email(s) sent", "count": sent}
 
 
-async def run_predictive_insights_job():
-    """Precompute predictive maintenance insights for all clients with PREDICTIVE_MAINTENANCE. Writes to cache."""
+@partitioned_job("predictive_insights_job")
+async def predictive_insights_shard(shard: Shard) -> int:
+    """Precompute predictive maintenance insights for this shard's clients with PREDICTIVE_MAINTENANCE."""
     from database import database
     from services.ops_compliance_feature_flags import get_effective_flags, PREDICTIVE_MAINTENANCE
     from services.predictive_service import get_insights_for_client
@@ -629,7 +693,7 @@ async def run_predictive_insights_job():
     db = database.get_db()
     clients = await db.clients.find({}, {"_id": 0, "client_id": 1, "billing_plan": 1}).to_list(10000)
     count = 0
-    for c in clients:
+    for c in shard.filter_clients(clients):
         try:
             flags = await get_effective_flags(c["client_id"], c.get("billing_plan"))
             if not flags.get(PREDICTIVE_MAINTENANCE):
@@ -638,9 +702,28 @@ async def run_predictive_insights_job():
             count += 1
         except Exception as e:
             logger.warning("Predictive insights skip client %s: %s", c.get("client_id"), e)
+    return count
+
+
+async def run_predictive_insights_job():
+    """Precompute predictive maintenance insights for all clients with PREDICTIVE_MAINTENANCE. Writes to cache."""
+    result = await run_partitioned("predictive_insights_job")
+    count = result["count"]
     return {"message": f"Predictive insights precomputed for {count} client(s)", "count": count}
 
 
+async def run_clearform_credit_reconcile():
+    """Check ClearForm credit balances against the transaction log and expiry batches (report-only)."""
+    from clearform.services.credit_service import credit_service
+
+    report = await credit_service.reconcile_balances()
+    drifted = report["users_drifted"]
+    return {
+        "message": f"ClearForm credit reconciliation: {drifted} of {report['users_checked']} user(s) drifted",
+        "count": drifted,
+    }
+
+
 # Map scheduler job id -> run function (for admin manual run)
 JOB_RUNNERS = {
     "daily_reminders": run_daily_reminders,
@@ -650,6 +733,8 @@ JOB_RUNNERS = {
     "compliance_check_evening": run_compliance_status_check,
     "scheduled_reports": run_scheduled_reports,
     "compliance_score_snapshots": run_compliance_score_snapshots,
+    "score_history_retention": run_score_history_retention,
+    "log_archival": run_log_archival,
     "compliance_recalc_worker": run_compliance_recalc_worker,
     "expiry_rollover_recalc": run_expiry_rollover_recalc,
     "order_delivery_processing": run_order_delivery_processing,
@@ -665,6 +750,8 @@ JOB_RUNNERS = {
     "sla_watchdog": run_sla_watchdog,
     "notification_failure_spike_monitor": run_notification_failure_spike_monitor,
     "notification_retry_worker": run_notification_retry_worker,
+    "extraction_queue_worker": run_extraction_queue_worker,
     "pending_payment_lifecycle": run_pending_payment_lifecycle,
     "predictive_insights_job": run_predictive_insights_job,
+    "clearform_credit_reconcile": run_clearform_credit_reconcile,
 }
@@ -0,0 +1,221 @@
+"""
+Scheduled job table, scheduler factory and leader-elected scheduler loop.
+
+Where jobs run is chosen by SCHEDULER_MODE:
+- embedded (default): the API lifespan runs the scheduler. Each process joins the leader election,
+  so with several uvicorn workers or replicas only the lock holder fires jobs.
+- worker: API processes never start a scheduler; `python worker.py` (see worker.py) owns the
+  scheduler, the recalc / notification-retry / extraction queues and one pooled DB client.
+  Run one or more worker replicas: the same leader lock makes every job run exactly once.
+
+The lock (services.leader_lock, collection scheduled_jobs_lock) guards the shared APScheduler
+job store (scheduled_jobs). Followers keep the scheduler paused and take over within the lock TTL.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_MODE_EMBEDDED = "embedded"
+SCHEDULER_MODE_WORKER = "worker"
+JOBSTORE_COLLECTION = "scheduled_jobs"
+
+
+def scheduler_mode() -> str:
+    mode = (os.environ.get("SCHEDULER_MODE") or SCHEDULER_MODE_EMBEDDED).strip().lower()
+    return mode if mode in (SCHEDULER_MODE_EMBEDDED, SCHEDULER_MODE_WORKER) else SCHEDULER_MODE_EMBEDDED
+
+
+def background_jobs_in_worker() -> bool:
+    """True when queues are drained by worker.py rather than by tasks inside API processes."""
+    return scheduler_mode() == SCHEDULER_MODE_WORKER
+
+
+class ScheduledJob(NamedTuple):
+    job_id: str
+    name: str
+    trigger: object
+    worker_only: bool = False
+
+
+SCHEDULED_JOBS: List[ScheduledJob] = [
+    # Daily reminders at 9:00 AM UTC
+    ScheduledJob("daily_reminders", "Daily Compliance Reminders", CronTrigger(hour=9, minute=0)),
+    # Pending verification digest daily at 9:30 AM UTC (counts only, no PII)
+    ScheduledJob("pending_verification_digest", "Pending Verification Digest", CronTrigger(hour=9, minute=30)),
+    # Monthly digest on the 1st of each month at 10:00 AM UTC
+    ScheduledJob("monthly_digest", "Monthly Compliance Digest", CronTrigger(day=1, hour=10, minute=0)),
+    # Compliance status check - runs twice daily at 8:00 AM and 6:00 PM UTC
+    ScheduledJob("compliance_check_morning", "Compliance Status Check (Morning)", CronTrigger(hour=8, minute=0)),
+    ScheduledJob("compliance_check_evening", "Compliance Status Check (Evening)", CronTrigger(hour=18, minute=0)),
+    # Scheduled reports - runs every hour
+    ScheduledJob("scheduled_reports", "Process Scheduled Reports", CronTrigger(minute=0)),
+    # Daily compliance score snapshots at 2:00 AM UTC
+    ScheduledJob("compliance_score_snapshots", "Daily Compliance Score Snapshots", CronTrigger(hour=2, minute=0)),
+    # Score history retention (rollups + archive) at 2:45 AM UTC, after the snapshots
+    ScheduledJob("score_history_retention", "Score History Retention (rollups + archive)", CronTrigger(hour=2, minute=45)),
+    # message_logs / audit_logs hot/cold archival - daily 1:30 AM UTC
+    ScheduledJob("log_archival", "Log Archival (message_logs, audit_logs)", CronTrigger(hour=1, minute=30)),
+    # Expiry rollover - daily 00:10 UTC
+    ScheduledJob("expiry_rollover_recalc", "Expiry Rollover Compliance Recalc", CronTrigger(hour=0, minute=10)),
+    # Async compliance recalc worker - every 15 seconds
+    ScheduledJob("compliance_recalc_worker", "Compliance Recalc Worker", IntervalTrigger(seconds=15)),
+    # Compliance recalc SLA monitor - every 5 minutes
+    ScheduledJob("compliance_recalc_sla_monitor", "Compliance Recalc SLA Monitor", CronTrigger(minute="*/5")),
+    # Notification failure spike monitor - every 5 minutes
+    ScheduledJob("notification_failure_spike_monitor", "Notification Failure Spike Monitor", CronTrigger(minute="*/5")),
+    # SLA watchdog (job run SLA) - every 10 minutes
+    ScheduledJob("sla_watchdog", "SLA Watchdog (job run monitoring)", CronTrigger(minute="*/10")),
+    # Notification retry worker - every minute
+    ScheduledJob("notification_retry_worker", "Notification Retry Worker", CronTrigger(minute="*")),
+    # Order delivery processing - every 5 minutes
+    ScheduledJob("order_delivery_processing", "Order Delivery Processing", CronTrigger(minute="*/5")),
+    # SLA monitoring - every 15 minutes
+    ScheduledJob("sla_monitoring", "SLA Monitoring", CronTrigger(minute="*/15")),
+    # Stuck order detection - every 30 minutes
+    ScheduledJob("stuck_order_detection", "Stuck Order Detection", CronTrigger(minute="*/30")),
+    # Queued order processing - every 10 minutes
+    ScheduledJob("queued_order_processing", "Queued Order Processing", CronTrigger(minute="*/10")),
+    # Abandoned intake detection - every 15 minutes
+    ScheduledJob("abandoned_intake_detection", "Abandoned Intake Detection", CronTrigger(minute="*/15")),
+    # Lead follow-up processing - every 15 minutes
+    ScheduledJob("lead_followup_processing", "Lead Follow-up Processing", CronTrigger(minute="*/15")),
+    # Pending payment lifecycle - daily 3:00 AM UTC
+    ScheduledJob("pending_payment_lifecycle", "Pending Payment Lifecycle (abandoned/archived)", CronTrigger(hour=3, minute=0)),
+    # Lead SLA breach check - every hour
+    ScheduledJob("lead_sla_check", "Lead SLA Breach Check", CronTrigger(minute=0)),
+    # Checklist nurture - daily 9:00 AM UTC
+    ScheduledJob("checklist_nurture_processing", "Checklist Nurture (compliance checklist leads)", CronTrigger(hour=9, minute=0)),
+    # Risk-check lead nurture (steps 2–5 at day 2, 4, 6, 10) - daily at 9:15 AM UTC
+    ScheduledJob("risk_lead_nurture_processing", "Risk Lead Nurture (risk-check conversion leads)", CronTrigger(hour=9, minute=15)),
+    # Predictive maintenance insights - daily 4:00 AM UTC (warms insights for clients with PREDICTIVE_MAINTENANCE)
+    ScheduledJob("predictive_insights_job", "Predictive Maintenance Insights (precompute)", CronTrigger(hour=4, minute=0)),
+    # ClearForm credit ledger reconciliation - daily 3:30 AM UTC (report-only)
+    ScheduledJob("clearform_credit_reconcile", "ClearForm Credit Reconciliation", CronTrigger(hour=3, minute=30)),
+    # Document extraction queue - every 15 seconds (worker mode; embedded API runs extractions as tasks)
+    ScheduledJob("extraction_queue_worker", "Document Extraction Queue Worker", IntervalTrigger(seconds=15), worker_only=True),
+]
+
+
+def create_scheduler() -> AsyncIOScheduler:
+    """AsyncIOScheduler backed by the shared MongoDB job store (memory store if Mongo is unavailable)."""
+    mongo_url = os.environ.get("MONGO_URL", "mongodb://localhost:27017")
+    db_name = os.environ.get("DB_NAME", "compliance_vault_pro")
+    jobstores = {}
+    try:
+        from pymongo import MongoClient
+        from apscheduler.jobstores.mongodb import MongoDBJobStore
+        jobstores["default"] = MongoDBJobStore(
+            database=db_name,
+            collection=JOBSTORE_COLLECTION,
+            client=MongoClient(mongo_url),
+        )
+        logger.info(f"MongoDB job store configured: {db_name}.{JOBSTORE_COLLECTION}")
+    except Exception as e:
+        logger.warning(f"Failed to configure MongoDB job store, using memory store: {e}")
+    options = {}
+    try:
+        options["event_loop"] = asyncio.get_running_loop()  # async jobs run on the caller's loop
+    except RuntimeError:
+        pass
+    # coalesce: a leader that takes over late runs a missed job once, not once per missed slot
+    return AsyncIOScheduler(jobstores=jobstores, job_defaults={"coalesce": True, "max_instances": 1}, **options)
+
+
+def register_jobs(scheduler: AsyncIOScheduler, include_worker_only: Optional[bool] = None) -> int:
+    """Add every scheduled job (replace_existing, so all processes agree on the shared job store)."""
+    if include_worker_only is None:
+        include_worker_only = background_jobs_in_worker()
+    count = 0
+    for job in SCHEDULED_JOBS:
+        if job.worker_only and not include_worker_only:
+            continue
+        # Textual reference + args: closures cannot be pickled into the shared job store
+        scheduler.add_job(
+            "job_runner:run_scheduled_job",
+            job.trigger,
+            args=[job.job_id],
+            id=job.job_id,
+            name=job.name,
+            replace_existing=True,
+        )
+        count += 1
+    return count
+
+
+async def list_scheduled_jobs(db) -> List[dict]:
+    """Jobs as persisted in the shared job store (works whichever process runs the scheduler)."""
+    names = {job.job_id: job.name for job in SCHEDULED_JOBS}
+    rows = []
+    async for doc in db[JOBSTORE_COLLECTION].find({}, {"_id": 1, "next_run_time": 1}).sort("next_run_time", 1):
+        ts = doc.get("next_run_time")
+        rows.append({
+            "id": doc["_id"],
+            "name": names.get(doc["_id"], doc["_id"]),
+            "next_run": datetime.fromtimestamp(ts, timezone.utc).isoformat() if ts is not None else None,
+        })
+    return rows
+
+
+class LeaderElectedScheduler:
+    """
+    Runs a scheduler only while holding the scheduled_jobs leader lock.
+    start(): scheduler starts paused and a background task acquires/renews the lock, resuming
+    the scheduler on acquisition and pausing it when the lock is lost.
+    """
+
+    def __init__(self, scheduler: AsyncIOScheduler, lock):
+        self.scheduler = scheduler
+        self.lock = lock
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.is_leader
+
+    async def step(self) -> bool:
+        """One election round: acquire/renew, then resume or pause the scheduler accordingly."""
+        leader = await self.lock.acquire()
+        if leader and self.scheduler.state == 2:  # STATE_PAUSED
+            self.scheduler.resume()
+            logger.info("Scheduler resumed: this process is the job leader (%s)", self.lock.owner_id)
+        elif not leader and self.scheduler.state == 1:  # STATE_RUNNING
+            self.scheduler.pause()
+            logger.info("Scheduler paused: another process holds the job lock")
+        return leader
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.step()
+            except Exception as e:
+                logger.warning("Scheduler leader election round failed: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.lock.renew_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        self.scheduler.start(paused=True)
+        await self.step()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+        await self.lock.release()
@@ -4,10 +4,13 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Optional, Callable
 from datetime import datetime, timezone
 import logging
+import time
 import uuid
 from auth import decode_access_token
 from models import UserRole, OnboardingStatus, PasswordStatus
 from database import database
+from services.query_profiler import current_correlation_id, query_profiler
+from utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +23,55 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
         correlation_id = (request.headers.get(CORRELATION_ID_HEADER) or "").strip() or str(uuid.uuid4())
         request.state.correlation_id = correlation_id
-        response = await call_next(request)
+        # Mongo commands issued by this request are attributed to the correlation id (sampled profiles)
+        token = current_correlation_id.set(correlation_id)
+        try:
+            with query_profiler.scope(
+                "request", correlation_id, f"{request.method} {request.url.path}", sampled=query_profiler.should_sample()
+            ) as profile:
+                response = await call_next(request)
+        finally:
+            current_correlation_id.reset(token)
+        query_profiler.finish_in_background(profile)
         if CORRELATION_ID_HEADER not in response.headers:
             response.headers[CORRELATION_ID_HEADER] = correlation_id
         return response
 
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: request latency per route template and in-flight count (utils.metrics).
+    The route template is read from the scope after routing, so /api/clients/{client_id} is one series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope.get("method", ""),
+                getattr(route, "path", None) or "unmatched",
+                status_code,
+            )
+
 async def get_current_user(request: Request) -> Optional[dict]:
     """Extract and validate current user from JWT token. Validates session_version when present (force-logout)."""
     auth_header = request.headers.get("Authorization")
@@ -0,0 +1,180 @@
+"""
+Route groups and process roles.
+
+server.py used to import every route module at load time. Routers are now listed here (in the
+original include order, which matters for overlapping prefixes) with the group they belong to;
+include_routers() imports only the modules of enabled groups.
+
+Enabled groups come from ROUTE_GROUPS (comma-separated group names, or "all") or else from
+PROCESS_ROLE:
+- api (default): every group
+- public: auth + public (marketing site, intake/checkout, Stripe webhooks)
+- client: auth + client portal
+- admin: auth + admin console
+- clearform: ClearForm product only
+- worker: no routes (scheduler/worker processes that only need the app object)
+"""
+import importlib
+import logging
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GROUP_AUTH = "auth"
+GROUP_PUBLIC = "public"
+GROUP_CLIENT = "client"
+GROUP_ADMIN = "admin"
+GROUP_CLEARFORM = "clearform"
+
+ALL_GROUPS = (GROUP_AUTH, GROUP_PUBLIC, GROUP_CLIENT, GROUP_ADMIN, GROUP_CLEARFORM)
+
+PROCESS_ROLES: Dict[str, Tuple[str, ...]] = {
+    "api": ALL_GROUPS,
+    "public": (GROUP_AUTH, GROUP_PUBLIC),
+    "client": (GROUP_AUTH, GROUP_CLIENT),
+    "admin": (GROUP_AUTH, GROUP_ADMIN),
+    "clearform": (GROUP_CLEARFORM,),
+    "worker": (),
+}
+DEFAULT_ROLE = "api"
+
+
+class RouterEntry(NamedTuple):
+    group: str
+    module: str
+    attr: str = "router"
+    kwargs: Tuple[Tuple[str, Any], ...] = ()
+
+
+def _r(group: str, module: str, attr: str = "router", **kwargs) -> RouterEntry:
+    return RouterEntry(group, module, attr, tuple(kwargs.items()))
+
+
+# Include order preserved from server.py
+ROUTERS: List[RouterEntry] = [
+    _r(GROUP_AUTH, "routes.auth"),
+    _r(GROUP_PUBLIC, "routes.intake"),
+    _r(GROUP_AUTH, "routes.onboarding"),
+    _r(GROUP_AUTH, "routes.portal"),
+    _r(GROUP_PUBLIC, "routes.webhooks"),
+    _r(GROUP_CLIENT, "routes.client"),
+    _r(GROUP_CLIENT, "routes.portfolio"),
+    _r(GROUP_ADMIN, "routes.admin"),
+    _r(GROUP_ADMIN, "routes.observability"),  # Admin: job-runs, incidents, score-events, boot report
+    _r(GROUP_CLIENT, "routes.documents"),
+    _r(GROUP_CLIENT, "routes.assistant"),
+    _r(GROUP_CLIENT, "routes.profile"),
+    _r(GROUP_CLIENT, "routes.properties"),
+    _r(GROUP_ADMIN, "routes.rules"),
+    _r(GROUP_ADMIN, "routes.templates"),
+    _r(GROUP_CLIENT, "routes.calendar"),
+    _r(GROUP_CLIENT, "routes.sms"),
+    _r(GROUP_AUTH, "routes.otp"),
+    _r(GROUP_CLIENT, "routes.reports"),
+    _r(GROUP_CLIENT, "routes.tenant"),
+    _r(GROUP_CLIENT, "routes.webhooks_config"),
+    _r(GROUP_CLIENT, "routes.billing"),
+    _r(GROUP_ADMIN, "routes.admin_billing"),
+    _r(GROUP_PUBLIC, "routes.public"),
+    _r(GROUP_PUBLIC, "routes.public_orders"),
+    _r(GROUP_ADMIN, "routes.admin_orders"),
+    _r(GROUP_PUBLIC, "routes.orders"),
+    _r(GROUP_CLIENT, "routes.client_orders"),
+    _r(GROUP_ADMIN, "routes.admin_notifications"),
+    _r(GROUP_ADMIN, "routes.admin_services"),  # Canonical /api/admin/services (task paths)
+    _r(GROUP_PUBLIC, "routes.public_services"),
+    _r(GROUP_PUBLIC, "routes.blog"),
+    _r(GROUP_ADMIN, "routes.admin_services_v2", prefix="/api/admin/services/v2"),  # V2 at /v2 only
+    _r(GROUP_PUBLIC, "routes.public_services_v2"),
+    _r(GROUP_PUBLIC, "routes.services_public"),
+    _r(GROUP_ADMIN, "routes.orchestration"),
+    _r(GROUP_PUBLIC, "routes.intake_wizard"),
+    _r(GROUP_ADMIN, "routes.admin_intake_schema"),
+    _r(GROUP_ADMIN, "routes.admin_pending_payments"),
+    _r(GROUP_ADMIN, "routes.analytics"),
+    _r(GROUP_PUBLIC, "routes.support", "public_router"),
+    _r(GROUP_CLIENT, "routes.support", "client_router"),
+    _r(GROUP_ADMIN, "routes.support", "admin_router"),
+    _r(GROUP_ADMIN, "routes.admin_canned_responses"),
+    _r(GROUP_PUBLIC, "routes.knowledge_base", "public_router"),
+    _r(GROUP_ADMIN, "routes.knowledge_base", "admin_router"),
+    _r(GROUP_PUBLIC, "routes.leads", "public_router"),
+    _r(GROUP_ADMIN, "routes.leads", "admin_router"),
+    _r(GROUP_PUBLIC, "routes.consent", "public_router"),
+    _r(GROUP_ADMIN, "routes.consent", "admin_router"),
+    _r(GROUP_ADMIN, "routes.cms"),  # Admin CMS routes
+    _r(GROUP_PUBLIC, "routes.cms", "public_router"),  # Public CMS page rendering
+    _r(GROUP_ADMIN, "routes.enablement"),  # Customer Enablement Automation Engine
+    _r(GROUP_ADMIN, "routes.reporting"),  # Full Reporting System - Export & Scheduling
+    _r(GROUP_PUBLIC, "routes.reporting", "public_router"),  # Public Report Sharing
+    _r(GROUP_ADMIN, "routes.team"),  # Team Permissions & Role Management
+    _r(GROUP_ADMIN, "routes.prompts"),  # Enterprise Prompt Manager
+    _r(GROUP_ADMIN, "routes.admin_document_templates"),  # Server-side DOCX templates (per service/doc_type)
+    _r(GROUP_ADMIN, "routes.document_packs"),  # Document Pack Orchestrator
+    _r(GROUP_PUBLIC, "routes.checkout_validation"),  # Checkout Validation
+    _r(GROUP_PUBLIC, "routes.marketing"),  # Marketing Website CMS
+    _r(GROUP_ADMIN, "routes.admin_legal_content"),  # Legal Content Editor
+    _r(GROUP_PUBLIC, "routes.talent_pool"),  # Talent Pool
+    _r(GROUP_PUBLIC, "routes.partnerships"),  # Partnerships
+    _r(GROUP_PUBLIC, "routes.admin_modules"),  # Public endpoints
+    _r(GROUP_ADMIN, "routes.admin_modules", "router_admin"),  # Admin endpoints
+    _r(GROUP_ADMIN, "routes.admin_submissions"),  # Unified submissions list/get/patch/notes/export
+    _r(GROUP_PUBLIC, "routes.intake_uploads"),  # Intake document uploads
+    _r(GROUP_PUBLIC, "routes.risk_check"),  # Compliance Risk Check (standalone demo, no client/provisioning)
+    _r(GROUP_ADMIN, "routes.admin_risk_leads"),  # Admin: risk leads list, export, resend report
+    _r(GROUP_ADMIN, "routes.ops_compliance"),  # Admin: Operations & Compliance (feature flags, plan usage)
+    _r(GROUP_ADMIN, "routes.contractors"),  # Admin: Contractors (Ops Contractor Network)
+    _r(GROUP_ADMIN, "routes.maintenance"),  # Admin: Work orders (Ops Maintenance)
+    _r(GROUP_CLIENT, "routes.client_maintenance"),  # Client: Maintenance work orders (gated by MAINTENANCE_WORKFLOWS)
+    _r(GROUP_ADMIN, "routes.predictive_data"),  # Admin: Property assets & maintenance events (data for predictive)
+    # ClearForm Routes - Separate Product (Isolated)
+    _r(GROUP_CLEARFORM, "clearform.routes.auth"),
+    _r(GROUP_CLEARFORM, "clearform.routes.credits"),
+    _r(GROUP_CLEARFORM, "clearform.routes.documents"),
+    _r(GROUP_CLEARFORM, "clearform.routes.subscriptions"),
+    _r(GROUP_CLEARFORM, "clearform.routes.webhooks"),  # ClearForm Stripe Webhooks
+    _r(GROUP_CLEARFORM, "clearform.routes.document_types"),  # Document Types (Admin-configurable)
+    _r(GROUP_CLEARFORM, "clearform.routes.document_types", "templates_router"),  # User Templates
+    _r(GROUP_CLEARFORM, "clearform.routes.workspaces", "workspaces_router"),
+    _r(GROUP_CLEARFORM, "clearform.routes.workspaces", "profiles_router"),  # Smart Profiles
+    _r(GROUP_CLEARFORM, "clearform.routes.organizations"),  # Organizations (Institutional)
+    _r(GROUP_CLEARFORM, "clearform.routes.audit"),
+    _r(GROUP_CLEARFORM, "clearform.routes.admin"),  # ClearForm Admin Panel
+]
+
+
+def process_role() -> str:
+    return (os.environ.get("PROCESS_ROLE") or DEFAULT_ROLE).strip().lower()
+
+
+def enabled_route_groups(role: Optional[str] = None, groups_env: Optional[str] = None) -> Tuple[str, ...]:
+    """Groups for this process: ROUTE_GROUPS if set, else the PROCESS_ROLE preset."""
+    raw = os.environ.get("ROUTE_GROUPS", "") if groups_env is None else groups_env
+    if raw.strip():
+        names = [g.strip().lower() for g in raw.split(",") if g.strip()]
+        if "all" in names:
+            return ALL_GROUPS
+        unknown = [g for g in names if g not in ALL_GROUPS]
+        if unknown:
+            raise ValueError(f"Unknown route group(s) in ROUTE_GROUPS: {', '.join(unknown)}")
+        return tuple(g for g in ALL_GROUPS if g in names)
+    role = role or process_role()
+    if role not in PROCESS_ROLES:
+        raise ValueError(f"Unknown PROCESS_ROLE {role!r} (expected one of {', '.join(PROCESS_ROLES)})")
+    return PROCESS_ROLES[role]
+
+
+def routers_for(groups: Iterable[str]) -> List[RouterEntry]:
+    enabled = set(groups)
+    return [entry for entry in ROUTERS if entry.group in enabled]
+
+
+def include_routers(app, groups: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """Import and include the routers of enabled groups (modules of disabled groups are never imported)."""
+    groups = tuple(enabled_route_groups() if groups is None else groups)
+    for entry in routers_for(groups):
+        module = importlib.import_module(entry.module)
+        app.include_router(getattr(module, entry.attr), **dict(entry.kwargs))
+    logger.info("Route groups enabled: %s", ", ".join(groups) or "(none)")
+    return groups
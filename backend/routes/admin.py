@@ -5,6 +5,10 @@ from database import database
 from middleware import admin_route_guard, require_owner, require_owner_or_admin, require_support_or_above
 from models import AuditAction, EmailTemplateAlias, PasswordToken, UserRole, UserStatus, PasswordStatus, ProvisioningJobStatus
 from utils.audit import create_audit_log
+from services.calendar_feed import CALENDAR_FEED_CLIENT_FIELDS, invalidate_calendar_feed
+from services.client_search_index import is_search_index_ready, reindex_client, search_clients
+from services.log_archive import count_logs, find_logs
+from utils.pagination import InvalidCursorError, cached_count, count_cache, keyset_filter, keyset_sort, next_cursor_for
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 import logging
@@ -256,7 +260,6 @@ async def get_email_delivery(
 ):
     """Read-only email delivery view (message_logs + EMAIL_SKIPPED_NO_RECIPIENT audit). No recipient in response."""
     await admin_route_guard(request)
-    db = database.get_db()
     try:
         since_dt = datetime.now(timezone.utc) - timedelta(hours=since_hours)
         status_order = {"failed": 0, "skipped": 1, "sent": 2}
@@ -278,27 +281,24 @@ async def get_email_delivery(
                 ]
             if client_id:
                 q["client_id"] = client_id
-            count_msg = await db.message_logs.count_documents(q)
-            cursor = (
-                db.message_logs.find(
-                    q,
-                    {
-                        "_id": 0,
-                        "created_at": 1,
-                        "template_alias": 1,
-                        "template_key": 1,
-                        "status": 1,
-                        "client_id": 1,
-                        "message_id": 1,
-                        "provider_error_type": 1,
-                        "provider_error_code": 1,
-                        "error_message": 1,
-                    },
-                )
-                .sort("created_at", -1)
-                .limit(2000)
+            count_msg = await count_logs("message_logs", q)
+            raw = await find_logs(
+                "message_logs",
+                q,
+                limit=2000,
+                projection={
+                    "_id": 0,
+                    "created_at": 1,
+                    "template_alias": 1,
+                    "template_key": 1,
+                    "status": 1,
+                    "client_id": 1,
+                    "message_id": 1,
+                    "provider_error_type": 1,
+                    "provider_error_code": 1,
+                    "error_message": 1,
+                },
             )
-            raw = await cursor.to_list(2000)
             for r in raw:
                 st = r.get("status") or ""
                 status_normalized = st.lower() if st in ("SENT", "FAILED", "sent", "failed") else st
@@ -321,16 +321,10 @@ async def get_email_delivery(
                 q["client_id"] = client_id
             if template_alias:
                 q["metadata.template"] = template_alias
-            count_audit = await db.audit_logs.count_documents(q)
-            cursor = (
-                db.audit_logs.find(
-                    q,
-                    {"_id": 0, "timestamp": 1, "client_id": 1, "metadata": 1},
-                )
-                .sort("timestamp", -1)
-                .limit(2000)
+            count_audit = await count_logs("audit_logs", q)
+            raw = await find_logs(
+                "audit_logs", q, limit=2000, projection={"_id": 0, "timestamp": 1, "client_id": 1, "metadata": 1},
             )
-            raw = await cursor.to_list(2000)
             for r in raw:
                 meta = r.get("metadata") or {}
                 template = meta.get("template")
@@ -372,6 +366,37 @@ async def get_email_delivery(
         )
 
 
+_SEARCH_RESULT_PROJECTION = {
+    "_id": 0, "client_id": 1, "customer_reference": 1, "full_name": 1,
+    "email": 1, "company_name": 1, "subscription_status": 1,
+    "onboarding_status": 1, "billing_plan": 1, "created_at": 1,
+}
+
+
+async def _search_clients_indexed(db, search_term: str, limit: int) -> list:
+    """Ranked clients from the client search index, in relevance order."""
+    ranked = await search_clients(search_term, limit=limit)
+    if not ranked:
+        return []
+    by_id = {
+        c["client_id"]: c
+        for c in await db.clients.find(
+            {"client_id": {"$in": [r["client_id"] for r in ranked]}},
+            _SEARCH_RESULT_PROJECTION,
+        ).to_list(len(ranked))
+    }
+    clients = []
+    for r in ranked:
+        c = by_id.get(r["client_id"])
+        if not c:
+            continue
+        if r["matched_via"] == "postcode":
+            c["matched_via"] = "postcode"
+            c["matched_postcode"] = r["matched_postcode"]
+        clients.append(c)
+    return clients
+
+
 @router.get("/search")
 async def global_search(request: Request, q: str = "", limit: int = 20):
     """
@@ -387,6 +412,24 @@ async def global_search(request: Request, q: str = "", limit: int = 20):
     search_term = q.strip()
     
     try:
+        if await is_search_index_ready():
+            clients = await _search_clients_indexed(db, search_term, limit)
+            await create_audit_log(
+                action=AuditAction.ADMIN_SEARCH_PERFORMED,
+                actor_id=user.get("portal_user_id"),
+                actor_role=UserRole.ROLE_ADMIN,
+                metadata={
+                    "search_query": search_term,
+                    "results_count": len(clients)
+                }
+            )
+            return {
+                "results": clients,
+                "query": search_term,
+                "total": len(clients)
+            }
+
+        # Legacy regex search (search index not built yet)
         # Build search conditions
         # 1. Exact CRN match (case-insensitive)
         # 2. Email contains (case-insensitive)
@@ -631,6 +674,72 @@ async def get_system_statistics(request: Request):
 _PLAN_CODE_TO_BILLING = {"solo": "PLAN_1_SOLO", "portfolio": "PLAN_2_PORTFOLIO", "pro": "PLAN_3_PRO"}
 
 
+# Max clients matched by q on the admin clients list (search index mode)
+CLIENT_LIST_SEARCH_CAP = 1000
+
+_CLIENT_LIST_LOOKUPS = [
+    {"$lookup": {"from": "client_billing", "localField": "client_id", "foreignField": "client_id", "as": "_billing"}},
+    {"$lookup": {"from": "properties", "localField": "client_id", "foreignField": "client_id", "as": "_props"}},
+    {
+        "$addFields": {
+            "property_count": {"$size": "$_props"},
+            "current_period_end": {"$arrayElemAt": ["$_billing.current_period_end", 0]},
+            "cancel_at_period_end": {"$arrayElemAt": ["$_billing.cancel_at_period_end", 0]},
+            "plan_code": "$billing_plan",
+            "portfolio_score_band": None,
+        }
+    },
+]
+
+
+async def _get_clients_keyset(db, match: dict, cursor: str, limit: int, min_properties, max_properties) -> dict:
+    """Keyset page of the admin clients list. Lookups run only on the page (plus property-count filter)."""
+    property_match = {}
+    if min_properties is not None:
+        property_match.setdefault("property_count", {})["$gte"] = min_properties
+    if max_properties is not None:
+        property_match.setdefault("property_count", {})["$lte"] = max_properties
+
+    pipeline = [
+        {"$match": keyset_filter(match, cursor, "created_at", "client_id")},
+        {"$sort": dict(keyset_sort("created_at", "client_id"))},
+    ]
+    if not property_match:
+        # Limit before the joins so each page costs O(limit) lookups
+        pipeline.append({"$limit": limit})
+    pipeline.extend(_CLIENT_LIST_LOOKUPS)
+    if property_match:
+        pipeline.append({"$match": property_match})
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": {"_id": 0, "_billing": 0, "_props": 0}})
+
+    clients = await db.clients.aggregate(pipeline).to_list(length=limit)
+    next_cursor = next_cursor_for(clients, limit, "created_at", "client_id")
+    for c in clients:
+        val = c.get("current_period_end")
+        if hasattr(val, "isoformat"):
+            c["current_period_end"] = val.isoformat()
+        if c.get("cancel_at_period_end") is None:
+            c["cancel_at_period_end"] = False
+
+    if property_match:
+        async def _count_with_properties() -> int:
+            count_pipeline = [{"$match": match}, _CLIENT_LIST_LOOKUPS[1], {"$addFields": {"property_count": {"$size": "$_props"}}}, {"$match": property_match}, {"$count": "n"}]
+            rows = await db.clients.aggregate(count_pipeline).to_list(length=1)
+            return rows[0]["n"] if rows else 0
+        total = await count_cache.get_or_compute("clients_with_properties", [match, property_match], _count_with_properties)
+    else:
+        total = await cached_count(db.clients, match)
+
+    return {
+        "clients": clients,
+        "total": total,
+        "skip": 0,
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/clients")
 async def get_clients(
     request: Request,
@@ -643,12 +752,15 @@ async def get_clients(
     max_properties: int = None,
     risk_band: str = None,
     q: str = None,
+    cursor: str = None,
 ):
     """
     Get all clients (admin only). Supports filtering by subscription_status, onboarding_status,
     plan_code (solo|portfolio|pro), min_properties, max_properties, and q (search name/email/CRN).
     Returns each client with plan_code, subscription_status, current_period_end, cancel_at_period_end,
     property_count; portfolio_score_band reserved for future use.
+    Pass cursor (next_cursor from a previous page) for keyset pagination ordered by
+    (created_at, client_id) desc; skip is kept for backward compatibility.
     """
     await admin_route_guard(request)
     db = database.get_db()
@@ -665,7 +777,10 @@ async def get_clients(
             plan_key = (plan_code or "").strip().lower()
             if plan_key in _PLAN_CODE_TO_BILLING:
                 match["billing_plan"] = _PLAN_CODE_TO_BILLING[plan_key]
-        if q and q.strip():
+        if q and q.strip() and await is_search_index_ready():
+            ranked = await search_clients(q.strip(), limit=CLIENT_LIST_SEARCH_CAP)
+            match["client_id"] = {"$in": [r["client_id"] for r in ranked]}
+        elif q and q.strip():
             q_esc = re.escape(q.strip())
             match["$or"] = [
                 {"full_name": {"$regex": q_esc, "$options": "i"}},
@@ -674,6 +789,9 @@ async def get_clients(
             ]
         # risk_band filter reserved for future use (no-op when portfolio_score_band not stored)
 
+        if cursor is not None:
+            return await _get_clients_keyset(db, match, cursor, limit, min_properties, max_properties)
+
         pipeline = [
             {"$match": match},
             {"$lookup": {"from": "client_billing", "localField": "client_id", "foreignField": "client_id", "as": "_billing"}},
@@ -733,6 +851,8 @@ async def get_clients(
         }
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         import traceback
         logger.error("Get clients error: %s\n%s", e, traceback.format_exc())
@@ -848,9 +968,11 @@ async def get_audit_logs(
     client_id: str = None,
     action: str = None,
     start_date: str = None,
-    end_date: str = None
+    end_date: str = None,
+    cursor: Optional[str] = None,
 ):
-    """Get audit logs with enhanced filtering (admin only)."""
+    """Get audit logs with enhanced filtering (admin only).
+    Pass cursor (next_cursor from a previous page) for keyset pagination; skip is legacy."""
     user = await admin_route_guard(request)
     db = database.get_db()
     
@@ -870,12 +992,13 @@ async def get_audit_logs(
             if end_date:
                 query["timestamp"]["$lte"] = end_date
         
-        logs = await db.audit_logs.find(
-            query,
-            {"_id": 0}
-        ).sort("timestamp", -1).skip(skip).limit(limit).to_list(limit)
-        
-        total = await db.audit_logs.count_documents(query)
+        # Hot collection plus archived segments (services.log_archive)
+        if cursor is not None:
+            logs = await find_logs("audit_logs", query, limit=limit, cursor=cursor)
+            total = await count_logs("audit_logs", query, cached=True)
+        else:
+            logs = await find_logs("audit_logs", query, limit=limit, skip=skip)
+            total = await count_logs("audit_logs", query)
         
         # Get unique actions for filter dropdown
         unique_actions = await db.audit_logs.distinct("action")
@@ -885,11 +1008,14 @@ async def get_audit_logs(
             "total": total,
             "skip": skip,
             "limit": limit,
+            "next_cursor": next_cursor_for(logs, limit, "timestamp", "audit_id"),
             "filters": {
                 "available_actions": unique_actions
             }
         }
     
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Get audit logs error: {e}")
         raise HTTPException(
@@ -1704,6 +1830,9 @@ async def update_client_profile(
             }
         )
         
+        await reindex_client(client_id)
+        if CALENDAR_FEED_CLIENT_FIELDS & update_data.keys():
+            await invalidate_calendar_feed(client_id)
         logger.info(f"Admin {user.get('auth_email')} updated client {client_id} profile")
         
         return {
@@ -1890,13 +2019,14 @@ async def get_client_audit_timeline(request: Request, client_id: str, limit: int
             "ADMIN_PROVISIONING_TRIGGERED"
         ]
         
-        logs = await db.audit_logs.find(
+        logs = await find_logs(
+            "audit_logs",
             {
                 "client_id": client_id,
                 "action": {"$in": timeline_actions}
             },
-            {"_id": 0}
-        ).sort("timestamp", -1).limit(limit).to_list(limit)
+            limit=limit,
+        )
         
         # Categorize events for UI grouping
         categorized = {
@@ -2238,10 +2368,10 @@ async def list_message_logs_delivery(
     recipient: Optional[str] = Query(None, description="Substring match on recipient"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor from previous page); offset is legacy"),
 ):
     """Admin observability: list message_logs with filters. Read-only."""
     await admin_route_guard(request)
-    db = database.get_db()
     try:
         q = {}
         if client_id:
@@ -2283,14 +2413,20 @@ async def list_message_logs_delivery(
             "error_message": 1,
             "recipient": 1,
         }
-        cursor = db.message_logs.find(q, projection).sort("created_at", -1).skip(offset).limit(limit)
-        items = await cursor.to_list(limit)
+        # Hot collection plus archived segments (services.log_archive)
+        if cursor is not None:
+            items = await find_logs("message_logs", q, limit=limit, cursor=cursor, projection=projection)
+        else:
+            items = await find_logs("message_logs", q, limit=limit, skip=offset, projection=projection)
+        next_cursor = next_cursor_for(items, limit, "created_at", "message_id")
         for it in items:
             for k in ("created_at", "sent_at", "delivered_at", "bounced_at"):
                 if it.get(k) and hasattr(it[k], "isoformat"):
                     it[k] = it[k].isoformat()
-        total = await db.message_logs.count_documents(q)
-        return {"items": items, "total": total, "limit": limit, "offset": offset}
+        total = await count_logs("message_logs", q, cached=cursor is not None)
+        return {"items": items, "total": total, "limit": limit, "offset": offset, "next_cursor": next_cursor}
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Message logs list error: {e}")
         raise HTTPException(
@@ -2568,15 +2704,11 @@ async def get_jobs_status(request: Request):
             except Exception:
                 pass
         
-        # Get scheduler status
-        from server import scheduler
-        scheduler_jobs = []
-        for job in scheduler.get_jobs():
-            scheduler_jobs.append({
-                "id": job.id,
-                "name": job.name,
-                "next_run": job.next_run_time.isoformat() if job.next_run_time else None
-            })
+        # Scheduler status from the shared job store (the scheduler may run in worker.py)
+        from job_schedule import list_scheduled_jobs, scheduler_mode
+        from services.leader_lock import get_lock_status
+        scheduler_jobs = await list_scheduled_jobs(db)
+        scheduler_leader = await get_lock_status(db)
         
         return {
             "daily_reminders": {
@@ -2588,6 +2720,7 @@ async def get_jobs_status(request: Request):
                 "total_sent": await db.digest_logs.count_documents({})
             },
             "scheduled_jobs": scheduler_jobs,
+            "scheduler": {"mode": scheduler_mode(), "leader": scheduler_leader},
             "system_status": "operational"
         }
     
@@ -2744,6 +2877,7 @@ async def admin_invite_client(
                 client_doc[key] = client_doc[key].isoformat()
         
         await db.clients.insert_one(client_doc)
+        await reindex_client(client.client_id)
         
         # Audit log
         await create_audit_log(
@@ -2824,6 +2958,7 @@ async def admin_add_property(
                 prop_doc[key] = prop_doc[key].isoformat()
         
         await db.properties.insert_one(prop_doc)
+        await reindex_client(client_id)
         
         # Audit log
         await create_audit_log(
@@ -3737,6 +3872,11 @@ async def lookup_client_by_crn(request: Request, crn: str = None):
             {"customer_reference": crn},
             {"_id": 0}
         )
+        if not client and await is_search_index_ready():
+            # Partial/unformatted CRN (e.g. "2026 00012"): accept only an unambiguous CRN match
+            ranked = [r for r in await search_clients(crn, limit=2) if r["matched_via"] == "crn"]
+            if len(ranked) == 1:
+                client = await db.clients.find_one({"client_id": ranked[0]["client_id"]}, {"_id": 0})
         
         if not client:
             # Log failed lookup attempt
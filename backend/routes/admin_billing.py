@@ -11,6 +11,8 @@ Endpoints:
 - POST /api/admin/billing/clients/{client_id}/resend-setup - Resend password setup email
 - POST /api/admin/billing/clients/{client_id}/force-provision - Re-run provisioning
 - POST /api/admin/billing/clients/{client_id}/message - Send message to client
+- GET /api/admin/billing/webhooks/dead-letters - Stripe events the async consumer dead-lettered
+- POST /api/admin/billing/webhooks/dead-letters/requeue - Requeue dead-lettered Stripe events
 
 NON-NEGOTIABLE RULES:
 1. Stripe is the billing authority. App is the entitlement authority.
@@ -1378,3 +1380,44 @@ async def get_job_status(request: Request):
             detail="Failed to get job status"
         )
 
+
+
+# =============================================================================
+# Stripe Webhook Dead Letters (STRIPE_WEBHOOK_MODE=async)
+# =============================================================================
+
+class RequeueDeadLettersRequest(BaseModel):
+    event_ids: Optional[List[str]] = None
+
+
+@router.get("/webhooks/dead-letters")
+async def list_webhook_dead_letters(request: Request, limit: int = 50):
+    """Stripe events the async consumer gave up on, newest first, plus queue depth."""
+    await admin_route_guard(request)
+    db = database.get_db()
+    dead = await db.stripe_events.find(
+        {"status": "DEAD"},
+        {"_id": 0, "payload_json": 0},
+    ).sort("dead_lettered_at", -1).limit(min(max(limit, 1), 200)).to_list(200)
+    queued = await db.stripe_events.count_documents({"status": "QUEUED"})
+    return {"dead_letters": dead, "total_dead": await db.stripe_events.count_documents({"status": "DEAD"}), "queued": queued}
+
+
+@router.post("/webhooks/dead-letters/requeue")
+async def requeue_webhook_dead_letters(body: RequeueDeadLettersRequest, request: Request):
+    """Put dead-lettered Stripe events (all, or event_ids) back on the async consumer queue."""
+    admin = await admin_route_guard(request)
+    from services.stripe_event_queue import requeue_dead_events
+
+    requeued = await requeue_dead_events(body.event_ids)
+    await create_audit_log(
+        action=AuditAction.ADMIN_ACTION,
+        actor_role=UserRole.ROLE_ADMIN,
+        actor_id=admin.get("portal_user_id"),
+        metadata={
+            "action_type": "STRIPE_EVENTS_REQUEUED",
+            "event_ids": body.event_ids,
+            "requeued": requeued,
+        }
+    )
+    return {"success": True, "requeued": requeued}
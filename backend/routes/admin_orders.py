@@ -9,6 +9,7 @@ from typing import Optional, List, Dict
 from datetime import datetime, timezone
 from database import database
 from middleware import admin_route_guard
+from utils.pagination import InvalidCursorError
 from services.order_workflow import (
     OrderStatus, get_allowed_transitions, get_admin_actions_for_review,
     PIPELINE_COLUMNS, is_valid_transition, requires_admin_action
@@ -46,18 +47,24 @@ async def get_orders_pipeline(
     status: Optional[str] = None,
     limit: int = 50,
     skip: int = 0,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(admin_route_guard),
 ):
     """
     Get orders for pipeline/kanban view.
     Returns orders grouped by status with counts.
+    Pass cursor (next_cursor from a previous page) for keyset pagination; skip is legacy.
     """
     
-    result = await get_orders_for_pipeline(
-        status_filter=status,
-        limit=limit,
-        skip=skip,
-    )
+    try:
+        result = await get_orders_for_pipeline(
+            status_filter=status,
+            limit=limit,
+            skip=skip,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return result
 
@@ -292,150 +292,25 @@ async def export_ical_calendar(
 ):
     """Export compliance expiry dates as an iCal calendar file.
     
-    Generates an iCal (.ics) file that can be subscribed to by external
+    Generates an iCal (.ics) file that can be imported into external
     calendar applications (Google Calendar, Outlook, Apple Calendar).
+    Served from the cached per-client artifact (services.calendar_feed) with
+    ETag / Last-Modified; conditional requests get 304.
     
     Plan gating: Requires Growth plan (PLAN_2_5) or higher.
     
     Returns:
         iCal file with VEVENT entries for each requirement expiry
     """
-    from fastapi.responses import Response
-    from services.plan_registry import plan_registry
+    from services.calendar_feed import feed_response, get_calendar_feed
 
     user = await client_route_guard(request)
     try:
-        # TEMP Step 2: calendar_sync has no plan_registry key; gate by compliance_calendar (all plans have it)
-        allowed, error_msg, error_details = await plan_registry.enforce_feature(
-            user["client_id"],
-            "compliance_calendar"
-        )
-        if not allowed:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail={
-                    "error_code": (error_details or {}).get("error_code", "PLAN_NOT_ELIGIBLE"),
-                    "message": error_msg,
-                    "feature": "calendar_sync",
-                    "upgrade_required": True,
-                    **(error_details or {})
-                }
-            )
-        
-        db = database.get_db()
-        client_id = user["client_id"]
-        
-        # Get client info for calendar name
-        client = await db.clients.find_one(
-            {"client_id": client_id},
-            {"_id": 0, "full_name": 1, "company_name": 1, "customer_reference": 1}
-        )
-        
-        calendar_name = client.get("company_name") or client.get("full_name") or "Compliance"
-        crn = client.get("customer_reference", "")
-        
-        now = datetime.now(timezone.utc)
-        end_date = now + timedelta(days=days)
-        
-        # Get all properties for this client
-        properties = await db.properties.find(
-            {"client_id": client_id},
-            {"_id": 0, "property_id": 1, "address_line_1": 1, "city": 1, "postcode": 1}
-        ).to_list(100)
-        
-        property_map = {p["property_id"]: p for p in properties}
-        property_ids = list(property_map.keys())
-        
-        # Get requirements within date range
-        requirements = await db.requirements.find(
-            {
-                "property_id": {"$in": property_ids},
-                "due_date": {
-                    "$gte": now.isoformat(),
-                    "$lte": end_date.isoformat()
-                }
-            },
-            {"_id": 0}
-        ).sort("due_date", 1).to_list(500)
-        
-        # Build iCal content
-        ical_lines = [
-            "BEGIN:VCALENDAR",
-            "VERSION:2.0",
-            "PRODID:-//Compliance Vault Pro//Pleerity Enterprise Ltd//EN",
-            f"X-WR-CALNAME:{calendar_name} - Compliance Expiries",
-            "CALSCALE:GREGORIAN",
-            "METHOD:PUBLISH"
-        ]
-        
-        for req in requirements:
-            property_info = property_map.get(req["property_id"], {})
-            due_date_str = req.get("due_date", "")
-            
-            try:
-                due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00')) if isinstance(due_date_str, str) else due_date_str
-            except:
-                continue
-            
-            # Create unique event ID
-            event_uid = f"{req['requirement_id']}@pleerityenterprise.co.uk"
-            
-            # Format dates for iCal (YYYYMMDD for all-day events)
-            dtstart = due_date.strftime("%Y%m%d")
-            
-            # Build location string
-            location = f"{property_info.get('address_line_1', '')}, {property_info.get('city', '')} {property_info.get('postcode', '')}".strip(", ")
-            
-            # Build description
-            description = f"Requirement: {req.get('requirement_type', 'Unknown')}\\n"
-            description += f"Property: {location}\\n"
-            description += f"Status: {req.get('status', 'PENDING')}\\n"
-            description += f"Description: {req.get('description', '')}\\n"
-            if crn:
-                description += f"CRN: {crn}"
-            
-            # Clean description for iCal (escape special chars)
-            description = description.replace(",", "\\,").replace(";", "\\;")
-            
-            # Determine alarm based on status
-            alarm_days = 7 if req.get("status") == "EXPIRING_SOON" else 30
-            
-            # Build event
-            ical_lines.extend([
-                "BEGIN:VEVENT",
-                f"UID:{event_uid}",
-                f"DTSTAMP:{now.strftime('%Y%m%dT%H%M%SZ')}",
-                f"DTSTART;VALUE=DATE:{dtstart}",
-                f"SUMMARY:{req.get('requirement_type', 'Compliance')} Expiry - {property_info.get('address_line_1', 'Property')}",
-                f"DESCRIPTION:{description}",
-                f"LOCATION:{location}",
-                "CATEGORIES:Compliance,Expiry",
-                "STATUS:CONFIRMED",
-                # Add alarm
-                "BEGIN:VALARM",
-                "ACTION:DISPLAY",
-                f"DESCRIPTION:Compliance expiry reminder - {req.get('requirement_type', '')}",
-                f"TRIGGER:-P{alarm_days}D",
-                "END:VALARM",
-                "END:VEVENT"
-            ])
-        
-        ical_lines.append("END:VCALENDAR")
-        
-        # Join with CRLF as per iCal spec
-        ical_content = "\r\n".join(ical_lines)
-        
-        # Generate filename
-        filename = f"compliance_expiries_{crn or client_id}.ics"
-        
-        return Response(
-            content=ical_content,
-            media_type="text/calendar",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Cache-Control": "no-cache"
-            }
-        )
+        await _enforce_calendar_feature(user["client_id"])
+        feed = await get_calendar_feed(user["client_id"], days)
+        if feed is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Client not found")
+        return feed_response(request, feed)
     
     except HTTPException:
         raise
@@ -447,54 +322,107 @@ async def export_ical_calendar(
         )
 
 
+@router.get("/feed/{token}.ics")
+async def calendar_feed_by_token(
+    request: Request,
+    token: str,
+    days: int = Query(default=365, ge=30, le=730, description="Days of events to include")
+):
+    """Subscription feed for external calendar apps, authenticated by the feed token in the URL.
+    
+    Tokens come from /subscription-url and are revoked by rotating or deleting them there.
+    """
+    from services.calendar_feed import feed_response, get_calendar_feed, resolve_feed_token
+
+    client_id = await resolve_feed_token(token)
+    if not client_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found")
+    feed = await get_calendar_feed(client_id, days)
+    if feed is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found")
+    return feed_response(request, feed, attachment=False)
+
+
+async def _enforce_calendar_feature(client_id: str) -> None:
+    from services.plan_registry import plan_registry
+
+    # TEMP Step 2: calendar_sync has no plan_registry key; gate by compliance_calendar (all plans have it)
+    allowed, error_msg, error_details = await plan_registry.enforce_feature(
+        client_id,
+        "compliance_calendar"
+    )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "error_code": (error_details or {}).get("error_code", "PLAN_NOT_ELIGIBLE"),
+                "message": error_msg,
+                "feature": "calendar_sync",
+                "upgrade_required": True,
+                **(error_details or {})
+            }
+        )
+
+
+def _subscription_payload(request: Request, token: Optional[str], token_doc: Optional[dict]) -> dict:
+    import os
+
+    # Get base URL from environment
+    base_url = os.environ.get("BASE_URL", request.base_url.scheme + "://" + request.base_url.netloc)
+    return {
+        "subscription_url": f"{base_url}/api/calendar/feed/{token}.ics" if token else None,
+        "active": bool(token or token_doc),
+        "created_at": (token_doc or {}).get("created_at"),
+        "last_used_at": (token_doc or {}).get("last_used_at"),
+        "format": "iCal (.ics)",
+        "note": (
+            "Keep this URL private: anyone with it can read your compliance calendar. Rotate it to revoke access."
+            if token else
+            "A subscription URL is active. It is only shown when created; rotate it to get a new URL."
+        ),
+        "instructions": {
+            "google_calendar": "Settings → Add calendar → From URL → Paste URL",
+            "outlook": "Add calendar → Subscribe from web → Paste URL",
+            "apple_calendar": "File → New Calendar Subscription → Paste URL"
+        }
+    }
+
+
+async def _audit_feed_token(user: dict, action_type: str, **metadata) -> None:
+    from models import AuditAction, UserRole
+    from utils.audit import create_audit_log
+
+    await create_audit_log(
+        action=AuditAction.ADMIN_ACTION,
+        actor_role=UserRole(user["role"]),
+        actor_id=user.get("portal_user_id"),
+        client_id=user["client_id"],
+        metadata={"action_type": action_type, **metadata},
+    )
+
+
 @router.get("/subscription-url")
 async def get_calendar_subscription_url(request: Request):
     """Get the URL for subscribing to the compliance calendar.
     
-    Returns a URL that can be used to subscribe to the calendar
-    in external applications. The URL includes an authentication token.
+    The URL carries a long-lived feed token instead of the bearer header, so
+    calendar apps can poll it. The first call creates the token and returns the
+    URL; only the token's hash is stored, so later calls report that a URL is
+    active (use /subscription-url/rotate for a new one).
     
     Plan gating: TEMP gated by compliance_calendar (Step 5 may introduce calendar_sync).
     """
-    from services.plan_registry import plan_registry
-    import os
+    from services.calendar_feed import active_feed_token, issue_feed_token
 
     user = await client_route_guard(request)
     try:
-        # TEMP Step 2: calendar_sync -> compliance_calendar
-        allowed, error_msg, error_details = await plan_registry.enforce_feature(
-            user["client_id"],
-            "compliance_calendar"
-        )
-        if not allowed:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail={
-                    "error_code": (error_details or {}).get("error_code", "PLAN_NOT_ELIGIBLE"),
-                    "message": error_msg,
-                    "feature": "calendar_sync",
-                    "upgrade_required": True,
-                    **(error_details or {})
-                }
-            )
-        
-        # Get base URL from environment
-        base_url = os.environ.get("BASE_URL", request.base_url.scheme + "://" + request.base_url.netloc)
-        
-        # For now, return the authenticated endpoint
-        # In production, you'd generate a long-lived token for calendar subscriptions
-        subscription_url = f"{base_url}/api/calendar/export.ics"
-        
-        return {
-            "subscription_url": subscription_url,
-            "format": "iCal (.ics)",
-            "note": "This URL requires authentication. For external calendar subscriptions, use the Download option.",
-            "instructions": {
-                "google_calendar": "Settings → Add calendar → From URL → Paste URL",
-                "outlook": "Add calendar → Subscribe from web → Paste URL",
-                "apple_calendar": "File → New Calendar Subscription → Paste URL"
-            }
-        }
+        await _enforce_calendar_feature(user["client_id"])
+        token_doc = await active_feed_token(user["client_id"])
+        if token_doc:
+            return _subscription_payload(request, None, token_doc)
+        token = await issue_feed_token(user["client_id"], user.get("portal_user_id"))
+        await _audit_feed_token(user, "CALENDAR_FEED_TOKEN_ISSUED")
+        return _subscription_payload(request, token, await active_feed_token(user["client_id"]))
     
     except HTTPException:
         raise
@@ -504,3 +432,27 @@ async def get_calendar_subscription_url(request: Request):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate subscription URL"
         )
+
+
+@router.post("/subscription-url/rotate")
+async def rotate_calendar_subscription_url(request: Request):
+    """Revoke the current subscription URL and return a new one."""
+    from services.calendar_feed import active_feed_token, issue_feed_token
+
+    user = await client_route_guard(request)
+    await _enforce_calendar_feature(user["client_id"])
+    token = await issue_feed_token(user["client_id"], user.get("portal_user_id"))
+    await _audit_feed_token(user, "CALENDAR_FEED_TOKEN_ROTATED")
+    return _subscription_payload(request, token, await active_feed_token(user["client_id"]))
+
+
+@router.delete("/subscription-url")
+async def revoke_calendar_subscription_url(request: Request):
+    """Revoke the subscription URL; subscribed calendar apps stop receiving updates."""
+    from services.calendar_feed import revoke_feed_tokens
+
+    user = await client_route_guard(request)
+    revoked = await revoke_feed_tokens(user["client_id"])
+    if revoked:
+        await _audit_feed_token(user, "CALENDAR_FEED_TOKEN_REVOKED", revoked=revoked)
+    return {"success": True, "revoked": revoked}
@@ -4,8 +4,11 @@ from pydantic import BaseModel
 from database import database
 from middleware import client_route_guard
 from services.compliance_score import calculate_compliance_score
+from services.client_data_loaders import loaders_for
+from utils.data_loader import group_by
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone, timedelta
+import asyncio
 import logging
 import io
 import uuid
@@ -107,6 +110,27 @@ async def get_compliance_score_trend(
         )
 
 
+@router.get("/compliance-score/forecast")
+async def get_compliance_score_forecast(
+    request: Request,
+    days: int = 90,
+):
+    """Projected portfolio and per-property scores for the next N days (max 366) from current evidence.
+
+    Includes 30/60/90-day horizons and the first date each property's score drops.
+    """
+    user = await client_route_guard(request)
+    try:
+        from services.score_forecast import forecast_client_scores
+        return await forecast_client_scores(client_id=user["client_id"], days=days)
+    except Exception as e:
+        logger.error(f"Compliance score forecast error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get compliance score forecast"
+        )
+
+
 @router.get("/score/timeline")
 async def get_score_timeline(
     request: Request,
@@ -421,23 +445,17 @@ async def trigger_compliance_snapshot(request: Request):
 async def get_dashboard(request: Request):
     """Get client dashboard data."""
     user = await client_route_guard(request)
-    db = database.get_db()
     
     try:
-        # Get client
-        client = await db.clients.find_one({"client_id": user["client_id"]}, {"_id": 0})
-        
-        # Get properties
-        properties = await db.properties.find(
-            {"client_id": user["client_id"]},
-            {"_id": 0}
-        ).to_list(100)
-        
-        # Get requirements summary
-        requirements = await db.requirements.find(
-            {"client_id": user["client_id"]},
-            {"_id": 0}
-        ).to_list(1000)
+        # Client, properties, requirements and onboarding checklist are independent reads
+        from services.onboarding_checklist_service import get_checklist_for_client
+        loaders = loaders_for(request, user["client_id"])
+        client, properties, requirements, checklist = await asyncio.gather(
+            loaders.clients.load(user["client_id"]),
+            loaders.properties_by_client.load(user["client_id"]),
+            loaders.requirements_by_client.load(user["client_id"]),
+            get_checklist_for_client(user["client_id"]),
+        )
         
         # Calculate compliance summary
         total_requirements = len(requirements)
@@ -446,11 +464,7 @@ async def get_dashboard(request: Request):
         expiring = sum(1 for r in requirements if r["status"] == "EXPIRING_SOON")
         
         # Group requirements by property so Properties page status matches Compliance Score
-        reqs_by_property = {}
-        for r in requirements:
-            pid = r.get("property_id")
-            if pid:
-                reqs_by_property.setdefault(pid, []).append(r)
+        reqs_by_property = group_by(requirements, "property_id")
         # Override each property's compliance_status with live-computed value (RED/AMBER/GREEN)
         properties_out = []
         for prop in properties:
@@ -461,8 +475,6 @@ async def get_dashboard(request: Request):
             properties_out.append(p)
         
         # Onboarding checklist (server-driven; for banner and deep-links)
-        from services.onboarding_checklist_service import get_checklist_for_client
-        checklist = await get_checklist_for_client(user["client_id"])
         if checklist.get("error"):
             checklist = {"items": [], "completed_at": None, "all_required_complete": False}
 
@@ -596,13 +608,13 @@ async def get_properties(request: Request):
 async def get_property_requirements(request: Request, property_id: str):
     """Get requirements for a property."""
     user = await client_route_guard(request)
-    db = database.get_db()
     
     try:
-        # Verify property belongs to client
-        prop = await db.properties.find_one(
-            {"property_id": property_id, "client_id": user["client_id"]},
-            {"_id": 0}
+        # Ownership check and requirements read run concurrently (both are client-scoped)
+        loaders = loaders_for(request, user["client_id"])
+        prop, requirements = await asyncio.gather(
+            loaders.properties.load(property_id),
+            loaders.requirements_by_property.load(property_id),
         )
         
         if not prop:
@@ -611,12 +623,7 @@ async def get_property_requirements(request: Request, property_id: str):
                 detail="Property not found"
             )
         
-        requirements = await db.requirements.find(
-            {"property_id": property_id, "client_id": user["client_id"]},
-            {"_id": 0}
-        ).to_list(100)
-        
-        return {"requirements": requirements}
+        return {"requirements": requirements[:100]}
     
     except HTTPException:
         raise
@@ -691,6 +698,8 @@ async def mark_requirement_not_applicable(request: Request, property_id: str):
             {"$set": update},
         )
         requirement_id = existing_row["requirement_id"]
+        from services.requirement_transitions import sync_requirement_transitions
+        await sync_requirement_transitions(db, {"requirement_id": requirement_id})
     else:
         requirement_id = str(uuid.uuid4())
         due_far = now + timedelta(days=365 * 10)
@@ -709,6 +718,8 @@ async def mark_requirement_not_applicable(request: Request, property_id: str):
             "created_at": now.isoformat(),
             "updated_at": now.isoformat(),
         }
+        from utils.expiry_utils import get_transition_fields
+        doc.update(get_transition_fields(doc))
         await db.requirements.insert_one(doc)
     from services.compliance_recalc_queue import enqueue_compliance_recalc, TRIGGER_PROPERTY_UPDATED, ACTOR_CLIENT
     await enqueue_compliance_recalc(
@@ -968,7 +979,7 @@ async def download_compliance_pack(
 
         from services.compliance_pack import compliance_pack_service
         
-        pdf_bytes = await compliance_pack_service.generate_compliance_pack(
+        pack = await compliance_pack_service.open_compliance_pack(
             property_id=property_id,
             client_id=user["client_id"],
             include_expired=include_expired,
@@ -988,10 +999,11 @@ async def download_compliance_pack(
             filename = f"compliance_pack_{property_doc['nickname'].replace(' ', '_')}.pdf"
         
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            pack.chunks(),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(pack.size),
             }
         )
     
@@ -17,6 +17,7 @@ from models.cms import (
 )
 from services import cms_service
 from services.storage_adapter import upload_file_to_storage
+from utils.response_cache import cached_response, NS_CMS
 
 router = APIRouter(prefix="/api/admin/cms", tags=["CMS"])
 
@@ -693,6 +694,7 @@ class PublicPageResponse(BaseModel):
 
 
 @public_router.get("/pages/{slug}", response_model=PublicPageResponse)
+@cached_response(NS_CMS)
 async def get_public_page(slug: str):
     """Get published page content for public rendering"""
     page = await cms_service.get_published_page(slug)
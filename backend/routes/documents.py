@@ -4,6 +4,7 @@ from database import database
 from middleware import client_route_guard, admin_route_guard
 from models import Document, DocumentStatus, RequirementStatus, AuditAction
 from utils.audit import create_audit_log
+from services.calendar_feed import invalidate_calendar_feed
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional
 import asyncio
@@ -173,6 +174,8 @@ async def _apply_extraction_to_requirement(
         {"requirement_id": requirement_id},
         {"$set": update_fields},
     )
+    from services.requirement_transitions import sync_requirement_transitions
+    await sync_requirement_transitions(db, {"requirement_id": requirement_id})
     from services.compliance_recalc_queue import enqueue_compliance_recalc, TRIGGER_AI_APPLIED, ACTOR_CLIENT
     await enqueue_compliance_recalc(
         property_id=property_id,
@@ -1148,6 +1151,10 @@ async def admin_confirm_extraction(request: Request, body: AdminExtractionConfir
                 except (TypeError, ValueError):
                     pass
             await db.requirements.update_one({"requirement_id": requirement_id}, {"$set": update_fields})
+            from services.requirement_transitions import sync_requirement_transitions
+            await sync_requirement_transitions(db, {"requirement_id": requirement_id})
+            # No recalc is enqueued here, so the cached ICS would keep the old due date
+            await invalidate_calendar_feed(document["client_id"])
         except ValueError:
             pass
     now = datetime.now(timezone.utc)
@@ -1473,6 +1480,8 @@ async def _revert_requirement_if_no_verified_docs(db, requirement_id: str, prope
         filter_query,
         {"$set": {"status": RequirementStatus.PENDING.value}, "$unset": {"due_date": ""}}
     )
+    from services.requirement_transitions import sync_requirement_transitions
+    await sync_requirement_transitions(db, filter_query)
     if property_id:
         from services.provisioning import provisioning_service
         await provisioning_service._update_property_compliance(property_id)
@@ -1500,6 +1509,8 @@ async def regenerate_requirement_due_date(requirement_id: str, client_id: str):
                 }
             }
         )
+        from services.requirement_transitions import sync_requirement_transitions
+        await sync_requirement_transitions(db, {"requirement_id": requirement_id})
         
         # Audit log
         await create_audit_log(
@@ -2041,6 +2052,8 @@ async def apply_ai_extraction(
                 {"requirement_id": requirement_id},
                 {"$set": update_fields}
             )
+            from services.requirement_transitions import sync_requirement_transitions
+            await sync_requirement_transitions(db, {"requirement_id": requirement_id})
             after_state["due_date"] = update_fields.get("due_date", after_state["due_date"])
             after_state["status"] = update_fields.get("status", after_state["status"])
         
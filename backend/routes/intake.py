@@ -26,7 +26,10 @@ from models import (
 from services.stripe_service import stripe_service
 from services.plan_registry import plan_registry, PlanCode, PriceConfigMissingError, StripeModeMismatchError
 from services.crn_service import get_next_crn
+from services.council_index import CouncilIndex
+from services.postcode_service import postcode_service, PostcodeUpstreamError, PostcodeUpstreamTimeout
 from utils.audit import create_audit_log
+from utils.response_cache import cached_response, NS_PLANS
 import logging
 import json
 import os
@@ -133,6 +136,7 @@ PLAN_DETAILS = {
 
 # Cache for councils data
 _councils_cache = None
+_council_index = None
 
 # Council type suffixes based on council code prefix
 # E06 = Unitary Authorities (usually "City Council" or "Borough Council")
@@ -295,7 +299,16 @@ def _load_councils():
     return _councils_cache
 
 
+def _get_council_index() -> CouncilIndex:
+    """Search index over the cached councils list (built once)."""
+    global _council_index
+    if _council_index is None:
+        _council_index = CouncilIndex(_load_councils())
+    return _council_index
+
+
 @router.get("/plans")
+@cached_response(NS_PLANS)
 async def get_plans(request: Request):
     """Get available billing plans with property limits and features.
     
@@ -414,17 +427,8 @@ async def search_councils(
     - page: Page number (default 1)
     - limit: Results per page (default 50, max 100)
     """
-    councils = _load_councils()
-    
-    # Filter by search term
-    if q:
-        q_lower = q.lower()
-        councils = [c for c in councils if q_lower in c["name"].lower()]
-    
-    # Filter by nation
-    if nation:
-        nation_lower = nation.lower()
-        councils = [c for c in councils if c.get("nation", "").lower() == nation_lower]
+    # Filter by search term (name substring) and nation via the precomputed index
+    councils = _get_council_index().search(q=q, nation=nation)
     
     # Pagination
     limit = min(limit, 100)
@@ -458,42 +462,26 @@ async def autocomplete_postcode(q: str):
     
     Uses postcodes.io free API - no API key required.
     Returns up to 10 matching postcodes with their locations.
+    Served through postcode_service (cached, coalesced; longer queries reuse shorter cached results).
     """
-    import httpx
-    
     if not q or len(q) < 2:
         return {"postcodes": []}
     
-    # Clean query
-    clean_query = q.strip().upper()
-    
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                "https://api.postcodes.io/postcodes",
-                params={"q": clean_query, "limit": 10}
-            )
-            
-            if response.status_code != 200:
-                return {"postcodes": []}
-            
-            data = response.json()
-            
-            if data.get("status") != 200 or not data.get("result"):
-                return {"postcodes": []}
-            
-            # Format results
-            postcodes = []
-            for item in data["result"][:10]:
-                postcodes.append({
-                    "postcode": item.get("postcode"),
-                    "admin_district": item.get("admin_district"),
-                    "post_town": item.get("post_town") or item.get("admin_district"),
-                    "region": item.get("region"),
-                    "country": item.get("country")
-                })
-            
-            return {"postcodes": postcodes}
+        items = await postcode_service.autocomplete(q)
+        
+        # Format results
+        postcodes = []
+        for item in items[:10]:
+            postcodes.append({
+                "postcode": item.get("postcode"),
+                "admin_district": item.get("admin_district"),
+                "post_town": item.get("post_town") or item.get("admin_district"),
+                "region": item.get("region"),
+                "country": item.get("country")
+            })
+        
+        return {"postcodes": postcodes}
     
     except Exception as e:
         logger.error(f"Postcode autocomplete error: {e}")
@@ -511,10 +499,8 @@ async def lookup_postcode(postcode: str):
     - Region
     - Country
     
-    This endpoint proxies to postcodes.io to avoid CORS issues.
+    This endpoint proxies to postcodes.io to avoid CORS issues (cached via postcode_service).
     """
-    import httpx
-    
     # Clean and validate postcode format
     clean_postcode = postcode.strip().upper().replace(" ", "")
     
@@ -525,101 +511,64 @@ async def lookup_postcode(postcode: str):
         )
     
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Lookup postcode via postcodes.io
-            response = await client.get(
-                f"https://api.postcodes.io/postcodes/{clean_postcode}"
-            )
-            
-            if response.status_code == 404:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Postcode not found"
-                )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_502_BAD_GATEWAY,
-                    detail="Postcode lookup service unavailable"
-                )
-            
-            data = response.json()
-            
-            if data.get("status") != 200 or not data.get("result"):
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Postcode not found"
-                )
-            
-            result = data["result"]
-            
-            # Extract relevant fields
-            admin_district = result.get("admin_district", "")
-            post_town = result.get("post_town", "") or result.get("admin_district", "")
-            region = result.get("region", "")
-            country = result.get("country", "")
-            parish = result.get("parish", "")
-            
-            # Try to match council from our database
-            councils = _load_councils()
-            matched_council = None
-            matched_council_code = None
-            
-            # First try exact match on admin_district
-            for council in councils:
-                if council["name"].lower() == admin_district.lower():
-                    matched_council = council["name"]
-                    matched_council_code = council["code"]
-                    break
-            
-            # If no exact match, try partial match
-            if not matched_council and admin_district:
-                for council in councils:
-                    if admin_district.lower() in council["name"].lower() or council["name"].lower() in admin_district.lower():
-                        matched_council = council["name"]
-                        matched_council_code = council["code"]
-                        break
-            
-            # Check DISTRICT_TO_COUNCIL mapping
-            if not matched_council and admin_district in DISTRICT_TO_COUNCIL:
-                mapped_name = DISTRICT_TO_COUNCIL[admin_district]
-                for council in councils:
-                    if council["name"] == mapped_name:
-                        matched_council = council["name"]
-                        matched_council_code = council["code"]
-                        break
-            
-            return {
-                "postcode": result.get("postcode", postcode),
-                "admin_district": admin_district,
-                "post_town": post_town,
-                "region": region,
-                "country": country,
-                "parish": parish,
-                "latitude": result.get("latitude"),
-                "longitude": result.get("longitude"),
-                # Matched council from our database - normalized to full official name
-                "council_name": normalize_council_name(matched_council, matched_council_code) if matched_council else None,
-                "council_code": matched_council_code,
-                # Suggested address (user can edit)
-                "suggested_city": post_town or admin_district,
-                "suggested_address": None,  # postcodes.io doesn't provide street address
-                "note": "Please enter your street address manually"
-            }
-    
-    except HTTPException:
-        raise
-    except httpx.TimeoutException:
+        result = await postcode_service.lookup(clean_postcode)
+    except PostcodeUpstreamTimeout:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail="Postcode lookup timed out"
         )
+    except PostcodeUpstreamError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Postcode lookup service unavailable"
+        )
     except Exception as e:
         logger.error(f"Postcode lookup error: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to lookup postcode"
         )
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Postcode not found"
+        )
+    
+    # Extract relevant fields
+    admin_district = result.get("admin_district", "") or ""
+    post_town = result.get("post_town", "") or admin_district
+    region = result.get("region", "")
+    country = result.get("country", "")
+    parish = result.get("parish", "")
+    
+    # Try to match council from our database: exact name, then partial, then DISTRICT_TO_COUNCIL
+    council_index = _get_council_index()
+    council = council_index.find_exact(admin_district) or council_index.find_partial(admin_district)
+    if not council and admin_district in DISTRICT_TO_COUNCIL:
+        mapped = council_index.find_exact(DISTRICT_TO_COUNCIL[admin_district])
+        if mapped and mapped["name"] == DISTRICT_TO_COUNCIL[admin_district]:
+            council = mapped
+    matched_council = council["name"] if council else None
+    matched_council_code = council["code"] if council else None
+    
+    return {
+        "postcode": result.get("postcode", postcode),
+        "admin_district": admin_district,
+        "post_town": post_town,
+        "region": region,
+        "country": country,
+        "parish": parish,
+        "latitude": result.get("latitude"),
+        "longitude": result.get("longitude"),
+        # Matched council from our database - normalized to full official name
+        "council_name": normalize_council_name(matched_council, matched_council_code) if matched_council else None,
+        "council_code": matched_council_code,
+        # Suggested address (user can edit)
+        "suggested_city": post_town or admin_district,
+        "suggested_address": None,  # postcodes.io doesn't provide street address
+        "note": "Please enter your street address manually"
+    }
 
 
 @router.post("/submit")
@@ -868,6 +817,9 @@ async def submit_intake(request: Request, data: IntakeFormData):
                 }
             )
         
+        from services.client_search_index import reindex_client
+        await reindex_client(client.client_id)
+        
         # =========== RECONCILE UPLOADED DOCUMENTS ===========
         
         if data.intake_session_id:
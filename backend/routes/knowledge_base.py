@@ -20,6 +20,7 @@ from datetime import datetime, timezone
 from enum import Enum
 from middleware import admin_route_guard
 from database import database
+from services.kb_search_index import article_search_index
 import logging
 import uuid
 import json
@@ -216,13 +217,23 @@ async def list_public_articles(
         filter_query["category_id"] = category
     if tag:
         filter_query["tags"] = tag
-    if search:
-        filter_query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"excerpt": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"tags": {"$regex": search, "$options": "i"}},
-        ]
+    if search and search.strip():
+        # BM25-ranked ids from the in-memory index; Mongo applies category/tag filters by id
+        ranked = await article_search_index.search(search)
+        rank = {article_id: i for i, (article_id, _) in enumerate(ranked)}
+        filter_query["article_id"] = {"$in": list(rank)}
+        matches = await db[ARTICLES_COLLECTION].find(
+            filter_query,
+            {"_id": 0, "content": 0}
+        ).to_list(length=len(rank))
+        matches.sort(key=lambda a: rank.get(a.get("article_id"), len(rank)))
+        articles = matches[skip:skip + limit]
+        ip = request.client.host if request and request.client else None
+        await log_search_analytics(search, len(articles), ip)
+        return {
+            "articles": articles,
+            "total": len(matches),
+        }
     
     # Get articles
     cursor = db[ARTICLES_COLLECTION].find(
@@ -233,11 +244,6 @@ async def list_public_articles(
     articles = await cursor.to_list(length=limit)
     total = await db[ARTICLES_COLLECTION].count_documents(filter_query)
     
-    # Log search if query provided
-    if search:
-        ip = request.client.host if request and request.client else None
-        await log_search_analytics(search, len(articles), ip)
-    
     return {
         "articles": articles,
         "total": total,
@@ -468,6 +474,7 @@ async def admin_create_article(
     
     await db[ARTICLES_COLLECTION].insert_one(doc)
     doc.pop("_id", None)
+    await article_search_index.refresh_article(article_id)
     
     # Audit log
     await log_kb_action(
@@ -529,6 +536,7 @@ async def admin_update_article(
     )
     
     updated = await db[ARTICLES_COLLECTION].find_one({"article_id": article_id}, {"_id": 0})
+    await article_search_index.refresh_article(article_id)
     
     # Audit log
     await log_kb_action(
@@ -570,6 +578,8 @@ async def admin_publish_article(
         }
     )
     
+    await article_search_index.refresh_article(article_id)
+    
     # Audit log
     await log_kb_action(
         action="KB_ARTICLE_PUBLISHED",
@@ -603,6 +613,8 @@ async def admin_unpublish_article(
         }
     )
     
+    await article_search_index.refresh_article(article_id)
+    
     # Audit log
     await log_kb_action(
         action="KB_ARTICLE_UNPUBLISHED",
@@ -630,12 +642,14 @@ async def admin_deactivate_article(
                 "is_active": False,
                 "deactivated_at": now,
                 "deactivated_by": current_user.get("email"),
+                "updated_at": now,
             }
         }
     )
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Article not found")
+    await article_search_index.refresh_article(article_id)
     
     # Audit log
     await log_kb_action(
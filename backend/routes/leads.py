@@ -15,6 +15,7 @@ import csv
 import io
 from middleware import admin_route_guard, client_route_guard
 from database import database
+from utils.pagination import InvalidCursorError, next_cursor_for
 from services.lead_service import LeadService, AbandonedIntakeService
 from services.lead_followup_service import LeadFollowUpService
 from services.lead_ai_service import LeadAISummaryService
@@ -442,23 +443,29 @@ async def list_leads(
     date_to: Optional[str] = Query(None, description="Filter to date (YYYY-MM-DD or ISO)"),
     page: int = Query(1, ge=1),
     limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="Keyset cursor (next_cursor from previous page); page is legacy"),
     current_user: dict = Depends(admin_route_guard),
 ):
     """List all leads with filters and pagination."""
-    leads, total = await LeadService.list_leads(
-        source_platform=source_platform,
-        service_interest=service_interest,
-        stage=stage,
-        intent_score=intent_score,
-        status=status,
-        assigned_to=assigned_to,
-        search=search,
-        sla_breach_only=sla_breach_only,
-        date_from=date_from,
-        date_to=date_to,
-        page=page,
-        limit=limit,
-    )
+    try:
+        leads, total = await LeadService.list_leads(
+            source_platform=source_platform,
+            service_interest=service_interest,
+            stage=stage,
+            intent_score=intent_score,
+            status=status,
+            assigned_to=assigned_to,
+            search=search,
+            sla_breach_only=sla_breach_only,
+            date_from=date_from,
+            date_to=date_to,
+            page=page,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = next_cursor_for(leads, limit, "created_at", "lead_id")
     # Enrich with lead_score (0-100), score_band (High/Medium/Low), and tags for display
     intent_to_score = {"HIGH": 75, "MEDIUM": 50, "LOW": 25}
     for lead in leads:
@@ -474,6 +481,7 @@ async def list_leads(
         "total": total,
         "page": page,
         "limit": limit,
+        "next_cursor": next_cursor,
         "stats": stats,
     }
 
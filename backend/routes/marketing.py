@@ -18,6 +18,7 @@ from typing import Optional, Dict, Any, List
 
 from services import cms_service
 from models.cms import CATEGORY_CONFIG, PageStatus
+from utils.response_cache import cached_response, NS_CMS, NS_CATALOGUE
 
 router = APIRouter(prefix="/api/marketing", tags=["Marketing Website"])
 
@@ -40,6 +41,7 @@ def add_environment_metadata(response: Dict[str, Any]) -> Dict[str, Any]:
 # ============================================================================
 
 @router.get("/services")
+@cached_response(NS_CMS, NS_CATALOGUE)
 async def get_services_hub():
     """
     Get the services hub page with all categories.
@@ -83,6 +85,7 @@ async def list_categories():
 
 
 @router.get("/services/category/{category_slug}")
+@cached_response(NS_CMS, NS_CATALOGUE)
 async def get_category(category_slug: str):
     """
     Get a category page with all its services.
@@ -114,6 +117,7 @@ async def get_category(category_slug: str):
 # ============================================================================
 
 @router.get("/services/{category_slug}/{service_slug}")
+@cached_response(NS_CMS, NS_CATALOGUE)
 async def get_service(category_slug: str, service_slug: str):
     """
     Get an individual service page.
@@ -5,7 +5,8 @@ All routes require admin. Export endpoints should be rate-limited in production.
 from fastapi import APIRouter, HTTPException, Request, Depends, status, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Set
+import asyncio
 import io
 import csv as csv_module
 import logging
@@ -19,6 +20,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin/observability", tags=["admin-observability"], dependencies=[Depends(admin_route_guard)])
 
+# In-process shard drains started by retry-shards (held so they are not garbage-collected mid-run)
+_drain_tasks: Set[asyncio.Task] = set()
+
 
 @router.get("/job-runs")
 async def get_job_runs(
@@ -46,6 +50,33 @@ async def get_job_runs(
     return {"items": items, "total": total}
 
 
+@router.get("/job-runs/{job_run_id}/shards")
+async def get_job_run_shards(request: Request, job_run_id: str):
+    """Shards of a partitioned job run (status, attempts, lease holder, count, last error). Admin only."""
+    await admin_route_guard(request)
+    from services.partitioned_jobs import SHARDS_COLLECTION
+    db = database.get_db()
+    shards = await db[SHARDS_COLLECTION].find({"job_run_id": job_run_id}, {"_id": 0}).sort("shard_index", 1).to_list(1000)
+    if not shards:
+        raise HTTPException(status_code=404, detail="No shards for this job run")
+    return {"job_run_id": job_run_id, "shards": shards}
+
+
+@router.post("/job-runs/{job_run_id}/retry-shards")
+async def retry_job_run_shards(request: Request, job_run_id: str):
+    """Requeue failed shards of a partitioned job run; other shards are not rerun. Admin only."""
+    await admin_route_guard(request)
+    from job_schedule import background_jobs_in_worker
+    from services.partitioned_jobs import drain_job_run, retry_failed_shards
+    requeued = await retry_failed_shards(job_run_id)
+    if requeued and not background_jobs_in_worker():
+        # No shard workers in embedded mode: run the requeued shards in this process
+        task = asyncio.create_task(drain_job_run(job_run_id))
+        _drain_tasks.add(task)
+        task.add_done_callback(_drain_tasks.discard)
+    return {"success": True, "job_run_id": job_run_id, "requeued": requeued}
+
+
 @router.get("/incidents")
 async def get_incidents_list(
     request: Request,
@@ -212,3 +243,86 @@ async def get_health_summary(request: Request):
         "last_success": last_success,
         "recent_failures": recent_failures,
     }
+
+
+@router.get("/boot-report")
+async def get_boot_report(request: Request):
+    """Per-phase timings of this process's last startup (ran/skipped/failed) and stored manifest fingerprints."""
+    await admin_route_guard(request)
+    from services.startup_manifest import MANIFEST_COLLECTION, last_boot_report
+    db = database.get_db()
+    manifest = await db[MANIFEST_COLLECTION].find({}, {"_id": 0}).sort("phase", 1).to_list(200)
+    return {"boot": last_boot_report, "manifest": manifest}
+
+
+@router.get("/query-profiler")
+async def get_query_profiler_status(request: Request):
+    """Mongo command profiler settings and in-memory counters for this process. Admin only."""
+    await admin_route_guard(request)
+    from services.query_profiler import query_profiler
+    return query_profiler.status()
+
+
+@router.get("/query-profiles")
+async def get_query_profiles(
+    request: Request,
+    kind: Optional[str] = Query(None, description="request | job"),
+    flag: Optional[str] = Query(None, description="slow | n_plus_one | collscan"),
+    limit: int = Query(50, ge=1, le=200),
+    source: str = Query("stored", description="stored (flagged, all processes) | recent (this process)"),
+):
+    """Profiled requests / job runs: DB time, command count and flags, newest first. Admin only."""
+    await admin_route_guard(request)
+    from services.query_profiler import PROFILE_COLLECTION, query_profiler
+    if source == "recent":
+        items = [p for p in query_profiler.recent
+                 if (not kind or p["kind"] == kind) and (not flag or flag in p["flags"])][:limit]
+        return {"items": items, "total": len(items)}
+    db = database.get_db()
+    query = {}
+    if kind:
+        query["kind"] = kind
+    if flag:
+        query["flags"] = flag
+    items = await db[PROFILE_COLLECTION].find(query, {"_id": 0}).sort("created_at", -1).to_list(limit)
+    return {"items": items, "total": len(items)}
+
+
+@router.get("/query-profiles/{key}")
+async def get_query_profile(request: Request, key: str):
+    """One profile by correlation id (request) or job_run_id (job), with per-shape stats. Admin only."""
+    await admin_route_guard(request)
+    from services.query_profiler import PROFILE_COLLECTION, query_profiler
+    for profile in query_profiler.recent:
+        if profile["key"] == key:
+            return profile
+    db = database.get_db()
+    doc = await db[PROFILE_COLLECTION].find_one({"key": key}, {"_id": 0})
+    if not doc:
+        raise HTTPException(status_code=404, detail="No profile for this correlation id / job run")
+    return doc
+
+
+@router.get("/slow-commands")
+async def get_slow_commands(request: Request, limit: int = Query(100, ge=1, le=500)):
+    """Recent Mongo commands over the slow threshold in this process (sampled or not), newest first. Admin only."""
+    await admin_route_guard(request)
+    from services.query_profiler import query_profiler
+    items = list(query_profiler.slow_commands)[-limit:][::-1]
+    return {"items": items, "slow_ms": query_profiler.slow_ms}
+
+
+@router.get("/artifact-cache")
+async def get_artifact_cache_stats(request: Request):
+    """Rendered PDF / compliance pack cache: hit ratio per kind (this process) and stored bytes (all). Admin only."""
+    await admin_route_guard(request)
+    from services.artifact_cache import cache_stats
+    return await cache_stats()
+
+
+@router.get("/log-archive")
+async def get_log_archive_stats(request: Request):
+    """message_logs / audit_logs: hot collection size (documents, data and index bytes) and archive totals. Admin only."""
+    await admin_route_guard(request)
+    from services.log_archive import archive_stats
+    return await archive_stats()
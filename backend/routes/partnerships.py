@@ -5,7 +5,7 @@ from models.partnership import PartnershipEnquiry, PartnershipStatus
 from models import AuditAction
 from utils.audit import create_audit_log
 from utils.submission_utils import (
-    check_rate_limit,
+    allow_submission,
     sanitize_html,
     is_website_honeypot_filled,
     compute_spam_score,
@@ -70,7 +70,7 @@ async def submit_partnership_enquiry(data: PartnershipEnquiryRequest, request: R
         raise HTTPException(status_code=422, detail="You must accept the privacy policy to submit.")
 
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(client_ip, "partnership"):
+    if not await allow_submission(client_ip, "partnership"):
         raise HTTPException(status_code=429, detail="Too many requests. Please wait a moment and try again.")
 
     honeypot_filled = is_website_honeypot_filled(data.website, data.honeypot)
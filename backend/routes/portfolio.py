@@ -11,7 +11,10 @@ from services.catalog_compliance import (
     get_property_compliance_detail,
     get_portfolio_compliance_from_catalog,
 )
+from services.client_data_loaders import loaders_for
+from utils.data_loader import group_by
 from datetime import datetime, timezone
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,7 +41,8 @@ async def get_compliance_summary(request: Request):
     """
     user = await client_route_guard(request)
     client_id = user["client_id"]
-    catalog_result = await get_portfolio_compliance_from_catalog(client_id)
+    loaders = loaders_for(request, client_id)
+    catalog_result = await get_portfolio_compliance_from_catalog(client_id, loaders)
     if catalog_result:
         return {
             "portfolio_score": catalog_result["portfolio_score"],
@@ -64,28 +68,24 @@ async def get_compliance_summary(request: Request):
                 for p in catalog_result.get("properties", [])
             ],
         }
-    # Legacy path
-    db = database.get_db()
-    properties = await db.properties.find(
-        {"client_id": client_id},
-        {"_id": 0, "property_id": 1, "address_line_1": 1, "postcode": 1, "nickname": 1},
-    ).to_list(100)
+    # Legacy path (properties were already read by the catalog attempt)
+    properties, requirements = await asyncio.gather(
+        loaders.properties_by_client.load(client_id),
+        loaders.requirements_by_client.load(client_id),
+    )
     if not properties:
         return {
             "portfolio_score": 100,
             "risk_level": "Low Risk",
             "properties": [],
         }
-    requirements = await db.requirements.find(
-        {"client_id": client_id},
-        {"_id": 0, "property_id": 1, "status": 1},
-    ).to_list(1000)
+    reqs_by_property = group_by(requirements, "property_id")
     total_weighted_score = 0.0
     total_requirements = 0
     property_summaries = []
     for prop in properties:
         pid = prop["property_id"]
-        prop_reqs = [r for r in requirements if r.get("property_id") == pid]
+        prop_reqs = reqs_by_property.get(pid, [])
         overdue_count = sum(1 for r in prop_reqs if r.get("status") in ("OVERDUE", "EXPIRED"))
         expiring_soon_count = sum(1 for r in prop_reqs if r.get("status") == "EXPIRING_SOON")
         if not prop_reqs:
@@ -135,13 +135,14 @@ async def get_property_compliance_detail_route(request: Request, property_id: st
     user = await client_route_guard(request)
     client_id = user["client_id"]
     db = database.get_db()
-    prop = await db.properties.find_one(
-        {"property_id": property_id, "client_id": client_id},
-        {"_id": 0, "property_id": 1, "nickname": 1, "address_line_1": 1, "compliance_score": 1, "risk_level": 1, "compliance_last_calculated_at": 1},
+    loaders = loaders_for(request, client_id)
+    # The detail's own property/catalog/requirements/documents reads are batched with this lookup
+    prop, detail = await asyncio.gather(
+        loaders.properties.load(property_id),
+        get_property_compliance_detail(client_id, property_id, loaders),
     )
     if not prop:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Property not found")
-    detail = await get_property_compliance_detail(client_id, property_id)
     if detail is not None:
         response = dict(detail)
         # Prefer matrix-computed score/risk so property detail matches the requirements matrix (no stale stored values)
@@ -151,10 +152,7 @@ async def get_property_compliance_detail_route(request: Request, property_id: st
             response["risk_level"] = response["risk_level"]
     else:
         # Fallback: no catalog or no applicable; return minimal from requirements
-        requirements = await db.requirements.find(
-            {"client_id": client_id, "property_id": property_id},
-            {"_id": 0, "requirement_id": 1, "requirement_type": 1, "status": 1, "due_date": 1, "description": 1},
-        ).to_list(200)
+        requirements = await loaders.requirements_by_property.load(property_id)
         from services.catalog_compliance import _days_to_expiry, _requirement_numeric_score
         matrix = []
         for r in requirements:
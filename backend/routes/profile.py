@@ -7,6 +7,8 @@ from database import database
 from middleware import client_route_guard
 from models import AuditAction, UserRole
 from utils.audit import create_audit_log
+from services.calendar_feed import invalidate_calendar_feed
+from services.client_search_index import reindex_client
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime, timezone
@@ -323,6 +325,9 @@ async def update_profile(request: Request, data: UpdateProfileRequest):
             {"client_id": user["client_id"]},
             {"$set": update_fields}
         )
+        if "full_name" in update_fields:
+            await reindex_client(user["client_id"])
+            await invalidate_calendar_feed(user["client_id"])
         
         after_state = {
             "full_name": data.full_name if data.full_name else before_state["full_name"],
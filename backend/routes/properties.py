@@ -2,19 +2,26 @@
 Allows clients to create and manage properties.
 """
 from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from database import database
 from middleware import client_route_guard
 from models import Property, ComplianceStatus, AuditAction, UserRole
-from utils.expiry_utils import get_effective_expiry_date, get_computed_status, is_included_for_calendar
+from utils.expiry_utils import get_effective_expiry_date, get_computed_status, get_transition_fields, is_included_for_calendar
 from utils.audit import create_audit_log
+from services.calendar_feed import CALENDAR_FEED_PROPERTY_FIELDS, invalidate_calendar_feed
+from services.client_search_index import reindex_client
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, Set
 from datetime import datetime, timezone
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/properties", tags=["properties"])
 
+# Background bulk imports (held so they are not garbage-collected mid-run)
+_import_tasks: Set[asyncio.Task] = set()
+
 class CreatePropertyRequest(BaseModel):
     nickname: Optional[str] = None  # Optional; when set, used to identify the property; otherwise address is used
     address_line_1: str
@@ -96,6 +103,7 @@ async def create_property(request: Request, data: CreatePropertyRequest):
                 prop_doc[key] = prop_doc[key].isoformat()
         
         await db.properties.insert_one(prop_doc)
+        await reindex_client(user["client_id"])
         
         # Remove MongoDB _id from response
         prop_doc.pop("_id", None)
@@ -240,6 +248,10 @@ async def patch_property(request: Request, property_id: str, data: PatchProperty
         {"property_id": property_id, "client_id": user["client_id"]},
         {"$set": update},
     )
+    if "postcode" in update:
+        await reindex_client(user["client_id"])
+    if CALENDAR_FEED_PROPERTY_FIELDS & update.keys():
+        await invalidate_calendar_feed(user["client_id"])
     from services.provisioning_status_hook import update_provisioning_status_for_property
     await update_provisioning_status_for_property(user["client_id"], property_id)
 
@@ -351,6 +363,8 @@ async def mark_requirement_not_applicable(
         )
         requirement_id = existing["requirement_id"]
         created = False
+        from services.requirement_transitions import sync_requirement_transitions
+        await sync_requirement_transitions(db, {"requirement_id": requirement_id})
     else:
         # Create new requirement row with NOT_REQUIRED
         from models import Requirement
@@ -375,6 +389,7 @@ async def mark_requirement_not_applicable(
         for key in ["due_date", "created_at", "updated_at"]:
             if doc.get(key) and hasattr(doc[key], "isoformat"):
                 doc[key] = doc[key].isoformat()
+        doc.update(get_transition_fields(doc))
         await db.requirements.insert_one(doc)
         requirement_id = doc["requirement_id"]
         created = True
@@ -478,6 +493,7 @@ async def patch_requirement(
     # Set status from deterministic rule when expiry or applicability changed
     merged = {**req, **update}
     update["status"] = get_computed_status(merged)
+    update.update(get_transition_fields(merged))
 
     await db.requirements.update_one(
         {"requirement_id": requirement_id, "property_id": property_id, "client_id": user["client_id"]},
@@ -548,33 +564,23 @@ async def list_properties(request: Request):
         )
 
 
-class BulkPropertyItem(BaseModel):
-    address_line_1: str
-    address_line_2: Optional[str] = None
-    city: str
-    postcode: str
-    property_type: str = "residential"
-    number_of_units: int = 1
-
-
-class BulkImportRequest(BaseModel):
-    properties: List[BulkPropertyItem]
-
-
 @router.post("/bulk-import")
-async def bulk_import_properties(request: Request, data: BulkImportRequest):
-    """Import multiple properties from a list (e.g., parsed CSV data).
+async def bulk_import_properties(request: Request):
+    """Import multiple properties (e.g. an agent's portfolio).
     
-    Accepts a list of property objects and creates them with requirements.
-    Useful for letting agents managing multiple properties.
+    Body: CSV (text/csv, header row with address_line_1, address_line_2, city, postcode,
+    property_type, number_of_units), NDJSON (application/x-ndjson, one property per line) or
+    JSON {"properties": [...]}. Rows are validated first, then properties and their requirements
+    are written in batches (see services.property_bulk_import).
     
-    Returns summary of successful and failed imports.
+    Returns summary of successful and failed imports. Imports over BULK_IMPORT_BACKGROUND_ROWS
+    rows (or with ?background=true) return 202 with a job_id to poll instead.
     """
     user = await client_route_guard(request)
     db = database.get_db()
     
     try:
-        from services.provisioning import ProvisioningService
+        from services import property_bulk_import as bulk
         
         # Verify client is provisioned
         client = await db.clients.find_one(
@@ -588,12 +594,18 @@ async def bulk_import_properties(request: Request, data: BulkImportRequest):
                 detail="Account must be fully provisioned to add properties"
             )
 
+        try:
+            rows = await bulk.read_rows(request.stream(), request.headers.get("content-type"))
+        except bulk.BulkImportError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        items, errors = bulk.validate_rows(rows, await bulk.existing_address_keys(db, user["client_id"]))
+
         # Property cap enforcement (plan_registry canonical) – count only active properties
         active_count = await db.properties.count_documents({
             "client_id": user["client_id"],
             "$or": [{"is_active": True}, {"is_active": {"$exists": False}}],
         })
-        import_count = len(data.properties)
+        import_count = len(items)
         from services.plan_registry import plan_registry
         allowed, error_msg, error_details = await plan_registry.enforce_property_limit(
             user["client_id"], active_count + import_count
@@ -619,105 +631,26 @@ async def bulk_import_properties(request: Request, data: BulkImportRequest):
                 detail=detail,
             )
 
-        results = {
-            "total": len(data.properties),
-            "successful": 0,
-            "failed": 0,
-            "errors": [],
-            "created_properties": []
-        }
+        job_id = await bulk.create_import_job(db, user["client_id"], user.get("portal_user_id"), len(rows), errors)
+        background = request.query_params.get("background", "").lower() in ("1", "true", "yes")
+        if background or import_count > bulk.background_threshold():
+            task = asyncio.create_task(bulk.run_import_in_background(job_id, user["client_id"], user, items))
+            _import_tasks.add(task)
+            task.add_done_callback(_import_tasks.discard)
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "message": f"Importing {import_count} of {len(rows)} properties",
+                    "job_id": job_id,
+                    "status_url": f"/api/properties/bulk-import/jobs/{job_id}",
+                },
+            )
 
-        provisioning = ProvisioningService()
-        
-        for idx, prop_data in enumerate(data.properties):
-            try:
-                # Validate required fields
-                if not prop_data.address_line_1 or not prop_data.city or not prop_data.postcode:
-                    results["failed"] += 1
-                    results["errors"].append({
-                        "row": idx + 1,
-                        "error": "Missing required field (address_line_1, city, or postcode)"
-                    })
-                    continue
-                
-                # Check for duplicate address
-                existing = await db.properties.find_one({
-                    "client_id": user["client_id"],
-                    "address_line_1": prop_data.address_line_1,
-                    "postcode": prop_data.postcode
-                })
-                
-                if existing:
-                    results["failed"] += 1
-                    results["errors"].append({
-                        "row": idx + 1,
-                        "address": f"{prop_data.address_line_1}, {prop_data.postcode}",
-                        "error": "Property already exists"
-                    })
-                    continue
-                
-                # Create property
-                property_obj = Property(
-                    client_id=user["client_id"],
-                    address_line_1=prop_data.address_line_1,
-                    address_line_2=prop_data.address_line_2,
-                    city=prop_data.city,
-                    postcode=prop_data.postcode,
-                    property_type=prop_data.property_type,
-                    number_of_units=prop_data.number_of_units,
-                    compliance_status=ComplianceStatus.RED
-                )
-                
-                prop_doc = property_obj.model_dump()
-                await db.properties.insert_one(prop_doc)
-                
-                # Generate requirements using internal method
-                req_count = 0
-                try:
-                    await provisioning._generate_requirements(
-                        client_id=user["client_id"],
-                        property_id=property_obj.property_id
-                    )
-                    # Count generated requirements
-                    req_count = await db.requirements.count_documents({
-                        "property_id": property_obj.property_id
-                    })
-                except Exception as req_err:
-                    logger.warning(f"Failed to generate requirements for {property_obj.property_id}: {req_err}")
-                
-                results["successful"] += 1
-                results["created_properties"].append({
-                    "property_id": property_obj.property_id,
-                    "address": f"{prop_data.address_line_1}, {prop_data.city}",
-                    "requirements_created": req_count
-                })
-                
-            except Exception as e:
-                results["failed"] += 1
-                results["errors"].append({
-                    "row": idx + 1,
-                    "error": str(e)
-                })
-        
-        # Audit log
-        await create_audit_log(
-            action=AuditAction.ADMIN_ACTION,
-            actor_id=user["portal_user_id"],
-            client_id=user["client_id"],
-            resource_type="property",
-            metadata={
-                "action": "bulk_import",
-                "total": results["total"],
-                "successful": results["successful"],
-                "failed": results["failed"]
-            }
-        )
-        
-        logger.info(f"Bulk import: {results['successful']}/{results['total']} properties created for {user['email']}")
-        
+        job = await bulk.run_import(job_id, user["client_id"], user, items)
         return {
-            "message": f"Imported {results['successful']} of {results['total']} properties",
-            "summary": results
+            "message": f"Imported {job['successful']} of {job['total']} properties",
+            "job_id": job_id,
+            "summary": bulk.job_summary(job),
         }
     
     except HTTPException:
@@ -730,6 +663,32 @@ async def bulk_import_properties(request: Request, data: BulkImportRequest):
         )
 
 
+@router.get("/bulk-import/jobs/{job_id}")
+async def get_bulk_import_job(request: Request, job_id: str):
+    """Progress of a bulk import: status, processed / total and, once done, the summary."""
+    user = await client_route_guard(request)
+    db = database.get_db()
+    from services import property_bulk_import as bulk
+
+    job = await db[bulk.IMPORT_JOBS_COLLECTION].find_one(
+        {"job_id": job_id, "client_id": user["client_id"]},
+        {"_id": 0},
+    )
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import job not found")
+    job = await bulk.fail_if_stale(db, job)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "total": job["total"],
+        "processed": job["processed"],
+        "created_at": job.get("created_at"),
+        "completed_at": job.get("completed_at"),
+        "last_error": job.get("last_error"),
+        "summary": bulk.job_summary(job),
+    }
+
+
 
 @router.get("/upcoming-deadlines")
 async def get_upcoming_deadlines(request: Request, days: int = 30):
@@ -8,9 +8,10 @@ from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime, timezone, timedelta
 from database import database
+from utils.response_cache import cached_response, NS_CATALOGUE
 from utils.submission_utils import (
     sanitize_html,
-    check_rate_limit,
+    allow_submission,
     is_website_honeypot_filled,
     is_honeypot_filled,
     compute_spam_score,
@@ -78,8 +79,8 @@ def generate_submission_id(prefix: str) -> str:
 # RATE LIMITING (delegate to submission_utils for consistency)
 # ============================================
 
-def _rate_limit_contact(ip: str) -> bool:
-    return check_rate_limit(ip, "contact")
+async def _rate_limit_contact(ip: str) -> bool:
+    return await allow_submission(ip, "contact")
 
 
 # ============================================
@@ -96,7 +97,7 @@ async def submit_contact_form(submission: ContactSubmission, request: Request):
         raise HTTPException(status_code=422, detail="You must accept the privacy policy to submit.")
 
     client_ip = request.client.host if request.client else "unknown"
-    if not _rate_limit_contact(client_ip):
+    if not await _rate_limit_contact(client_ip):
         raise HTTPException(status_code=429, detail="Too many requests. Please wait a moment and try again.")
 
     honeypot_filled = is_website_honeypot_filled(submission.website, submission.honeypot)
@@ -219,7 +220,7 @@ async def submit_lead(data: LeadSubmission, request: Request):
     if is_website_honeypot_filled(data.website, data.honeypot):
         return {"ok": True, "submission_id": "", "message": "Thank you. We'll be in touch soon."}
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(client_ip, "lead"):
+    if not await allow_submission(client_ip, "lead"):
         raise HTTPException(status_code=429, detail="Too many requests. Please wait a moment and try again.")
     from services.lead_service import LeadService
     from services.lead_models import LeadCreateRequest, LeadSourcePlatform, LeadServiceInterest
@@ -288,7 +289,7 @@ async def track_event(body: TrackEventBody, request: Request):
     Rate-limited; writes to analytics_events. Marketing site can call on load or interaction.
     """
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(client_ip, "track"):
+    if not await allow_submission(client_ip, "track"):
         raise HTTPException(status_code=429, detail="Too many requests.")
     from services.analytics_service import log_public_track
     ok = await log_public_track(
@@ -307,7 +308,7 @@ async def submit_service_inquiry(inquiry: ServiceInquiry, request: Request):
     Writes to service_inquiries collection ONLY.
     """
     client_ip = request.client.host if request.client else "unknown"
-    if not check_rate_limit(client_ip, "service-inquiry"):
+    if not await allow_submission(client_ip, "service-inquiry"):
         raise HTTPException(status_code=429, detail="Too many requests. Please wait a moment and try again.")
     
     db = database.get_db()
@@ -369,6 +370,7 @@ async def get_published_intake_schema(schema_key: str):
 
 
 @router.get("/services")
+@cached_response(NS_CATALOGUE)
 async def get_services():
     """
     Get list of available services with pricing from database.
@@ -415,6 +417,7 @@ async def get_services():
 
 
 @router.get("/services/{service_code}")
+@cached_response(NS_CATALOGUE)
 async def get_service_detail(service_code: str):
     """
     Get detailed information about a specific service from database.
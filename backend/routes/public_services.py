@@ -5,11 +5,13 @@ No authentication required.
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 from services.service_catalogue import service_catalogue, ServiceCategory
+from utils.response_cache import cached_response, NS_CATALOGUE
 
 router = APIRouter(prefix="/api/public", tags=["public-services"])
 
 
 @router.get("/services")
+@cached_response(NS_CATALOGUE)
 async def list_public_services(
     category: Optional[str] = None,
 ):
@@ -59,6 +61,7 @@ async def list_public_services(
 
 
 @router.get("/services/{service_code}")
+@cached_response(NS_CATALOGUE)
 async def get_public_service(
     service_code: str,
 ):
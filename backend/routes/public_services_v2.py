@@ -9,6 +9,7 @@ If a service is not in the catalogue, it cannot be displayed or ordered.
 """
 from fastapi import APIRouter, HTTPException
 from typing import Optional, List
+from utils.response_cache import cached_response, NS_CATALOGUE
 from services.service_catalogue_v2 import (
     service_catalogue_v2,
     ServiceCategory,
@@ -18,6 +19,7 @@ router = APIRouter(prefix="/api/public/v2", tags=["public-services-v2"])
 
 
 @router.get("/services")
+@cached_response(NS_CATALOGUE)
 async def list_public_services(
     category: Optional[str] = None,
 ):
@@ -66,6 +68,7 @@ async def list_public_services(
 
 
 @router.get("/services/by-category")
+@cached_response(NS_CATALOGUE)
 async def list_services_by_category():
     """
     List all active services grouped by category.
@@ -134,6 +137,7 @@ async def list_services_by_category():
 
 
 @router.get("/services/document-packs")
+@cached_response(NS_CATALOGUE)
 async def list_document_packs():
     """
     List document packs in tier order (Essential → Plus → Pro).
@@ -179,6 +183,7 @@ async def list_document_packs():
 
 
 @router.get("/services/{service_code}")
+@cached_response(NS_CATALOGUE)
 async def get_public_service(service_code: str):
     """
     Get service details for public display and Learn More page.
@@ -236,6 +241,7 @@ async def get_public_service(service_code: str):
 
 
 @router.get("/services/{service_code}/intake")
+@cached_response(NS_CATALOGUE)
 async def get_service_intake(service_code: str):
     """
     Get intake form fields for a service.
@@ -274,6 +280,7 @@ async def get_service_intake(service_code: str):
 
 
 @router.get("/services/{service_code}/price")
+@cached_response(NS_CATALOGUE)
 async def calculate_public_price(
     service_code: str,
     fast_track: bool = False,
@@ -296,6 +303,7 @@ async def calculate_public_price(
 
 
 @router.get("/cvp/plans")
+@cached_response(NS_CATALOGUE)
 async def get_cvp_plans():
     """
     Get CVP subscription plans and pricing.
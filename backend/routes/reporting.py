@@ -19,17 +19,8 @@ from models.core import AuditAction, UserRole
 from utils.audit import create_audit_log
 import logging
 
-# Excel support
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
-
-# PDF support
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
+# Excel (openpyxl) and PDF (ReportLab) support are imported inside format_xlsx / format_pdf:
+# they are only needed when a report is exported.
 
 logger = logging.getLogger(__name__)
 
@@ -377,6 +368,10 @@ def format_json(data: List[dict]) -> io.StringIO:
 
 def format_xlsx(data: List[dict], report_type: str, start: datetime, end: datetime) -> io.BytesIO:
     """Format data as Excel XLSX."""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+    from openpyxl.utils import get_column_letter
+
     output = io.BytesIO()
     
     wb = Workbook()
@@ -452,6 +447,11 @@ def format_xlsx(data: List[dict], report_type: str, start: datetime, end: dateti
 
 def format_pdf(data: List[dict], report_type: str, start: datetime, end: datetime) -> io.BytesIO:
     """Format data as PDF."""
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
     output = io.BytesIO()
     
     # Use landscape for more columns
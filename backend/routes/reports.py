@@ -1,5 +1,4 @@
 """Reporting Routes - Generate and download compliance reports."""
-import asyncio
 import csv
 import io
 import logging
@@ -15,8 +14,6 @@ from middleware import client_route_guard, admin_route_guard
 from models import AuditAction
 from utils.audit import create_audit_log
 from services.reporting_service import reporting_service
-from services.pdf_report_builder import build_portfolio_report, build_property_report, build_score_explanation_report
-from services.report_service import load_evidence_readiness_data
 from services.compliance_score import calculate_compliance_score
 
 logger = logging.getLogger(__name__)
@@ -56,6 +53,7 @@ async def generate_evidence_readiness_report(request: Request, body: GenerateRep
     Returns application/pdf. Stores metadata in reports collection. Plan-gated by reports_pdf.
     """
     from services.plan_registry import plan_registry
+    from services.report_service import load_evidence_readiness_data, render_evidence_readiness_pdf
 
     user = await client_route_guard(request)
     allowed, error_msg, error_details = await plan_registry.enforce_feature(user["client_id"], "reports_pdf")
@@ -72,12 +70,7 @@ async def generate_evidence_readiness_report(request: Request, body: GenerateRep
             scope=body.scope,
             property_id=body.property_id,
         )
-        if body.scope == "portfolio":
-            pdf_bytes = await asyncio.to_thread(build_portfolio_report, user["client_id"], report_data)
-        else:
-            pdf_bytes = await asyncio.to_thread(
-                build_property_report, user["client_id"], body.property_id, report_data
-            )
+        pdf = await render_evidence_readiness_pdf(user["client_id"], body.scope, body.property_id, report_data)
         score_at_time, risk_level_at_time = _score_and_risk_from_report_data(report_data)
         now = datetime.now(timezone.utc)
         db = database.get_db()
@@ -106,9 +99,9 @@ async def generate_evidence_readiness_report(request: Request, body: GenerateRep
         )
         filename = f"evidence_readiness_{body.scope}_{now.strftime('%Y%m%d_%H%M')}.pdf"
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            pdf.chunks(),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            headers={"Content-Disposition": f"attachment; filename={filename}", "Content-Length": str(pdf.size)},
         )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -248,6 +241,7 @@ async def get_score_explanation_pdf(
     Branded, audit-style report. Plan-gated by reports_pdf. Audit logged.
     """
     from services.plan_registry import plan_registry
+    from services.report_service import render_score_explanation_pdf
 
     user = await client_route_guard(request)
     allowed, error_msg, error_details = await plan_registry.enforce_feature(user["client_id"], "reports_pdf")
@@ -274,13 +268,7 @@ async def get_score_explanation_pdf(
                 "company_name": client_doc.get("company_name") or client_doc.get("full_name") or "Client",
             }
 
-        pdf_bytes = await asyncio.to_thread(
-            build_score_explanation_report,
-            user["client_id"],
-            score_data,
-            client_doc,
-            branding,
-        )
+        pdf = await render_score_explanation_pdf(user["client_id"], score_data, client_doc, branding)
 
         await create_audit_log(
             action=AuditAction.REPORT_EXPORTED,
@@ -296,9 +284,9 @@ async def get_score_explanation_pdf(
 
         filename = f"compliance_score_summary_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M')}.pdf"
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            pdf.chunks(),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
+            headers={"Content-Disposition": f"attachment; filename={filename}", "Content-Length": str(pdf.size)},
         )
     except Exception as e:
         logger.exception("Score explanation PDF error: %s", e)
@@ -312,6 +300,7 @@ async def get_score_explanation_pdf(
 async def download_report_by_id(request: Request, report_id: str):
     """Re-generate and download PDF for a previous report run (same scope/property_id, current data)."""
     from services.plan_registry import plan_registry
+    from services.report_service import load_evidence_readiness_data, render_evidence_readiness_pdf
 
     user = await client_route_guard(request)
     allowed, _, _ = await plan_registry.enforce_feature(user["client_id"], "reports_pdf")
@@ -332,20 +321,15 @@ async def download_report_by_id(request: Request, report_id: str):
         report_data = await load_evidence_readiness_data(
             client_id=user["client_id"], scope=scope, property_id=property_id
         )
-        if scope == "portfolio":
-            pdf_bytes = await asyncio.to_thread(build_portfolio_report, user["client_id"], report_data)
-        else:
-            pdf_bytes = await asyncio.to_thread(
-                build_property_report, user["client_id"], property_id, report_data
-            )
+        pdf = await render_evidence_readiness_pdf(user["client_id"], scope, property_id, report_data)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     created = row.get("created_at") or datetime.now(timezone.utc)
     filename = f"evidence_readiness_{scope}_{created.strftime('%Y%m%d_%H%M')}.pdf"
     return StreamingResponse(
-        io.BytesIO(pdf_bytes),
+        pdf.chunks(),
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        headers={"Content-Disposition": f"attachment; filename={filename}", "Content-Length": str(pdf.size)},
     )
 
 
@@ -297,7 +297,6 @@ async def get_tenant_compliance_pack(request: Request, property_id: str):
     Tenants get free access to compliance packs for their assigned properties.
     """
     from fastapi.responses import StreamingResponse
-    import io
     
     user = await tenant_route_guard(request)
     db = database.get_db()
@@ -333,7 +332,7 @@ async def get_tenant_compliance_pack(request: Request, property_id: str):
     try:
         from services.compliance_pack import compliance_pack_service
         
-        pdf_bytes = await compliance_pack_service.generate_compliance_pack(
+        pack = await compliance_pack_service.open_compliance_pack(
             property_id=property_id,
             client_id=client_id,
             include_expired=False,  # Tenants only see valid certificates
@@ -344,10 +343,11 @@ async def get_tenant_compliance_pack(request: Request, property_id: str):
         filename = f"compliance_pack_{property_doc.get('postcode', property_id)}.pdf"
         
         return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+            pack.chunks(),
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={filename}"
+                "Content-Disposition": f"attachment; filename={filename}",
+                "Content-Length": str(pack.size),
             }
         )
     
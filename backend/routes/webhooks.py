@@ -7,6 +7,8 @@ Stripe webhook endpoint with:
 
 POST /api/webhook/stripe - Main Stripe webhook endpoint
 POST /api/webhooks/stripe - Alias for Stripe webhook (for backward compatibility)
+With STRIPE_WEBHOOK_MODE=async the Stripe endpoints verify, record and acknowledge only;
+services.stripe_event_queue applies the events in the background.
 POST /api/webhooks/postmark - Postmark delivery/bounce/spam; validated by X-Postmark-Token when POSTMARK_WEBHOOK_TOKEN is set.
 """
 from fastapi import APIRouter, HTTPException, Request, Header, status
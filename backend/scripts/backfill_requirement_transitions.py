@@ -0,0 +1,43 @@
+"""
+Backfill requirement transition fields (effective_expiry_at, next_transition_at).
+
+Run from backend root: python -m scripts.backfill_requirement_transitions [--all]
+Or: python scripts/backfill_requirement_transitions.py (with PYTHONPATH=.)
+
+Safe to re-run. By default only requirements without next_transition_at are indexed; --all
+recomputes every requirement. Run once after deploy: the daily expiry jobs only read
+requirements whose next_transition_at has passed, so unindexed rows are not rolled over.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(recompute_all: bool = False):
+    from database import database
+    from services.requirement_transitions import sync_requirement_transitions
+
+    await database.connect()
+    try:
+        query = {} if recompute_all else {"next_transition_at": {"$exists": False}}
+        count = await sync_requirement_transitions(database.get_db(), query)
+        logger.info("Indexed %s requirement(s)", count)
+    finally:
+        await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--all", action="store_true", help="Recompute every requirement")
+    args = parser.parse_args()
+    asyncio.run(main(recompute_all=args.all))
@@ -0,0 +1,136 @@
+"""
+Concurrency benchmark for the ClearForm credit ledger.
+
+Run from backend root: python -m scripts.benchmark_clearform_credits [--parallel 200] [--balance 150] [--legacy]
+
+Creates a throwaway user (user_id BENCH-CREDITS-*) with --balance credits split over several
+expiry batches, fires --parallel concurrent 1-credit deductions through
+CreditService.deduct_credits and checks:
+- successes == min(parallel, balance) and the final balance is balance - successes (no lost updates)
+- the balance never goes negative
+- reconcile_balances reports no drift (balance == transaction log == expiry batches)
+--legacy runs the same load through the previous read-then-$set pattern for comparison.
+Requires MONGO_URL / DB_NAME; all benchmark documents are deleted afterwards.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+EXPIRY_BATCHES = 5
+
+
+async def _legacy_deduct(db, user_id, amount):
+    """Previous shape: read balance, check in Python, then $set the computed value."""
+    user = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0, "credit_balance": 1})
+    current = user.get("credit_balance", 0)
+    if current < amount:
+        return False
+    await asyncio.sleep(0)  # yield between read and write, as a real request does
+    await db.clearform_users.update_one({"user_id": user_id}, {"$set": {"credit_balance": current - amount}})
+    return True
+
+
+async def _seed(credit_service, user_id, balance):
+    from database import database
+    from clearform.models.credits import CreditTransactionType
+
+    db = database.get_db()
+    await db.clearform_users.insert_one({
+        "user_id": user_id,
+        "email": f"{user_id.lower()}@bench.invalid",
+        "credit_balance": 0,
+        "created_at": datetime.now(timezone.utc),
+    })
+    per_batch, extra = divmod(balance, EXPIRY_BATCHES)
+    for i in range(EXPIRY_BATCHES):
+        amount = per_batch + (1 if i < extra else 0)
+        if amount:
+            await credit_service.add_credits(
+                user_id=user_id,
+                amount=amount,
+                transaction_type=CreditTransactionType.BONUS,
+                description="benchmark seed",
+                expires_at=datetime.now(timezone.utc) + timedelta(days=30 + i),
+            )
+
+
+async def _cleanup(db, user_id):
+    for name in ("clearform_users", "clearform_credit_transactions", "clearform_credit_expiry"):
+        await db[name].delete_many({"user_id": user_id})
+    await db.clearform_credit_reconciliations.delete_many({"drift.user_id": user_id})
+
+
+async def run(parallel, balance, legacy):
+    from database import database
+    from clearform.models.credits import CreditTransactionType
+    from clearform.services.credit_service import CreditService
+
+    await database.connect()
+    db = database.get_db()
+    credit_service = CreditService()
+    user_id = f"BENCH-CREDITS-{uuid.uuid4().hex[:8].upper()}"
+    try:
+        await _seed(credit_service, user_id, balance)
+
+        async def _one(i):
+            if legacy:
+                return await _legacy_deduct(db, user_id, 1)
+            _, ok = await credit_service.deduct_credits(
+                user_id=user_id,
+                amount=1,
+                transaction_type=CreditTransactionType.DOCUMENT_GENERATION,
+                description=f"benchmark deduction {i}",
+            )
+            return ok
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(_one(i) for i in range(parallel)))
+        elapsed = time.perf_counter() - start
+
+        successes = sum(1 for r in results if r)
+        user = await db.clearform_users.find_one({"user_id": user_id}, {"_id": 0, "credit_balance": 1})
+        final_balance = user.get("credit_balance", 0)
+        expected_successes = min(parallel, balance)
+        report = await credit_service.reconcile_balances(user_ids=[user_id])
+        return {
+            "mode": "legacy" if legacy else "atomic",
+            "parallel": parallel,
+            "initial_balance": balance,
+            "successes": successes,
+            "final_balance": final_balance,
+            "lost_updates": (balance - successes) - final_balance,
+            "overdrawn": successes > balance or final_balance < 0,
+            "correct": successes == expected_successes and final_balance == balance - successes,
+            "reconciliation_drift": report["users_drifted"],
+            "elapsed_ms": round(elapsed * 1e3, 1),
+            "deductions_per_second": round(parallel / elapsed, 1) if elapsed else None,
+        }
+    finally:
+        await _cleanup(db, user_id)
+        await database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--parallel", type=int, default=200)
+    parser.add_argument("--balance", type=int, default=150)
+    parser.add_argument("--legacy", action="store_true", help="Use the previous read-then-$set deduction")
+    args = parser.parse_args()
+    result = asyncio.run(run(args.parallel, args.balance, args.legacy))
+    print(json.dumps(result, indent=2))
+    if not result["correct"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Synthetic portfolio data and an in-memory MongoDB stand-in for the offline benchmarks.
+
+Used by scripts.benchmark_suite (and importable from other benchmark scripts):
+- generate_portfolio(clients, properties_per_client, seed) -> seeded clients / properties /
+  requirements / documents shaped like the production collections (same keys the scoring,
+  report and notification code reads).
+- InMemoryDatabase: the subset of the Motor API those code paths use (find_one, find with
+  sort/skip/limit/to_list/async iteration, insert_one/many, update_one/many with $set, $inc,
+  $setOnInsert, $unset, $push and upsert, count_documents, delete_one/many) with the common
+  query operators. Timings against it measure our Python, not Mongo; use --mongo-url on the
+  suite for end-to-end numbers.
+"""
+import copy
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+REQUIREMENT_TYPES = (
+    "gas_safety", "eicr", "epc", "hmo_licence", "tenancy_agreement", "how_to_rent", "deposit_protection",
+)
+_STREETS = ("High Street", "Station Road", "Church Lane", "Victoria Road", "Mill Lane", "Park Avenue")
+_TOWNS = (("London", "E1"), ("Manchester", "M1"), ("Leeds", "LS1"), ("Bristol", "BS1"), ("Glasgow", "G1"))
+
+
+def _requirement_status(expiry: Optional[datetime], now: datetime) -> str:
+    if expiry is None:
+        return "PENDING"
+    if expiry < now:
+        return "OVERDUE"
+    if expiry < now + timedelta(days=30):
+        return "EXPIRING_SOON"
+    return "COMPLIANT"
+
+
+def generate_portfolio(clients: int = 20, properties_per_client: int = 5, seed: int = 42,
+                       now: Optional[datetime] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Deterministic for a given (clients, properties_per_client, seed, now)."""
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    out: Dict[str, List[Dict[str, Any]]] = {"clients": [], "properties": [], "requirements": [], "documents": []}
+    for c in range(clients):
+        client_id = f"bench-client-{c}"
+        out["clients"].append({
+            "client_id": client_id,
+            "customer_reference": f"PLE-BENCH-{c:05d}",
+            "full_name": f"Bench Landlord {c}",
+            "company_name": f"Bench Lettings {c} Ltd" if rng.random() < 0.5 else None,
+            "email": f"landlord{c}@bench.invalid",
+            "onboarding_status": "PROVISIONED",
+            "subscription_status": "ACTIVE",
+            "entitlement_status": "ENABLED",
+            "billing_plan": rng.choice(("PLAN_1_SOLO", "PLAN_2_PORTFOLIO", "PLAN_3_PRO")),
+        })
+        for p in range(properties_per_client):
+            property_id = f"{client_id}-p{p}"
+            town, postcode = rng.choice(_TOWNS)
+            prop = {
+                "property_id": property_id,
+                "client_id": client_id,
+                "address_line_1": f"{rng.randint(1, 200)} {rng.choice(_STREETS)}",
+                "city": town,
+                "postcode": f"{postcode} {rng.randint(1, 9)}AB",
+                "is_hmo": rng.random() < 0.25,
+                "bedrooms": rng.choice((1, 2, 3, 4, 6)),
+                "occupancy": rng.choice(("single_family", "multi_family")),
+                "cert_gas_safety": rng.choice(("YES", "YES", "NO")),
+                "licence_required": rng.choice(("YES", "NO", "NO")),
+                "has_gas_supply": rng.random() < 0.8,
+                "tenancy_active": rng.random() < 0.7,
+                "deposit_taken": rng.random() < 0.6,
+                "created_at": (now - timedelta(days=rng.randint(30, 900))).isoformat(),
+            }
+            out["properties"].append(prop)
+            for n, req_type in enumerate(REQUIREMENT_TYPES):
+                requirement_id = f"{property_id}-r{n}"
+                expiry = None
+                if rng.random() < 0.85:
+                    expiry = now + timedelta(days=rng.randint(-60, 400))
+                    out["documents"].append({
+                        "document_id": f"{requirement_id}-d",
+                        "client_id": client_id,
+                        "property_id": property_id,
+                        "requirement_id": requirement_id,
+                        "file_name": f"{req_type}.pdf",
+                        "status": rng.choice(("VERIFIED", "VERIFIED", "UPLOADED")),
+                        "expiry_date": expiry.isoformat(),
+                        "uploaded_at": (expiry - timedelta(days=365)).isoformat(),
+                    })
+                out["requirements"].append({
+                    "requirement_id": requirement_id,
+                    "client_id": client_id,
+                    "property_id": property_id,
+                    "requirement_type": req_type,
+                    "description": req_type.replace("_", " ").title(),
+                    "applicability": rng.choice(("REQUIRED", "REQUIRED", "UNKNOWN")),
+                    "status": _requirement_status(expiry, now),
+                    "due_date": expiry.isoformat() if expiry else None,
+                })
+    return out
+
+
+# ---------------------------------------------------------------------------
+# In-memory MongoDB stand-in
+# ---------------------------------------------------------------------------
+
+_MISSING = object()
+
+
+def _get_path(doc: Any, path: str) -> Any:
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return _MISSING
+    return value
+
+
+def _comparable(a: Any, b: Any) -> bool:
+    if a is _MISSING or a is None or b is None:
+        return False
+    return isinstance(a, type(b)) or isinstance(b, type(a)) or (
+        isinstance(a, (int, float)) and isinstance(b, (int, float))
+    )
+
+
+def _match_operator(value: Any, op: str, operand: Any) -> bool:
+    if op == "$eq":
+        return _match_value(value, operand)
+    if op == "$ne":
+        return not _match_value(value, operand)
+    if op == "$in":
+        return any(_match_value(value, o) for o in operand)
+    if op == "$nin":
+        return not any(_match_value(value, o) for o in operand)
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if op == "$regex":
+        return isinstance(value, str) and re.search(operand, value) is not None
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        candidates = value if isinstance(value, list) else [value]
+        for v in candidates:
+            if not _comparable(v, operand):
+                continue
+            if (op == "$gt" and v > operand) or (op == "$gte" and v >= operand) \
+                    or (op == "$lt" and v < operand) or (op == "$lte" and v <= operand):
+                return True
+        return False
+    if op == "$options":
+        return True
+    raise NotImplementedError(f"InMemoryDatabase does not support {op}")
+
+
+def _match_value(value: Any, condition: Any) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        if "$regex" in condition and "i" in (condition.get("$options") or ""):
+            return isinstance(value, str) and re.search(condition["$regex"], value, re.IGNORECASE) is not None
+        return all(_match_operator(value, op, operand) for op, operand in condition.items())
+    if value is _MISSING:
+        return condition is None
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    return value == condition
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif not _match_value(_get_path(doc, key), condition):
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    include_id = projection.get("_id", 1)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(fields.values()):
+        out = {}
+        for path in fields:
+            value = _get_path(doc, path)
+            if value is _MISSING:
+                continue
+            target = out
+            parts = path.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = copy.deepcopy(value)
+    else:
+        out = copy.deepcopy(doc)
+        for path in fields:
+            out.pop(path, None)
+    if include_id and "_id" in doc:
+        out["_id"] = doc["_id"]
+    elif not include_id:
+        out.pop("_id", None)
+    return out
+
+
+def _sort_key(value: Any):
+    # Mongo orders missing/None first, then numbers, strings, dates
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, datetime):
+        return (3, value.timestamp() if value.tzinfo else value.replace(tzinfo=timezone.utc).timestamp())
+    return (4, str(value))
+
+
+def _apply_sort(docs: List[Dict[str, Any]], sort) -> List[Dict[str, Any]]:
+    for field, direction in reversed(list(sort or [])):
+        docs = sorted(docs, key=lambda d: _sort_key(_get_path(d, field)), reverse=direction < 0)
+    return docs
+
+
+class InMemoryCursor:
+    def __init__(self, collection: "InMemoryCollection", query, projection):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = None
+        self._skip = 0
+        self._limit = 0
+
+    def sort(self, key_or_list, direction: int = 1) -> "InMemoryCursor":
+        self._sort = [(key_or_list, direction)] if isinstance(key_or_list, str) else list(key_or_list)
+        return self
+
+    def skip(self, n: int) -> "InMemoryCursor":
+        self._skip = n
+        return self
+
+    def limit(self, n: int) -> "InMemoryCursor":
+        self._limit = n
+        return self
+
+    def _results(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = [d for d in self._collection.docs if matches(d, self._query)]
+        docs = _apply_sort(docs, self._sort)[self._skip:]
+        cap = min(x for x in (self._limit, length) if x) if (self._limit or length) else None
+        if cap:
+            docs = docs[:cap]
+        return [_project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._results(length)
+
+    def __aiter__(self):
+        self._iter = iter(self._results())
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class InMemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+
+    def find(self, query=None, projection=None, sort=None, limit: int = 0, skip: int = 0) -> InMemoryCursor:
+        cursor = InMemoryCursor(self, query, projection)
+        if sort:
+            cursor.sort(sort)
+        return cursor.skip(skip).limit(limit)
+
+    async def find_one(self, query=None, projection=None, sort=None, **_):
+        docs = await self.find(query, projection, sort=sort).to_list(1)
+        return docs[0] if docs else None
+
+    async def count_documents(self, query=None, **_) -> int:
+        return sum(1 for d in self.docs if matches(d, query))
+
+    async def insert_one(self, doc: Dict[str, Any], **_):
+        doc.setdefault("_id", ObjectId())  # Motor mutates the caller's dict the same way
+        self.docs.append(copy.deepcopy(doc))
+        return SimpleNamespace(inserted_id=doc["_id"], acknowledged=True)
+
+    async def insert_many(self, docs, ordered: bool = True, **_):
+        ids = [(await self.insert_one(d)).inserted_id for d in docs]
+        return SimpleNamespace(inserted_ids=ids, acknowledged=True)
+
+    @staticmethod
+    def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+        for op, fields in update.items():
+            if op == "$setOnInsert" and not inserting:
+                continue
+            for path, value in fields.items():
+                parts = path.split(".")
+                target = doc
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                leaf = parts[-1]
+                if op in ("$set", "$setOnInsert"):
+                    target[leaf] = copy.deepcopy(value)
+                elif op == "$inc":
+                    target[leaf] = target.get(leaf, 0) + value
+                elif op == "$unset":
+                    target.pop(leaf, None)
+                elif op == "$push":
+                    target.setdefault(leaf, []).append(copy.deepcopy(value))
+                else:
+                    raise NotImplementedError(f"InMemoryDatabase does not support {op}")
+
+    async def update_one(self, query, update, upsert: bool = False, **_):
+        return await self._update(query, update, upsert, many=False)
+
+    async def update_many(self, query, update, upsert: bool = False, **_):
+        return await self._update(query, update, upsert, many=True)
+
+    async def _update(self, query, update, upsert: bool, many: bool):
+        matched = 0
+        for doc in self.docs:
+            if matches(doc, query):
+                self._apply_update(doc, update, inserting=False)
+                matched += 1
+                if not many:
+                    break
+        upserted_id = None
+        if not matched and upsert:
+            doc = {k: v for k, v in (query or {}).items() if not k.startswith("$") and not isinstance(v, dict)}
+            self._apply_update(doc, update, inserting=True)
+            upserted_id = (await self.insert_one(doc)).inserted_id
+        return SimpleNamespace(matched_count=matched, modified_count=matched, upserted_id=upserted_id)
+
+    async def delete_one(self, query, **_):
+        for i, doc in enumerate(self.docs):
+            if matches(doc, query):
+                del self.docs[i]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query, **_):
+        before = len(self.docs)
+        self.docs = [d for d in self.docs if not matches(d, query)]
+        return SimpleNamespace(deleted_count=before - len(self.docs))
+
+    async def create_index(self, *args, **kwargs) -> str:
+        return "in_memory"
+
+
+class InMemoryDatabase:
+    """Collections are created on first access, like Motor."""
+
+    def __init__(self, name: str = "benchmark"):
+        self.name = name
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, *args, **kwargs) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+    async def list_collection_names(self) -> List[str]:
+        return sorted(self._collections)
@@ -0,0 +1,142 @@
+"""
+Benchmark KB retrieval: BM25 index vs the previous keyword-overlap scan.
+
+Run from backend root: python -m scripts.benchmark_kb_retrieval [--repeat 200] [--corpus-scale 1] [--json]
+
+Uses the curated assistant KB (docs/assistant_kb/*.md) and a small labelled query set
+(query -> expected source file). Reports per-query latency (mean/p95, microseconds) and
+ranking quality (hit@3, MRR) for both scorers. --corpus-scale N replicates the corpus with
+distinct ids to show how each scorer grows with the number of documents. No DB required.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# (query, expected source file)
+LABELLED_QUERIES = [
+    ("how do I upload a document", "how_to_upload.md"),
+    ("uploading certificates to the portal", "how_to_upload.md"),
+    ("what is an EICR", "certificates_overview.md"),
+    ("gas safety certificate CP12", "certificates_overview.md"),
+    ("why did my score change", "score_changes.md"),
+    ("score dropped after expiry", "score_changes.md"),
+    ("how is the compliance score calculated", "how_scoring_works.md"),
+    ("weighting of requirements in scoring", "how_scoring_works.md"),
+    ("contact support escalate a problem", "support_and_escalation.md"),
+    ("what data do you use and limitations", "data_sources_and_limits.md"),
+    ("meaning of HMO", "glossary.md"),
+]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _load_corpus(scale):
+    from services.assistant_retrieval_service import _load_kb_into_cache
+
+    raw = _load_kb_into_cache()
+    corpus = []
+    for copy in range(scale):
+        for source_id, title, content in raw:
+            sid = source_id if copy == 0 else f"{source_id}#{copy}"
+            corpus.append((sid, title, content))
+    return corpus
+
+
+def _overlap_rank(corpus, query):
+    from services.assistant_retrieval_service import _keyword_overlap_score
+
+    scored = [(sid, _keyword_overlap_score(query, title + " " + content)) for sid, title, content in corpus]
+    scored.sort(key=lambda x: (-x[1], x[0]))
+    return scored
+
+
+def _quality(rank_fn, queries):
+    hits, rr = 0, 0.0
+    for query, expected in queries:
+        ids = [sid.split("/")[-1] for sid, _ in rank_fn(query)]
+        if expected in ids[:3]:
+            hits += 1
+        if expected in ids:
+            rr += 1.0 / (ids.index(expected) + 1)
+    return {"hit_at_3": round(hits / len(queries), 3), "mrr": round(rr / len(queries), 3)}
+
+
+def _latency(rank_fn, queries, repeat):
+    samples = []
+    for _ in range(repeat):
+        for query, _ in queries:
+            start = time.perf_counter()
+            rank_fn(query)
+            samples.append((time.perf_counter() - start) * 1e6)
+    return {"mean_us": round(statistics.mean(samples), 1), "p95_us": round(_percentile(samples, 95), 1)}
+
+
+def run(repeat=200, corpus_scale=1):
+    from services.kb_search_index import build_index
+
+    corpus = _load_corpus(corpus_scale)
+    if not corpus:
+        raise SystemExit("No KB documents found under docs/assistant_kb/")
+
+    build_start = time.perf_counter()
+    index = build_index((sid, {"title": title, "content": content}) for sid, title, content in corpus)
+    build_ms = (time.perf_counter() - build_start) * 1e3
+
+    def bm25(query):
+        return index.search(query)
+
+    def overlap(query):
+        return _overlap_rank(corpus, query)
+
+    # Quality is measured on the unreplicated corpus (replicas would tie with originals)
+    base = _load_corpus(1)
+    base_index = build_index((sid, {"title": t, "content": c}) for sid, t, c in base)
+    return {
+        "documents": len(corpus),
+        "queries": len(LABELLED_QUERIES),
+        "repeat": repeat,
+        "bm25": {
+            "build_ms": round(build_ms, 2),
+            **_latency(bm25, LABELLED_QUERIES, repeat),
+            **_quality(lambda q: base_index.search(q), LABELLED_QUERIES),
+        },
+        "keyword_overlap": {
+            **_latency(overlap, LABELLED_QUERIES, repeat),
+            **_quality(lambda q: _overlap_rank(base, q), LABELLED_QUERIES),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--corpus-scale", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    result = run(repeat=args.repeat, corpus_scale=max(1, args.corpus_scale))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"KB retrieval benchmark: {result['documents']} docs, {result['queries']} queries x {result['repeat']}")
+    print(f"{'scorer':<16}{'mean_us':>10}{'p95_us':>10}{'hit@3':>8}{'mrr':>8}")
+    for name in ("bm25", "keyword_overlap"):
+        r = result[name]
+        print(f"{name:<16}{r['mean_us']:>10}{r['p95_us']:>10}{r['hit_at_3']:>8}{r['mrr']:>8}")
+    print(f"bm25 index build: {result['bm25']['build_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
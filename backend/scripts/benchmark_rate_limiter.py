@@ -0,0 +1,160 @@
+"""
+Benchmark the sliding-window counter rate limiter against the previous timestamp-list limiter.
+
+Run from backend root: python -m scripts.benchmark_rate_limiter [--keys 10000] [--hits 20] [--limit 10]
+                                                                [--max-keys 100000] [--mongo-url URL] [--json]
+
+Simulates many-key load (bots rotating IPs): --keys distinct keys, each hit --hits times in a
+shuffled order within one window, with a per-key --limit. Reports checks/second, allowed and
+denied counts, resident keys and traced memory (tracemalloc) for both limiters. With --mongo-url
+also measures the shared MongoDB store on a throwaway bench_* database (dropped afterwards).
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class _TimestampListLimiter:
+    """The previous utils.rate_limiter algorithm (list of attempt timestamps per key), for comparison."""
+
+    def __init__(self):
+        self.attempts = {}
+
+    def hit(self, key, limit, window_minutes):
+        now = datetime.now(timezone.utc)
+        if key in self.attempts:
+            self.attempts[key] = [t for t in self.attempts[key] if now - t < timedelta(minutes=window_minutes)]
+        else:
+            self.attempts[key] = []
+        if len(self.attempts[key]) >= limit:
+            min(self.attempts[key])
+            return False
+        self.attempts[key].append(now)
+        return True
+
+
+def _workload(keys, hits, seed=42):
+    rng = random.Random(seed)
+    order = [f"otp:198.51.{k // 256 % 256}.{k % 256}:{k}" for k in range(keys) for _ in range(hits)]
+    rng.shuffle(order)
+    return order
+
+
+def _measure(make_limiter, check, order):
+    """Timed pass without tracing, then a traced pass on a fresh limiter for peak memory."""
+    limiter = make_limiter()
+    start = time.perf_counter()
+    allowed = sum(1 for key in order if check(limiter, key))
+    elapsed = time.perf_counter() - start
+
+    traced = make_limiter()
+    tracemalloc.start()
+    for key in order:
+        check(traced, key)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return limiter, {
+        "checks_per_second": round(len(order) / elapsed),
+        "allowed": allowed,
+        "denied": len(order) - allowed,
+        "peak_traced_mb": round(peak / 1e6, 2),
+    }
+
+
+async def _measure_mongo(mongo_url, order, limit, window_seconds, sample):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from utils.rate_limiter import MongoRateLimitStore
+
+    client = AsyncIOMotorClient(mongo_url, serverSelectionTimeoutMS=5000)
+    db = client[f"bench_{uuid.uuid4().hex[:8]}"]
+    try:
+        store = MongoRateLimitStore(db)
+        subset = order[:sample]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(store.hit(key, limit, window_seconds) for key in subset))
+        elapsed = time.perf_counter() - start
+        return {
+            "checks": len(subset),
+            "checks_per_second": round(len(subset) / elapsed),
+            "allowed": sum(1 for ok, _ in results if ok),
+            "counter_documents": await db.rate_limit_counters.count_documents({}),
+        }
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+def run(keys=10000, hits=20, limit=10, max_keys=100000, mongo_url=None, mongo_sample=5000):
+    from utils.rate_limiter import MemoryRateLimitStore
+
+    order = _workload(keys, hits)
+    window_seconds = 600
+
+    legacy, legacy_result = _measure(
+        _TimestampListLimiter, lambda lim, key: lim.hit(key, limit, window_seconds // 60), order,
+    )
+    legacy_result["resident_keys"] = len(legacy.attempts)
+
+    store, sliding_result = _measure(
+        lambda: MemoryRateLimitStore(max_keys=max_keys), lambda lim, key: lim.hit(key, limit, window_seconds)[0], order,
+    )
+    sliding_result["resident_keys"] = len(store)
+
+    result = {
+        "keys": keys,
+        "hits_per_key": hits,
+        "limit": limit,
+        "checks": len(order),
+        "max_keys": max_keys,
+        "timestamp_list": legacy_result,
+        "sliding_window_counter": sliding_result,
+        "speedup": round(sliding_result["checks_per_second"] / legacy_result["checks_per_second"], 2),
+    }
+    if mongo_url:
+        result["mongo_shared"] = asyncio.run(_measure_mongo(mongo_url, order, limit, window_seconds, mongo_sample))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--hits", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--max-keys", type=int, default=100000, help="LRU bound for the sliding-window store")
+    parser.add_argument("--mongo-url", default=None, help="Also measure the shared store on this server")
+    parser.add_argument("--mongo-sample", type=int, default=5000, help="Checks sent to MongoDB")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    result = run(keys=args.keys, hits=args.hits, limit=args.limit, max_keys=args.max_keys,
+                 mongo_url=args.mongo_url, mongo_sample=args.mongo_sample)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"Rate limiter benchmark: {result['keys']} keys x {result['hits_per_key']} hits, limit {result['limit']}")
+    print(f"{'limiter':<24}{'checks/s':>12}{'allowed':>10}{'denied':>10}{'keys':>10}{'peak_mb':>10}")
+    for name in ("timestamp_list", "sliding_window_counter"):
+        r = result[name]
+        print(f"{name:<24}{r['checks_per_second']:>12}{r['allowed']:>10}{r['denied']:>10}"
+              f"{r['resident_keys']:>10}{r['peak_traced_mb']:>10}")
+    print(f"speedup: {result['speedup']}x")
+    if "mongo_shared" in result:
+        m = result["mongo_shared"]
+        print(f"mongo shared store: {m['checks']} concurrent checks, {m['checks_per_second']} checks/s, "
+              f"{m['counter_documents']} counter documents")
+
+
+if __name__ == "__main__":
+    main()
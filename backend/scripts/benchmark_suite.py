@@ -0,0 +1,358 @@
+"""
+Offline benchmark suite: scoring, persistence, rendering, retrieval and notifications.
+
+Run from backend root:
+  python -m scripts.benchmark_suite [--clients 20] [--properties 5] [--repeat 3] [--only a,b]
+                                    [--mongo-url mongodb://localhost:27017] [--save FILE] [--compare FILE]
+                                    [--threshold 0.25] [--min-delta-ms 0.05] [--json]
+
+Seeds a synthetic portfolio (scripts.benchmark_data) into an in-memory Mongo stand-in, or into a
+throwaway bench_* database on --mongo-url (dropped afterwards), points database.db at it and
+times each hot path:
+
+  compute_property_score     pure v1 score, one call per property
+  portfolio_score_and_risk   one call per client over its scored properties
+  recalculate_and_persist    load + score + property update + history/ledger/audit writes
+  template_docx / template_pdf   TemplateRenderer._render_docx / _render_pdf (COMP_ audit output)
+  portfolio_report_pdf       build_portfolio_report per client from persisted state
+  load_kb_snippets           labelled queries from scripts.benchmark_kb_retrieval
+  notification_send          NotificationOrchestrator.send with a stored template and a fake Postmark provider
+
+Each benchmark reports n, mean/p50/p95/max in milliseconds. --save writes the result (with the
+git commit, Python version and dataset size) as a JSON baseline; --compare reads a baseline and
+flags benchmarks whose p50 grew by more than --threshold (exit code 1), so a regression shows up
+between commits run on the same machine. No network; nothing is sent.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+BENCHMARKS = (
+    "compute_property_score",
+    "portfolio_score_and_risk",
+    "recalculate_and_persist",
+    "template_docx",
+    "template_pdf",
+    "portfolio_report_pdf",
+    "load_kb_snippets",
+    "notification_send",
+)
+BENCH_TEMPLATE_KEY = "BENCHMARK_NOTICE"
+
+_COMPLIANCE_OUTPUT = {
+    "property_summary": {"address": "12 High Street, Leeds", "property_type": "HMO", "bedrooms": 5},
+    "safety_certificates": [
+        {"certificate_type": "Gas Safety (CP12)", "status": "Valid", "compliance_status": "Compliant"},
+        {"certificate_type": "EICR", "status": "Expired", "compliance_status": "Non-compliant"},
+        {"certificate_type": "EPC", "status": "Valid", "compliance_status": "Compliant"},
+    ],
+    "risk_summary": {
+        "overall_risk_level": "High",
+        "critical_risks": ["EICR expired 42 days ago", "Fire risk assessment missing"],
+        "high_risks": ["HMO licence renewal due in 21 days"],
+    },
+    "action_plan": [
+        {"priority": "Critical", "action": "Book an EICR with a registered electrician", "responsible_party": "Landlord"},
+        {"priority": "High", "action": "Submit HMO licence renewal to the council", "responsible_party": "Agent"},
+        {"priority": "Medium", "action": "Upload updated How to Rent guide", "responsible_party": "Landlord"},
+    ],
+    "disclaimers": ["This report is not legal advice.", "Based on documents supplied at the time of review."],
+    "data_gaps_flagged": ["Smoke alarm test records not provided"],
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _summary(samples_ms):
+    return {
+        "n": len(samples_ms),
+        "mean_ms": round(statistics.mean(samples_ms), 3),
+        "p50_ms": round(_percentile(samples_ms, 50), 3),
+        "p95_ms": round(_percentile(samples_ms, 95), 3),
+        "max_ms": round(max(samples_ms), 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class _FakePostmarkEmails:
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, **kwargs):
+        self.sent += 1
+        return {"MessageID": f"bench-{uuid.uuid4()}", "To": kwargs.get("To")}
+
+
+async def _seed(db, data):
+    for name in ("clients", "properties", "requirements", "documents"):
+        if data[name]:
+            await db[name].insert_many([dict(d) for d in data[name]])
+    await db.notification_templates.insert_one({
+        "template_key": BENCH_TEMPLATE_KEY, "channel": "EMAIL", "email_template_alias": "admin-manual",
+        "requires_provisioned": True, "requires_active_subscription": True, "requires_entitlement_enabled": True,
+        "plan_required_feature_key": None, "is_active": True,
+    })
+    # Stored template: rendering stays inside the orchestrator (services.email_service, with its
+    # built-in HTML templates, is never imported)
+    await db.email_templates.insert_one({
+        "alias": "admin-manual", "is_active": True, "subject": "{{subject}}",
+        "html_body": "<p>Hello {{client_name}}</p>", "text_body": "Hello {{client_name}}",
+    })
+
+
+async def _timed(samples, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    if asyncio.iscoroutine(result):
+        result = await result
+    samples.append((time.perf_counter() - start) * 1e3)
+    return result
+
+
+async def _run_benchmarks(db, data, repeat, only):
+    from scripts.benchmark_kb_retrieval import LABELLED_QUERIES
+    from services.assistant_retrieval_service import load_kb_snippets
+    from services.compliance_scoring import compute_property_score, portfolio_score_and_risk
+    from services.compliance_scoring_service import REASON_LAZY_BACKFILL, recalculate_and_persist
+    from services.notification_orchestrator import NotificationOrchestrator
+    from services.pdf_report_builder import build_portfolio_report
+    from services.template_renderer import RenderStatus, TemplateRenderer
+
+    reqs_by_prop, docs_by_prop, props_by_client = {}, {}, {}
+    for r in data["requirements"]:
+        reqs_by_prop.setdefault(r["property_id"], []).append(r)
+    for d in data["documents"]:
+        docs_by_prop.setdefault(d["property_id"], []).append(d)
+    for p in data["properties"]:
+        props_by_client.setdefault(p["client_id"], []).append(p)
+    now = datetime.now(timezone.utc)
+
+    async def bench_compute_property_score(samples):
+        for p in data["properties"]:
+            await _timed(samples, compute_property_score, p, reqs_by_prop.get(p["property_id"], []),
+                         docs_by_prop.get(p["property_id"], []), as_of=now)
+
+    async def bench_portfolio_score_and_risk(samples):
+        scored_by_client = {
+            cid: [{**p, **compute_property_score(p, reqs_by_prop.get(p["property_id"], []),
+                                                 docs_by_prop.get(p["property_id"], []), as_of=now)}
+                  for p in props]
+            for cid, props in props_by_client.items()
+        }
+        for scored in scored_by_client.values():
+            await _timed(samples, portfolio_score_and_risk, scored)
+
+    async def bench_recalculate_and_persist(samples):
+        for p in data["properties"]:
+            await _timed(samples, recalculate_and_persist, p["property_id"], REASON_LAZY_BACKFILL,
+                         actor={"role": "SYSTEM"})
+
+    renderer = TemplateRenderer()
+    order = {"order_id": "bench-order", "order_ref": "PLE-BENCH-ORDER", "service_code": "COMP_HMO",
+             "service_name": "HMO Compliance Audit", "customer": {"full_name": "Bench Landlord"}}
+    intake = {"property_address": "12 High Street, Leeds", "bedrooms": 5}
+
+    async def bench_template_docx(samples):
+        for _ in range(max(1, len(props_by_client) // 4)):
+            await _timed(samples, renderer._render_docx, order, _COMPLIANCE_OUTPUT, intake, 1, RenderStatus.DRAFT)
+
+    async def bench_template_pdf(samples):
+        for _ in range(max(1, len(props_by_client) // 4)):
+            await _timed(samples, renderer._render_pdf, order, _COMPLIANCE_OUTPUT, intake, 1, RenderStatus.DRAFT)
+
+    async def bench_portfolio_report_pdf(samples):
+        for client in data["clients"]:
+            cid = client["client_id"]
+            report_data = {
+                "client": client,
+                "properties": await db.properties.find({"client_id": cid}, {"_id": 0}).to_list(500),
+                "requirements": await db.requirements.find({"client_id": cid}, {"_id": 0}).to_list(5000),
+                "audit_logs": await db.audit_logs.find({"client_id": cid}, {"_id": 0}).to_list(50),
+                "now_iso": now.isoformat(),
+            }
+            await _timed(samples, build_portfolio_report, cid, report_data)
+
+    async def bench_load_kb_snippets(samples):
+        for query, _ in LABELLED_QUERIES:
+            await _timed(samples, load_kb_snippets, query)
+
+    orchestrator = NotificationOrchestrator()
+    orchestrator._postmark_client = type("FakePostmark", (), {"emails": _FakePostmarkEmails()})()
+
+    async def bench_notification_send(samples):
+        for client in data["clients"]:
+            result = await _timed(samples, orchestrator.send, BENCH_TEMPLATE_KEY, client["client_id"],
+                                  {"subject": "Benchmark notice", "client_name": client["full_name"]})
+            if result.outcome != "sent":
+                raise RuntimeError(f"notification_send: unexpected outcome {result.outcome} {result.block_reason}")
+
+    runners = {
+        "compute_property_score": bench_compute_property_score,
+        "portfolio_score_and_risk": bench_portfolio_score_and_risk,
+        "recalculate_and_persist": bench_recalculate_and_persist,
+        "template_docx": bench_template_docx,
+        "template_pdf": bench_template_pdf,
+        "portfolio_report_pdf": bench_portfolio_report_pdf,
+        "load_kb_snippets": bench_load_kb_snippets,
+        "notification_send": bench_notification_send,
+    }
+    results = {}
+    for name in BENCHMARKS:
+        if only and name not in only:
+            continue
+        await runners[name]([])  # warm-up: imports, font/style caches, KB index build
+        samples = []
+        for _ in range(repeat):
+            await runners[name](samples)
+        results[name] = _summary(samples)
+    return results
+
+
+async def _with_database(args, data, fn):
+    from database import database
+
+    previous = database.db
+    client = None
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(args.mongo_url, serverSelectionTimeoutMS=5000)
+        db = client[f"bench_{uuid.uuid4().hex[:8]}"]
+    else:
+        from scripts.benchmark_data import InMemoryDatabase
+
+        db = InMemoryDatabase()
+    database.db = db
+    try:
+        await _seed(db, data)
+        return await fn(db)
+    finally:
+        database.db = previous
+        if client is not None:
+            await client.drop_database(db.name)
+            client.close()
+
+
+def run(clients=20, properties=5, repeat=3, only=None, mongo_url=None, seed=42):
+    from scripts.benchmark_data import generate_portfolio
+
+    data = generate_portfolio(clients, properties, seed=seed)
+    args = argparse.Namespace(mongo_url=mongo_url)
+    results = asyncio.run(_with_database(args, data, lambda db: _run_benchmarks(db, data, repeat, only)))
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "mongodb" if mongo_url else "in_memory",
+            "clients": clients,
+            "properties": clients * properties,
+            "requirements": len(data["requirements"]),
+            "documents": len(data["documents"]),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.25, min_delta_ms=0.05):
+    """
+    Per-benchmark p50 ratio vs baseline; regressed when ratio > 1 + threshold and the p50 grew by
+    more than min_delta_ms (sub-0.1 ms benchmarks jitter by more than 25% between runs).
+    """
+    rows = []
+    for name, now in current["results"].items():
+        before = (baseline.get("results") or {}).get(name)
+        if not before or not before.get("p50_ms"):
+            rows.append({"benchmark": name, "baseline_p50_ms": None, "p50_ms": now["p50_ms"], "ratio": None,
+                         "regressed": False})
+            continue
+        ratio = now["p50_ms"] / before["p50_ms"]
+        rows.append({"benchmark": name, "baseline_p50_ms": before["p50_ms"], "p50_ms": now["p50_ms"],
+                     "ratio": round(ratio, 3),
+                     "regressed": ratio > 1 + threshold and now["p50_ms"] - before["p50_ms"] > min_delta_ms})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--properties", type=int, default=5, help="Properties per client")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", default="", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--mongo-url", default=None, help="Use a throwaway bench_* database on this server")
+    parser.add_argument("--save", default=None, help="Write the result JSON (baseline) to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare p50 against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed p50 growth before flagging (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="Ignore p50 growth below this (ms)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    unknown = only - set(BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    # Per-call service logging (audit, "provider not configured" notices) would swamp the table
+    logging.disable(logging.WARNING)
+    result = run(clients=args.clients, properties=args.properties, repeat=max(1, args.repeat), only=only,
+                 mongo_url=args.mongo_url, seed=args.seed)
+    comparison = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        comparison = compare(result, baseline, args.threshold, args.min_delta_ms)
+        result["comparison"] = {"baseline_commit": (baseline.get("meta") or {}).get("commit"),
+                                "threshold": args.threshold, "rows": comparison}
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        meta = result["meta"]
+        print(f"Benchmark suite @ {meta['commit'] or '?'} ({meta['backend']}): {meta['clients']} clients, "
+              f"{meta['properties']} properties, {meta['requirements']} requirements, repeat {meta['repeat']}")
+        print(f"{'benchmark':<28}{'n':>6}{'mean_ms':>10}{'p50_ms':>10}{'p95_ms':>10}{'max_ms':>10}")
+        for name, r in result["results"].items():
+            print(f"{name:<28}{r['n']:>6}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['max_ms']:>10}")
+        if comparison is not None:
+            print(f"\nvs baseline {result['comparison']['baseline_commit'] or '?'} (p50, threshold +{args.threshold:.0%})")
+            for row in comparison:
+                flag = "REGRESSED" if row["regressed"] else ""
+                ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "new"
+                print(f"{row['benchmark']:<28}{str(row['baseline_p50_ms']):>10} -> {row['p50_ms']:<10}{ratio:>8}  {flag}")
+    if comparison and any(row["regressed"] for row in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Import-time profile: cumulative import cost per module / package and peak RSS of a cold import.
+
+Run from backend root:
+  python -m scripts.profile_imports                       # profile `import server` (all route groups)
+  python -m scripts.profile_imports --role worker         # as the scheduler/worker process would load
+  python -m scripts.profile_imports --target job_runner --top 20
+  python -m scripts.profile_imports --why docx            # which first-party import pulls a package in
+  python -m scripts.profile_imports --json
+
+Each run imports the target in a fresh interpreter with `python -X importtime`, so numbers are
+cold-start numbers (--repeat N keeps the fastest run). No DB connection is made: importing
+server builds the app but does not run the lifespan.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# Printed by the child after the import: wall time and peak RSS
+_PROBE = """
+import resource, sys, time
+t0 = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - t0
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print("PROBE", round(elapsed * 1000, 1), rss_kb, len(sys.modules))
+"""
+
+# Packages whose presence in a process is worth calling out (see utils/lazy_import.py)
+HEAVY_PACKAGES = (
+    "reportlab", "docx", "docxtpl", "openpyxl", "numpy", "pandas", "aiohttp", "stripe",
+    "twilio", "boto3", "botocore", "litellm", "google", "openai", "PIL", "fitz", "pypdf",
+)
+
+
+def _first_party_roots():
+    roots = set()
+    for path in ROOT.iterdir():
+        if path.suffix == ".py":
+            roots.add(path.stem)
+        elif path.is_dir() and not path.name.startswith((".", "__")):
+            roots.add(path.name)
+    return roots
+
+
+def parse_importtime(stderr: str):
+    """Rows of (module, self_us, cumulative_us, depth, importer) in import order."""
+    entries = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            entries.append([m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2, None])
+    # importtime prints a module after its children; the importer is the next row one level up
+    for i, entry in enumerate(entries):
+        for parent in entries[i + 1:]:
+            if parent[3] < entry[3]:
+                entry[4] = parent[0]
+                break
+    return [tuple(e) for e in entries]
+
+
+def import_chain(entries, module: str):
+    """Importer chain for the first import of module (module <- importer <- ... <- target)."""
+    index = {e[0]: e for e in entries}
+    chain = [module]
+    while index.get(chain[-1]) and index[chain[-1]][4]:
+        chain.append(index[chain[-1]][4])
+    return chain
+
+
+def profile(target="server", role=None, repeat=1):
+    env = dict(os.environ)
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "import_profile")
+    if role:
+        env["PROCESS_ROLE"] = role
+    best = None
+    for _ in range(max(1, repeat)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(target=target)],
+            cwd=str(ROOT), env=env, capture_output=True, text=True,
+        )
+        probe = [l for l in proc.stdout.splitlines() if l.startswith("PROBE ")]
+        if proc.returncode != 0 or not probe:
+            raise SystemExit(f"import {target} failed:\n{proc.stderr[-2000:]}")
+        _, wall_ms, rss_kb, modules = probe[-1].split()
+        run = {"wall_ms": float(wall_ms), "rss_mb": round(int(rss_kb) / 1024, 1),
+               "modules": int(modules), "stderr": proc.stderr}
+        if best is None or run["wall_ms"] < best["wall_ms"]:
+            best = run
+    entries = parse_importtime(best.pop("stderr"))
+    return best, entries
+
+
+def summarize(target, role, run, entries, top=25):
+    first_party = _first_party_roots()
+    by_package = defaultdict(int)
+    for module, self_us, _cum, _depth, _imp in entries:
+        by_package[module.split(".")[0]] += self_us
+    first_party_modules = sorted(
+        (e for e in entries if e[0].split(".")[0] in first_party),
+        key=lambda e: e[2], reverse=True,
+    )
+    heavy = {}
+    loaded = {e[0] for e in entries}
+    for package in HEAVY_PACKAGES:
+        if package in loaded:
+            chain = import_chain(entries, package)
+            heavy[package] = {
+                "ms": round(by_package.get(package, 0) / 1000, 1),
+                "via": next((m for m in chain[1:] if m.split(".")[0] in first_party), None),
+            }
+    return {
+        "target": target,
+        "role": role or os.environ.get("PROCESS_ROLE") or "api",
+        "wall_ms": run["wall_ms"],
+        "rss_mb": run["rss_mb"],
+        "modules_loaded": run["modules"],
+        "top_packages_ms": [
+            {"package": p, "ms": round(us / 1000, 1)}
+            for p, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]
+        ],
+        "top_first_party_cumulative_ms": [
+            {"module": m, "ms": round(cum / 1000, 1)} for m, _s, cum, _d, _i in first_party_modules[:top]
+        ],
+        "heavy_packages_loaded": heavy,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", default="server", help="Module to import (default: server)")
+    parser.add_argument("--role", default=None, help="PROCESS_ROLE for the child (api, public, admin, clearform, worker)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=1, help="Run N cold imports, keep the fastest")
+    parser.add_argument("--why", default=None, help="Print the import chain that loads this module")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON only")
+    args = parser.parse_args()
+
+    run, entries = profile(args.target, args.role, args.repeat)
+    if args.why:
+        chain = import_chain(entries, args.why)
+        print(" <- ".join(chain) if args.why in {e[0] for e in entries} else f"{args.why} is not imported")
+        return
+    report = summarize(args.target, args.role, run, entries, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import {report['target']} (role={report['role']}): {report['wall_ms']} ms, "
+          f"peak RSS {report['rss_mb']} MB, {report['modules_loaded']} modules")
+    print("\nSelf time by top-level package:")
+    for row in report["top_packages_ms"]:
+        print(f"  {row['package']:<32}{row['ms']:>9.1f} ms")
+    print("\nCumulative time by first-party module:")
+    for row in report["top_first_party_cumulative_ms"]:
+        print(f"  {row['module']:<48}{row['ms']:>9.1f} ms")
+    if report["heavy_packages_loaded"]:
+        print("\nHeavy packages loaded (first-party importer):")
+        for package, info in report["heavy_packages_loaded"].items():
+            print(f"  {package:<14}{info['ms']:>8.1f} ms  via {info['via']}")
+
+
+if __name__ == "__main__":
+    main()
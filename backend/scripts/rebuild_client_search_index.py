@@ -0,0 +1,38 @@
+"""
+Rebuild the admin client search index (client_search_index) from clients + properties.
+
+Run from backend root: python -m scripts.rebuild_client_search_index
+Or: python scripts/rebuild_client_search_index.py (with PYTHONPATH=.)
+
+Safe to re-run: each client's index document is replaced in place. Run once after deploy
+to backfill; admin search falls back to regex matching until a rebuild has completed
+(it records a build marker in client_search_index_meta).
+"""
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Allow running as script or module
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    from database import database
+    from services.client_search_index import rebuild_search_index
+
+    await database.connect()
+    try:
+        result = await rebuild_search_index()
+        logger.info("Indexed %s client(s)", result["indexed"])
+    finally:
+        await database.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
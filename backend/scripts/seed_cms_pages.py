@@ -39,7 +39,9 @@ def generate_slug(text: str) -> str:
 
 async def seed_cms_pages():
     """Seed CMS pages from Service Catalogue."""
-    await database.connect()
+    # Reuse the API connection when called from startup (reconnecting leaked a client and rebuilt all indexes)
+    if database.get_db() is None:
+        await database.connect()
     db = database.get_db()
     
     print("=" * 60)
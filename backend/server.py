@@ -1,36 +1,24 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 import uuid
 from contextlib import asynccontextmanager
 from database import database
-from routes import auth, intake, onboarding, portal, webhooks, client, admin, documents, assistant, profile, properties, rules, templates, calendar, sms, otp, reports, tenant, webhooks_config, billing, admin_billing, public, admin_orders, orders, client_orders, admin_notifications, admin_services, public_services, blog, admin_services_v2, public_services_v2, services_public, orchestration, intake_wizard, admin_intake_schema, admin_pending_payments, analytics, support, admin_canned_responses, knowledge_base, leads, consent, cms, enablement, reporting, team, prompts, document_packs, checkout_validation, marketing, admin_legal_content, talent_pool, partnerships, admin_modules, admin_submissions, intake_uploads, portfolio, risk_check, admin_risk_leads
-from routes import observability, ops_compliance, contractors, maintenance, client_maintenance, predictive_data, admin_document_templates, public_orders
-
-# ClearForm - Separate Product Routes
-from clearform.routes import auth as clearform_auth
-from clearform.routes import credits as clearform_credits
-from clearform.routes import documents as clearform_documents
-from clearform.routes import subscriptions as clearform_subscriptions
-from clearform.routes import webhooks as clearform_webhooks
-from clearform.routes.document_types import router as clearform_document_types_router
-from clearform.routes.document_types import templates_router as clearform_templates_router
-from clearform.routes.workspaces import workspaces_router as clearform_workspaces_router
-from clearform.routes.workspaces import profiles_router as clearform_profiles_router
-from clearform.routes.organizations import router as clearform_organizations_router
-from clearform.routes.audit import router as clearform_audit_router
-from clearform.routes.admin import router as clearform_admin_router
+from route_groups import include_routers
+from job_schedule import (
+    SCHEDULER_MODE_WORKER,
+    LeaderElectedScheduler,
+    create_scheduler,
+    register_jobs,
+    scheduler_mode,
+)
+from services.leader_lock import LeaderLock
 
 import os
 import logging
-import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.jobstores.mongodb import MongoDBJobStore
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -43,60 +31,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize scheduler with MongoDB job store for persistence
-# Jobs will survive server restarts
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-db_name = os.environ.get('DB_NAME', 'compliance_vault_pro')
-
-jobstores = {
-    'default': MongoDBJobStore(
-        database=db_name,
-        collection='scheduled_jobs',
-        client=None  # Will use mongo_url
-    )
-}
-
-# Configure job store with MongoDB URL
-try:
-    from pymongo import MongoClient
-    mongo_client = MongoClient(mongo_url)
-    jobstores['default'] = MongoDBJobStore(
-        database=db_name,
-        collection='scheduled_jobs',
-        client=mongo_client
-    )
-    logger.info(f"MongoDB job store configured: {db_name}.scheduled_jobs")
-except Exception as e:
-    logger.warning(f"Failed to configure MongoDB job store, using memory store: {e}")
-    jobstores = {}
-
-scheduler = AsyncIOScheduler(jobstores=jobstores)
-
-# Import job runners from shared module (used by scheduler and admin run-now)
-from job_runner import (
-    make_instrumented,
-    run_daily_reminders,
-    run_pending_verification_digest,
-    run_monthly_digests,
-    run_compliance_status_check,
-    run_scheduled_reports,
-    run_compliance_score_snapshots,
-    run_compliance_recalc_worker,
-    run_compliance_recalc_sla_monitor,
-    run_expiry_rollover_recalc,
-    run_order_delivery_processing,
-    run_sla_monitoring,
-    run_stuck_order_detection,
-    run_queued_order_processing,
-    run_abandoned_intake_detection,
-    run_lead_followup_processing,
-    run_lead_sla_check,
-    run_checklist_nurture_processing,
-    run_risk_lead_nurture_processing,
-    run_notification_failure_spike_monitor,
-    run_notification_retry_worker,
-    run_pending_payment_lifecycle,
-)
+# Set by the lifespan in embedded scheduler mode (None in worker mode / before startup)
+scheduler = None
 
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
@@ -107,7 +43,10 @@ async def lifespan(app: FastAPI):
         logger.info("PYTEST_RUNNING=1: skipping database, scheduler, and heavy startup")
         yield
         return
-    await database.connect()
+    from services.startup_manifest import boot_report, finish_boot
+    with boot_report.timed("database_connect"):
+        # Indexes and seeds are run by the startup manifest below
+        await database.connect(create_indexes=False)
 
     # Stripe config: log mode (test/live) from key prefix and which price IDs are in use (no secret keys)
     try:
@@ -156,416 +95,62 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.warning("Bootstrap owner failed: %s", e)
     
-    # Create consent indexes
-    try:
-        from services.consent_service import ensure_consent_indexes
-        await ensure_consent_indexes()
-        logger.info("Consent indexes created")
-    except Exception as e:
-        logger.error(f"Failed to create consent indexes: {e}")
-    
-    # Create CMS indexes
+    # Schema + seed manifest: skips phases whose fingerprint is unchanged, builds indexes concurrently
     try:
-        db = database.get_db()
-        await db.cms_pages.create_index("page_id", unique=True)
-        await db.cms_pages.create_index("slug", unique=True)
-        await db.cms_pages.create_index("status")
-        await db.cms_revisions.create_index("revision_id", unique=True)
-        await db.cms_revisions.create_index([("page_id", 1), ("version", -1)])
-        await db.cms_media.create_index("media_id", unique=True)
-        await db.cms_media.create_index("media_type")
-        await db.cms_media.create_index([("file_name", "text"), ("alt_text", "text")])
-        logger.info("CMS indexes created")
+        from services.startup_manifest import run_startup_manifest
+        await run_startup_manifest(report=boot_report)
     except Exception as e:
-        logger.error(f"Failed to create CMS indexes: {e}")
-    
-    # Create Enablement Engine indexes and seed templates
-    try:
-        from services.enablement_templates import ensure_enablement_indexes, seed_enablement_templates
-        await ensure_enablement_indexes()
-        await seed_enablement_templates()
-        logger.info("Enablement engine initialized")
-    except Exception as e:
-        logger.error(f"Failed to initialize enablement engine: {e}")
-    
-    # Seed service catalogue
-    try:
-        from services.service_catalogue import seed_service_catalogue
-        await seed_service_catalogue()
-        logger.info("Service catalogue seeded successfully")
-    except Exception as e:
-        logger.error(f"Failed to seed service catalogue: {e}")
-    
-    # Seed service catalogue V2 (authoritative)
-    try:
-        from services.service_definitions_v2 import seed_service_catalogue_v2
-        result = await seed_service_catalogue_v2()
-        logger.info(f"Service catalogue V2 seeded: {result['created']} created, {result['skipped']} skipped")
-    except Exception as e:
-        logger.error(f"Failed to seed service catalogue V2: {e}")
-    
-    # Seed CMS pages (hub, category, service pages) so /services/* category pages show services. Idempotent.
-    try:
-        from scripts.seed_cms_pages import seed_cms_pages
-        await seed_cms_pages()
-        logger.info("CMS pages (services hub, categories, service pages) seeded")
-    except Exception as e:
-        logger.warning("CMS pages seed failed (category pages may show 'No services available'): %s", e)
-    
-    # Create Prompt Manager indexes
-    try:
-        db = database.get_db()
-        await db.prompt_templates.create_index("template_id", unique=True)
-        await db.prompt_templates.create_index([("service_code", 1), ("doc_type", 1), ("status", 1)])
-        await db.prompt_templates.create_index([("service_code", 1), ("doc_type", 1), ("version", -1)])
-        await db.prompt_templates.create_index("status")
-        await db.prompt_templates.create_index("tags")
-        await db.prompt_test_results.create_index("test_id", unique=True)
-        await db.prompt_test_results.create_index([("template_id", 1), ("executed_at", -1)])
-        await db.prompt_audit_log.create_index("audit_id", unique=True)
-        await db.prompt_audit_log.create_index([("template_id", 1), ("performed_at", -1)])
-        await db.prompt_audit_log.create_index("performed_at")
-        # Prompt execution metrics indexes for analytics
-        await db.prompt_execution_metrics.create_index([("template_id", 1), ("executed_at", -1)])
-        await db.prompt_execution_metrics.create_index([("service_code", 1), ("executed_at", -1)])
-        await db.prompt_execution_metrics.create_index("executed_at")
-        logger.info("Prompt Manager indexes created")
-    except Exception as e:
-        logger.error(f"Failed to create Prompt Manager indexes: {e}")
-    
-    # Create Document Pack Orchestrator indexes
-    try:
-        db = database.get_db()
-        await db.document_pack_items.create_index("item_id", unique=True)
-        await db.document_pack_items.create_index([("order_id", 1), ("canonical_index", 1)])
-        await db.document_pack_items.create_index("order_id")
-        await db.document_pack_items.create_index("status")
-        await db.document_pack_items.create_index("doc_type")
-        await db.document_pack_items.create_index("doc_key")
-        logger.info("Document Pack Orchestrator indexes created")
-    except Exception as e:
-        logger.error(f"Failed to create Document Pack Orchestrator indexes: {e}")
-    
-    # Document templates (server-side .docx per service_code/doc_type)
-    try:
-        db = database.get_db()
-        await db.document_templates.create_index("template_id", unique=True)
-        await db.document_templates.create_index([("service_code", 1), ("doc_type", 1)], unique=True)
-        await db.document_templates.create_index("service_code")
-        logger.info("Document templates indexes created")
-    except Exception as e:
-        logger.error("Document templates indexes: %s", e)
-    
-    # Create ClearForm indexes
-    try:
-        db = database.get_db()
-        # Users
-        await db.clearform_users.create_index("user_id", unique=True)
-        await db.clearform_users.create_index("email", unique=True)
-        await db.clearform_users.create_index("stripe_customer_id", sparse=True)
-        # Documents
-        await db.clearform_documents.create_index("document_id", unique=True)
-        await db.clearform_documents.create_index([("user_id", 1), ("created_at", -1)])
-        await db.clearform_documents.create_index("status")
-        await db.clearform_documents.create_index("document_type")
-        # Credit transactions
-        await db.clearform_credit_transactions.create_index("transaction_id", unique=True)
-        await db.clearform_credit_transactions.create_index([("user_id", 1), ("created_at", -1)])
-        await db.clearform_credit_transactions.create_index("transaction_type")
-        # Credit expiry
-        await db.clearform_credit_expiry.create_index("expiry_id", unique=True)
-        await db.clearform_credit_expiry.create_index([("user_id", 1), ("expires_at", 1)])
-        await db.clearform_credit_expiry.create_index("expired")
-        # Subscriptions
-        await db.clearform_subscriptions.create_index("subscription_id", unique=True)
-        await db.clearform_subscriptions.create_index("user_id")
-        await db.clearform_subscriptions.create_index("stripe_subscription_id", sparse=True)
-        # Top-ups
-        await db.clearform_credit_topups.create_index("topup_id", unique=True)
-        await db.clearform_credit_topups.create_index("stripe_checkout_session_id", sparse=True)
-        # Document types (admin-configurable)
-        await db.clearform_document_types.create_index("type_id", unique=True)
-        await db.clearform_document_types.create_index("code", unique=True)
-        await db.clearform_document_types.create_index("category")
-        await db.clearform_document_types.create_index("is_active")
-        # Document categories
-        await db.clearform_document_categories.create_index("category_id", unique=True)
-        await db.clearform_document_categories.create_index("code", unique=True)
-        # User templates
-        await db.clearform_templates.create_index("template_id", unique=True)
-        await db.clearform_templates.create_index([("user_id", 1), ("document_type_code", 1)])
-        await db.clearform_templates.create_index("workspace_id", sparse=True)
-        # Workspaces
-        await db.clearform_workspaces.create_index("workspace_id", unique=True)
-        await db.clearform_workspaces.create_index("owner_id")
-        # Smart profiles
-        await db.clearform_profiles.create_index("profile_id", unique=True)
-        await db.clearform_profiles.create_index([("user_id", 1), ("profile_type", 1)])
-        # Organizations
-        await db.clearform_organizations.create_index("org_id", unique=True)
-        await db.clearform_organizations.create_index("slug", unique=True)
-        await db.clearform_organizations.create_index("owner_id")
-        # Organization members
-        await db.clearform_org_members.create_index("member_id", unique=True)
-        await db.clearform_org_members.create_index([("org_id", 1), ("user_id", 1)], unique=True)
-        await db.clearform_org_members.create_index("user_id")
-        # Organization invitations
-        await db.clearform_org_invitations.create_index("invitation_id", unique=True)
-        await db.clearform_org_invitations.create_index([("org_id", 1), ("email", 1), ("status", 1)])
-        # Audit logs
-        await db.clearform_audit_logs.create_index("log_id", unique=True)
-        await db.clearform_audit_logs.create_index([("user_id", 1), ("created_at", -1)])
-        await db.clearform_audit_logs.create_index([("org_id", 1), ("created_at", -1)])
-        await db.clearform_audit_logs.create_index("action")
-        await db.clearform_audit_logs.create_index("created_at")
-        # Compliance packs
-        await db.clearform_compliance_packs.create_index("pack_id", unique=True)
-        await db.clearform_compliance_packs.create_index("code", unique=True)
-        logger.info("ClearForm indexes created")
-        
-        # Initialize default document types
-        from clearform.services.document_type_service import document_type_service
-        await document_type_service.initialize_defaults()
-        logger.info("ClearForm document types initialized")
-    except Exception as e:
-        logger.error(f"Failed to create ClearForm indexes: {e}")
-    
-    # Configure scheduled jobs – bind scheduler to running event loop so async jobs execute
-    try:
-        _loop = asyncio.get_running_loop()
-        scheduler._eventloop = _loop
-        logger.info("Scheduler bound to running event loop (jobs will run automatically)")
-    except RuntimeError as e:
-        logger.warning("No running event loop for scheduler: %s. Jobs may not run automatically.", e)
-    # Daily reminders at 9:00 AM UTC
-    scheduler.add_job(
-        make_instrumented("daily_reminders", "schedule"),
-        CronTrigger(hour=9, minute=0),
-        id="daily_reminders",
-        name="Daily Compliance Reminders",
-        replace_existing=True
-    )
-    
-    # Pending verification digest daily at 9:30 AM UTC (counts only, no PII)
-    scheduler.add_job(
-        make_instrumented("pending_verification_digest", "schedule"),
-        CronTrigger(hour=9, minute=30),
-        id="pending_verification_digest",
-        name="Pending Verification Digest",
-        replace_existing=True
-    )
-    
-    # Monthly digest on the 1st of each month at 10:00 AM UTC
-    scheduler.add_job(
-        make_instrumented("monthly_digest", "schedule"),
-        CronTrigger(day=1, hour=10, minute=0),
-        id="monthly_digest",
-        name="Monthly Compliance Digest",
-        replace_existing=True
-    )
-    
-    # Compliance status check - runs twice daily at 8:00 AM and 6:00 PM UTC
-    scheduler.add_job(
-        make_instrumented("compliance_check_morning", "schedule"),
-        CronTrigger(hour=8, minute=0),
-        id="compliance_check_morning",
-        name="Compliance Status Check (Morning)",
-        replace_existing=True
-    )
-    
-    scheduler.add_job(
-        make_instrumented("compliance_check_evening", "schedule"),
-        CronTrigger(hour=18, minute=0),
-        id="compliance_check_evening",
-        name="Compliance Status Check (Evening)",
-        replace_existing=True
-    )
-    
-    # Scheduled reports - runs every hour
-    scheduler.add_job(
-        make_instrumented("scheduled_reports", "schedule"),
-        CronTrigger(minute=0),
-        id="scheduled_reports",
-        name="Process Scheduled Reports",
-        replace_existing=True
-    )
-    
-    # Daily compliance score snapshots at 2:00 AM UTC
-    scheduler.add_job(
-        make_instrumented("compliance_score_snapshots", "schedule"),
-        CronTrigger(hour=2, minute=0),
-        id="compliance_score_snapshots",
-        name="Daily Compliance Score Snapshots",
-        replace_existing=True
-    )
-    
-    # Expiry rollover - daily 00:10 UTC
-    scheduler.add_job(
-        make_instrumented("expiry_rollover_recalc", "schedule"),
-        CronTrigger(hour=0, minute=10),
-        id="expiry_rollover_recalc",
-        name="Expiry Rollover Compliance Recalc",
-        replace_existing=True
-    )
-    
-    # Async compliance recalc worker - every 15 seconds
-    scheduler.add_job(
-        make_instrumented("compliance_recalc_worker", "schedule"),
-        IntervalTrigger(seconds=15),
-        id="compliance_recalc_worker",
-        name="Compliance Recalc Worker",
-        replace_existing=True
-    )
-    
-    # Compliance recalc SLA monitor - every 5 minutes
-    scheduler.add_job(
-        make_instrumented("compliance_recalc_sla_monitor", "schedule"),
-        CronTrigger(minute="*/5"),
-        id="compliance_recalc_sla_monitor",
-        name="Compliance Recalc SLA Monitor",
-        replace_existing=True
-    )
-    
-    # Notification failure spike monitor - every 5 minutes
-    scheduler.add_job(
-        make_instrumented("notification_failure_spike_monitor", "schedule"),
-        CronTrigger(minute="*/5"),
-        id="notification_failure_spike_monitor",
-        name="Notification Failure Spike Monitor",
-        replace_existing=True
-    )
-    
-    # SLA watchdog (job run SLA) - every 10 minutes
-    scheduler.add_job(
-        make_instrumented("sla_watchdog", "schedule"),
-        CronTrigger(minute="*/10"),
-        id="sla_watchdog",
-        name="SLA Watchdog (job run monitoring)",
-        replace_existing=True
-    )
-    
-    # Notification retry worker - every minute
-    scheduler.add_job(
-        make_instrumented("notification_retry_worker", "schedule"),
-        CronTrigger(minute="*"),
-        id="notification_retry_worker",
-        name="Notification Retry Worker",
-        replace_existing=True
-    )
-    
-    # Order delivery processing - every 5 minutes
-    scheduler.add_job(
-        make_instrumented("order_delivery_processing", "schedule"),
-        CronTrigger(minute="*/5"),
-        id="order_delivery_processing",
-        name="Order Delivery Processing",
-        replace_existing=True
-    )
-    
-    # SLA monitoring - every 15 minutes
-    scheduler.add_job(
-        make_instrumented("sla_monitoring", "schedule"),
-        CronTrigger(minute="*/15"),
-        id="sla_monitoring",
-        name="SLA Monitoring",
-        replace_existing=True
-    )
-    
-    # Stuck order detection - every 30 minutes
-    scheduler.add_job(
-        make_instrumented("stuck_order_detection", "schedule"),
-        CronTrigger(minute="*/30"),
-        id="stuck_order_detection",
-        name="Stuck Order Detection",
-        replace_existing=True
-    )
-    
-    # Queued order processing - every 10 minutes
-    scheduler.add_job(
-        make_instrumented("queued_order_processing", "schedule"),
-        CronTrigger(minute="*/10"),
-        id="queued_order_processing",
-        name="Queued Order Processing",
-        replace_existing=True
-    )
-    
-    # Abandoned intake detection - every 15 minutes
-    scheduler.add_job(
-        make_instrumented("abandoned_intake_detection", "schedule"),
-        CronTrigger(minute="*/15"),
-        id="abandoned_intake_detection",
-        name="Abandoned Intake Detection",
-        replace_existing=True
-    )
-    
-    # Lead follow-up processing - every 15 minutes
-    scheduler.add_job(
-        make_instrumented("lead_followup_processing", "schedule"),
-        CronTrigger(minute="*/15"),
-        id="lead_followup_processing",
-        name="Lead Follow-up Processing",
-        replace_existing=True
-    )
-    
-    # Pending payment lifecycle - daily 3:00 AM UTC
-    scheduler.add_job(
-        make_instrumented("pending_payment_lifecycle", "schedule"),
-        CronTrigger(hour=3, minute=0),
-        id="pending_payment_lifecycle",
-        name="Pending Payment Lifecycle (abandoned/archived)",
-        replace_existing=True
-    )
-    
-    # Lead SLA breach check - every hour
-    scheduler.add_job(
-        make_instrumented("lead_sla_check", "schedule"),
-        CronTrigger(minute=0),
-        id="lead_sla_check",
-        name="Lead SLA Breach Check",
-        replace_existing=True
-    )
+        logger.error("Startup manifest failed: %s", e)
+    
+    # Scheduled jobs: embedded mode runs them here under the leader lock (one process fires them);
+    # SCHEDULER_MODE=worker leaves them to worker.py so the API loop only serves requests
+    global scheduler
+    job_leader = None
+    order_pipeline = None
+    stripe_events = None
+    if scheduler_mode() == SCHEDULER_MODE_WORKER:
+        logger.info("SCHEDULER_MODE=worker: scheduled jobs and queues run in worker.py, not in the API")
+    else:
+        # Every API process drains the order pipeline and, in async webhook mode, queued Stripe events (claims are leases)
+        from services.order_pipeline_queue import OrderPipelinePool
+        from services.stripe_event_queue import StripeEventConsumer, consumers_enabled
+        order_pipeline = OrderPipelinePool()
+        order_pipeline.start()
+        if consumers_enabled():
+            stripe_events = StripeEventConsumer()
+            stripe_events.start()
+        try:
+            scheduler = create_scheduler()
+            register_jobs(scheduler)
+            job_leader = LeaderElectedScheduler(scheduler, LeaderLock(database.get_db()))
+            await job_leader.start()
+            logger.info(
+                "Background job scheduler started with %s job(s) (%s)",
+                len(scheduler.get_jobs()), "leader" if job_leader.is_leader else "standby",
+            )
+        except Exception as e:
+            job_leader = None
+            logger.exception("Background job scheduler failed to start: %s. API will run without scheduled jobs.", e)
     
-    # Checklist nurture - daily 9:00 AM UTC
-    scheduler.add_job(
-        make_instrumented("checklist_nurture_processing", "schedule"),
-        CronTrigger(hour=9, minute=0),
-        id="checklist_nurture_processing",
-        name="Checklist Nurture (compliance checklist leads)",
-        replace_existing=True
-    )
-    # Risk-check lead nurture (steps 2–5 at day 2, 4, 6, 10) - daily at 9:15 AM UTC
-    scheduler.add_job(
-        make_instrumented("risk_lead_nurture_processing", "schedule"),
-        CronTrigger(hour=9, minute=15),
-        id="risk_lead_nurture_processing",
-        name="Risk Lead Nurture (risk-check conversion leads)",
-        replace_existing=True
-    )
-    # Predictive maintenance insights - daily 4:00 AM UTC (warms insights for clients with PREDICTIVE_MAINTENANCE)
-    scheduler.add_job(
-        make_instrumented("predictive_insights_job", "schedule"),
-        CronTrigger(hour=4, minute=0),
-        id="predictive_insights_job",
-        name="Predictive Maintenance Insights (precompute)",
-        replace_existing=True
-    )
-
-    scheduler_started = False
-    try:
-        scheduler.start()
-        scheduler_started = True
-        jobs = scheduler.get_jobs()
-        logger.info("Background job scheduler started with %s job(s). Next runs: %s", len(jobs), [j.next_run_time.isoformat() if j.next_run_time else None for j in jobs[:5]])
-    except Exception as e:
-        logger.exception("Background job scheduler failed to start: %s. API will run without scheduled jobs.", e)
+    # Cold-start latency per phase (also served at /api/admin/observability/boot-report)
+    finish_boot(boot_report)
     
     yield
     
     # Shutdown
     logger.info("Shutting down Compliance Vault Pro API")
-    if scheduler_started:
-        scheduler.shutdown(wait=False)
+    if stripe_events is not None:
+        await stripe_events.stop()
+    if order_pipeline is not None:
+        await order_pipeline.stop()
+    if job_leader is not None:
+        await job_leader.stop()
         logger.info("Background job scheduler stopped")
+    try:
+        from services.postcode_service import postcode_service
+        await postcode_service.aclose()
+    except Exception:
+        pass
     await database.close()
 
 # Create FastAPI app
@@ -599,102 +184,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 # Correlation ID for tracing (set or forward X-Correlation-Id on every request/response)
-from middleware import CorrelationIdMiddleware
+from middleware import CorrelationIdMiddleware, MetricsMiddleware
 app.add_middleware(CorrelationIdMiddleware)
+# Request latency per route template + in-flight requests (outermost, so it times everything)
+app.add_middleware(MetricsMiddleware)
 
-# Include routers
-app.include_router(auth.router)
-app.include_router(intake.router)
-app.include_router(onboarding.router)
-app.include_router(portal.router)
-app.include_router(webhooks.router)
-app.include_router(client.router)
-app.include_router(portfolio.router)
-app.include_router(admin.router)
-app.include_router(observability.router)
-app.include_router(documents.router)
-app.include_router(assistant.router)
-app.include_router(profile.router)
-app.include_router(properties.router)
-app.include_router(rules.router)
-app.include_router(templates.router)
-app.include_router(calendar.router)
-app.include_router(sms.router)
-app.include_router(otp.router)
-app.include_router(reports.router)
-app.include_router(tenant.router)
-app.include_router(webhooks_config.router)
-app.include_router(billing.router)
-app.include_router(admin_billing.router)
-app.include_router(public.router)
-app.include_router(public_orders.router)
-app.include_router(admin_orders.router)
-app.include_router(orders.router)
-app.include_router(client_orders.router)
-app.include_router(admin_notifications.router)
-app.include_router(admin_services.router)  # Canonical /api/admin/services (task paths)
-app.include_router(public_services.router)
-app.include_router(blog.router)
-app.include_router(admin_services_v2.router, prefix="/api/admin/services/v2")  # V2 at /v2 only
-app.include_router(public_services_v2.router)
-app.include_router(services_public.router)
-app.include_router(orchestration.router)
-app.include_router(intake_wizard.router)
-app.include_router(admin_intake_schema.router)
-app.include_router(admin_pending_payments.router)
-app.include_router(analytics.router)
-app.include_router(support.public_router)
-app.include_router(support.client_router)
-app.include_router(support.admin_router)
-app.include_router(admin_canned_responses.router)
-app.include_router(knowledge_base.public_router)
-app.include_router(knowledge_base.admin_router)
-app.include_router(leads.public_router)
-app.include_router(leads.admin_router)
-app.include_router(consent.public_router)
-app.include_router(consent.admin_router)
-app.include_router(cms.router)  # Admin CMS routes
-app.include_router(cms.public_router)  # Public CMS page rendering
-app.include_router(enablement.router)  # Customer Enablement Automation Engine
-app.include_router(reporting.router)  # Full Reporting System - Export & Scheduling
-app.include_router(reporting.public_router)  # Public Report Sharing
-app.include_router(team.router)  # Team Permissions & Role Management
-app.include_router(prompts.router)  # Enterprise Prompt Manager
-app.include_router(admin_document_templates.router)  # Server-side DOCX templates (per service/doc_type)
-app.include_router(document_packs.router)  # Document Pack Orchestrator
-app.include_router(checkout_validation.router)  # Checkout Validation
-app.include_router(marketing.router)  # Marketing Website CMS
-app.include_router(admin_legal_content.router)  # Legal Content Editor
-app.include_router(talent_pool.router)  # Talent Pool
-app.include_router(partnerships.router)  # Partnerships
-app.include_router(admin_modules.router)  # Public endpoints
-app.include_router(admin_modules.router_admin)  # Admin endpoints
-app.include_router(admin_submissions.router)  # Unified submissions list/get/patch/notes/export
-app.include_router(intake_uploads.router)  # Intake document uploads
-app.include_router(risk_check.router)  # Compliance Risk Check (standalone demo, no client/provisioning)
-app.include_router(admin_risk_leads.router)  # Admin: risk leads list, export, resend report
-app.include_router(observability.router)  # Admin: job-runs, incidents, score-events (observability)
-app.include_router(ops_compliance.router)  # Admin: Operations & Compliance (feature flags, plan usage)
-app.include_router(contractors.router)  # Admin: Contractors (Ops Contractor Network)
-app.include_router(maintenance.router)  # Admin: Work orders (Ops Maintenance)
-app.include_router(client_maintenance.router)  # Client: Maintenance work orders (gated by MAINTENANCE_WORKFLOWS)
-app.include_router(predictive_data.router)  # Admin: Property assets & maintenance events (data for predictive)
-
-# ============================================================================
-# ClearForm Routes - Separate Product (Isolated)
-# ============================================================================
-app.include_router(clearform_auth.router)  # ClearForm Auth
-app.include_router(clearform_credits.router)  # ClearForm Credits
-app.include_router(clearform_documents.router)  # ClearForm Documents
-app.include_router(clearform_subscriptions.router)  # ClearForm Subscriptions
-app.include_router(clearform_webhooks.router)  # ClearForm Stripe Webhooks
-app.include_router(clearform_document_types_router)  # ClearForm Document Types (Admin-configurable)
-app.include_router(clearform_templates_router)  # ClearForm User Templates
-app.include_router(clearform_workspaces_router)  # ClearForm Workspaces
-app.include_router(clearform_profiles_router)  # ClearForm Smart Profiles
-app.include_router(clearform_organizations_router)  # ClearForm Organizations (Institutional)
-app.include_router(clearform_audit_router)  # ClearForm Audit Logs
-app.include_router(clearform_admin_router)  # ClearForm Admin Panel
+# Include routers for this process role (PROCESS_ROLE / ROUTE_GROUPS; see route_groups.py).
+# Route modules of disabled groups are never imported.
+include_routers(app)
 
 # Root endpoint
 @app.get("/api")
@@ -724,6 +221,18 @@ async def version_info():
         "environment": os.getenv("ENVIRONMENT", "development"),
     }
 
+# Prometheus scrape endpoint (per process). Set METRICS_TOKEN to require "Authorization: Bearer <token>".
+@app.get("/api/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    token = (os.environ.get("METRICS_TOKEN") or "").strip()
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return JSONResponse(status_code=401, content={"detail": "Not authenticated"})
+    import services.queue_metrics  # noqa: F401  registers the queue depth/lag collector
+    import services.artifact_cache  # noqa: F401  registers the stored-artifact gauges
+    import services.log_archive  # noqa: F401  registers the hot log size / archive gauges
+    from utils.metrics import REGISTRY
+    return PlainTextResponse(await REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Validation error handler: log request_id + full errors (loc path) for intake submit debugging
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -2,6 +2,8 @@
 AI provider for compliance document field extraction only.
 Input: extracted text (no raw binary). Output: strict JSON schema only.
 No legal advice; no compliance verdicts. If uncertain, return nulls and lower confidence.
+Fast path: services.certificate_parser parses common CP12/EICR/EPC layouts locally; when its
+confidence reaches CONFIDENCE_THRESHOLD (with an expiry date) the LLM is not called.
 Config: utils.ai_config (AI_ENABLED, OPENAI_API_KEY, AI_MODEL, etc.). No env vars required when AI_ENABLED=false.
 """
 import json
@@ -11,6 +13,7 @@ import logging
 from typing import Any, Dict, Optional
 
 from utils import ai_config
+from utils.metrics import LLM_CALL_SECONDS, time_call
 
 logger = logging.getLogger(__name__)
 
@@ -74,15 +77,16 @@ def _call_openai(text: str, file_name: str, hints: Optional[Dict[str, Any]] = No
     if hints:
         hint_str = f" Hints: {json.dumps(hints)}."
     user_content = f"Document filename: {file_name}.{hint_str}\n\nExtract fields from this document text:\n\n{text}"
-    response = client.chat.completions.create(
-        model=ai_config.AI_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_content[:30000]},
-        ],
-        temperature=ai_config.AI_TEMPERATURE,
-        max_tokens=ai_config.AI_MAX_OUTPUT_TOKENS,
-    )
+    with time_call(LLM_CALL_SECONDS, "openai", "document_extraction"):
+        response = client.chat.completions.create(
+            model=ai_config.AI_MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_content[:30000]},
+            ],
+            temperature=ai_config.AI_TEMPERATURE,
+            max_tokens=ai_config.AI_MAX_OUTPUT_TOKENS,
+        )
     raw_text = (response.choices[0].message.content or "").strip()
     # Strip markdown code block if present
     if raw_text.startswith("```"):
@@ -99,8 +103,12 @@ def extract_compliance_fields(
     """
     Extract compliance fields from document text only. No legal advice; output is suggested only.
     Returns dict with: extracted payload (normalized), raw_response_json, model, prompt_version,
-    tokens_in, tokens_out (if available). On failure raises or returns error payload.
+    tokens_in, tokens_out (if available), provider ("local_parser" or "openai").
+    On failure raises or returns error payload.
     """
+    local = _extract_locally(text, file_name)
+    if local is not None:
+        return local
     if not ai_config.is_configured():
         return {
             "success": False,
@@ -179,6 +187,40 @@ def extract_compliance_fields(
         "prompt_version": AI_EXTRACTION_PROMPT_VERSION,
         "tokens_in": tokens_in,
         "tokens_out": tokens_out,
+        "provider": "openai",
+    }
+
+
+def _extract_locally(text: str, file_name: str) -> Optional[Dict[str, Any]]:
+    """Rule-based extraction result when confident enough to skip the LLM, else None."""
+    if not text or not text.strip():
+        return None
+    from services.certificate_parser import PARSER_NAME, PARSER_VERSION, is_confident, parse_certificate_text
+    from services.document_extraction_service import CONFIDENCE_THRESHOLD
+
+    try:
+        parsed = parse_certificate_text(text, file_name)
+    except Exception as e:
+        logger.warning("Local certificate parse failed for %s: %s", file_name, e)
+        return None
+    if not is_confident(parsed, CONFIDENCE_THRESHOLD):
+        return None
+    extracted = _normalize_extraction(parsed)
+    logger.info(
+        "Local certificate parser accepted %s (%s, confidence %.2f); LLM skipped",
+        file_name, extracted["doc_type"], extracted["confidence"]["overall"],
+    )
+    return {
+        "success": True,
+        "error_code": None,
+        "error_message": None,
+        "extracted": extracted,
+        "raw_response_json": json.dumps(parsed),
+        "model": PARSER_NAME,
+        "prompt_version": PARSER_VERSION,
+        "tokens_in": 0,
+        "tokens_out": 0,
+        "provider": "local_parser",
     }
 
 
@@ -0,0 +1,231 @@
+"""
+Content-addressed cache for rendered artifacts (compliance packs, Evidence Readiness and score
+explanation PDFs).
+
+An artifact is keyed by artifact_key(): a SHA-256 of the artifact kind, client, template version
+and the exact input data the renderer reads (including branding). Unchanged input means the same
+key, so a repeat download is served from storage instead of re-rendering; any change to the data,
+the branding or the template version is a different key and simply misses. Nothing is ever
+invalidated explicitly.
+
+- Bytes live in the GridFS bucket ARTIFACT_BUCKET; artifact_cache holds one entry per key (file id,
+  size, hits, last_accessed_at).
+- When the stored total exceeds ARTIFACT_CACHE_MAX_BYTES, least recently used entries are evicted
+  down to ARTIFACT_CACHE_EVICT_TO_RATIO of the limit.
+- Cache failures never fail a download: a broken lookup or store falls back to rendering.
+- Effectiveness: artifact_cache_requests{kind,outcome} and artifact_cache_evictions counters,
+  stored bytes / entries gauges at scrape time, and cache_stats() (admin observability).
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from database import database
+from utils.metrics import ARTIFACT_CACHE_EVICTIONS, ARTIFACT_CACHE_REQUESTS, REGISTRY, family
+
+logger = logging.getLogger(__name__)
+
+ENTRIES_COLLECTION = "artifact_cache"
+ARTIFACT_BUCKET = "artifact_cache_files"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+ARTIFACT_CACHE_MAX_BYTES = _env_int("ARTIFACT_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+# Evict below the limit so a full cache does not evict on every store
+ARTIFACT_CACHE_EVICT_TO_RATIO = 0.9
+
+
+def artifact_key(kind: str, client_id: str, template_version: str, inputs: Any) -> str:
+    """Stable hash of everything that determines the rendered bytes (inputs must be JSON-like)."""
+    canonical = json.dumps(
+        {"kind": kind, "client_id": client_id, "template_version": template_version, "inputs": inputs},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _bucket(db) -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(db, bucket_name=ARTIFACT_BUCKET)
+
+
+@dataclass
+class Artifact:
+    """A rendered artifact: either fresh bytes (miss) or an open GridFS download stream (hit)."""
+    key: str
+    size: int
+    cache_hit: bool
+    body: Optional[bytes] = None
+    _stream: Any = None
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        if self.body is not None:
+            yield self.body
+            return
+        while True:
+            chunk = await self._stream.readchunk()
+            if not chunk:
+                break
+            yield chunk
+
+    async def read(self) -> bytes:
+        if self.body is None:
+            self.body = b"".join([chunk async for chunk in self.chunks()])
+        return self.body
+
+
+async def _lookup(db, key: str) -> Optional[Artifact]:
+    entry = await db[ENTRIES_COLLECTION].find_one_and_update(
+        {"_id": key},
+        {"$set": {"last_accessed_at": datetime.now(timezone.utc)}, "$inc": {"hits": 1}},
+        projection={"file_id": 1, "size": 1},
+    )
+    if not entry:
+        return None
+    try:
+        stream = await _bucket(db).open_download_stream(entry["file_id"])
+    except Exception:
+        # Evicted between the entry read and the open: drop the dangling entry and re-render
+        await db[ENTRIES_COLLECTION].delete_one({"_id": key, "file_id": entry["file_id"]})
+        return None
+    return Artifact(key=key, size=entry["size"], cache_hit=True, _stream=stream)
+
+
+async def _store(db, kind: str, key: str, client_id: str, body: bytes) -> None:
+    if len(body) > ARTIFACT_CACHE_MAX_BYTES:
+        return
+    bucket = _bucket(db)
+    file_id = await bucket.upload_from_stream(
+        f"{kind}/{key}", io.BytesIO(body), metadata={"kind": kind, "client_id": client_id},
+    )
+    now = datetime.now(timezone.utc)
+    result = await db[ENTRIES_COLLECTION].update_one(
+        {"_id": key},
+        {"$setOnInsert": {
+            "kind": kind,
+            "client_id": client_id,
+            "file_id": file_id,
+            "size": len(body),
+            "hits": 0,
+            "created_at": now,
+            "last_accessed_at": now,
+        }},
+        upsert=True,
+    )
+    if result.upserted_id is None:
+        # A concurrent render stored the same key first; keep theirs
+        await bucket.delete(file_id)
+        return
+    await evict(db)
+
+
+async def get_or_render(
+    kind: str, key: str, client_id: str, render: Callable[[], Awaitable[bytes]]
+) -> Artifact:
+    """Serve the artifact for key from storage, or render it (render() returns the bytes) and store it."""
+    db = database.get_db()
+    try:
+        cached = await _lookup(db, key)
+    except Exception as e:
+        logger.warning("Artifact cache lookup failed for %s: %s", kind, e)
+        cached = None
+    if cached is not None:
+        ARTIFACT_CACHE_REQUESTS.inc(kind, "hit")
+        return cached
+    body = await render()
+    ARTIFACT_CACHE_REQUESTS.inc(kind, "miss")
+    try:
+        await _store(db, kind, key, client_id, body)
+    except Exception as e:
+        logger.warning("Artifact cache store failed for %s: %s", kind, e)
+    return Artifact(key=key, size=len(body), cache_hit=False, body=body)
+
+
+async def _stored_totals(db) -> List[Dict[str, Any]]:
+    return await db[ENTRIES_COLLECTION].aggregate([
+        {"$group": {"_id": "$kind", "entries": {"$sum": 1}, "bytes": {"$sum": "$size"}, "hits": {"$sum": "$hits"}}},
+    ]).to_list(100)
+
+
+async def evict(db=None, max_bytes: Optional[int] = None) -> int:
+    """Drop least recently used artifacts while the stored total exceeds max_bytes. Returns entries evicted."""
+    db = db if db is not None else database.get_db()
+    max_bytes = ARTIFACT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    total = sum(row["bytes"] for row in await _stored_totals(db))
+    if total <= max_bytes:
+        return 0
+    target = max_bytes * ARTIFACT_CACHE_EVICT_TO_RATIO
+    bucket = _bucket(db)
+    evicted = 0
+    cursor = db[ENTRIES_COLLECTION].find({}, {"file_id": 1, "size": 1, "kind": 1}).sort("last_accessed_at", 1)
+    async for entry in cursor:
+        if total <= target:
+            break
+        # Conditional on file_id: another process may have evicted and re-stored this key
+        deleted = await db[ENTRIES_COLLECTION].delete_one({"_id": entry["_id"], "file_id": entry["file_id"]})
+        if not deleted.deleted_count:
+            continue
+        try:
+            await bucket.delete(entry["file_id"])
+        except Exception as e:
+            logger.warning("Artifact cache: could not delete GridFS file %s: %s", entry["file_id"], e)
+        total -= entry.get("size") or 0
+        evicted += 1
+        ARTIFACT_CACHE_EVICTIONS.inc(entry.get("kind") or "unknown")
+    if evicted:
+        logger.info("Artifact cache evicted %d entries (stored bytes now %d)", evicted, total)
+    return evicted
+
+
+async def cache_stats() -> Dict[str, Any]:
+    """Hit ratio per kind since process start, plus what is stored (all processes)."""
+    db = database.get_db()
+    requests = ARTIFACT_CACHE_REQUESTS.values()
+    stored = {row["_id"]: row for row in await _stored_totals(db)}
+    kinds = sorted({kind for kind, _ in requests} | set(stored))
+    by_kind = {}
+    for kind in kinds:
+        hits = requests.get((kind, "hit"), 0)
+        misses = requests.get((kind, "miss"), 0)
+        row = stored.get(kind) or {}
+        by_kind[kind] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else None,
+            "stored_entries": row.get("entries", 0),
+            "stored_bytes": row.get("bytes", 0),
+            "stored_hits": row.get("hits", 0),
+            "evictions": ARTIFACT_CACHE_EVICTIONS.values().get((kind,), 0),
+        }
+    return {
+        "max_bytes": ARTIFACT_CACHE_MAX_BYTES,
+        "stored_bytes": sum(row["bytes"] for row in stored.values()),
+        "stored_entries": sum(row["entries"] for row in stored.values()),
+        "kinds": by_kind,
+    }
+
+
+@REGISTRY.register_collector
+async def collect_artifact_cache_metrics() -> List[tuple]:
+    db = database.get_db()
+    if db is None:
+        return []
+    rows = await _stored_totals(db)
+    return [
+        family("artifact_cache_stored_bytes", "gauge", "Bytes of rendered artifacts held in the artifact cache",
+               [({"kind": row["_id"]}, row["bytes"]) for row in rows]),
+        family("artifact_cache_stored_entries", "gauge", "Rendered artifacts held in the artifact cache",
+               [({"kind": row["_id"]}, row["entries"]) for row in rows]),
+    ]
@@ -9,6 +9,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, TypedDict
 
 from database import database
+from services.kb_search_index import BM25Index, build_index
 from utils import ai_config
 
 logger = logging.getLogger(__name__)
@@ -31,15 +32,18 @@ class Snippet(TypedDict):
 # In-memory cache: list of (source_id, title, content) loaded from .md files
 _KB_CACHE: Optional[List[tuple]] = None
 _KB_CACHE_DIR: Optional[Path] = None
+# BM25 index over _KB_CACHE (built with the cache, keyed by source_id)
+_KB_INDEX: Optional[BM25Index] = None
 
 
 def _load_kb_into_cache() -> List[tuple]:
     """Load all .md files from KB_DIR into cache. Returns list of (source_id, title, content)."""
-    global _KB_CACHE, _KB_CACHE_DIR
+    global _KB_CACHE, _KB_CACHE_DIR, _KB_INDEX
     if _KB_CACHE is not None and _KB_CACHE_DIR == KB_DIR:
         return _KB_CACHE
     _KB_CACHE_DIR = KB_DIR
     _KB_CACHE = []
+    _KB_INDEX = None
     if not KB_DIR.is_dir():
         logger.debug("KB dir not found: %s", KB_DIR)
         return _KB_CACHE
@@ -59,8 +63,20 @@ def _load_kb_into_cache() -> List[tuple]:
     return _KB_CACHE
 
 
+def _get_kb_index() -> BM25Index:
+    """BM25 index over the cached KB files (title weighted above body); built once per cache load."""
+    global _KB_INDEX
+    raw = _load_kb_into_cache()
+    if _KB_INDEX is None:
+        _KB_INDEX = build_index(
+            (source_id, {"title": title, "content": content}) for source_id, title, content in raw
+        )
+    return _KB_INDEX
+
+
 def _keyword_overlap_score(query: str, text: str) -> float:
-    """Case-insensitive keyword overlap: number of query words that appear in text."""
+    """Case-insensitive keyword overlap: number of query words that appear in text.
+    Previous ranking for load_kb_snippets; kept as the baseline in scripts.benchmark_kb_retrieval."""
     words = set(re.findall(r"[a-z0-9]+", query.lower()))
     if not words:
         return 0.0
@@ -71,21 +87,22 @@ def _keyword_overlap_score(query: str, text: str) -> float:
 
 def load_kb_snippets(query: str) -> List[Snippet]:
     """
-    Load all .md from backend/docs/assistant_kb/ from cache; rank by keyword overlap with query;
-    return top KB_TOP_N snippets with source_id, title, content (trimmed), score.
+    Load all .md from backend/docs/assistant_kb/ from cache; rank by BM25 (stemmed, stop words
+    removed) against the prebuilt index; return top KB_TOP_N snippets with source_id, title,
+    content (trimmed), score. When fewer than KB_TOP_N documents match, the remainder is filled
+    with score 0 in source order (same as the previous overlap ranking).
     """
     raw = _load_kb_into_cache()
     if not raw:
         return []
-    scored: List[tuple] = []
-    for source_id, title, content in raw:
-        score = _keyword_overlap_score(query, f"{title} {content}")
-        scored.append((score, source_id, title, content))
-    scored.sort(key=lambda x: (-x[0], x[1]))
-    top = scored[:KB_TOP_N]
+    by_id = {source_id: (title, content) for source_id, title, content in raw}
+    ranked = _get_kb_index().search(query, top_k=KB_TOP_N)
+    if len(ranked) < KB_TOP_N:
+        matched = {sid for sid, _ in ranked}
+        ranked += [(sid, 0.0) for sid in sorted(by_id) if sid not in matched][: KB_TOP_N - len(ranked)]
     return [
-        Snippet(source_id=sid, title=t, content=c.strip(), score=sc)
-        for sc, sid, t, c in top
+        Snippet(source_id=sid, title=by_id[sid][0], content=by_id[sid][1].strip(), score=round(sc, 4))
+        for sid, sc in ranked
     ]
 
 
@@ -357,7 +374,7 @@ async def get_portal_facts(
 
 def get_kb_snippets(query: str) -> List[Dict[str, Any]]:
     """
-    Return top KB_TOP_N KB snippets ranked by keyword overlap with query.
+    Return top KB_TOP_N KB snippets ranked by BM25 relevance to query.
     Uses in-memory cache of backend/docs/assistant_kb/*.md. Each item includes
     source_id, title, content, score for citations.
     """
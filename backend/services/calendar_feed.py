@@ -0,0 +1,329 @@
+"""
+Per-client iCalendar feed (GET /api/calendar/export.ics and the token URL /api/calendar/feed/{token}.ics).
+
+Calendar apps poll the feed URL constantly, so the ICS text is built once and kept in
+calendar_feeds (one document per client and day window) with its ETag and Last-Modified:
+- invalidate_calendar_feed(client_id) marks the client's artifacts stale (generation $inc), so the
+  next poll rebuilds. The compliance recalc enqueue calls it for requirement and applicability
+  changes; writes that touch only what the feed prints (CALENDAR_FEED_CLIENT_FIELDS,
+  CALENDAR_FEED_PROPERTY_FIELDS) call it directly;
+- an artifact is also rebuilt after CALENDAR_FEED_MAX_AGE_SECONDS and on a new UTC day, because the
+  event window slides with the date;
+- Last-Modified only moves when the rebuilt text differs, so unchanged rebuilds still 304;
+- each process keeps artifacts for CALENDAR_FEED_LOCAL_TTL_SECONDS (concurrent polls share one
+  read or build); another replica's invalidation shows up after at most that long.
+
+Feed tokens: a long-lived random token in the subscription URL replaces the bearer header for
+external calendar clients. Only its SHA-256 is stored (calendar_feed_tokens); issuing a new one
+revokes the previous one. Resolved tokens are cached per process for CALENDAR_FEED_TOKEN_CACHE_SECONDS,
+so a revocation reaches other replicas within that time.
+"""
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+
+from auth import generate_secure_token, hash_token
+from database import database
+from utils.response_cache import etag_matches
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+FEEDS_COLLECTION = "calendar_feeds"
+TOKENS_COLLECTION = "calendar_feed_tokens"
+
+TOKEN_LAST_USED_RESOLUTION = timedelta(hours=1)
+
+# Client / property fields printed in the ICS (calendar name, filename, LOCATION, DESCRIPTION)
+CALENDAR_FEED_CLIENT_FIELDS = frozenset({"full_name", "company_name", "customer_reference"})
+CALENDAR_FEED_PROPERTY_FIELDS = frozenset({"address_line_1", "city", "postcode"})
+
+
+def _env_seconds(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+CALENDAR_FEED_MAX_AGE_SECONDS = _env_seconds("CALENDAR_FEED_MAX_AGE_SECONDS", 6 * 3600)
+CALENDAR_FEED_LOCAL_TTL_SECONDS = _env_seconds("CALENDAR_FEED_LOCAL_TTL_SECONDS", 30)
+CALENDAR_FEED_TOKEN_CACHE_SECONDS = _env_seconds("CALENDAR_FEED_TOKEN_CACHE_SECONDS", 60)
+
+
+@dataclass(frozen=True)
+class CalendarFeed:
+    body: bytes
+    etag: str
+    last_modified: datetime
+    filename: str
+
+
+_feeds = TTLCache(max_entries=2048, ttl_seconds=CALENDAR_FEED_LOCAL_TTL_SECONDS)
+_tokens = TTLCache(max_entries=4096, ttl_seconds=CALENDAR_FEED_TOKEN_CACHE_SECONDS)
+
+
+def build_ics(client: Dict[str, Any], properties: List[Dict[str, Any]], requirements: List[Dict[str, Any]],
+              generated_at: datetime) -> str:
+    """VCALENDAR with an all-day VEVENT (and reminder) per requirement expiry."""
+    calendar_name = client.get("company_name") or client.get("full_name") or "Compliance"
+    crn = client.get("customer_reference", "")
+    property_map = {p["property_id"]: p for p in properties}
+
+    ical_lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Compliance Vault Pro//Pleerity Enterprise Ltd//EN",
+        f"X-WR-CALNAME:{calendar_name} - Compliance Expiries",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH"
+    ]
+    # Stable for the artifact's lifetime (the ETag is a hash of the text)
+    dtstamp = generated_at.strftime('%Y%m%dT000000Z')
+
+    for req in requirements:
+        property_info = property_map.get(req["property_id"], {})
+        due_date_str = req.get("due_date", "")
+
+        try:
+            due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00')) if isinstance(due_date_str, str) else due_date_str
+            dtstart = due_date.strftime("%Y%m%d")
+        except (ValueError, AttributeError):
+            continue
+
+        # Create unique event ID
+        event_uid = f"{req['requirement_id']}@pleerityenterprise.co.uk"
+
+        # Build location string
+        location = f"{property_info.get('address_line_1', '')}, {property_info.get('city', '')} {property_info.get('postcode', '')}".strip(", ")
+
+        # Build description
+        description = f"Requirement: {req.get('requirement_type', 'Unknown')}\\n"
+        description += f"Property: {location}\\n"
+        description += f"Status: {req.get('status', 'PENDING')}\\n"
+        description += f"Description: {req.get('description', '')}\\n"
+        if crn:
+            description += f"CRN: {crn}"
+
+        # Clean description for iCal (escape special chars)
+        description = description.replace(",", "\\,").replace(";", "\\;")
+
+        # Determine alarm based on status
+        alarm_days = 7 if req.get("status") == "EXPIRING_SOON" else 30
+
+        ical_lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{event_uid}",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART;VALUE=DATE:{dtstart}",
+            f"SUMMARY:{req.get('requirement_type', 'Compliance')} Expiry - {property_info.get('address_line_1', 'Property')}",
+            f"DESCRIPTION:{description}",
+            f"LOCATION:{location}",
+            "CATEGORIES:Compliance,Expiry",
+            "STATUS:CONFIRMED",
+            "BEGIN:VALARM",
+            "ACTION:DISPLAY",
+            f"DESCRIPTION:Compliance expiry reminder - {req.get('requirement_type', '')}",
+            f"TRIGGER:-P{alarm_days}D",
+            "END:VALARM",
+            "END:VEVENT"
+        ])
+
+    ical_lines.append("END:VCALENDAR")
+    # Join with CRLF as per iCal spec
+    return "\r\n".join(ical_lines)
+
+
+async def _build_ics(db, client_id: str, days: int, now: datetime) -> Optional[tuple]:
+    client = await db.clients.find_one(
+        {"client_id": client_id},
+        {"_id": 0, "full_name": 1, "company_name": 1, "customer_reference": 1}
+    )
+    if not client:
+        return None
+    properties = await db.properties.find(
+        {"client_id": client_id},
+        {"_id": 0, "property_id": 1, "address_line_1": 1, "city": 1, "postcode": 1}
+    ).to_list(100)
+    # Whole UTC days, so every rebuild on the same day sees the same window
+    start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    requirements = await db.requirements.find(
+        {
+            "property_id": {"$in": [p["property_id"] for p in properties]},
+            "due_date": {"$gte": start.isoformat(), "$lte": (start + timedelta(days=days)).isoformat()},
+        },
+        {"_id": 0}
+    ).sort("due_date", 1).to_list(500)
+    filename = f"compliance_expiries_{client.get('customer_reference') or client_id}.ics"
+    return build_ics(client, properties, requirements, start), filename
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _is_fresh(doc: Dict[str, Any], now: datetime) -> bool:
+    built_at = _aware(doc.get("built_at"))
+    return (
+        doc.get("built_generation") == doc.get("generation", 0)
+        and built_at is not None
+        and built_at.date() == now.date()
+        and (now - built_at).total_seconds() < CALENDAR_FEED_MAX_AGE_SECONDS
+    )
+
+
+def _feed_from_doc(doc: Dict[str, Any]) -> CalendarFeed:
+    return CalendarFeed(doc["ics"].encode("utf-8"), doc["etag"], _aware(doc["last_modified"]), doc["filename"])
+
+
+async def _load_feed(client_id: str, days: int) -> Optional[CalendarFeed]:
+    db = database.get_db()
+    key = f"{client_id}:{days}"
+    now = datetime.now(timezone.utc)
+    doc = await db[FEEDS_COLLECTION].find_one({"_id": key})
+    if doc and _is_fresh(doc, now):
+        return _feed_from_doc(doc)
+
+    built = await _build_ics(db, client_id, days, now)
+    if built is None:
+        return None
+    ics, filename = built
+    etag = '"' + hashlib.sha256(ics.encode("utf-8")).hexdigest()[:32] + '"'
+    unchanged = doc is not None and doc.get("etag") == etag
+    last_modified = _aware(doc["last_modified"]) if unchanged else now.replace(microsecond=0)
+    generation = doc.get("generation", 0) if doc else 0
+    fields = {
+        "client_id": client_id,
+        "days": days,
+        "ics": ics,
+        "etag": etag,
+        "filename": filename,
+        "last_modified": last_modified,
+        "built_at": now,
+        "built_generation": generation,
+    }
+    if doc is None:
+        await db[FEEDS_COLLECTION].update_one(
+            {"_id": key}, {"$set": fields, "$setOnInsert": {"generation": 0}}, upsert=True
+        )
+    else:
+        # No match: invalidated while building; serve this build but leave the artifact stale
+        await db[FEEDS_COLLECTION].update_one({"_id": key, "generation": generation}, {"$set": fields})
+    logger.info("Calendar feed rebuilt client_id=%s days=%s changed=%s", client_id, days, not unchanged)
+    return CalendarFeed(ics.encode("utf-8"), etag, last_modified, filename)
+
+
+async def get_calendar_feed(client_id: str, days: int = 365) -> Optional[CalendarFeed]:
+    """The client's ICS artifact, rebuilt only when stale. None when the client does not exist."""
+    return await _feeds.get_or_load(
+        (client_id, days), lambda: _load_feed(client_id, days),
+        ttl_for=lambda feed: None if feed else 0,
+    )
+
+
+async def invalidate_calendar_feed(client_id: str) -> None:
+    """Requirements or properties of the client changed. Never raises (called on write paths)."""
+    _feeds.discard_where(lambda key: key[0] == client_id)
+    try:
+        await database.get_db()[FEEDS_COLLECTION].update_many(
+            {"client_id": client_id}, {"$inc": {"generation": 1}}
+        )
+    except Exception as e:
+        logger.warning("Calendar feed invalidation failed client_id=%s: %s", client_id, e)
+
+
+def _not_modified(request: Request, feed: CalendarFeed) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, feed.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = _aware(parsedate_to_datetime(if_modified_since))
+    except (TypeError, ValueError):
+        return False
+    return since is not None and feed.last_modified <= since
+
+
+def feed_response(request: Request, feed: CalendarFeed, attachment: bool = True) -> Response:
+    """200 with the ICS, or 304 for a matching If-None-Match / If-Modified-Since."""
+    headers = {
+        "ETag": feed.etag,
+        "Last-Modified": format_datetime(feed.last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if _not_modified(request, feed):
+        return Response(status_code=304, headers=headers)
+    if attachment:
+        headers["Content-Disposition"] = f"attachment; filename={feed.filename}"
+    return Response(content=feed.body, media_type="text/calendar", headers=headers)
+
+
+async def issue_feed_token(client_id: str, actor_id: Optional[str] = None) -> str:
+    """New subscription token for the client; earlier tokens stop working. Returns the token."""
+    await revoke_feed_tokens(client_id)
+    token = generate_secure_token()
+    await database.get_db()[TOKENS_COLLECTION].insert_one({
+        "token_hash": hash_token(token),
+        "client_id": client_id,
+        "created_by": actor_id,
+        "created_at": datetime.now(timezone.utc),
+        "last_used_at": None,
+        "revoked_at": None,
+    })
+    return token
+
+
+async def revoke_feed_tokens(client_id: str) -> int:
+    db = database.get_db()
+    active = await db[TOKENS_COLLECTION].find(
+        {"client_id": client_id, "revoked_at": None}, {"_id": 0, "token_hash": 1}
+    ).to_list(100)
+    if not active:
+        return 0
+    for doc in active:
+        _tokens.pop(doc["token_hash"])
+    result = await db[TOKENS_COLLECTION].update_many(
+        {"client_id": client_id, "revoked_at": None},
+        {"$set": {"revoked_at": datetime.now(timezone.utc)}},
+    )
+    return result.modified_count
+
+
+async def active_feed_token(client_id: str) -> Optional[Dict[str, Any]]:
+    return await database.get_db()[TOKENS_COLLECTION].find_one(
+        {"client_id": client_id, "revoked_at": None}, {"_id": 0, "token_hash": 0}
+    )
+
+
+async def _load_token(token_hash: str) -> Optional[str]:
+    db = database.get_db()
+    doc = await db[TOKENS_COLLECTION].find_one(
+        {"token_hash": token_hash, "revoked_at": None}, {"_id": 0, "client_id": 1}
+    )
+    if not doc:
+        return None
+    now = datetime.now(timezone.utc)
+    await db[TOKENS_COLLECTION].update_one(
+        {"token_hash": token_hash, "$or": [
+            {"last_used_at": None}, {"last_used_at": {"$lt": now - TOKEN_LAST_USED_RESOLUTION}},
+        ]},
+        {"$set": {"last_used_at": now}},
+    )
+    return doc["client_id"]
+
+
+async def resolve_feed_token(token: str) -> Optional[str]:
+    """client_id of an active feed token, else None."""
+    if not token:
+        return None
+    return await _tokens.get_or_load(hash_token(token), lambda: _load_token(hash_token(token)))
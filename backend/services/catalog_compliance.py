@@ -4,7 +4,7 @@ Uses requirements_catalog + rule evaluator; joins existing requirements collecti
 Guardrails: 1 HIGH overdue => at least HIGH risk; 2+ HIGH overdue => CRITICAL.
 Do not change provisioning/auth; read-side only.
 """
-from database import database
+import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from utils.catalog_rules import build_property_profile, evaluate_applies_to
@@ -82,23 +82,47 @@ def _max_risk(a: str, b: str) -> str:
 
 
 async def get_property_compliance_detail(
-    client_id: str, property_id: str
+    client_id: str, property_id: str, loaders=None
 ) -> Optional[Dict[str, Any]]:
     """
     Catalog-driven compliance detail for one property.
     Returns matrix (per applicable requirement: code, title, status, score, criticality, weight, expiry_date, days_to_expiry, evidence_doc_id),
     property_score, risk_index, risk_level. If catalog empty, returns None (caller can fall back to legacy).
+    Reads go through the request's ClientDataLoaders when given (property, catalog, requirements
+    and verified documents are fetched concurrently).
     """
-    db = database.get_db()
-    prop = await db.properties.find_one(
-        {"property_id": property_id, "client_id": client_id},
-        {"_id": 0},
+    from services.client_data_loaders import ClientDataLoaders
+
+    loaders = loaders or ClientDataLoaders(client_id)
+    prop, catalog, reqs, docs = await asyncio.gather(
+        loaders.properties.load(property_id),
+        loaders.catalog.load("catalog"),
+        loaders.requirements_by_property.load(property_id),
+        loaders.verified_documents_by_property.load(property_id),
     )
-    if not prop:
-        return None
-    catalog = await _load_catalog(db)
-    if not catalog:
+    if not prop or not catalog:
         return None
+    return _compliance_detail(property_id, prop, catalog, reqs, docs)
+
+
+def _requirements_by_code(reqs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """First requirement row per code, matching on requirement_type or requirement_code (see _requirement_matches_code)."""
+    index: Dict[str, Dict[str, Any]] = {}
+    for r in reqs:
+        for value in (r.get("requirement_type"), r.get("requirement_code")):
+            key = (value or "").strip().lower()
+            if key:
+                index.setdefault(key, r)
+    return index
+
+
+def _compliance_detail(
+    property_id: str,
+    prop: Dict[str, Any],
+    catalog: List[Dict[str, Any]],
+    reqs: List[Dict[str, Any]],
+    docs: List[Dict[str, Any]],
+) -> Dict[str, Any]:
     profile = build_property_profile(prop)
     applicable = [c for c in catalog if evaluate_applies_to(profile, c.get("applies_to"))]
     if not applicable:
@@ -111,19 +135,12 @@ async def get_property_compliance_detail(
             "risk_level": "Low Risk",
             "kpis": {"overdue": 0, "expiring_30": 0, "missing": 0, "compliant": 0},
         }
-    reqs = await db.requirements.find(
-        {"client_id": client_id, "property_id": property_id},
-        {"_id": 0, "requirement_id": 1, "requirement_type": 1, "requirement_code": 1, "status": 1, "due_date": 1, "applicability": 1},
-    ).to_list(200)
-    docs = await db.documents.find(
-        {"client_id": client_id, "property_id": property_id, "status": "VERIFIED"},
-        {"_id": 0, "requirement_id": 1, "document_id": 1},
-    ).to_list(500)
     req_id_to_doc = {}
     for d in docs:
         rid = d.get("requirement_id")
         if rid and rid not in req_id_to_doc:
             req_id_to_doc[rid] = d.get("document_id")
+    reqs_by_code = _requirements_by_code(reqs)
 
     matrix = []
     weighted_sum = 0.0
@@ -141,7 +158,7 @@ async def get_property_compliance_detail(
         is_high = criticality == "HIGH"
         if is_high:
             high_total += 1
-        row = next((r for r in reqs if _requirement_matches_code(r, code)), None)
+        row = reqs_by_code.get(code.strip().lower()) if code.strip() else None
         # Exclude from matrix and score if a requirement row exists with applicability=NOT_REQUIRED
         if row and (row.get("applicability") or "").strip().upper() == "NOT_REQUIRED":
             continue
@@ -221,20 +238,23 @@ async def get_property_compliance_detail(
 
 
 async def get_portfolio_compliance_from_catalog(
-    client_id: str,
+    client_id: str, loaders=None
 ) -> Optional[Dict[str, Any]]:
     """
     Catalog-driven portfolio summary. If catalog empty, returns None (caller uses legacy).
     Returns portfolio_score, portfolio_risk_level, updated_at, kpis, properties (with name, score, risk_level, overdue_count, expiring_30_count, missing_count).
+    Catalog and properties are read concurrently, then requirements and verified documents for
+    all properties in one batched query each.
     """
-    db = database.get_db()
-    catalog = await _load_catalog(db)
+    from services.client_data_loaders import ClientDataLoaders
+
+    loaders = loaders or ClientDataLoaders(client_id)
+    catalog, properties = await asyncio.gather(
+        loaders.catalog.load("catalog"),
+        loaders.properties_by_client.load(client_id),
+    )
     if not catalog:
         return None
-    properties = await db.properties.find(
-        {"client_id": client_id},
-        {"_id": 0, "property_id": 1, "address_line_1": 1, "nickname": 1, "postcode": 1},
-    ).to_list(100)
     if not properties:
         return {
             "portfolio_score": 100,
@@ -244,15 +264,18 @@ async def get_portfolio_compliance_from_catalog(
             "kpis": {"overdue": 0, "expiring_30": 0, "missing": 0, "compliant": 0},
             "properties": [],
         }
+    property_ids = [p["property_id"] for p in properties]
+    reqs_per_property, docs_per_property = await asyncio.gather(
+        loaders.requirements_by_property.load_many(property_ids),
+        loaders.verified_documents_by_property.load_many(property_ids),
+    )
     total_weighted = 0.0
     total_weights = 0.0
     portfolio_risk_level = "Low Risk"
     kpis_agg = {"overdue": 0, "expiring_30": 0, "missing": 0, "compliant": 0}
     property_list = []
-    for prop in properties:
-        detail = await get_property_compliance_detail(client_id, prop["property_id"])
-        if not detail:
-            continue
+    for prop, reqs, docs in zip(properties, reqs_per_property, docs_per_property):
+        detail = _compliance_detail(prop["property_id"], prop, catalog, reqs, docs)
         total_weighted += detail["property_score"] * sum(m.get("weight", 1) for m in detail["matrix"])
         total_weights += sum(m.get("weight", 1) for m in detail["matrix"])
         portfolio_risk_level = _max_risk(portfolio_risk_level, detail["risk_level"])
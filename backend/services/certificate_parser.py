@@ -0,0 +1,305 @@
+"""
+Local rule-based parser for common UK compliance certificates (fast path before AI extraction).
+
+Covers Gas Safe CP12 / Landlord Gas Safety Records, EICRs and EPCs laid out as labelled text
+(the text layer produced by document_extraction_service._extract_text_from_file). Returns the
+same normalized schema as ai_provider._normalize_extraction, with confidence scores:
+- doc_type: from distinct certificate markers found in the text
+- dates: labelled issue/expiry dates (0.95 when both present and consistent); an expiry only
+  derived from the statutory validity period scores lower so such documents still go to AI
+- address: property address line and UK postcode
+
+Callers skip the LLM when confidence.overall >= CONFIDENCE_THRESHOLD and an expiry date was
+found (see is_confident). Deterministic: same text, same output; no network, no DB.
+"""
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+PARSER_NAME = "local_rules"
+PARSER_VERSION = "certificate-parser-v1"
+
+# Statutory validity used to derive a missing expiry date, and to sanity-check labelled ones
+VALIDITY_DAYS = {
+    "GAS_SAFETY": 365,
+    "EICR": 5 * 365 + 1,
+    "EPC": 10 * 365 + 2,
+}
+VALIDITY_SLACK_DAYS = 62
+
+REQUIREMENT_KEYS = {"GAS_SAFETY": "gas_safety", "EICR": "eicr", "EPC": "epc"}
+
+# Distinct markers per certificate type (lowercase substrings)
+DOC_TYPE_MARKERS = {
+    "GAS_SAFETY": (
+        "gas safety certificate", "landlord gas safety record", "gas safety record", "cp12",
+        "gas safe register", "gas safe registered", "gas safe id", "gas safe registration",
+        "appliances checked", "flue", "lgsr",
+    ),
+    "EICR": (
+        "electrical installation condition report", "eicr", "bs 7671", "bs7671", "niceic",
+        "napit", "consumer unit", "circuits tested", "observation codes",
+    ),
+    "EPC": (
+        "energy performance certificate", "energy efficiency rating", "energy rating",
+        "current energy rating", "potential energy rating", "rrn", "report reference number",
+        "accreditation number", "primary energy",
+    ),
+}
+
+ISSUE_LABELS = (
+    "date of check", "date of inspection", "inspection date", "date of issue", "issue date",
+    "date issued", "date of assessment", "assessment date", "date of certificate",
+    "date of this report", "date of report", "report date", "inspected on", "issued on",
+    "date of lodgement", "lodgement date", "inspection carried out on",
+)
+EXPIRY_LABELS = (
+    "next check due", "next inspection due", "next inspection date", "landlord check due",
+    "next safety check due", "recommended date for next inspection", "next inspection by",
+    "next inspection", "expiry date", "expiry", "expires on", "expires", "valid until",
+    "valid to", "due date",
+)
+CERT_NUMBER_LABELS = (
+    "certificate number", "certificate no", "certificate ref", "cert no", "cert number",
+    "report number", "report no", "report reference number", "report reference", "rrn",
+    "serial number", "serial no", "reference number", "record number", "record no",
+)
+INSPECTOR_ID_LABELS = (
+    "gas safe id", "gas safe registration number", "gas safe registration", "gas safe reg",
+    "gas safe licence number", "gas safe number", "registration number", "registration no",
+    "enrolment number", "membership number", "assessor accreditation number",
+    "accreditation number", "licence number", "licence no", "engineer id",
+)
+COMPANY_LABELS = (
+    "company name", "company", "trading name", "business name", "contractor", "assessor's company",
+    "organisation", "employer",
+)
+ADDRESS_LABELS = (
+    "property address", "address of property", "installation address", "address of installation",
+    "address of dwelling", "dwelling address", "premises address", "site address", "address",
+)
+
+_MONTHS = {
+    m: i + 1 for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+    )
+}
+_MONTH_RE = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+_DATE_PATTERNS = (
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), "ymd"),
+    (re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4})\b"), "dmy"),
+    (re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{2})\b"), "dmy2"),
+    (re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+" + _MONTH_RE + r",?\s+(\d{4})\b", re.I), "d_mon_y"),
+    (re.compile(r"\b" + _MONTH_RE + r"\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b", re.I), "mon_d_y"),
+)
+POSTCODE_RE = re.compile(r"\b([A-Z]{1,2}\d[A-Z\d]?)\s*(\d[A-Z]{2})\b", re.I)
+_RRN_RE = re.compile(r"\b\d{4}-\d{4}-\d{4}-\d{4}-\d{4}\b")
+_LABEL_SEP_RE = re.compile(r"^\s*[:\-–#.]*\s*")
+_MARKER_PATTERNS = {
+    doc_type: [re.compile(r"(?<![a-z0-9])" + re.escape(m) + r"(?![a-z0-9])") for m in markers]
+    for doc_type, markers in DOC_TYPE_MARKERS.items()
+}
+_SUB_BUILDING_RE = re.compile(r"^(flat|apartment|apt|unit|room|studio)\b", re.I)
+
+
+def _parse_date_str(text: str) -> Optional[date]:
+    """First date found in text, in any supported UK layout."""
+    best: Optional[Tuple[int, date]] = None
+    for pattern, kind in _DATE_PATTERNS:
+        m = pattern.search(text)
+        if not m:
+            continue
+        try:
+            if kind == "ymd":
+                d = date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            elif kind == "dmy":
+                d = date(int(m.group(3)), int(m.group(2)), int(m.group(1)))
+            elif kind == "dmy2":
+                d = date(2000 + int(m.group(3)), int(m.group(2)), int(m.group(1)))
+            elif kind == "d_mon_y":
+                d = date(int(m.group(3)), _MONTHS[m.group(2).lower()[:3]], int(m.group(1)))
+            else:
+                d = date(int(m.group(3)), _MONTHS[m.group(1).lower()[:3]], int(m.group(2)))
+        except ValueError:
+            continue
+        if best is None or m.start() < best[0]:
+            best = (m.start(), d)
+    return best[1] if best else None
+
+
+def _lines(text: str) -> List[str]:
+    return [ln.strip() for ln in text.replace("\r", "\n").split("\n")]
+
+
+def _label_values(lines: List[str], labels: Tuple[str, ...], max_following: int = 1) -> List[str]:
+    """
+    Values for the first matching label (in label priority order): the text after the label on
+    the same line, else the next non-empty line(s). Returns up to max_following value lines.
+    """
+    lowered = [ln.lower() for ln in lines]
+    for label in labels:
+        for i, low in enumerate(lowered):
+            idx = low.find(label)
+            if idx < 0:
+                continue
+            # Label must start the line or follow a separator (avoid "expiry" inside prose)
+            if idx > 0 and low[idx - 1].isalnum():
+                continue
+            rest = lines[i][idx + len(label):]
+            if rest[:1].isalnum():
+                continue  # part of a longer word
+            rest = _LABEL_SEP_RE.sub("", rest).strip()
+            if rest:
+                return [rest]
+            out = []
+            for nxt in lines[i + 1:]:
+                if not nxt:
+                    if out:
+                        break
+                    continue
+                out.append(nxt)
+                if len(out) >= max_following:
+                    break
+            if out:
+                return out
+    return []
+
+
+def detect_doc_type(text: str, file_name: Optional[str] = None) -> Tuple[str, float]:
+    """(doc_type, confidence) from distinct certificate markers; filename breaks ties."""
+    low = text.lower()
+    counts = {
+        doc_type: sum(1 for pattern in patterns if pattern.search(low))
+        for doc_type, patterns in _MARKER_PATTERNS.items()
+    }
+    name = (file_name or "").lower()
+    if any(k in name for k in ("gas", "cp12", "lgsr")):
+        counts["GAS_SAFETY"] += 1
+    elif any(k in name for k in ("eicr", "electrical")):
+        counts["EICR"] += 1
+    elif "epc" in name or "energy" in name:
+        counts["EPC"] += 1
+    ranked = sorted(counts.items(), key=lambda kv: -kv[1])
+    (best, hits), (_, runner_up) = ranked[0], ranked[1]
+    if hits == 0:
+        return "UNKNOWN", 0.0
+    confidence = {1: 0.6, 2: 0.85, 3: 0.95}.get(hits, 0.98)
+    if runner_up:
+        # Markers of another certificate type present: less sure
+        confidence -= 0.15 * min(runner_up, hits) / hits
+    return best, round(max(confidence, 0.0), 3)
+
+
+def _first_token(value: str, pattern: str) -> Optional[str]:
+    m = re.search(pattern, value)
+    return m.group(0) if m else None
+
+
+def _first_address_line(value: str) -> Optional[str]:
+    """First line of a comma-separated address; keeps 'Flat 2, 10 High Road' together."""
+    parts = [p.strip() for p in value.split(",") if p.strip()]
+    if not parts:
+        return None
+    if len(parts) > 1 and _SUB_BUILDING_RE.match(parts[0]):
+        return f"{parts[0]}, {parts[1]}"
+    return parts[0]
+
+
+def parse_certificate_text(text: str, file_name: Optional[str] = None) -> Dict[str, Any]:
+    """Extract normalized compliance fields from certificate text (ai_provider schema)."""
+    lines = _lines(text or "")
+    doc_type, doc_type_conf = detect_doc_type(text or "", file_name)
+
+    # Dates
+    issue_values = _label_values(lines, ISSUE_LABELS)
+    expiry_values = _label_values(lines, EXPIRY_LABELS)
+    issue = _parse_date_str(issue_values[0]) if issue_values else None
+    expiry = _parse_date_str(expiry_values[0]) if expiry_values else None
+    notes: List[str] = []
+    validity = VALIDITY_DAYS.get(doc_type)
+    if expiry and issue:
+        consistent = issue < expiry and (
+            validity is None or (expiry - issue).days <= validity + VALIDITY_SLACK_DAYS
+        )
+        dates_conf = 0.95 if consistent else 0.5
+        if not consistent:
+            notes.append("issue/expiry dates inconsistent with certificate validity")
+    elif expiry:
+        dates_conf = 0.85
+    elif issue and validity:
+        expiry = issue + timedelta(days=validity)
+        dates_conf = 0.6
+        notes.append("expiry derived from issue date and statutory validity")
+    else:
+        dates_conf = 0.3 if issue else 0.0
+
+    # Certificate number (EPC RRN has a fixed shape)
+    cert_values = _label_values(lines, CERT_NUMBER_LABELS)
+    certificate_number = None
+    if cert_values:
+        certificate_number = _first_token(cert_values[0], r"[A-Za-z0-9][A-Za-z0-9/\-]{3,}")
+    if not certificate_number and doc_type == "EPC":
+        certificate_number = _first_token(text or "", _RRN_RE.pattern)
+
+    # Engineer / assessor
+    id_values = _label_values(lines, INSPECTOR_ID_LABELS)
+    inspector_id = _first_token(id_values[0], r"[A-Za-z]{0,6}/?\d{4,}[A-Za-z0-9/\-]*") if id_values else None
+    company_values = _label_values(lines, COMPANY_LABELS)
+    inspector_company = company_values[0][:200] if company_values else None
+
+    # Address + postcode (prefer a postcode inside the address block)
+    address_values = _label_values(lines, ADDRESS_LABELS, max_following=4)
+    address_line_1 = None
+    postcode = None
+    for value in address_values:
+        m = POSTCODE_RE.search(value)
+        if m and not postcode:
+            postcode = f"{m.group(1).upper()} {m.group(2).upper()}"
+            stripped = POSTCODE_RE.sub("", value).strip(" ,")
+            if stripped and not address_line_1:
+                address_line_1 = _first_address_line(stripped)
+        elif not address_line_1:
+            address_line_1 = _first_address_line(value)
+    if not postcode:
+        m = POSTCODE_RE.search(text or "")
+        if m:
+            postcode = f"{m.group(1).upper()} {m.group(2).upper()}"
+    address_conf = 0.9 if (address_line_1 and postcode) else (0.6 if (address_line_1 or postcode) else 0.0)
+
+    overall = (
+        0.3 * doc_type_conf
+        + 0.4 * dates_conf
+        + 0.15 * (1.0 if certificate_number else 0.0)
+        + 0.15 * (1.0 if inspector_id else 0.0)
+    )
+    if doc_type == "UNKNOWN":
+        overall = min(overall, 0.3)
+
+    return {
+        "doc_type": doc_type,
+        "certificate_number": certificate_number,
+        "issue_date": issue.isoformat() if issue else None,
+        "expiry_date": expiry.isoformat() if expiry else None,
+        "inspector_company": inspector_company,
+        "inspector_id": inspector_id,
+        "address_line_1": address_line_1,
+        "postcode": postcode,
+        "requirement_key": REQUIREMENT_KEYS.get(doc_type),
+        "confidence": {
+            "overall": round(overall, 3),
+            "dates": round(dates_conf, 3),
+            "address": round(address_conf, 3),
+            "doc_type": round(doc_type_conf, 3),
+        },
+        "notes": "; ".join(notes) if notes else None,
+    }
+
+
+def is_confident(extracted: Dict[str, Any], threshold: float) -> bool:
+    """True when the local result can be used without calling the LLM."""
+    confidence = extracted.get("confidence") or {}
+    return (
+        extracted.get("doc_type") in REQUIREMENT_KEYS
+        and bool(extracted.get("expiry_date"))
+        and float(confidence.get("overall") or 0) >= threshold
+    )
@@ -0,0 +1,89 @@
+"""
+Per-request batched loaders for the client portal read paths (dashboard, portfolio summary,
+property compliance detail, property requirements).
+
+ClientDataLoaders(client_id) holds one DataLoader per lookup, all scoped to the client:
+lookups issued together (asyncio.gather) go to MongoDB as one $in query per collection, the
+independent collections are read concurrently, and every value is read at most once per request,
+so e.g. the portfolio summary is a handful of queries instead of four per property.
+Use loaders_for(request, client_id) in routes so nested helpers share the request's loaders.
+"""
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+
+from database import database
+from utils.data_loader import DataLoader, group_by
+
+# Same caps as the former per-request reads
+MAX_PROPERTIES = 100
+MAX_REQUIREMENTS_PER_PROPERTY = 200
+MAX_DOCUMENTS_PER_PROPERTY = 500
+MAX_CLIENT_REQUIREMENTS = 1000
+
+
+class ClientDataLoaders:
+    def __init__(self, client_id: str, db=None):
+        self.client_id = client_id
+        self.db = db if db is not None else database.get_db()
+        self.clients: DataLoader[str, Optional[Dict[str, Any]]] = DataLoader(self._clients)
+        self.properties_by_client: DataLoader[str, List[Dict[str, Any]]] = DataLoader(self._properties_by_client, list)
+        self.properties: DataLoader[str, Optional[Dict[str, Any]]] = DataLoader(self._properties)
+        self.requirements_by_client: DataLoader[str, List[Dict[str, Any]]] = DataLoader(self._requirements_by_client, list)
+        self.requirements_by_property: DataLoader[str, List[Dict[str, Any]]] = DataLoader(self._requirements_by_property, list)
+        self.verified_documents_by_property: DataLoader[str, List[Dict[str, Any]]] = DataLoader(
+            self._verified_documents_by_property, list
+        )
+        self.catalog: DataLoader[str, List[Dict[str, Any]]] = DataLoader(self._catalog, list)
+
+    async def _clients(self, client_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        docs = await self.db.clients.find({"client_id": {"$in": client_ids}}, {"_id": 0}).to_list(len(client_ids))
+        return {d["client_id"]: d for d in docs}
+
+    async def _properties_by_client(self, client_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        docs = await self.db.properties.find(
+            {"client_id": {"$in": client_ids}}, {"_id": 0}
+        ).to_list(MAX_PROPERTIES * len(client_ids))
+        # Seed the by-id loader so later per-property lookups are free
+        for d in docs:
+            self.properties.prime(d["property_id"], d)
+        return group_by(docs, "client_id")
+
+    async def _properties(self, property_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        docs = await self.db.properties.find(
+            {"client_id": self.client_id, "property_id": {"$in": property_ids}}, {"_id": 0}
+        ).to_list(len(property_ids))
+        return {d["property_id"]: d for d in docs}
+
+    async def _requirements_by_client(self, client_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        docs = await self.db.requirements.find(
+            {"client_id": {"$in": client_ids}}, {"_id": 0}
+        ).to_list(MAX_CLIENT_REQUIREMENTS * len(client_ids))
+        return group_by(docs, "client_id")
+
+    async def _requirements_by_property(self, property_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        docs = await self.db.requirements.find(
+            {"client_id": self.client_id, "property_id": {"$in": property_ids}}, {"_id": 0}
+        ).to_list(MAX_REQUIREMENTS_PER_PROPERTY * len(property_ids))
+        return group_by(docs, "property_id")
+
+    async def _verified_documents_by_property(self, property_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        docs = await self.db.documents.find(
+            {"client_id": self.client_id, "property_id": {"$in": property_ids}, "status": "VERIFIED"},
+            {"_id": 0, "property_id": 1, "requirement_id": 1, "document_id": 1},
+        ).to_list(MAX_DOCUMENTS_PER_PROPERTY * len(property_ids))
+        return group_by(docs, "property_id")
+
+    async def _catalog(self, keys: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        from services.catalog_compliance import _load_catalog
+        catalog = await _load_catalog(self.db)
+        return {key: catalog for key in keys}
+
+
+def loaders_for(request: Request, client_id: str) -> ClientDataLoaders:
+    """The request's loaders for client_id (created on first use)."""
+    loaders = getattr(request.state, "client_data_loaders", None)
+    if loaders is None or loaders.client_id != client_id:
+        loaders = ClientDataLoaders(client_id)
+        request.state.client_data_loaders = loaders
+    return loaders
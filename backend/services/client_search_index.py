@@ -0,0 +1,280 @@
+"""
+Client Search Index - indexed prefix search for admin client lookup.
+
+One document per client in client_search_index holds normalized tokens and edge n-grams
+(prefixes) of the searchable fields, with property postcodes folded in:
+- customer_reference (CRN), email, full_name, company_name
+- properties.postcode (all of the client's properties)
+
+Queries match every query term against the multikey "prefixes" index ($all) and rank every
+match in Python (exact token > prefix, CRN/email above name/company/postcode), keeping the best
+`limit`. This replaces unanchored case-insensitive $regex scans over clients and properties.
+
+Kept current by reindex_client() on client and property writes; rebuild_search_index()
+backfills the whole collection (python -m scripts.rebuild_client_search_index) and records a
+build-complete marker, which is what is_search_index_ready() checks: until a backfill has
+finished, admin search keeps using the regex fallback.
+"""
+from database import database
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Set
+import heapq
+import logging
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_COLLECTION = "client_search_index"
+# {"_id": "build", "completed_at", "indexed"} once rebuild_search_index() has finished
+SEARCH_INDEX_META_COLLECTION = "client_search_index_meta"
+BUILD_MARKER_ID = "build"
+
+# Edge n-gram bounds: query terms longer than MAX_PREFIX_LEN are truncated before lookup
+MIN_PREFIX_LEN = 1
+MAX_PREFIX_LEN = 16
+
+# Ranking weights per field (higher = more relevant)
+FIELD_WEIGHTS = {
+    "crn": 5.0,
+    "email": 4.0,
+    "name": 3.0,
+    "postcode": 3.0,
+    "company": 2.0,
+}
+EXACT_TOKEN_BONUS = 2.0
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _fold(text: Any) -> str:
+    """Lowercase and strip accents so 'José' and 'jose' index the same."""
+    s = unicodedata.normalize("NFKD", str(text or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return s.lower()
+
+
+def tokenize(text: Any) -> List[str]:
+    """Split text into normalized alphanumeric tokens."""
+    return [t for t in _NON_ALNUM.split(_fold(text)) if t]
+
+
+def compact(text: Any) -> str:
+    """All alphanumerics joined (e.g. 'SW1A 1AA' -> 'sw1a1aa', CRN without dashes)."""
+    return "".join(tokenize(text))
+
+
+def edge_ngrams(token: str) -> List[str]:
+    """Prefixes of token from MIN_PREFIX_LEN to MAX_PREFIX_LEN characters."""
+    upper = min(len(token), MAX_PREFIX_LEN)
+    return [token[:n] for n in range(MIN_PREFIX_LEN, upper + 1)]
+
+
+def _field_tokens(value: Any, with_compact: bool = False) -> List[str]:
+    tokens = tokenize(value)
+    if with_compact and len(tokens) > 1:
+        tokens.append("".join(tokens))
+    return tokens
+
+
+def build_index_doc(client: Dict[str, Any], postcodes: Iterable[str]) -> Dict[str, Any]:
+    """Build the search index document for one client (pure; no DB access)."""
+    postcode_list = sorted({p.strip().upper() for p in postcodes if p and str(p).strip()})
+    field_tokens: Dict[str, List[str]] = {
+        "crn": _field_tokens(client.get("customer_reference"), with_compact=True),
+        "email": _field_tokens(client.get("email"), with_compact=True),
+        "name": _field_tokens(client.get("full_name")),
+        "company": _field_tokens(client.get("company_name")),
+        "postcode": sorted({t for p in postcode_list for t in _field_tokens(p, with_compact=True)}),
+    }
+    tokens: Set[str] = set()
+    for values in field_tokens.values():
+        tokens.update(values)
+    prefixes: Set[str] = set()
+    for token in tokens:
+        prefixes.update(edge_ngrams(token))
+    return {
+        "client_id": client["client_id"],
+        "field_tokens": field_tokens,
+        "tokens": sorted(tokens),
+        "prefixes": sorted(prefixes),
+        "postcodes": postcode_list,
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+def query_terms(q: str) -> List[str]:
+    """Normalized query terms, truncated to the indexed prefix length, de-duplicated in order."""
+    seen: List[str] = []
+    for t in tokenize(q):
+        t = t[:MAX_PREFIX_LEN]
+        if t not in seen:
+            seen.append(t)
+    return seen
+
+
+def score_index_doc(doc: Dict[str, Any], terms: List[str]) -> Dict[str, Any]:
+    """
+    Relevance of one index doc for the query terms. Each term contributes its best
+    field match: weight * (1 + EXACT_TOKEN_BONUS) for an exact token, weight for a prefix.
+    Returns {"score", "matched_via"} where matched_via is the field of the strongest term match.
+    """
+    field_tokens = doc.get("field_tokens") or {}
+    total = 0.0
+    best_field, best_field_score = None, -1.0
+    for term in terms:
+        term_best, term_field = 0.0, None
+        for field, values in field_tokens.items():
+            weight = FIELD_WEIGHTS.get(field, 1.0)
+            for value in values:
+                if value == term or (len(term) == MAX_PREFIX_LEN and value.startswith(term)):
+                    s = weight * (1.0 + EXACT_TOKEN_BONUS)
+                elif value.startswith(term):
+                    s = weight
+                else:
+                    continue
+                if s > term_best:
+                    term_best, term_field = s, field
+        total += term_best
+        if term_best > best_field_score:
+            best_field, best_field_score = term_field, term_best
+    return {"score": total, "matched_via": best_field}
+
+
+async def reindex_client(client_id: str) -> None:
+    """
+    Rebuild the index document for one client from clients + properties.
+    Removes the index entry when the client no longer exists. Never raises (search index
+    must not break the write path); failures are logged and fixed by the next rebuild.
+    """
+    if not client_id:
+        return
+    try:
+        db = database.get_db()
+        client = await db.clients.find_one(
+            {"client_id": client_id},
+            {"_id": 0, "client_id": 1, "customer_reference": 1, "email": 1, "full_name": 1, "company_name": 1},
+        )
+        if not client:
+            await db[SEARCH_INDEX_COLLECTION].delete_one({"client_id": client_id})
+            return
+        props = await db.properties.find(
+            {"client_id": client_id}, {"_id": 0, "postcode": 1}
+        ).to_list(length=None)
+        doc = build_index_doc(client, (p.get("postcode") for p in props))
+        await db[SEARCH_INDEX_COLLECTION].replace_one({"client_id": client_id}, doc, upsert=True)
+    except Exception as e:
+        logger.warning("Client search reindex failed client_id=%s: %s", client_id, e)
+
+
+async def rebuild_search_index(batch_size: int = 500) -> Dict[str, int]:
+    """Backfill/refresh the index for every client in batches (bulk upserts)."""
+    from pymongo import ReplaceOne
+
+    db = database.get_db()
+    indexed = 0
+    batch: List[Dict[str, Any]] = []
+
+    async def _flush(rows: List[Dict[str, Any]]) -> int:
+        if not rows:
+            return 0
+        ids = [r["client_id"] for r in rows]
+        postcodes: Dict[str, List[str]] = {cid: [] for cid in ids}
+        async for row in db.properties.aggregate([
+            {"$match": {"client_id": {"$in": ids}}},
+            {"$group": {"_id": "$client_id", "postcodes": {"$addToSet": "$postcode"}}},
+        ]):
+            postcodes[row["_id"]] = row.get("postcodes") or []
+        ops = [
+            ReplaceOne({"client_id": r["client_id"]}, build_index_doc(r, postcodes.get(r["client_id"], [])), upsert=True)
+            for r in rows
+        ]
+        await db[SEARCH_INDEX_COLLECTION].bulk_write(ops, ordered=False)
+        return len(ops)
+
+    cursor = db.clients.find(
+        {"client_id": {"$exists": True}},
+        {"_id": 0, "client_id": 1, "customer_reference": 1, "email": 1, "full_name": 1, "company_name": 1},
+    )
+    async for client in cursor:
+        batch.append(client)
+        if len(batch) >= batch_size:
+            indexed += await _flush(batch)
+            batch = []
+    indexed += await _flush(batch)
+    await db[SEARCH_INDEX_META_COLLECTION].update_one(
+        {"_id": BUILD_MARKER_ID},
+        {"$set": {"completed_at": datetime.now(timezone.utc), "indexed": indexed}},
+        upsert=True,
+    )
+    logger.info("Client search index rebuilt: %s client(s)", indexed)
+    return {"indexed": indexed}
+
+
+async def is_search_index_ready() -> bool:
+    """
+    True once a full backfill has completed (callers fall back to regex search otherwise).
+    Documents written by reindex_client() alone do not count: they cover only recent writes.
+    """
+    db = database.get_db()
+    try:
+        return await db[SEARCH_INDEX_META_COLLECTION].find_one({"_id": BUILD_MARKER_ID}, {"_id": 1}) is not None
+    except Exception:
+        return False
+
+
+async def search_clients(q: str, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Ranked client matches for q. Every query term must prefix-match some indexed token.
+    Returns [{"client_id", "score", "matched_via", "matched_postcode"}] best first.
+    """
+    terms = query_terms(q)
+    if not terms:
+        return []
+    db = database.get_db()
+    # Rank every match, not an arbitrary first batch, so a strong match is never cut off;
+    # only the best `limit` are held in memory
+    best: List[tuple] = []
+    cursor = db[SEARCH_INDEX_COLLECTION].find(
+        {"prefixes": {"$all": terms}},
+        {"_id": 0, "client_id": 1, "field_tokens": 1, "postcodes": 1},
+    )
+    async for doc in cursor:
+        scored = score_index_doc(doc, terms)
+        # heap root is the weakest kept entry: lowest score, then highest client_id
+        entry = (scored["score"], _Desc(doc["client_id"]), scored["matched_via"], doc.get("postcodes") or [])
+        if len(best) < limit:
+            heapq.heappush(best, entry)
+        elif entry[:2] > best[0][:2]:
+            heapq.heapreplace(best, entry)
+
+    ranked = []
+    for score, client_id, matched_via, postcodes in sorted(best, key=lambda e: e[:2], reverse=True):
+        matched_postcode = None
+        if matched_via == "postcode":
+            q_compact = compact(q)
+            matched_postcode = next((p for p in postcodes if compact(p).startswith(q_compact)), (postcodes or [None])[0])
+        ranked.append({
+            "client_id": client_id.value,
+            "score": score,
+            "matched_via": matched_via,
+            "matched_postcode": matched_postcode,
+        })
+    return ranked
+
+
+class _Desc:
+    """Wraps a string so it orders in reverse (ties on score rank by ascending client_id)."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: str):
+        self.value = value
+
+    def __lt__(self, other: "_Desc") -> bool:
+        return self.value > other.value
+
+    def __gt__(self, other: "_Desc") -> bool:
+        return self.value < other.value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Desc) and self.value == other.value
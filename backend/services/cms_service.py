@@ -15,6 +15,7 @@ from models.cms import (
     MediaType, BLOCK_CONTENT_SCHEMAS, CATEGORY_CONFIG, PurchaseMode
 )
 from utils.audit import create_audit_log
+from utils.response_cache import response_cache, NS_CMS
 from models.core import AuditAction, UserRole
 
 
@@ -22,6 +23,11 @@ def get_db():
     return database.get_db()
 
 
+async def _invalidate_public_pages():
+    """Drop cached public/marketing page responses after any CMS page or redirect write."""
+    await response_cache.bump(NS_CMS)
+
+
 async def log_audit(action: str, entity_type: str, entity_id: str, user_id: str, user_email: str, changes: dict):
     """Simple audit logging wrapper for CMS operations"""
     # Map action string to AuditAction enum
@@ -197,6 +203,7 @@ async def create_page(
     }
     
     await get_db().cms_pages.insert_one(page_doc)
+    await _invalidate_public_pages()
     
     # Audit log
     await log_audit(
@@ -377,6 +384,7 @@ async def update_page(
         {"page_id": page_id},
         {"$set": update_fields}
     )
+    await _invalidate_public_pages()
     
     # Audit log
     await log_audit(
@@ -405,6 +413,7 @@ async def delete_page(page_id: str, admin_id: str, admin_email: str) -> bool:
             "updated_by": admin_id
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_page_archive",
@@ -482,6 +491,7 @@ async def add_block(
             "status": PageStatus.DRAFT.value if page.get("status") == PageStatus.PUBLISHED.value else page.get("status")
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_block_add",
@@ -548,6 +558,7 @@ async def update_block(
             "status": PageStatus.DRAFT.value if page.get("status") == PageStatus.PUBLISHED.value else page.get("status")
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_block_update",
@@ -592,6 +603,7 @@ async def delete_block(
             "status": PageStatus.DRAFT.value if page.get("status") == PageStatus.PUBLISHED.value else page.get("status")
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_block_delete",
@@ -647,6 +659,7 @@ async def reorder_blocks(
             "status": PageStatus.DRAFT.value if page.get("status") == PageStatus.PUBLISHED.value else page.get("status")
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_blocks_reorder",
@@ -707,6 +720,7 @@ async def publish_page(
             "updated_by": admin_id,
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_page_publish",
@@ -741,6 +755,7 @@ async def unpublish_page(
             "updated_by": admin_id,
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_page_unpublish",
@@ -803,6 +818,7 @@ async def rollback_page(
             "updated_by": admin_id,
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_page_rollback",
@@ -980,6 +996,7 @@ async def clear_page_blocks(page_id: str, admin_id: str, admin_email: str):
             "status": PageStatus.DRAFT.value
         }}
     )
+    await _invalidate_public_pages()
     
     await log_audit(
         action="cms_page_update",
@@ -1288,6 +1305,7 @@ async def create_redirect(from_path: str, to_path: str, created_by: str = "syste
         {"$set": redirect_doc},
         upsert=True
     )
+    await _invalidate_public_pages()
 
 
 async def list_category_services(category_slug: str, published_only: bool = True) -> List[Dict[str, Any]]:
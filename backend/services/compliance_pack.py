@@ -3,13 +3,15 @@
 This service creates a professional PDF document containing all valid certificates
 for a property, suitable for sharing with agents, tenants, or regulatory bodies.
 """
+import asyncio
 import os
 import io
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from typing import Optional, List, Dict
 from database import database
 from models import AuditAction
+from services.artifact_cache import Artifact, artifact_key, get_or_render
 from utils.audit import create_audit_log
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
@@ -30,6 +32,9 @@ GRAY_500 = HexColor('#6b7280')
 GRAY_200 = HexColor('#e5e7eb')
 WHITE = HexColor('#ffffff')
 
+# Bump when the pack layout changes so cached packs are not reused
+PACK_TEMPLATE_VERSION = "2"
+
 
 class CompliancePackService:
     """Service to generate compliance pack PDFs."""
@@ -190,6 +195,24 @@ class CompliancePackService:
         Returns:
             PDF bytes
         """
+        artifact = await self.open_compliance_pack(
+            property_id, client_id, include_expired, requested_by, requested_by_role
+        )
+        return await artifact.read()
+    
+    async def open_compliance_pack(
+        self,
+        property_id: str,
+        client_id: str,
+        include_expired: bool = False,
+        requested_by: str = None,
+        requested_by_role: str = None
+    ) -> Artifact:
+        """Compliance pack PDF as a cached artifact (stream it with artifact.chunks()).
+        
+        Re-rendered only when the property, client, requirements or verified documents changed
+        (or PACK_TEMPLATE_VERSION / the UTC day did); otherwise streamed from the artifact cache.
+        """
         db = database.get_db()
         
         # Get property details
@@ -224,6 +247,52 @@ class CompliancePackService:
             {"_id": 0}
         ).to_list(100)
         
+        # The pack prints its generation date, so a cached copy is reused for the same UTC day only
+        generated_on = datetime.now(timezone.utc).date()
+        key = artifact_key("compliance_pack", client_id, PACK_TEMPLATE_VERSION, {
+            "property": property_doc,
+            "client": client,
+            "requirements": requirements,
+            "documents": documents,
+            "include_expired": include_expired,
+            "date": generated_on.isoformat(),
+        })
+        artifact = await get_or_render(
+            "compliance_pack", key, client_id,
+            lambda: asyncio.to_thread(self._render_pack, property_doc, client, requirements, documents, generated_on),
+        )
+        
+        # Log generation
+        logger.info(f"Compliance pack generated for property {property_id} by {requested_by}")
+        
+        # Create audit log
+        await create_audit_log(
+            action=AuditAction.DOCUMENT_VERIFIED,  # Reuse for now
+            actor_id=requested_by,
+            client_id=client_id,
+            resource_type="compliance_pack",
+            resource_id=property_id,
+            metadata={
+                "action": "compliance_pack_generated",
+                "property_id": property_id,
+                "include_expired": include_expired,
+                "certificate_count": len(requirements),
+                "requested_by_role": requested_by_role,
+                "cache_hit": artifact.cache_hit,
+            }
+        )
+        
+        return artifact
+    
+    def _render_pack(
+        self,
+        property_doc: dict,
+        client: Optional[dict],
+        requirements: List[dict],
+        documents: List[dict],
+        generated_on: date
+    ) -> bytes:
+        """Render the pack PDF (sync; run off the event loop)."""
         # Build document map
         doc_map = {}
         for doc in documents:
@@ -248,7 +317,7 @@ class CompliancePackService:
         # Title
         story.append(Paragraph("COMPLIANCE PACK", self.styles['PackTitle']))
         story.append(Paragraph(
-            f"Generated on {datetime.now(timezone.utc).strftime('%d %B %Y at %H:%M UTC')}",
+            f"Generated on {generated_on.strftime('%d %B %Y')}",
             self.styles['PackSubtitle']
         ))
         
@@ -362,26 +431,6 @@ class CompliancePackService:
         ))
         
         doc.build(story)
-        
-        # Log generation
-        logger.info(f"Compliance pack generated for property {property_id} by {requested_by}")
-        
-        # Create audit log
-        await create_audit_log(
-            action=AuditAction.DOCUMENT_VERIFIED,  # Reuse for now
-            actor_id=requested_by,
-            client_id=client_id,
-            resource_type="compliance_pack",
-            resource_id=property_id,
-            metadata={
-                "action": "compliance_pack_generated",
-                "property_id": property_id,
-                "include_expired": include_expired,
-                "certificate_count": len(requirements),
-                "requested_by_role": requested_by_role
-            }
-        )
-        
         return buffer.getvalue()
     
     async def get_pack_preview(
@@ -1,13 +1,15 @@
 """
 Async compliance recalculation queue (Option B).
-Single enqueue function; worker in job_runner processes jobs.
+Single enqueue function (plus a bulk variant for imports); worker in job_runner processes jobs.
 Reuses compliance_scoring_service.recalculate_and_persist — no duplicate scoring logic.
 """
 from database import database
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, List, Optional
 import logging
 
+from pymongo.errors import BulkWriteError
+
 logger = logging.getLogger(__name__)
 
 # Trigger reasons (match task correlation_id rules)
@@ -49,6 +51,9 @@ async def enqueue_compliance_recalc(
     """
     if not correlation_id:
         correlation_id = f"{trigger_reason}:{property_id}:{datetime.now(timezone.utc).timestamp()}"
+    # Every requirement / property write enqueues a recalc; the client's ICS feed is stale too
+    from services.calendar_feed import invalidate_calendar_feed
+    await invalidate_calendar_feed(client_id)
     db = database.get_db()
     now = datetime.now(timezone.utc)
     doc = {
@@ -77,3 +82,57 @@ async def enqueue_compliance_recalc(
         if "duplicate key" in str(e).lower() or "E11000" in str(e):
             return False
         raise
+
+
+async def enqueue_compliance_recalcs(
+    items: List[Dict[str, str]],
+    trigger_reason: str,
+    actor_type: str,
+    actor_id: Optional[str] = None,
+) -> int:
+    """
+    Bulk enqueue_compliance_recalc for items of {"property_id", "client_id", "correlation_id"}
+    (correlation_id defaults to "<trigger_reason>:<property_id>"): one insert_many and one
+    update_many. Duplicates are skipped as in the single enqueue. Returns the number enqueued.
+    """
+    if not items:
+        return 0
+    from services.calendar_feed import invalidate_calendar_feed
+    for client_id in {item["client_id"] for item in items}:
+        await invalidate_calendar_feed(client_id)
+    db = database.get_db()
+    now = datetime.now(timezone.utc).isoformat()
+    docs = [
+        {
+            "property_id": item["property_id"],
+            "client_id": item["client_id"],
+            "trigger_reason": trigger_reason,
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+            "correlation_id": item.get("correlation_id") or f"{trigger_reason}:{item['property_id']}",
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "next_run_at": now,
+            "last_error": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in items
+    ]
+    try:
+        result = await db.compliance_recalc_queue.insert_many(docs, ordered=False)
+        enqueued = [d["property_id"] for d in docs]
+        count = len(result.inserted_ids)
+    except BulkWriteError as e:
+        duplicates = {docs[err["index"]]["property_id"] for err in e.details.get("writeErrors", []) if err.get("code") == 11000}
+        if len(duplicates) < len(e.details.get("writeErrors", [])):
+            raise
+        enqueued = [d["property_id"] for d in docs if d["property_id"] not in duplicates]
+        count = e.details.get("nInserted", len(enqueued))
+    if enqueued:
+        await db.properties.update_many(
+            {"property_id": {"$in": enqueued}},
+            {"$set": {"compliance_score_pending": True}},
+        )
+    logger.info(f"Enqueued {count} compliance recalcs trigger_reason={trigger_reason}")
+    return count
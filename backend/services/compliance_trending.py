@@ -6,6 +6,8 @@ Provides "what changed" explanations for score movements.
 from database import database
 from services.compliance_score import calculate_compliance_score
 from services.compliance_scoring_service import calculate_property_compliance
+from services.score_history_retention import before_raw_window, latest_rollup_row, rollup_rows
+from pymongo import UpdateOne
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional
 import logging
@@ -16,6 +18,18 @@ logger = logging.getLogger(__name__)
 PROPERTY_SCORE_DAILY_COLLECTION = "property_score_daily"
 
 
+async def _with_rollups(
+    db, collection: str, client_id: str, start_date: str, rows: List[Dict[str, Any]], date_field: str,
+    series: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Prepend rolled-up days (score_history_retention) when the range reaches past the raw window."""
+    if not before_raw_window(collection, start_date):
+        return rows
+    raw_dates = {r[date_field] for r in rows}
+    older = [r for r in await rollup_rows(db, collection, client_id, start_date, series) if r[date_field] not in raw_dates]
+    return sorted(older + rows, key=lambda r: r[date_field]) if older else rows
+
+
 async def capture_daily_snapshot(client_id: str) -> Dict[str, Any]:
     """Capture a daily compliance score snapshot for a client.
     
@@ -115,6 +129,67 @@ async def capture_property_daily_snapshot(client_id: str, property_id: str) -> O
         return None
 
 
+def _date_key(value: Any) -> Optional[str]:
+    """YYYY-MM-DD of a stored timestamp (ISO string or datetime), or None."""
+    if isinstance(value, datetime):
+        return (value.astimezone(timezone.utc) if value.tzinfo else value).date().isoformat()
+    if isinstance(value, str) and len(value) >= 10:
+        return value[:10]
+    return None
+
+
+# Missed nightly rows older than this are left as gaps (backfill uses current evidence)
+PROPERTY_SNAPSHOT_BACKFILL_DAYS = 7
+
+
+async def backfill_property_daily_snapshots(client_id: str, days: int = PROPERTY_SNAPSHOT_BACKFILL_DAYS) -> Dict[str, Any]:
+    """Fill missing property_score_daily rows for the last `days` days (before today) in one vectorized pass.
+
+    Scores are computed from the current requirements/documents at each missing date, so
+    existing rows are never overwritten; inserted rows carry source="backfill" and are written in
+    one bulk_write. Days before a property's created_at get no row.
+    """
+    from services.score_forecast import load_client_portfolio, score_matrix, date_range
+
+    db = database.get_db()
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    dates = date_range(today - timedelta(days=days), days)
+    if not dates:
+        return {"inserted": 0}
+    date_keys = [d.isoformat() for d in dates]
+    existing = set()
+    async for row in db[PROPERTY_SCORE_DAILY_COLLECTION].find(
+        {"client_id": client_id, "date": {"$gte": date_keys[0], "$lte": date_keys[-1]}},
+        {"_id": 0, "property_id": 1, "date": 1},
+    ):
+        existing.add((row.get("property_id"), row.get("date")))
+
+    portfolio = await load_client_portfolio(client_id)
+    if not len(portfolio):
+        return {"inserted": 0}
+    scores, _ = score_matrix(portfolio, dates)
+    ops = []
+    for i, property_id in enumerate(portfolio.property_ids):
+        # No rows for days before the property was added
+        created_key = _date_key(portfolio.properties[i].get("created_at"))
+        for k, date_key in enumerate(date_keys):
+            if (property_id, date_key) in existing or (created_key and date_key < created_key):
+                continue
+            ops.append(UpdateOne(
+                {"client_id": client_id, "property_id": property_id, "date": date_key},
+                {"$setOnInsert": {
+                    "client_id": client_id, "property_id": property_id, "date": date_key,
+                    "score": int(scores[i, k]), "source": "backfill", "created_at": now.isoformat(),
+                }},
+                upsert=True,
+            ))
+    if not ops:
+        return {"inserted": 0}
+    result = await db[PROPERTY_SCORE_DAILY_COLLECTION].bulk_write(ops, ordered=False)
+    return {"inserted": result.upserted_count}
+
+
 async def get_score_trend(
     client_id: str,
     days: int = 30,
@@ -157,6 +232,7 @@ async def get_score_trend(
             },
             projection
         ).sort("date_key", 1).to_list(days + 1)
+        snapshots = await _with_rollups(db, "compliance_score_history", client_id, start_date, snapshots, "date_key")
 
         # If no history yet, capture today's snapshot so trend can start building (lazy backfill)
         if not snapshots:
@@ -293,6 +369,7 @@ async def get_portfolio_trend_with_summary(client_id: str, days: int = 90) -> Di
         {"client_id": client_id, "date_key": {"$gte": start_date}},
         {"_id": 0, "date_key": 1, "score": 1, "created_at": 1, "timestamp": 1},
     ).sort("date_key", 1).to_list(days + 5)
+    snapshots = await _with_rollups(db, "compliance_score_history", client_id, start_date, snapshots, "date_key")
     points = [{"date": s["date_key"], "score": s.get("score", 0), "created_at": s.get("created_at"), "timestamp": s.get("timestamp")} for s in snapshots]
     summary = _trend_summary_from_points(points, now)
     if not points and summary["current"] is None:
@@ -318,6 +395,7 @@ async def get_property_trend_with_summary(client_id: str, property_id: str, days
         {"client_id": client_id, "property_id": property_id, "date": {"$gte": start_date}},
         {"_id": 0, "date": 1, "score": 1, "created_at": 1},
     ).sort("date", 1).to_list(days + 5)
+    snapshots = await _with_rollups(db, PROPERTY_SCORE_DAILY_COLLECTION, client_id, start_date, snapshots, "date", property_id)
     points = [{"date": s["date"], "score": s.get("score", 0), "created_at": s.get("created_at")} for s in snapshots]
     summary = _trend_summary_from_points(points, now)
     return {"points": points, **summary}
@@ -361,6 +439,11 @@ async def get_score_change_explanation(
             {"_id": 0},
             sort=[("date_key", -1)]
         )
+        # Older days may only survive as rollups
+        if not today_snapshot:
+            today_snapshot = await latest_rollup_row(db, "compliance_score_history", client_id)
+        if not compare_snapshot:
+            compare_snapshot = await latest_rollup_row(db, "compliance_score_history", client_id, compare_date)
         
         if not today_snapshot:
             return {
@@ -483,10 +566,10 @@ async def get_score_change_explanation(
         }
 
 
-async def capture_all_client_snapshots() -> Dict[str, Any]:
+async def capture_all_client_snapshots(shard=None) -> Dict[str, Any]:
     """Capture daily snapshots for all active clients.
     
-    Called by the scheduler job daily.
+    Called by the scheduler job daily (per shard when partitioned: services.partitioned_jobs).
     
     Returns:
         dict with success/failure counts
@@ -499,6 +582,8 @@ async def capture_all_client_snapshots() -> Dict[str, Any]:
             {"subscription_status": "ACTIVE"},
             {"_id": 0, "client_id": 1}
         ).to_list(1000)
+        if shard is not None:
+            clients = shard.filter_clients(clients)
         
         success_count = 0
         error_count = 0
@@ -516,6 +601,8 @@ async def capture_all_client_snapshots() -> Dict[str, Any]:
                     ).to_list(500)
                     for prop in props:
                         await capture_property_daily_snapshot(client["client_id"], prop["property_id"])
+                    if props:
+                        await backfill_property_daily_snapshots(client["client_id"])
                 except Exception as prop_err:
                     logger.debug("Property snapshots for client %s: %s", client["client_id"], prop_err)
             except Exception as e:
@@ -12,6 +12,7 @@ import logging
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional, List, Tuple
 from database import database
+from utils.mongo_indexes import ensure_indexes, index
 from models.consent import (
     ConsentEventType,
     ConsentActionTaken,
@@ -656,26 +657,27 @@ class ConsentAdminService:
         }
 
 
-async def ensure_consent_indexes():
-    """Create indexes for consent collections."""
-    db = get_db()
-    
+CONSENT_INDEXES = [
     # consent_events indexes
-    await db[CONSENT_EVENTS_COLLECTION].create_index("created_at")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("session_id")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("client_id")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("crn")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("event_type")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("preferences.marketing")
-    await db[CONSENT_EVENTS_COLLECTION].create_index("preferences.analytics")
-    
+    index(CONSENT_EVENTS_COLLECTION, "created_at"),
+    index(CONSENT_EVENTS_COLLECTION, "session_id"),
+    index(CONSENT_EVENTS_COLLECTION, "client_id"),
+    index(CONSENT_EVENTS_COLLECTION, "crn"),
+    index(CONSENT_EVENTS_COLLECTION, "event_type"),
+    index(CONSENT_EVENTS_COLLECTION, "preferences.marketing"),
+    index(CONSENT_EVENTS_COLLECTION, "preferences.analytics"),
     # consent_state indexes
-    await db[CONSENT_STATE_COLLECTION].create_index("session_id", unique=True)
-    await db[CONSENT_STATE_COLLECTION].create_index("updated_at")
-    await db[CONSENT_STATE_COLLECTION].create_index("client_id")
-    await db[CONSENT_STATE_COLLECTION].create_index("crn")
-    await db[CONSENT_STATE_COLLECTION].create_index("action_taken")
-    await db[CONSENT_STATE_COLLECTION].create_index("preferences.marketing")
-    await db[CONSENT_STATE_COLLECTION].create_index("preferences.analytics")
-    
+    index(CONSENT_STATE_COLLECTION, "session_id", unique=True),
+    index(CONSENT_STATE_COLLECTION, "updated_at"),
+    index(CONSENT_STATE_COLLECTION, "client_id"),
+    index(CONSENT_STATE_COLLECTION, "crn"),
+    index(CONSENT_STATE_COLLECTION, "action_taken"),
+    index(CONSENT_STATE_COLLECTION, "preferences.marketing"),
+    index(CONSENT_STATE_COLLECTION, "preferences.analytics"),
+]
+
+
+async def ensure_consent_indexes():
+    """Create indexes for consent collections."""
+    await ensure_indexes(get_db(), CONSENT_INDEXES)
     logger.info("Consent indexes created")
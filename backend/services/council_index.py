@@ -0,0 +1,78 @@
+"""
+Council Index - precomputed search structures over data/uk_councils.json.
+
+Built once per process (the council list is static) and used by the intake routes:
+- substring search on council name via a sorted suffix list (bisect instead of scanning
+  every name); results keep the source file order, same as the previous linear filter
+- nation filter via precomputed position lists
+- exact (case-insensitive) name lookup for postcode -> council matching
+"""
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+
+class CouncilIndex:
+    """Read-only index over a list of council dicts ({code, name, region, nation})."""
+
+    def __init__(self, councils: List[Dict[str, Any]]):
+        self.councils = list(councils)
+        suffixes = []
+        self._by_lower_name: Dict[str, int] = {}
+        self._by_nation: Dict[str, List[int]] = {}
+        for pos, council in enumerate(self.councils):
+            name = (council.get("name") or "").lower()
+            self._by_lower_name.setdefault(name, pos)
+            self._by_nation.setdefault((council.get("nation") or "").lower(), []).append(pos)
+            for start in range(len(name)):
+                suffixes.append((name[start:], pos))
+        suffixes.sort()
+        self._suffixes = suffixes
+        self._suffix_keys = [s for s, _ in suffixes]
+
+    def __len__(self) -> int:
+        return len(self.councils)
+
+    def _positions_containing(self, q: str) -> List[int]:
+        start = bisect_left(self._suffix_keys, q)
+        found = set()
+        for i in range(start, len(self._suffix_keys)):
+            if not self._suffix_keys[i].startswith(q):
+                break
+            found.add(self._suffixes[i][1])
+        return sorted(found)
+
+    def search(self, q: Optional[str] = None, nation: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Councils whose name contains q (case-insensitive) and whose nation matches, in source order."""
+        positions: Optional[List[int]] = None
+        if q:
+            positions = self._positions_containing(q.lower())
+        if nation:
+            nation_positions = self._by_nation.get(nation.lower(), [])
+            if positions is None:
+                positions = nation_positions
+            else:
+                allowed = set(nation_positions)
+                positions = [p for p in positions if p in allowed]
+        if positions is None:
+            return list(self.councils)
+        return [self.councils[p] for p in positions]
+
+    def find_exact(self, name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """First council whose name equals name (case-insensitive)."""
+        if not name:
+            return None
+        pos = self._by_lower_name.get(name.lower())
+        return self.councils[pos] if pos is not None else None
+
+    def find_partial(self, name: Optional[str]) -> Optional[Dict[str, Any]]:
+        """First council (source order) whose name contains name or is contained in it."""
+        if not name:
+            return None
+        lower = name.lower()
+        candidates = self._positions_containing(lower)
+        first = candidates[0] if candidates else None
+        for council in self.councils[: first if first is not None else len(self.councils)]:
+            council_name = (council.get("name") or "").lower()
+            if council_name and council_name in lower:
+                return council
+        return self.councils[first] if first is not None else None
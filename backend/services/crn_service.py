@@ -70,6 +70,10 @@ async def ensure_client_crn(client_id: str, stripe_event_id: Optional[str] = Non
         {"$set": {"customer_reference": crn}},
     )
     logger.info(f"Assigned CRN {crn} to client {client_id}")
+    from services.client_search_index import reindex_client
+    await reindex_client(client_id)
+    from services.calendar_feed import invalidate_calendar_feed
+    await invalidate_calendar_feed(client_id)
     metadata = {"client_id": client_id, "crn": crn, "timestamp": datetime.now(timezone.utc).isoformat()}
     if stripe_event_id:
         metadata["stripe_event_id"] = stripe_event_id
@@ -4,9 +4,11 @@ IMPORTANT: This service is ASSISTIVE ONLY. Extracted data must be reviewed by us
 before being applied. AI CANNOT mark a requirement as compliant - the deterministic
 compliance engine remains the final authority.
 
-Uses AI when available: if AI_ENABLED=true and OPENAI_API_KEY set (see utils.ai_config),
-extraction runs via OpenAI (text from file). Otherwise uses LLM_API_KEY (Gemini) with
-file upload. If neither is configured, returns success=False with a clear error message.
+Text-layer certificates (CP12/EICR/EPC) are first parsed locally (services.certificate_parser);
+confident results are stored without any LLM call. Otherwise uses AI when available: if
+AI_ENABLED=true and OPENAI_API_KEY set (see utils.ai_config), extraction runs via OpenAI (text
+from file). Otherwise uses LLM_API_KEY (Gemini) with file upload. If neither is configured,
+returns success=False with a clear error message.
 """
 from database import database
 from models import AuditAction
@@ -212,22 +214,23 @@ class DocumentAnalysisService:
         if not doc_type_hint:
             doc_type_hint = self._detect_document_type_hint(os.path.basename(file_path))
 
-        # Prefer ai_config (OpenAI) when enabled and configured
+        # Local certificate parser first, then ai_config (OpenAI) when enabled and configured
         try:
-            from utils import ai_config
             from services.document_extraction_service import _extract_text_from_file
             from services.ai_provider import extract_compliance_fields
         except ImportError:
-            ai_config = None
             _extract_text_from_file = None
             extract_compliance_fields = None
 
-        if ai_config and getattr(ai_config, "is_configured", lambda: False)() and _extract_text_from_file and extract_compliance_fields:
+        if _extract_text_from_file and extract_compliance_fields:
             try:
                 text = _extract_text_from_file(file_path, mime_type)
                 if text and text.strip():
+                    # Returns the local parse without an LLM call when confident; otherwise
+                    # calls OpenAI if configured (AI_NOT_CONFIGURED falls through to Gemini)
                     result = extract_compliance_fields(text, os.path.basename(file_path), None)
                     if result.get("success") and result.get("extracted"):
+                        provider = result.get("provider") or "openai"
                         mapped = self._map_ai_provider_to_analysis(result["extracted"])
                         extracted_data = self._normalize_extraction_data(mapped)
                         extraction_quality = self._assess_extraction_quality(extracted_data)
@@ -242,6 +245,7 @@ class DocumentAnalysisService:
                                     "extraction_quality": extraction_quality,
                                     "requires_review": True,
                                     "review_status": "pending",
+                                    "provider": provider,
                                 }
                             }}
                         )
@@ -259,10 +263,10 @@ class DocumentAnalysisService:
                                 "has_expiry_date": extracted_data.get("expiry_date") is not None,
                                 "has_engineer_details": extracted_data.get("engineer_details", {}).get("name") is not None,
                                 "requires_review": True,
-                                "provider": "openai",
+                                "provider": provider,
                             }
                         )
-                        logger.info("Document analyzed successfully via OpenAI: %s (quality: %s)", document_id, extraction_quality)
+                        logger.info("Document analyzed successfully via %s: %s (quality: %s)", provider, document_id, extraction_quality)
                         return {
                             "success": True,
                             "extracted_data": extracted_data,
@@ -270,10 +274,10 @@ class DocumentAnalysisService:
                             "requires_review": True,
                             "error": None,
                         }
-                # No text or extraction failed; fall through to Gemini if available
-                logger.debug("OpenAI extraction path produced no result; trying Gemini if configured")
+                # No text, local parse not confident and OpenAI unavailable/failed; try Gemini
+                logger.debug("Text extraction path produced no result; trying Gemini if configured")
             except Exception as e:
-                logger.warning("OpenAI extraction path failed: %s; falling back to Gemini if configured", e)
+                logger.warning("Text extraction path failed: %s; falling back to Gemini if configured", e)
 
         # Gemini path (LLM_API_KEY)
         try:
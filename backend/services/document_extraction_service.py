@@ -11,6 +11,8 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from pymongo import ReturnDocument
+
 from database import database
 from models import AuditAction
 from utils.audit import create_audit_log
@@ -29,6 +31,12 @@ CONFIDENCE_THRESHOLD = 0.85
 RATE_LIMIT_GLOBAL_PER_MINUTE = 60
 RATE_LIMIT_CLIENT_PER_DAY = 200
 
+# Worker-mode queue (SCHEDULER_MODE=worker): records drained per run, and when a claim is considered abandoned
+EXTRACTION_QUEUE_BATCH = 10
+EXTRACTION_CLAIM_STALE_MINUTES = 15
+# Claims of one record before it is marked FAILED (each run that raises, or dies, is one attempt)
+EXTRACTION_MAX_ATTEMPTS = 3
+
 # In-memory rate limit state (simple; reset on restart)
 _rate_global: List[float] = []
 _rate_by_client: Dict[str, List[float]] = {}
@@ -154,10 +162,66 @@ async def enqueue_extraction(
         resource_id=document_id,
         metadata={"extraction_id": extraction_id, "source": source},
     )
-    asyncio.create_task(run_extraction_job(extraction_id))
+    from job_schedule import background_jobs_in_worker
+    if not background_jobs_in_worker():
+        asyncio.create_task(run_extraction_job(extraction_id))
+    # else: picked up by the worker's extraction_queue_worker job (process_extraction_queue)
     return extraction_id
 
 
+async def process_extraction_queue(limit: int = EXTRACTION_QUEUE_BATCH) -> int:
+    """
+    Drain PENDING extractions (worker process). Each record is claimed atomically so several
+    workers never run the same extraction; a claim older than EXTRACTION_CLAIM_STALE_MINUTES
+    (worker died mid-run, or the run raised) is claimed again. Every claim counts an attempt
+    (queue_attempts, last error in queue_last_error); after EXTRACTION_MAX_ATTEMPTS the record
+    is marked FAILED instead of being retried forever. Returns the number of extractions run.
+    """
+    db = database.get_db()
+    processed = 0
+    for _ in range(limit):
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(minutes=EXTRACTION_CLAIM_STALE_MINUTES)
+        record = await db.extracted_documents.find_one_and_update(
+            {
+                "status": "PENDING",
+                "$or": [{"queue_claimed_at": None}, {"queue_claimed_at": {"$lt": stale_before}}],
+            },
+            {"$set": {"queue_claimed_at": now}, "$inc": {"queue_attempts": 1}},
+            sort=[("audit.created_at", 1)],
+            projection={"_id": 0, "extraction_id": 1, "document_id": 1, "client_id": 1,
+                        "queue_attempts": 1, "queue_last_error": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not record:
+            break
+        extraction_id = record["extraction_id"]
+        attempts = record.get("queue_attempts") or 1
+        if attempts > EXTRACTION_MAX_ATTEMPTS:
+            # The last attempt died without recording an outcome
+            await _set_failed(
+                db, extraction_id, record.get("document_id"), record.get("client_id"), "MAX_ATTEMPTS",
+                record.get("queue_last_error") or "Extraction did not complete",
+            )
+            continue
+        try:
+            await run_extraction_job(extraction_id)
+        except Exception as e:
+            logger.exception("process_extraction_queue: extraction %s failed (attempt %s/%s): %s",
+                             extraction_id, attempts, EXTRACTION_MAX_ATTEMPTS, e)
+            error = f"{type(e).__name__}: {e}"[:500]
+            if attempts >= EXTRACTION_MAX_ATTEMPTS:
+                await _set_failed(db, extraction_id, record.get("document_id"), record.get("client_id"),
+                                  "MAX_ATTEMPTS", error)
+            else:
+                # Left claimed: retried once the claim goes stale
+                await db.extracted_documents.update_one(
+                    {"extraction_id": extraction_id}, {"$set": {"queue_last_error": error}}
+                )
+        processed += 1
+    return processed
+
+
 async def run_extraction_job(extraction_id: str) -> None:
     """Load extraction record, read file, extract text, call AI, validate, store result."""
     db = database.get_db()
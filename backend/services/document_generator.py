@@ -674,12 +674,17 @@ Document Version: v{version}
 """
 
 
-# Import real document generator
-from services.real_document_generator import RealDocumentGenerator
+# Use real document generator for production (python-docx/ReportLab, imported on first use)
+# To switch back to mock, return MockDocumentGenerator() here
+_document_generator = None
 
-# Use real document generator for production
-# To switch back to mock, change this to MockDocumentGenerator()
-document_generator = RealDocumentGenerator()
+
+def get_document_generator() -> DocumentGenerator:
+    global _document_generator
+    if _document_generator is None:
+        from services.real_document_generator import RealDocumentGenerator
+        _document_generator = RealDocumentGenerator()
+    return _document_generator
 
 
 # Main interface function
@@ -692,7 +697,7 @@ async def generate_documents(
     Generate documents for an order.
     This is the main entry point - swap document_generator instance to change implementation.
     """
-    return await document_generator.generate_documents(
+    return await get_document_generator().generate_documents(
         order_id, 
         regeneration_notes,
         regenerated_from_version
@@ -2,6 +2,7 @@ from postmarker.core import PostmarkClient
 from database import database
 from models import MessageLog, EmailTemplateAlias, AuditAction
 from utils.audit import create_audit_log
+from utils.metrics import EMAIL_PROVIDER_SECONDS, time_call
 from datetime import datetime, timezone
 import html as html_module
 import os
@@ -76,16 +77,17 @@ class EmailService:
                         email_subject = email_subject.replace(placeholder, str(value))
                     
                     try:
-                        response = self.client.emails.send(
-                            From=DEFAULT_SENDER,
-                            To=recipient,
-                            Subject=email_subject,
-                            HtmlBody=html_body,
-                            TextBody=text_body,
-                            TrackOpens=True,
-                            TrackLinks="HtmlOnly",
-                            Tag=template_alias.value
-                        )
+                        with time_call(EMAIL_PROVIDER_SECONDS, "postmark"):
+                            response = self.client.emails.send(
+                                From=DEFAULT_SENDER,
+                                To=recipient,
+                                Subject=email_subject,
+                                HtmlBody=html_body,
+                                TextBody=text_body,
+                                TrackOpens=True,
+                                TrackLinks="HtmlOnly",
+                                Tag=template_alias.value
+                            )
                         
                         message_log.postmark_message_id = response["MessageID"]
                         message_log.status = "sent"
@@ -101,16 +103,17 @@ class EmailService:
                     text_body = self._build_text_body(template_alias, template_model)
                     
                     try:
-                        response = self.client.emails.send(
-                            From=DEFAULT_SENDER,
-                            To=recipient,
-                            Subject=subject,
-                            HtmlBody=html_body,
-                            TextBody=text_body,
-                            TrackOpens=True,
-                            TrackLinks="HtmlOnly",
-                            Tag=template_alias.value
-                        )
+                        with time_call(EMAIL_PROVIDER_SECONDS, "postmark"):
+                            response = self.client.emails.send(
+                                From=DEFAULT_SENDER,
+                                To=recipient,
+                                Subject=subject,
+                                HtmlBody=html_body,
+                                TextBody=text_body,
+                                TrackOpens=True,
+                                TrackLinks="HtmlOnly",
+                                Tag=template_alias.value
+                            )
                         
                         message_log.postmark_message_id = response["MessageID"]
                         message_log.status = "sent"
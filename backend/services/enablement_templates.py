@@ -10,6 +10,7 @@ IMPORTANT: These templates are EDUCATIONAL ONLY
 """
 from datetime import datetime, timezone
 from database import database
+from utils.mongo_indexes import ensure_indexes, index
 from models.enablement import (
     EnablementEventType, EnablementCategory, DeliveryChannel, EnablementTemplate
 )
@@ -359,45 +360,41 @@ async def seed_enablement_templates():
     return {"seeded": seeded_count, "updated": updated_count}
 
 
-async def ensure_enablement_indexes():
-    """Create indexes for enablement collections"""
-    db = database.get_db()
-    
+ENABLEMENT_INDEXES = [
     # Events
-    await db.enablement_events.create_index("event_id", unique=True)
-    await db.enablement_events.create_index("client_id")
-    await db.enablement_events.create_index("event_type")
-    await db.enablement_events.create_index("timestamp")
-    
+    index("enablement_events", "event_id", unique=True),
+    index("enablement_events", "client_id"),
+    index("enablement_events", "event_type"),
+    index("enablement_events", "timestamp"),
     # Actions
-    await db.enablement_actions.create_index("action_id", unique=True)
-    await db.enablement_actions.create_index("client_id")
-    await db.enablement_actions.create_index("event_id")
-    await db.enablement_actions.create_index("status")
-    await db.enablement_actions.create_index("created_at")
-    
+    index("enablement_actions", "action_id", unique=True),
+    index("enablement_actions", "client_id"),
+    index("enablement_actions", "event_id"),
+    index("enablement_actions", "status"),
+    index("enablement_actions", "created_at"),
     # Templates
-    await db.enablement_templates.create_index("template_id", unique=True)
-    await db.enablement_templates.create_index("template_code", unique=True)
-    await db.enablement_templates.create_index("event_triggers")
-    await db.enablement_templates.create_index("is_active")
-    
+    index("enablement_templates", "template_id", unique=True),
+    index("enablement_templates", "template_code", unique=True),
+    index("enablement_templates", "event_triggers"),
+    index("enablement_templates", "is_active"),
     # Preferences
-    await db.enablement_preferences.create_index("client_id", unique=True)
-    
+    index("enablement_preferences", "client_id", unique=True),
     # Suppressions
-    await db.enablement_suppressions.create_index("rule_id", unique=True)
-    await db.enablement_suppressions.create_index("active")
-    await db.enablement_suppressions.create_index("client_id")
-    
+    index("enablement_suppressions", "rule_id", unique=True),
+    index("enablement_suppressions", "active"),
+    index("enablement_suppressions", "client_id"),
     # Assistant context
-    await db.enablement_assistant_context.create_index("context_id", unique=True)
-    await db.enablement_assistant_context.create_index("client_id")
-    await db.enablement_assistant_context.create_index("expires_at")
-    
+    index("enablement_assistant_context", "context_id", unique=True),
+    index("enablement_assistant_context", "client_id"),
+    index("enablement_assistant_context", "expires_at"),
     # Client notifications
-    await db.client_notifications.create_index("notification_id", unique=True)
-    await db.client_notifications.create_index("client_id")
-    await db.client_notifications.create_index("read")
-    
+    index("client_notifications", "notification_id", unique=True),
+    index("client_notifications", "client_id"),
+    index("client_notifications", "read"),
+]
+
+
+async def ensure_enablement_indexes():
+    """Create indexes for enablement collections"""
+    await ensure_indexes(database.get_db(), ENABLEMENT_INDEXES)
     logger.info("Enablement indexes created")
@@ -10,6 +10,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from utils.expiry_utils import get_effective_expiry_date, get_computed_status, is_included_for_calendar
+from services.partitioned_jobs import checkpointed
 
 ROOT_DIR = Path(__file__).parent.parent
 load_dotenv(ROOT_DIR / '.env')
@@ -39,6 +40,12 @@ class JobScheduler:
         self.db = None
     
     async def connect(self):
+        # Reuse the process-wide pooled client (API or worker.py); only standalone callers open their own
+        from database import database
+        shared_db = database.get_db()
+        if shared_db is not None:
+            self.db = shared_db
+            return
         self.client = AsyncIOMotorClient(self.mongo_url)
         self.db = self.client[self.db_name]
         logger.info("Job scheduler connected to MongoDB")
@@ -46,8 +53,9 @@ class JobScheduler:
     async def close(self):
         if self.client:
             self.client.close()
+            self.client = None
     
-    async def send_daily_reminders(self):
+    async def send_daily_reminders(self, shard=None):
         """Send daily compliance reminders for expiring requirements.
         Respects user notification preferences.
         
@@ -66,10 +74,22 @@ class JobScheduler:
                 },
                 {"_id": 0}
             ).to_list(1000)
+            if shard is not None:
+                clients = shard.filter_clients(clients)
             
             reminder_count = 0
+
+            # Time-driven status changes (EXPIRING_SOON/OVERDUE) + recalc enqueue: only requirements
+            # whose next_transition_at has passed. Reminders below still go out if this fails.
+            # Partitioned runs: global pass, so only shard 0 does it.
+            if shard is None or shard.is_first:
+                try:
+                    from services.requirement_transitions import process_due_transitions
+                    await process_due_transitions(self.db, correlation_prefix="REMINDER_JOB")
+                except Exception as transition_err:
+                    logger.error(f"Requirement transition pass failed: {transition_err}")
             
-            for client in clients:
+            async for client in checkpointed(clients, shard):
                 # Check notification preferences
                 prefs = await self.db.notification_preferences.find_one(
                     {"client_id": client["client_id"]},
@@ -91,9 +111,15 @@ class JobScheduler:
                     logger.info(f"Skipping reminders for {client['email']} - within quiet hours")
                     continue
                 
-                # Get all requirements for client; use effective expiry (confirmed else extracted else due_date); exclude NOT_REQUIRED
+                # Requirements overdue or expiring within the reminder window, by indexed effective_expiry_at
+                # (confirmed else extracted else due_date); rows not yet backfilled are checked below
+                now_utc = datetime.now(timezone.utc)
+                reminder_horizon = (now_utc + timedelta(days=reminder_days + 1)).isoformat()
                 requirements = await self.db.requirements.find(
-                    {"client_id": client["client_id"]},
+                    {"client_id": client["client_id"], "$or": [
+                        {"effective_expiry_at": {"$lte": reminder_horizon}},
+                        {"effective_expiry_at": {"$exists": False}},
+                    ]},
                     {"_id": 0}
                 ).to_list(500)
 
@@ -114,8 +140,6 @@ class JobScheduler:
                 expiring_requirements = []
                 overdue_requirements = []
                 reminder_refs = []  # For message_logs: client_id on log; refs list here
-                properties_status_changed = set()
-                now_utc = datetime.now(timezone.utc)
 
                 for req in requirements:
                     if not is_included_for_calendar(req):
@@ -138,11 +162,6 @@ class JobScheduler:
                             "requirement_type": req.get("requirement_type", ""),
                             "due_date": due_date.strftime("%Y-%m-%d"),
                         })
-                        await self.db.requirements.update_one(
-                            {"requirement_id": req["requirement_id"]},
-                            {"$set": {"status": "OVERDUE"}}
-                        )
-                        properties_status_changed.add(req.get("property_id"))
                     elif 0 <= days_until_due <= reminder_days:
                         prop_addr = properties_map.get(req.get("property_id"), "Your property")
                         expiring_requirements.append({
@@ -157,29 +176,7 @@ class JobScheduler:
                             "requirement_type": req.get("requirement_type", ""),
                             "due_date": due_date.strftime("%Y-%m-%d"),
                         })
-                        await self.db.requirements.update_one(
-                            {"requirement_id": req["requirement_id"]},
-                            {"$set": {"status": "EXPIRING_SOON"}}
-                        )
-                        properties_status_changed.add(req.get("property_id"))
-                
-                # Enqueue compliance recalc for properties whose requirement status changed
-                if properties_status_changed:
-                    from services.compliance_recalc_queue import enqueue_compliance_recalc
-                    from services.compliance_recalc_queue import TRIGGER_EXPIRY_JOB, ACTOR_SYSTEM
-                    date_str = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-                    for property_id in properties_status_changed:
-                        if not property_id:
-                            continue
-                        await enqueue_compliance_recalc(
-                            property_id=property_id,
-                            client_id=client["client_id"],
-                            trigger_reason=TRIGGER_EXPIRY_JOB,
-                            actor_type=ACTOR_SYSTEM,
-                            actor_id=None,
-                            correlation_id=f"REMINDER_JOB:{property_id}:{date_str}",
-                        )
-                
+
                 # Send reminder if there are expiring or overdue requirements
                 if expiring_requirements or overdue_requirements:
                     reminder_recipients = await self._resolve_reminder_recipients(client)
@@ -225,9 +222,11 @@ class JobScheduler:
         
         except Exception as e:
             logger.error(f"Daily reminder job error: {e}")
+            if shard is not None:
+                raise  # partitioned run: let the shard be retried
             return 0
     
-    async def send_monthly_digests(self):
+    async def send_monthly_digests(self, shard=None):
         """Send monthly compliance digest to all active clients.
         Respects user notification preferences.
         
@@ -246,10 +245,12 @@ class JobScheduler:
                 },
                 {"_id": 0}
             ).to_list(1000)
+            if shard is not None:
+                clients = shard.filter_clients(clients)
             
             digest_count = 0
             
-            for client in clients:
+            async for client in checkpointed(clients, shard):
                 # Check notification preferences
                 prefs = await self.db.notification_preferences.find_one(
                     {"client_id": client["client_id"]},
@@ -344,6 +345,8 @@ class JobScheduler:
         
         except Exception as e:
             logger.error(f"Monthly digest job error: {e}")
+            if shard is not None:
+                raise  # partitioned run: let the shard be retried
             return 0
     
     async def _resolve_reminder_recipients(self, client) -> list:
@@ -624,7 +627,7 @@ class JobScheduler:
             logger.error(f"Pending verification digest job error: {e}")
             return 0
 
-    async def check_compliance_status_changes(self):
+    async def check_compliance_status_changes(self, shard=None):
         """Check for compliance status changes and send alerts.
         
         This job:
@@ -649,10 +652,12 @@ class JobScheduler:
                 },
                 {"_id": 0}
             ).to_list(1000)
+            if shard is not None:
+                clients = shard.filter_clients(clients)
             
             alert_count = 0
             
-            for client in clients:
+            async for client in checkpointed(clients, shard):
                 # Check notification preferences
                 prefs = await self.db.notification_preferences.find_one(
                     {"client_id": client["client_id"]},
@@ -779,6 +784,8 @@ class JobScheduler:
         
         except Exception as e:
             logger.error(f"Compliance status check error: {e}")
+            if shard is not None:
+                raise  # partitioned run: let the shard be retried
             return 0
     
     def _is_in_quiet_hours(self, prefs) -> bool:
@@ -0,0 +1,252 @@
+"""
+BM25 inverted index for knowledge-base retrieval.
+
+Used by:
+- assistant_retrieval_service.load_kb_snippets (curated markdown under docs/assistant_kb/)
+- GET /api/kb/articles?search= (published, active kb_articles)
+
+Documents are tokenized, stop-word filtered and stemmed once at index time; queries
+score only the postings of their own terms instead of scanning every document.
+The index is updated per document (add/remove), so article edits do not rebuild it.
+The kb_articles index syncs from updated_at on a short interval, so edits made on
+another replica are picked up without a restart.
+"""
+from database import database
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Field weights: title/tag terms count more than body terms
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "excerpt": 2, "content": 1}
+
+ARTICLES_COLLECTION = "kb_articles"
+# Seconds between incremental syncs of the kb_articles index from updated_at
+ARTICLE_SYNC_INTERVAL_SECONDS = 5.0
+# Max ranked article ids considered for one public search
+ARTICLE_SEARCH_CAP = 500
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in into is it its me my "
+    "of on or our so that the their then there these this to was we what when where which who "
+    "why will with you your".split()
+)
+
+
+def stem(word: str) -> str:
+    """
+    Light English suffix stripper (plural, -ing, -ed, -ly, -ation). Deterministic and
+    conservative: only strips when a stem of at least three characters remains.
+    """
+    w = word
+    if len(w) <= 3 or w.isdigit():
+        return w
+    if w.endswith("ies") and len(w) > 4:
+        w = w[:-3] + "y"
+    elif w.endswith("sses"):
+        w = w[:-2]
+    elif w.endswith("s") and not w.endswith("ss") and not w.endswith("us") and not w.endswith("is"):
+        w = w[:-1]
+    for suffix in ("ations", "ation", "ingly", "ing", "edly", "ed", "ly"):
+        if w.endswith(suffix) and len(w) - len(suffix) >= 3:
+            w = w[: -len(suffix)]
+            break
+    if len(w) > 3 and w[-1] == w[-2] and w[-1] not in "lsz":
+        w = w[:-1]  # "uploadd"/"stopp" -> single consonant after -ed/-ing removal
+    if w.endswith("e") and len(w) > 4:
+        w = w[:-1]
+    return w
+
+
+def analyze(text: Any) -> List[str]:
+    """Tokenize, drop stop words, stem."""
+    return [stem(t) for t in _TOKEN_RE.findall(str(text or "").lower()) if t not in STOP_WORDS]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring and per-document updates."""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._doc_len
+
+    def add(self, doc_id: str, fields: Dict[str, Any]) -> None:
+        """Index (or re-index) a document from weighted text fields."""
+        if doc_id in self._doc_len:
+            self.remove(doc_id)
+        tf: Dict[str, int] = {}
+        length = 0
+        for field, value in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1)
+            text = " ".join(value) if isinstance(value, (list, tuple)) else value
+            for term in analyze(text):
+                tf[term] = tf.get(term, 0) + weight
+                length += weight
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[doc_id] = count
+        self._doc_len[doc_id] = length
+        self._doc_terms[doc_id] = list(tf)
+        self._total_len += length
+
+    def remove(self, doc_id: str) -> None:
+        if doc_id not in self._doc_len:
+            return
+        for term in self._doc_terms.pop(doc_id, []):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_len.clear()
+        self._doc_terms.clear()
+        self._total_len = 0
+
+    def search(self, query: str, top_k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Return [(doc_id, score)] for documents matching any query term, best first."""
+        n = len(self._doc_len)
+        if n == 0:
+            return []
+        avg_len = self._total_len / n if n else 0.0
+        scores: Dict[str, float] = {}
+        for term in set(analyze(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            df = len(posting)
+            idf = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+            for doc_id, tf in posting.items():
+                norm = self.k1 * (1.0 - self.b + self.b * self._doc_len[doc_id] / avg_len) if avg_len else self.k1
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (tf * (self.k1 + 1.0)) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+        return ranked[:top_k] if top_k else ranked
+
+
+# ---------------------------------------------------------------------------
+# kb_articles index (public KB search)
+# ---------------------------------------------------------------------------
+
+def _article_fields(article: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": article.get("title") or "",
+        "tags": article.get("tags") or [],
+        "excerpt": article.get("excerpt") or "",
+        "content": article.get("content") or "",
+    }
+
+
+def _is_searchable(article: Dict[str, Any]) -> bool:
+    return article.get("status") == "published" and article.get("is_active", True) is not False
+
+
+class ArticleSearchIndex:
+    """BM25 index over published, active kb_articles, synced incrementally by updated_at."""
+
+    def __init__(self):
+        self.index = BM25Index()
+        self._built = False
+        self._last_sync_marker: Optional[str] = None
+        self._last_sync_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def apply(self, article: Dict[str, Any]) -> None:
+        """Add, refresh or drop one article depending on its publish/active state."""
+        article_id = article.get("article_id")
+        if not article_id:
+            return
+        if _is_searchable(article):
+            self.index.add(article_id, _article_fields(article))
+        else:
+            self.index.remove(article_id)
+
+    async def _load(self, query: Dict[str, Any]) -> None:
+        db = database.get_db()
+        cursor = db[ARTICLES_COLLECTION].find(
+            query,
+            {"_id": 0, "article_id": 1, "title": 1, "tags": 1, "excerpt": 1, "content": 1,
+             "status": 1, "is_active": 1, "updated_at": 1},
+        )
+        async for article in cursor:
+            self.apply(article)
+            marker = article.get("updated_at")
+            if marker is not None:
+                marker = marker.isoformat() if hasattr(marker, "isoformat") else str(marker)
+                if self._last_sync_marker is None or marker > self._last_sync_marker:
+                    self._last_sync_marker = marker
+
+    async def ensure_current(self, force: bool = False) -> None:
+        """Build on first use, then apply articles changed since the last sync."""
+        now = time.monotonic()
+        if self._built and not force and now - self._last_sync_at < ARTICLE_SYNC_INTERVAL_SECONDS:
+            return
+        async with self._lock:
+            if not self._built:
+                self.index.clear()
+                self._last_sync_marker = None
+                await self._load({})
+                self._built = True
+                logger.info("KB article search index built: %s article(s)", len(self.index))
+            elif self._last_sync_marker is not None:
+                await self._load({"updated_at": {"$gt": self._last_sync_marker}})
+            else:
+                await self._load({})
+            self._last_sync_at = time.monotonic()
+
+    async def refresh_article(self, article_id: str) -> None:
+        """Re-read one article after a write (create/update/publish/unpublish/deactivate)."""
+        if not self._built:
+            return
+        db = database.get_db()
+        article = await db[ARTICLES_COLLECTION].find_one(
+            {"article_id": article_id},
+            {"_id": 0, "article_id": 1, "title": 1, "tags": 1, "excerpt": 1, "content": 1,
+             "status": 1, "is_active": 1},
+        )
+        if article:
+            self.apply(article)
+        else:
+            self.index.remove(article_id)
+
+    async def search(self, query: str, limit: int = ARTICLE_SEARCH_CAP) -> List[Tuple[str, float]]:
+        await self.ensure_current()
+        return self.index.search(query, top_k=limit)
+
+    def reset(self) -> None:
+        self.index.clear()
+        self._built = False
+        self._last_sync_marker = None
+        self._last_sync_at = 0.0
+
+
+article_search_index = ArticleSearchIndex()
+
+
+def build_index(docs: Iterable[Tuple[str, Dict[str, Any]]]) -> BM25Index:
+    """Build a BM25Index from (doc_id, fields) pairs."""
+    index = BM25Index()
+    for doc_id, fields in docs:
+        index.add(doc_id, fields)
+    return index
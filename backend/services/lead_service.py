@@ -18,6 +18,7 @@ import json
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any, Tuple
 from database import database
+from utils.pagination import cached_count, keyset_filter, keyset_sort
 from services.lead_models import (
     LeadSourcePlatform,
     LeadServiceInterest,
@@ -331,8 +332,11 @@ class LeadService:
         date_to: Optional[str] = None,
         page: int = 1,
         limit: int = 50,
+        cursor: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], int]:
-        """List leads with filters and pagination."""
+        """List leads with filters and pagination.
+        When cursor is given ("" for the first page), uses keyset pagination on
+        (created_at, lead_id) and a cached total; page is the legacy mode."""
         db = database.get_db()
         
         # Build filter
@@ -371,13 +375,22 @@ class LeadService:
             ]
         
         # Get leads
+        if cursor is not None:
+            find_cursor = db[LEADS_COLLECTION].find(
+                keyset_filter(filter_query, cursor, "created_at", "lead_id"),
+                {"_id": 0}
+            ).sort(keyset_sort("created_at", "lead_id")).limit(limit)
+            leads = await find_cursor.to_list(length=limit)
+            total = await cached_count(db[LEADS_COLLECTION], filter_query)
+            return leads, total
+        
         skip = (page - 1) * limit
-        cursor = db[LEADS_COLLECTION].find(
+        find_cursor = db[LEADS_COLLECTION].find(
             filter_query,
             {"_id": 0}
-        ).sort([("created_at", -1)]).skip(skip).limit(limit)
+        ).sort(keyset_sort("created_at", "lead_id")).skip(skip).limit(limit)
         
-        leads = await cursor.to_list(length=limit)
+        leads = await find_cursor.to_list(length=limit)
         total = await db[LEADS_COLLECTION].count_documents(filter_query)
         
         return leads, total
@@ -0,0 +1,95 @@
+"""
+Distributed leader lock (MongoDB) so scheduled jobs run on exactly one process across replicas.
+
+One document per lock in scheduled_jobs_lock: {_id: name, owner, expires_at, acquired_at, renewed_at}.
+acquire() is a single conditional upsert: it succeeds when the lock is free, expired, or already
+ours; otherwise the upsert collides on _id (DuplicateKeyError) and we are a follower. The holder
+renews every ttl/3; a crashed leader is replaced after at most ttl seconds.
+(The lock lives next to the APScheduler job store, not inside scheduled_jobs: the job store
+deletes any document it cannot unpickle as a job.)
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+LOCK_COLLECTION = "scheduled_jobs_lock"
+SCHEDULER_LOCK_NAME = "scheduled_jobs"
+DEFAULT_LOCK_TTL_SECONDS = 30
+
+
+def default_owner_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLock:
+    def __init__(self, db, name: str = SCHEDULER_LOCK_NAME, ttl_seconds: int = DEFAULT_LOCK_TTL_SECONDS,
+                 owner_id: Optional[str] = None):
+        self.db = db
+        self.name = name
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner_id = owner_id or default_owner_id()
+        self.is_leader = False
+
+    @property
+    def renew_interval_seconds(self) -> float:
+        return max(1.0, self.ttl.total_seconds() / 3)
+
+    async def acquire(self, now: Optional[datetime] = None) -> bool:
+        """Acquire or renew the lock. Returns True while this process is the leader."""
+        now = now or datetime.now(timezone.utc)
+        update: Dict[str, Any] = {
+            "$set": {"owner": self.owner_id, "expires_at": now + self.ttl, "renewed_at": now},
+            "$setOnInsert": {"acquired_at": now},
+        }
+        try:
+            doc = await self.db[LOCK_COLLECTION].find_one_and_update(
+                {"_id": self.name, "$or": [{"owner": self.owner_id}, {"expires_at": {"$lte": now}}]},
+                update,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            leader = bool(doc) and doc.get("owner") == self.owner_id
+        except DuplicateKeyError:
+            leader = False
+        except Exception as e:
+            # Cannot prove we still hold it: step down rather than risk two leaders
+            logger.warning("Leader lock %s: acquire failed (%s); acting as follower", self.name, e)
+            leader = False
+        if leader != self.is_leader:
+            logger.info("Leader lock %s: %s (%s)", self.name, "acquired" if leader else "lost", self.owner_id)
+        self.is_leader = leader
+        return leader
+
+    async def release(self) -> None:
+        """Give up the lock (on shutdown) so a standby takes over without waiting for expiry."""
+        if not self.is_leader:
+            return
+        try:
+            await self.db[LOCK_COLLECTION].delete_one({"_id": self.name, "owner": self.owner_id})
+        except Exception as e:
+            logger.warning("Leader lock %s: release failed: %s", self.name, e)
+        self.is_leader = False
+
+
+async def get_lock_status(db, name: str = SCHEDULER_LOCK_NAME) -> Optional[Dict[str, Any]]:
+    """Current holder of a lock (for admin job status)."""
+    doc = await db[LOCK_COLLECTION].find_one({"_id": name})
+    if not doc:
+        return None
+    expires_at = doc.get("expires_at")
+    if expires_at is not None and expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return {
+        "owner": doc.get("owner"),
+        "acquired_at": doc.get("acquired_at").isoformat() if doc.get("acquired_at") else None,
+        "expires_at": expires_at.isoformat() if expires_at else None,
+        "active": bool(expires_at and expires_at > datetime.now(timezone.utc)),
+    }
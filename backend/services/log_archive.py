@@ -0,0 +1,400 @@
+"""
+Hot/cold archival for message_logs and audit_logs.
+
+Both collections take several inserts per user action and notification and carry many secondary
+indexes, so they are kept "hot" only for a configurable age (MESSAGE_LOGS_HOT_DAYS,
+AUDIT_LOGS_HOT_DAYS). The nightly log_archival job moves older rows to compressed segment files
+on local storage (LOG_ARCHIVE_DIR, a shared volume like DOCUMENT_STORAGE_PATH) and deletes them:
+
+- <collection>/<YYYY-MM>/<first-day>_<id>.ndjson.gz: rows of one month, one gzip member per
+  (client_id, day) block (utils.ndjson_archive, datetimes round-trip as datetimes);
+- a sidecar <...>.idx.json next to it: one entry per block (client_id, date, byte offset, length,
+  count, first/last time). It is written after the segment, so a segment without a sidecar is
+  an interrupted write and is ignored.
+
+Each batch is journalled (log_archive_batches: its row _ids, and whether its segments are
+complete) before anything is written, and the entry is removed once the rows are deleted. The
+next run finishes an interrupted batch first: segments of a batch that never completed are
+removed (its rows are still hot), rows of a completed batch are deleted from the hot collection.
+So no row is ever archived twice, and sidecar counts are exact.
+
+Readers use find_logs() / count_logs() for both tiers: the hot collection is read first (newest
+rows), then archived blocks selected from the sidecars by client_id and day are decompressed
+individually and matched with the same filter, so pagination (keyset cursor or skip) and totals
+carry on across the boundary. Archived totals are kept in the short-lived count cache
+(utils.pagination) unless the sidecar block counts answer the query directly.
+
+Metrics: log_archived_rows{collection}, plus hot-collection documents / data and index bytes and
+archive segments / bytes at scrape time; archive_stats() for admin observability.
+"""
+import asyncio
+import heapq
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import database
+from utils.metrics import LOG_ARCHIVED_ROWS, REGISTRY, family
+from utils.ndjson_archive import decode_rows, encode_rows, match_query
+from utils.pagination import cached_count, count_cache, decode_cursor, keyset_filter, keyset_sort
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.getenv("DATA_DIR", "/tmp")
+LOG_ARCHIVE_DIR = Path(os.environ.get("LOG_ARCHIVE_DIR", str(Path(DATA_DIR) / "archive" / "logs")))
+LOG_ARCHIVE_BATCH = 5000
+# Write-ahead entries for batches in flight: {_id: batch_id, collection, ids, segments_complete}
+ARCHIVE_BATCHES_COLLECTION = "log_archive_batches"
+
+
+def _env_days(name: str, default: int) -> int:
+    value = (os.environ.get(name) or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else default
+
+
+@dataclass(frozen=True)
+class LogCollection:
+    name: str
+    time_field: str
+    id_field: str
+    hot_days: int
+
+
+LOG_COLLECTIONS: Dict[str, LogCollection] = {c.name: c for c in (
+    LogCollection("message_logs", "created_at", "message_id", _env_days("MESSAGE_LOGS_HOT_DAYS", 90)),
+    LogCollection("audit_logs", "timestamp", "audit_id", _env_days("AUDIT_LOGS_HOT_DAYS", 180)),
+)}
+
+
+def _time_key(value: Any) -> str:
+    """Sortable UTC string for a stored time (datetimes and ISO strings both occur)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return value
+    if isinstance(value, datetime):
+        return (value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value).isoformat()
+    return ""
+
+
+def _row_key(spec: LogCollection, row: Dict[str, Any]) -> Tuple[str, str]:
+    return _time_key(row.get(spec.time_field)), str(row.get(spec.id_field) or "")
+
+
+# ---- Writing segments ----------------------------------------------------------------------
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _write_segment(spec: LogCollection, rows: List[Dict[str, Any]], batch_id: str) -> Dict[str, Any]:
+    """Write one month's rows as a segment plus its sidecar index; returns the sidecar."""
+    rows = sorted(rows, key=lambda r: _row_key(spec, r))
+    first_at, last_at = _row_key(spec, rows[0])[0], _row_key(spec, rows[-1])[0]
+    directory = LOG_ARCHIVE_DIR / spec.name / first_at[:7]
+    directory.mkdir(parents=True, exist_ok=True)
+    # The batch id in the name lets an interrupted batch's files be found and removed
+    stem = f"{first_at[:10]}_{batch_id}"
+    groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    for row in rows:
+        row = {k: v for k, v in row.items() if k != "_id"}
+        groups.setdefault((row.get("client_id") or "", _time_key(row.get(spec.time_field))[:10]), []).append(row)
+    blocks, chunks, offset = [], [], 0
+    for (client_id, day), group in sorted(groups.items()):
+        data = encode_rows(group, typed_dates=True)
+        blocks.append({
+            "client_id": client_id or None,
+            "date": day,
+            "offset": offset,
+            "length": len(data),
+            "count": len(group),
+            "first_at": _row_key(spec, group[0])[0],
+            "last_at": _row_key(spec, group[-1])[0],
+        })
+        chunks.append(data)
+        offset += len(data)
+    _write_atomic(directory / f"{stem}.ndjson.gz", b"".join(chunks))
+    sidecar = {
+        "collection": spec.name,
+        "segment": f"{stem}.ndjson.gz",
+        "count": len(rows),
+        "bytes": offset,
+        "first_at": first_at,
+        "last_at": last_at,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "blocks": blocks,
+    }
+    _write_atomic(directory / f"{stem}.idx.json", json.dumps(sidecar, separators=(",", ":")).encode("utf-8"))
+    return sidecar
+
+
+def _remove_batch_files(spec: LogCollection, batch_id: str) -> int:
+    removed = 0
+    for path in (LOG_ARCHIVE_DIR / spec.name).glob(f"*/*_{batch_id}.*"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+async def _recover_batches(db, spec: LogCollection) -> None:
+    """Finish batches a previous run left in flight (see module docstring)."""
+    pending = await db[ARCHIVE_BATCHES_COLLECTION].find({"collection": spec.name}).to_list(None)
+    for batch in pending:
+        if batch.get("segments_complete"):
+            await db[spec.name].delete_many({"_id": {"$in": batch["ids"]}})
+            logger.info("Log archive: finished interrupted batch %s of %s", batch["_id"], spec.name)
+        else:
+            removed = await asyncio.to_thread(_remove_batch_files, spec, batch["_id"])
+            logger.info("Log archive: discarded %s file(s) of incomplete batch %s of %s", removed, batch["_id"], spec.name)
+        await db[ARCHIVE_BATCHES_COLLECTION].delete_one({"_id": batch["_id"]})
+
+
+async def archive_collection(spec: LogCollection, now: Optional[datetime] = None, db=None) -> int:
+    """Move rows older than spec.hot_days to segments; returns rows archived."""
+    db = db if db is not None else database.get_db()
+    await _recover_batches(db, spec)
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=spec.hot_days)
+    # Times are stored as dates by some writers and ISO strings by others
+    query = {"$or": [{spec.time_field: {"$lt": cutoff}}, {spec.time_field: {"$lt": cutoff.isoformat()}}]}
+    archived = 0
+    while True:
+        rows = await db[spec.name].find(query).sort("_id", 1).limit(LOG_ARCHIVE_BATCH).to_list(LOG_ARCHIVE_BATCH)
+        if not rows:
+            break
+        batch_id = uuid.uuid4().hex[:12]
+        ids = [r["_id"] for r in rows]
+        batches = db[ARCHIVE_BATCHES_COLLECTION]
+        await batches.insert_one({"_id": batch_id, "collection": spec.name, "ids": ids, "segments_complete": False,
+                                  "created_at": datetime.now(timezone.utc)})
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_month.setdefault(_time_key(row.get(spec.time_field))[:7], []).append(row)
+        for month_rows in by_month.values():
+            await asyncio.to_thread(_write_segment, spec, month_rows, batch_id)
+        await batches.update_one({"_id": batch_id}, {"$set": {"segments_complete": True}})
+        await db[spec.name].delete_many({"_id": {"$in": ids}})
+        await batches.delete_one({"_id": batch_id})
+        archived += len(rows)
+        LOG_ARCHIVED_ROWS.inc(spec.name, amount=len(rows))
+        if len(rows) < LOG_ARCHIVE_BATCH:
+            break
+    return archived
+
+
+async def run_log_archival() -> Dict[str, int]:
+    results = {}
+    for spec in LOG_COLLECTIONS.values():
+        results[spec.name] = await archive_collection(spec)
+    logger.info("Log archival: %s", results)
+    return results
+
+
+# ---- Reading segments ----------------------------------------------------------------------
+
+# Sidecars never change once written: cache parsed ones by path (and mtime, in case of restore)
+_SIDECAR_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _sidecars(spec: LogCollection, first_day: Optional[str] = None, last_day: Optional[str] = None) -> List[Tuple[Path, Dict[str, Any]]]:
+    root = LOG_ARCHIVE_DIR / spec.name
+    if not root.is_dir():
+        return []
+    found = []
+    for month_dir in sorted(root.iterdir()):
+        month = month_dir.name
+        if (first_day and month < first_day[:7]) or (last_day and month > last_day[:7]):
+            continue
+        for path in month_dir.glob("*.idx.json"):
+            try:
+                mtime = path.stat().st_mtime
+                cached = _SIDECAR_CACHE.get(str(path))
+                if cached is None or cached[0] != mtime:
+                    cached = (mtime, json.loads(path.read_bytes()))
+                    _SIDECAR_CACHE[str(path)] = cached
+                found.append((path.with_name(cached[1]["segment"]), cached[1]))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Log archive: unreadable sidecar %s: %s", path, e)
+    return found
+
+
+def _bounds(spec: LogCollection, query: Dict[str, Any], cursor: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """(client_id, first day, last day) a query can touch; None means unbounded."""
+    client_id = query.get("client_id") if isinstance(query.get("client_id"), str) else None
+    lower = upper = None
+    condition = query.get(spec.time_field)
+    if isinstance(condition, dict):
+        for op in ("$gte", "$gt"):
+            if op in condition:
+                lower = _time_key(condition[op])[:10] or None
+        for op in ("$lte", "$lt"):
+            if op in condition:
+                upper = _time_key(condition[op])[:10] or None
+    if cursor:
+        sort_value = _time_key(decode_cursor(cursor)[0])[:10] or None
+        upper = min(upper, sort_value) if upper and sort_value else (upper or sort_value)
+    return client_id, lower, upper
+
+
+def _blocks(spec: LogCollection, query: Dict[str, Any], cursor: Optional[str] = None) -> List[Tuple[Path, Dict[str, Any]]]:
+    client_id, lower, upper = _bounds(spec, query, cursor)
+    selected = []
+    for segment, sidecar in _sidecars(spec, lower, upper):
+        for block in sidecar["blocks"]:
+            if client_id is not None and block["client_id"] != client_id:
+                continue
+            if (lower and block["date"] < lower) or (upper and block["date"] > upper):
+                continue
+            selected.append((segment, block))
+    return selected
+
+
+def _read_block(segment: Path, block: Dict[str, Any]) -> List[Dict[str, Any]]:
+    with open(segment, "rb") as fh:
+        fh.seek(block["offset"])
+        return decode_rows(fh.read(block["length"]))
+
+
+def _project(row: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    included = [k for k, v in (projection or {}).items() if v and k != "_id"]
+    return {k: row[k] for k in included if k in row} if included else row
+
+
+def _scan(spec: LogCollection, query: Dict[str, Any], cursor: Optional[str], need: Optional[int]) -> List[Dict[str, Any]]:
+    """Archived rows matching query (keyset cursor applied), newest first; at least need of them if set."""
+    matched = keyset_filter(query, cursor, spec.time_field, spec.id_field) if cursor else query
+    rows: Dict[str, Dict[str, Any]] = {}
+    blocks = sorted(_blocks(spec, query, cursor), key=lambda b: b[1]["last_at"], reverse=True)
+    for i, (segment, block) in enumerate(blocks):
+        try:
+            for row in _read_block(segment, block):
+                if match_query(row, matched):
+                    rows[str(row.get(spec.id_field) or id(row))] = row
+        except OSError as e:
+            logger.warning("Log archive: unreadable segment %s: %s", segment, e)
+        if need and len(rows) >= need and i + 1 < len(blocks):
+            # Stop once no remaining block can hold a row newer than the need-th newest so far
+            nth = heapq.nlargest(need, (_row_key(spec, r)[0] for r in rows.values()))[-1]
+            if blocks[i + 1][1]["last_at"] < nth:
+                break
+    return sorted(rows.values(), key=lambda r: _row_key(spec, r), reverse=True)
+
+
+# ---- Unified reads -------------------------------------------------------------------------
+
+async def find_logs(
+    collection: str,
+    query: Dict[str, Any],
+    *,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rows matching query across the hot collection and the archive, newest first by
+    (time_field, id_field). cursor is a keyset cursor (utils.pagination) as the admin list
+    endpoints use; skip is the legacy offset.
+    """
+    spec = LOG_COLLECTIONS[collection]
+    db = database.get_db()
+    hot_query = keyset_filter(query, cursor, spec.time_field, spec.id_field) if cursor else query
+    hot = db[collection].find(hot_query, projection or {"_id": 0}).sort(keyset_sort(spec.time_field, spec.id_field))
+    if skip:
+        hot = hot.skip(skip)
+    items = await hot.limit(limit).to_list(limit)
+    if len(items) >= limit:
+        return items
+    cold_skip = 0
+    if skip and not items:
+        cold_skip = max(0, skip - await db[collection].count_documents(query))
+    need = cold_skip + limit - len(items)
+    cold = await asyncio.to_thread(_scan, spec, query, cursor, need)
+    return items + [_project(r, projection) for r in cold[cold_skip:need]]
+
+
+async def count_logs(collection: str, query: Dict[str, Any], cached: bool = False) -> int:
+    """
+    Hot plus archived total for query; cached=True also takes the hot count from the short-lived
+    count cache (cursor mode). Archived totals that need decompressing blocks are always cached:
+    the archive only changes when the archival job runs.
+    """
+    spec = LOG_COLLECTIONS[collection]
+    db = database.get_db()
+
+    async def _scanned() -> int:
+        return len(await asyncio.to_thread(_scan, spec, query, None, None))
+
+    if set(query) <= {"client_id"}:
+        # Answered by the sidecar block counts alone
+        cold = sum(b["count"] for _, b in await asyncio.to_thread(_blocks, spec, query))
+    else:
+        cold = await count_cache.get_or_compute(f"{collection}:archive", query, _scanned)
+    hot = await cached_count(db[collection], query) if cached else await db[collection].count_documents(query)
+    return hot + cold
+
+
+# ---- Size and stats ------------------------------------------------------------------------
+
+def _archive_totals(spec: LogCollection) -> Dict[str, Any]:
+    sidecars = [s for _, s in _sidecars(spec)]
+    return {
+        "segments": len(sidecars),
+        "rows": sum(s["count"] for s in sidecars),
+        "bytes": sum(s["bytes"] for s in sidecars),
+        "oldest_at": min((s["first_at"] for s in sidecars), default=None),
+        "newest_at": max((s["last_at"] for s in sidecars), default=None),
+    }
+
+
+async def _hot_stats(db, spec: LogCollection) -> Dict[str, Any]:
+    stats = {"documents": await db[spec.name].estimated_document_count(), "data_bytes": None, "index_bytes": None}
+    try:
+        coll_stats = await db.command("collStats", spec.name)
+        stats["data_bytes"] = coll_stats.get("size")
+        stats["index_bytes"] = coll_stats.get("totalIndexSize")
+    except Exception as e:
+        logger.debug("collStats unavailable for %s: %s", spec.name, e)
+    return stats
+
+
+async def archive_stats() -> Dict[str, Any]:
+    """Hot collection size and archive totals per collection."""
+    db = database.get_db()
+    collections = {}
+    for spec in LOG_COLLECTIONS.values():
+        collections[spec.name] = {
+            "hot_days": spec.hot_days,
+            "hot": await _hot_stats(db, spec),
+            "archive": await asyncio.to_thread(_archive_totals, spec),
+        }
+    return {"archive_dir": str(LOG_ARCHIVE_DIR), "collections": collections}
+
+
+@REGISTRY.register_collector
+async def collect_log_archive_metrics() -> List[tuple]:
+    db = database.get_db()
+    if db is None:
+        return []
+    hot, archive = [], []
+    for spec in LOG_COLLECTIONS.values():
+        hot.append((spec.name, await _hot_stats(db, spec)))
+        archive.append((spec.name, await asyncio.to_thread(_archive_totals, spec)))
+    return [
+        family("log_hot_documents", "gauge", "Documents in the hot log collection",
+               [({"collection": name}, s["documents"]) for name, s in hot]),
+        family("log_hot_bytes", "gauge", "Hot log collection size (data and index bytes)",
+               [({"collection": name, "kind": kind}, s[f"{kind}_bytes"]) for name, s in hot
+                for kind in ("data", "index") if s[f"{kind}_bytes"] is not None]),
+        family("log_archive_segments", "gauge", "Archived log segments on local storage",
+               [({"collection": name}, a["segments"]) for name, a in archive]),
+        family("log_archive_bytes", "gauge", "Compressed bytes of archived log segments",
+               [({"collection": name}, a["bytes"]) for name, a in archive]),
+    ]
@@ -16,6 +16,7 @@ from typing import Any, Dict, Optional, Tuple
 from database import database
 from models import AuditAction
 from utils.audit import create_audit_log
+from utils.metrics import EMAIL_PROVIDER_SECONDS, time_call
 
 logger = logging.getLogger(__name__)
 
@@ -534,7 +535,8 @@ class NotificationOrchestrator:
                     {"Name": a.get("Name", "file"), "Content": a.get("Content"), "ContentType": a.get("ContentType", "application/octet-stream")}
                     for a in attachments if a.get("Content")
                 ]
-            response = self._postmark_client.emails.send(**send_kw)
+            with time_call(EMAIL_PROVIDER_SECONDS, "postmark"):
+                response = self._postmark_client.emails.send(**send_kw)
             provider_id = response.get("MessageID")
             sent_at = datetime.now(timezone.utc)
             await db.message_logs.update_one(
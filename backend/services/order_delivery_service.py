@@ -66,7 +66,14 @@ class OrderDeliveryService:
             "errors": []
         }
         
+        # Orders waiting in (or held by) the order pipeline are delivered there
+        from services.order_pipeline_queue import active_order_ids
+        in_pipeline = await active_order_ids(db, [o["order_id"] for o in finalising_orders]) if finalising_orders else set()
+        
         for order in finalising_orders:
+            if order["order_id"] in in_pipeline:
+                results["skipped"] += 1
+                continue
             try:
                 result = await self.deliver_order(order["order_id"])
                 results["processed"] += 1
@@ -0,0 +1,321 @@
+"""
+Event-driven order pipeline: work items for orders that need automated advancement, drained by a
+pool of concurrent workers in priority order.
+
+Order status changes into QUEUED (paid / re-queued), DRAFT_READY, REGEN_REQUESTED (regeneration)
+or FINALISING (approval) enqueue the order from order_service.transition_order_state, so generation
+starts as soon as a worker is free instead of on the next 10-minute poll. One document per order in
+order_pipeline_queue ({_id: order_id}) doubles as the per-order lock:
+- claims are leases (find_one_and_update on pending, or running with an expired lease), taken in
+  priority order: queue_priority (priority=10, fast-track=5), then the order's created_at;
+- an event for an order that is already running sets rerun, and the holder requeues it when done;
+- a crashed holder's item is reclaimed when its lease expires (holders renew every lease/3);
+- an item that raises is retried with backoff, then left failed (the sweep re-enqueues it later).
+
+OrderPipelinePool runs ORDER_PIPELINE_CONCURRENCY workers per consuming process (worker.py, or the
+API in embedded scheduler mode). Enqueues in the same process wake it immediately; other processes
+see new items within ORDER_PIPELINE_POLL_SECONDS. The queued_order_processing job is now a sweep
+(sweep_pipeline_orders) that enqueues paid orders that were missed.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import database
+from services.leader_lock import default_owner_id
+from services.order_workflow import OrderStatus
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_COLLECTION = "order_pipeline_queue"
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+# Order statuses with an automated next step (see WorkflowAutomationService.advance_order)
+PIPELINE_STATUSES = (
+    OrderStatus.QUEUED.value,
+    OrderStatus.DRAFT_READY.value,
+    OrderStatus.REGEN_REQUESTED.value,
+    OrderStatus.FINALISING.value,
+)
+
+ITEM_LEASE_SECONDS = 120
+ITEM_MAX_ATTEMPTS = 3
+# Backoff before attempt 2, 3
+ITEM_RETRY_BACKOFF_SECONDS = [30, 120]
+
+# Order being advanced by this task; its own transitions do not re-enqueue it
+current_pipeline_order: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_pipeline_order", default=None,
+)
+
+_local_pools: List["OrderPipelinePool"] = []
+
+
+def order_priority(order: Dict[str, Any]) -> int:
+    """Same ranking as the former poll: queue_priority, then priority, then fast_track."""
+    if order.get("queue_priority") is not None:
+        return int(order["queue_priority"])
+    if order.get("priority"):
+        return 10
+    if order.get("fast_track"):
+        return 5
+    return 0
+
+
+def _is_eligible(order: Dict[str, Any]) -> bool:
+    if not order.get("paid_at"):
+        return False  # test orders without payment are never auto-processed
+    if order.get("status") == OrderStatus.FINALISING.value:
+        return bool(order.get("version_locked")) and order.get("approved_document_version") is not None
+    return order.get("status") in PIPELINE_STATUSES
+
+
+async def enqueue_order(
+    order_id: str,
+    reason: str,
+    order: Optional[Dict[str, Any]] = None,
+    rerun_if_running: bool = True,
+) -> Optional[str]:
+    """
+    Ask the pipeline to advance an order. Returns "enqueued", "rerun" (the order is being processed;
+    it is requeued afterwards), "pending" (already waiting; priority raised if needed) or None when
+    the order has nothing automated to do.
+    """
+    db = database.get_db()
+    if order is None:
+        order = await db.orders.find_one({"order_id": order_id}, {"_id": 0})
+    if not order or not _is_eligible(order):
+        return None
+    now = datetime.now(timezone.utc)
+    priority = order_priority(order)
+    queue = db[PIPELINE_COLLECTION]
+
+    pending = await queue.update_one(
+        {"_id": order_id, "status": ITEM_PENDING},
+        {"$max": {"priority": priority}, "$set": {"reason": reason, "updated_at": now}},
+    )
+    if pending.matched_count:
+        outcome = "pending"
+    else:
+        try:
+            # Never matches a running item: its _id collides instead (DuplicateKeyError)
+            await queue.update_one(
+                {"_id": order_id, "status": {"$in": [ITEM_DONE, ITEM_FAILED]}},
+                {"$set": {
+                    "status": ITEM_PENDING,
+                    "priority": priority,
+                    "order_created_at": order.get("created_at") or now,
+                    "reason": reason,
+                    "attempts": 0,
+                    "rerun": False,
+                    "available_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": None,
+                    "enqueued_at": now,
+                    "updated_at": now,
+                }},
+                upsert=True,
+            )
+            outcome = "enqueued"
+        except DuplicateKeyError:
+            if not rerun_if_running:
+                return "running"
+            await queue.update_one(
+                {"_id": order_id, "status": ITEM_RUNNING},
+                {"$set": {"rerun": True, "reason": reason, "updated_at": now}},
+            )
+            outcome = "rerun"
+    if outcome == "enqueued":
+        for pool in _local_pools:
+            pool.wake()
+    logger.info("Order pipeline: %s %s (reason=%s, priority=%s)", outcome, order_id, reason, priority)
+    return outcome
+
+
+async def claim_item(db, owner_id: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Lease the highest-priority runnable item: pending and due, or running with an expired lease."""
+    now = now or datetime.now(timezone.utc)
+    return await db[PIPELINE_COLLECTION].find_one_and_update(
+        {"$or": [
+            {"status": ITEM_PENDING, "available_at": {"$lte": now}},
+            {"status": ITEM_RUNNING, "lease_expires_at": {"$lte": now}},
+        ]},
+        {
+            "$set": {
+                "status": ITEM_RUNNING,
+                "lease_owner": owner_id,
+                "lease_expires_at": now + timedelta(seconds=ITEM_LEASE_SECONDS),
+                "rerun": False,
+                "started_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("priority", -1), ("order_created_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _renew_lease(db, order_id: str, owner_id: str) -> None:
+    """Heartbeat until cancelled. A failed renewal is logged and retried on the next beat, so one
+    transient error does not let the lease expire under an order that is still advancing."""
+    while True:
+        await asyncio.sleep(ITEM_LEASE_SECONDS / 3)
+        try:
+            await db[PIPELINE_COLLECTION].update_one(
+                {"_id": order_id, "lease_owner": owner_id},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=ITEM_LEASE_SECONDS)}},
+            )
+        except Exception as e:
+            logger.warning("Order pipeline: lease renewal for %s failed: %s", order_id, e)
+
+
+async def run_claimed_item(db, item: Dict[str, Any], owner_id: str) -> Optional[Dict[str, Any]]:
+    """Advance the leased order and record the outcome. Returns the workflow result, if any."""
+    from services.workflow_automation_service import workflow_automation_service
+
+    order_id = item["_id"]
+    attempts = item.get("attempts", 1)
+    error: Optional[str] = None
+    result = None
+    if attempts > ITEM_MAX_ATTEMPTS:
+        error = "Lease expired on every attempt"
+    else:
+        token = current_pipeline_order.set(order_id)
+        heartbeat = asyncio.create_task(_renew_lease(db, order_id, owner_id))
+        try:
+            order = await db.orders.find_one({"order_id": order_id}, {"_id": 0})
+            if order and _is_eligible(order):
+                result = await workflow_automation_service.advance_order(order)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("Order pipeline: %s failed (attempt %s)", order_id, attempts)
+        finally:
+            heartbeat.cancel()
+            current_pipeline_order.reset(token)
+
+    now = datetime.now(timezone.utc)
+    if error is None:
+        update = {"status": ITEM_DONE, "finished_at": now, "last_error": None,
+                  "last_result": (result or {}).get("status")}
+    elif attempts >= ITEM_MAX_ATTEMPTS:
+        update = {"status": ITEM_FAILED, "finished_at": now, "last_error": error}
+    else:
+        backoff = ITEM_RETRY_BACKOFF_SECONDS[min(attempts, len(ITEM_RETRY_BACKOFF_SECONDS)) - 1]
+        update = {"status": ITEM_PENDING, "available_at": now + timedelta(seconds=backoff), "last_error": error}
+    update.update({"lease_owner": None, "lease_expires_at": None, "updated_at": now})
+    recorded = await db[PIPELINE_COLLECTION].find_one_and_update(
+        {"_id": order_id, "lease_owner": owner_id},
+        {"$set": update},
+        projection={"rerun": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if recorded is None:
+        logger.warning("Order pipeline: lease on %s lost before completion; outcome not recorded", order_id)
+    elif recorded.get("rerun") and update["status"] != ITEM_PENDING:
+        # Another event arrived while we held the order
+        await enqueue_order(order_id, reason="rerun", rerun_if_running=False)
+    return result
+
+
+async def sweep_pipeline_orders(limit: int = 200) -> Dict[str, int]:
+    """Enqueue paid orders awaiting an automated step that have no waiting or running item."""
+    db = database.get_db()
+    orders = await db.orders.find(
+        {"status": {"$in": list(PIPELINE_STATUSES)}, "paid_at": {"$exists": True, "$ne": None}},
+        {"_id": 0, "order_id": 1, "status": 1, "paid_at": 1, "created_at": 1, "queue_priority": 1,
+         "priority": 1, "fast_track": 1, "version_locked": 1, "approved_document_version": 1},
+    ).sort([("queue_priority", -1), ("created_at", 1)]).limit(limit).to_list(length=limit)
+    counts = {"orders": len(orders), "enqueued": 0, "already_queued": 0}
+    for order in orders:
+        outcome = await enqueue_order(order["order_id"], reason="sweep", order=order, rerun_if_running=False)
+        if outcome == "enqueued":
+            counts["enqueued"] += 1
+        elif outcome in ("pending", "running"):
+            counts["already_queued"] += 1
+    return counts
+
+
+async def active_order_ids(db, order_ids: List[str]) -> set:
+    """Orders among order_ids with a waiting or running pipeline item."""
+    docs = await db[PIPELINE_COLLECTION].find(
+        {"_id": {"$in": order_ids}, "status": {"$in": [ITEM_PENDING, ITEM_RUNNING]}}, {"_id": 1},
+    ).to_list(length=len(order_ids))
+    return {d["_id"] for d in docs}
+
+
+def default_concurrency() -> int:
+    value = (os.environ.get("ORDER_PIPELINE_CONCURRENCY") or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else 4
+
+
+def default_poll_seconds() -> float:
+    try:
+        return max(0.1, float(os.environ.get("ORDER_PIPELINE_POLL_SECONDS") or 2))
+    except ValueError:
+        return 2.0
+
+
+class OrderPipelinePool:
+    """N concurrent pipeline workers in this process; each claims one order at a time."""
+
+    def __init__(self, concurrency: Optional[int] = None, owner_id: Optional[str] = None,
+                 poll_seconds: Optional[float] = None):
+        self.concurrency = concurrency or default_concurrency()
+        self.owner_id = owner_id or default_owner_id()
+        self.poll_seconds = poll_seconds or default_poll_seconds()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def run_once(self) -> bool:
+        db = database.get_db()
+        item = await claim_item(db, self.owner_id)
+        if not item:
+            return False
+        await run_claimed_item(db, item, self.owner_id)
+        return True
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            # Cleared before claiming so an enqueue during the claim still wakes us
+            self._wake.clear()
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                logger.warning("Order pipeline worker round failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        _local_pools.append(self)
+        logger.info("Order pipeline: %s worker(s) started (%s)", self.concurrency, self.owner_id)
+
+    async def stop(self, grace_seconds: float = 30) -> None:
+        """Let in-flight orders finish (a cancelled one is reclaimed after its lease expires)."""
+        self._stopping.set()
+        self._wake.set()
+        if self in _local_pools:
+            _local_pools.remove(self)
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
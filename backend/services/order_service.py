@@ -10,6 +10,7 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
 from database import database
+from utils.pagination import cached_count, keyset_filter, keyset_sort, next_cursor_for
 from services.order_workflow import (
     OrderStatus, TransitionType, 
     is_valid_transition, requires_admin_action, 
@@ -225,9 +226,25 @@ async def transition_order_state(
     
     # Fetch and return updated order
     updated_order = await db.orders.find_one({"order_id": order_id}, {"_id": 0})
+    
+    # Statuses with an automated next step go straight to the order pipeline workers
+    await _enqueue_for_pipeline(order_id, new_status, updated_order)
     return updated_order
 
 
+async def _enqueue_for_pipeline(order_id: str, new_status: OrderStatus, order: Optional[Dict]) -> None:
+    from services.order_pipeline_queue import PIPELINE_STATUSES, current_pipeline_order, enqueue_order
+    
+    # A pipeline worker advancing this order runs the follow-up steps itself
+    if new_status.value not in PIPELINE_STATUSES or current_pipeline_order.get() == order_id:
+        return
+    try:
+        await enqueue_order(order_id, reason=new_status.value, order=order)
+    except Exception as e:
+        # The queued_order_processing sweep picks the order up later
+        logger.warning(f"Order pipeline enqueue failed for {order_id}: {e}")
+
+
 async def create_workflow_execution(
     order_id: str,
     previous_state: Optional[str],
@@ -405,10 +422,13 @@ async def get_orders_for_pipeline(
     status_filter: Optional[str] = None,
     limit: int = 50,
     skip: int = 0,
+    cursor: Optional[str] = None,
 ) -> Dict:
     """
     Get orders grouped by status for pipeline view.
     Returns dict with orders grouped by status and total counts.
+    When cursor is given (next_cursor from a previous page, or "" for the first page),
+    uses keyset pagination on (created_at, order_id) and a cached total; skip is legacy.
     """
     db = database.get_db()
     
@@ -418,17 +438,26 @@ async def get_orders_for_pipeline(
         query["status"] = status_filter
     
     # Get orders
-    cursor = db.orders.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit)
-    orders = await cursor.to_list(length=None)
+    if cursor is not None:
+        find_cursor = db.orders.find(
+            keyset_filter(query, cursor, "created_at", "order_id"), {"_id": 0}
+        ).sort(keyset_sort("created_at", "order_id")).limit(limit)
+    else:
+        find_cursor = db.orders.find(query, {"_id": 0}).sort(keyset_sort("created_at", "order_id")).skip(skip).limit(limit)
+    orders = await find_cursor.to_list(length=None)
     
     # Get total counts
-    total = await db.orders.count_documents(query)
+    if cursor is not None:
+        total = await cached_count(db.orders, query)
+    else:
+        total = await db.orders.count_documents(query)
     counts = await get_pipeline_counts()
     
     return {
         "orders": orders,
         "total": total,
         "counts": counts,
+        "next_cursor": next_cursor_for(orders, limit, "created_at", "order_id"),
     }
 
 
@@ -0,0 +1,384 @@
+"""
+Hash-partitioned execution of per-client batch jobs across worker processes.
+
+A partitioned job run (daily reminders, monthly digest, compliance status check, score snapshots,
+predictive insights) is split into N shards; shard i owns the clients with
+crc32(client_id) % N == i. Shards are documents in job_shards and are claimed through leases:
+- the coordinator (the scheduler leader running the job) creates the shards, then claims and runs
+  shards itself until none are left, aggregating progress into its job_runs record
+  (metadata.shards, affected_clients_count);
+- every worker.py process runs a ShardWorker that claims shards of any run, so wall time drops
+  with worker count;
+- a shard whose holder dies is reclaimed when its lease expires (holders renew every lease/3);
+- a failing shard is retried with backoff (SHARD_MAX_ATTEMPTS) without rerunning the others;
+  retry_failed_shards() requeues shards that exhausted their attempts;
+- a retried shard does not repeat per-client side effects (emails, SMS): loops that iterate
+  checkpointed(clients, shard) record each finished client on the shard document (done_clients),
+  and filter_clients() skips them on the next attempt. Idempotent steps (upserted snapshots,
+  retention, cached insights) need no checkpoints.
+
+Shard functions receive a Shard and must raise on failure (so the shard is retried).
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from database import database
+from services.leader_lock import default_owner_id
+
+logger = logging.getLogger(__name__)
+
+SHARDS_COLLECTION = "job_shards"
+
+SHARD_PENDING = "pending"
+SHARD_RUNNING = "running"
+SHARD_DONE = "done"
+SHARD_FAILED = "failed"
+
+SHARD_LEASE_SECONDS = 120
+SHARD_MAX_ATTEMPTS = 3
+# Backoff before attempt 2, 3, ...
+SHARD_RETRY_BACKOFF_SECONDS = [30, 120]
+COORDINATOR_POLL_SECONDS = 5
+COORDINATOR_TIMEOUT_SECONDS = 3 * 3600
+
+# job_runs._id of the instrumented run in progress (set by job_runner.run_instrumented)
+current_job_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_job_run_id", default=None)
+
+
+class ShardsIncomplete(Exception):
+    """Coordinator gave up waiting; remaining shards still finish and update job_runs."""
+
+
+class ShardsFailed(Exception):
+    """At least one shard exhausted its attempts (see job_shards / metadata.shards)."""
+
+
+def default_shard_count() -> int:
+    value = (os.environ.get("JOB_SHARD_COUNT") or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else 4
+
+
+def client_shard(client_id: str, shard_count: int) -> int:
+    """Stable across processes (unlike hash(), which is salted per interpreter)."""
+    return zlib.crc32(str(client_id).encode("utf-8")) % shard_count
+
+
+class Shard(NamedTuple):
+    index: int
+    count: int
+    # job_shards._id, and clients an earlier attempt of this shard already finished
+    shard_id: Optional[str] = None
+    done: FrozenSet[str] = frozenset()
+
+    def owns(self, client_id: str) -> bool:
+        return client_shard(client_id, self.count) == self.index
+
+    def filter_clients(self, clients: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Clients of this shard still to run (those checkpointed by an earlier attempt are skipped)."""
+        return [c for c in clients if c.get("client_id") and self.owns(c["client_id"]) and c["client_id"] not in self.done]
+
+    async def checkpoint(self, client_id: str) -> None:
+        if not self.shard_id:
+            return
+        try:
+            await database.get_db()[SHARDS_COLLECTION].update_one(
+                {"_id": self.shard_id}, {"$addToSet": {"done_clients": client_id}}
+            )
+        except Exception as e:
+            # The client's work is done; at worst a retry of this shard repeats it
+            logger.warning("Shard %s: checkpoint for client %s failed: %s", self.shard_id, client_id, e)
+
+    @property
+    def is_first(self) -> bool:
+        """Shard 0 also runs the job's global (non per-client) steps, once per run."""
+        return self.index == 0
+
+
+async def checkpointed(clients: Iterable[Dict[str, Any]], shard: Optional[Shard]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Iterate clients, checkpointing each one on the shard once the loop body has finished with it
+    (including via `continue`). A body that raises leaves its client unrecorded, so the retried
+    shard runs it again. Without a shard this is a plain iteration.
+    """
+    for client in clients:
+        yield client
+        if shard is not None:
+            await shard.checkpoint(client["client_id"])
+
+
+ShardFn = Callable[[Shard], Awaitable[int]]
+
+# job_name -> shard function returning the number of clients affected in that shard
+PARTITIONED_JOBS: Dict[str, ShardFn] = {}
+
+
+def partitioned_job(job_name: str):
+    def register(fn: ShardFn) -> ShardFn:
+        PARTITIONED_JOBS[job_name] = fn
+        return fn
+    return register
+
+
+def _shard_id(job_run_id: str, index: int) -> str:
+    return f"{job_run_id}:{index}"
+
+
+async def create_shards(db, job_name: str, job_run_id: str, shard_count: int) -> int:
+    now = datetime.now(timezone.utc)
+    docs = [
+        {
+            "_id": _shard_id(job_run_id, i),
+            "job_run_id": job_run_id,
+            "job_name": job_name,
+            "shard_index": i,
+            "shard_count": shard_count,
+            "status": SHARD_PENDING,
+            "attempts": 0,
+            "available_at": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "count": None,
+            "last_error": None,
+            "created_at": now,
+        }
+        for i in range(shard_count)
+    ]
+    try:
+        await db[SHARDS_COLLECTION].insert_many(docs, ordered=False)
+    except BulkWriteError:
+        pass  # shards already created for this run (coordinator retried)
+    return shard_count
+
+
+async def claim_shard(db, owner_id: str, *, job_run_id: Optional[str] = None,
+                      job_names: Optional[Iterable[str]] = None, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Lease the next runnable shard: pending and due, or running with an expired lease."""
+    now = now or datetime.now(timezone.utc)
+    query: Dict[str, Any] = {
+        "$or": [
+            {"status": SHARD_PENDING, "available_at": {"$lte": now}},
+            {"status": SHARD_RUNNING, "lease_expires_at": {"$lte": now}},
+        ],
+    }
+    if job_run_id:
+        query["job_run_id"] = job_run_id
+    if job_names is not None:
+        query["job_name"] = {"$in": list(job_names)}
+    return await db[SHARDS_COLLECTION].find_one_and_update(
+        query,
+        {
+            "$set": {
+                "status": SHARD_RUNNING,
+                "lease_owner": owner_id,
+                "lease_expires_at": now + timedelta(seconds=SHARD_LEASE_SECONDS),
+                "started_at": now,
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("available_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _renew_lease(db, shard_id: str, owner_id: str) -> None:
+    """Heartbeat until cancelled. A failed renewal is logged and retried on the next beat, so one
+    transient error does not let the lease expire under a running shard."""
+    while True:
+        await asyncio.sleep(SHARD_LEASE_SECONDS / 3)
+        try:
+            await db[SHARDS_COLLECTION].update_one(
+                {"_id": shard_id, "lease_owner": owner_id},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=SHARD_LEASE_SECONDS)}},
+            )
+        except Exception as e:
+            logger.warning("Shard %s: lease renewal failed: %s", shard_id, e)
+
+
+async def run_claimed_shard(db, shard_doc: Dict[str, Any], owner_id: str) -> bool:
+    """Run a leased shard and record the outcome. Returns True on success."""
+    shard_id = shard_doc["_id"]
+    fn = PARTITIONED_JOBS.get(shard_doc["job_name"])
+    attempts = shard_doc.get("attempts", 1)
+    started = time.monotonic()
+    error: Optional[str] = None
+    count = 0
+    if fn is None:
+        error = f"No partitioned job registered for {shard_doc['job_name']}"
+        attempts = SHARD_MAX_ATTEMPTS
+    elif attempts > SHARD_MAX_ATTEMPTS:
+        # Lease expired repeatedly (holders crashed or hung): stop handing it out
+        error = "Lease expired on every attempt"
+    else:
+        heartbeat = asyncio.create_task(_renew_lease(db, shard_id, owner_id))
+        try:
+            shard = Shard(shard_doc["shard_index"], shard_doc["shard_count"], shard_id,
+                          frozenset(shard_doc.get("done_clients") or ()))
+            count = int(await fn(shard) or 0)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.exception("Shard %s failed (attempt %s)", shard_id, attempts)
+        finally:
+            heartbeat.cancel()
+
+    now = datetime.now(timezone.utc)
+    duration_ms = int((time.monotonic() - started) * 1000)
+    if error is None:
+        update = {"status": SHARD_DONE, "count": count, "finished_at": now, "duration_ms": duration_ms,
+                  "lease_owner": None, "last_error": None}
+    elif attempts >= SHARD_MAX_ATTEMPTS:
+        update = {"status": SHARD_FAILED, "finished_at": now, "duration_ms": duration_ms,
+                  "lease_owner": None, "last_error": error}
+    else:
+        backoff = SHARD_RETRY_BACKOFF_SECONDS[min(attempts, len(SHARD_RETRY_BACKOFF_SECONDS)) - 1]
+        update = {"status": SHARD_PENDING, "available_at": now + timedelta(seconds=backoff),
+                  "lease_owner": None, "last_error": error}
+    result = await db[SHARDS_COLLECTION].update_one({"_id": shard_id, "lease_owner": owner_id}, {"$set": update})
+    if not result.modified_count:
+        logger.warning("Shard %s: lease lost before completion; outcome not recorded", shard_id)
+    await aggregate_job_run(db, shard_doc["job_run_id"])
+    return error is None
+
+
+async def aggregate_job_run(db, job_run_id: str) -> Dict[str, int]:
+    """Roll shard states up into job_runs.metadata.shards (and affected_clients_count when complete)."""
+    summary = {"total": 0, SHARD_PENDING: 0, SHARD_RUNNING: 0, SHARD_DONE: 0, SHARD_FAILED: 0, "count": 0}
+    async for row in db[SHARDS_COLLECTION].aggregate([
+        {"$match": {"job_run_id": job_run_id}},
+        {"$group": {"_id": "$status", "n": {"$sum": 1}, "count": {"$sum": {"$ifNull": ["$count", 0]}}}},
+    ]):
+        summary[row["_id"]] = row["n"]
+        summary["total"] += row["n"]
+        summary["count"] += row["count"]
+    summary["remaining"] = summary[SHARD_PENDING] + summary[SHARD_RUNNING]
+
+    from bson import ObjectId
+    from services.job_run_service import COLLECTION as JOB_RUNS, STATUS_FAILED, STATUS_SUCCESS
+    try:
+        oid = ObjectId(job_run_id)
+    except Exception:
+        return summary  # ad-hoc run without a job_runs record
+    update: Dict[str, Any] = {"metadata.shards": summary}
+    if summary["remaining"] == 0:
+        update["affected_clients_count"] = summary["count"]
+    await db[JOB_RUNS].update_one({"_id": oid}, {"$set": update})
+    if summary["remaining"] == 0 and summary[SHARD_FAILED] == 0:
+        # Shards that finished after the coordinator gave up (or after retry_failed_shards)
+        await db[JOB_RUNS].update_one(
+            {"_id": oid, "status": STATUS_FAILED, "error_code": {"$in": [ShardsIncomplete.__name__, ShardsFailed.__name__]}},
+            {"$set": {"status": STATUS_SUCCESS, "error_code": None, "error_message": None, "stack_trace": None,
+                      "finished_at": datetime.now(timezone.utc).isoformat()}},
+        )
+    return summary
+
+
+async def run_partitioned(job_name: str, shard_count: Optional[int] = None, *,
+                          job_run_id: Optional[str] = None, owner_id: Optional[str] = None,
+                          timeout_seconds: float = COORDINATOR_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """
+    Coordinator: create shards for this run, work through them alongside any ShardWorkers,
+    and return the aggregate. Raises ShardsFailed / ShardsIncomplete so the job run is marked failed.
+    """
+    if job_name not in PARTITIONED_JOBS:
+        raise ValueError(f"Unknown partitioned job: {job_name}")
+    db = database.get_db()
+    shard_count = shard_count or default_shard_count()
+    job_run_id = job_run_id or current_job_run_id.get() or f"adhoc-{job_name}-{int(time.time())}"
+    owner_id = owner_id or default_owner_id()
+    await create_shards(db, job_name, job_run_id, shard_count)
+    summary = await aggregate_job_run(db, job_run_id)
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        shard_doc = await claim_shard(db, owner_id, job_run_id=job_run_id)
+        if shard_doc:
+            await run_claimed_shard(db, shard_doc, owner_id)
+            continue
+        summary = await aggregate_job_run(db, job_run_id)
+        if summary["remaining"] == 0:
+            break
+        if time.monotonic() >= deadline:
+            raise ShardsIncomplete(f"{summary['remaining']} of {shard_count} shard(s) still pending/running")
+        # Other workers hold the remaining leases, or a failed shard is waiting out its backoff
+        await asyncio.sleep(COORDINATOR_POLL_SECONDS)
+    if summary[SHARD_FAILED]:
+        raise ShardsFailed(f"{summary[SHARD_FAILED]} of {shard_count} shard(s) failed")
+    return {"count": summary["count"], "shards": shard_count}
+
+
+async def retry_failed_shards(job_run_id: str) -> int:
+    """
+    Requeue shards that exhausted their attempts; ShardWorkers (or drain_job_run) pick them up.
+    Checkpointed clients (done_clients) are kept, so they are not run again.
+    """
+    db = database.get_db()
+    result = await db[SHARDS_COLLECTION].update_many(
+        {"job_run_id": job_run_id, "status": SHARD_FAILED},
+        {"$set": {"status": SHARD_PENDING, "attempts": 0, "available_at": datetime.now(timezone.utc)}},
+    )
+    if result.modified_count:
+        await aggregate_job_run(db, job_run_id)
+    return result.modified_count
+
+
+async def drain_job_run(job_run_id: str, owner_id: Optional[str] = None) -> int:
+    """Run the runnable shards of one job run in this process (used when no ShardWorker is running)."""
+    db = database.get_db()
+    owner_id = owner_id or default_owner_id()
+    processed = 0
+    while True:
+        shard_doc = await claim_shard(db, owner_id, job_run_id=job_run_id, job_names=PARTITIONED_JOBS)
+        if not shard_doc:
+            return processed
+        await run_claimed_shard(db, shard_doc, owner_id)
+        processed += 1
+
+
+class ShardWorker:
+    """Claims shards of any partitioned job run (one loop per worker.py process, independent of leadership)."""
+
+    def __init__(self, owner_id: Optional[str] = None, poll_seconds: float = COORDINATOR_POLL_SECONDS):
+        self.owner_id = owner_id or default_owner_id()
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> bool:
+        db = database.get_db()
+        shard_doc = await claim_shard(db, self.owner_id, job_names=PARTITIONED_JOBS)
+        if not shard_doc:
+            return False
+        await run_claimed_shard(db, shard_doc, self.owner_id)
+        return True
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                logger.warning("Shard worker round failed: %s", e)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self, grace_seconds: float = 30) -> None:
+        """Let the current shard finish (a cancelled shard would be rerun in full by another worker)."""
+        self._stopping.set()
+        if not self._task:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout=grace_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+            pass
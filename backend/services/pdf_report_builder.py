@@ -16,6 +16,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import io
 
 PDF_FOOTER_DISCLAIMER = "This report does not constitute legal advice."
+# Part of the artifact cache key (services.report_service); bump when a report layout changes
+REPORT_TEMPLATE_VERSION = "2"
 
 
 def _hex_to_rgb(hex_color: str) -> tuple:
@@ -159,7 +161,7 @@ def build_portfolio_report(client_id: str, report_data: dict) -> bytes:
     elements.append(Spacer(1, 80))
     elements.append(Paragraph("Evidence Readiness Report", styles["title"]))
     elements.append(Paragraph(
-        f"{company_name}<br/>CRN: {crn}<br/>Scope: portfolio<br/>Generated: {now.strftime('%d %B %Y at %H:%M UTC')}",
+        f"{company_name}<br/>CRN: {crn}<br/>Scope: portfolio<br/>Generated: {now.strftime('%d %B %Y')}",
         styles["subtitle"],
     ))
     elements.append(Spacer(1, 40))
@@ -281,17 +283,20 @@ def build_score_explanation_report(
     score_payload: dict,
     client_doc: dict,
     branding: dict,
+    generated_at: Optional[datetime] = None,
 ) -> bytes:
     """
     Build Compliance Score Summary (Informational) PDF. Audit-style, branded.
     Sections: cover, portfolio snapshot, what score means, weighting model,
     top drivers, property breakdown, appendix (full drivers). Footer: disclaimer + Pleerity line.
+    generated_at: the date printed on the report (default: now, UTC).
     """
     company_name = client_doc.get("company_name") or client_doc.get("full_name") or "Client"
     crn = client_doc.get("customer_reference") or client_id
-    now = datetime.now(timezone.utc)
-    now_str = now.strftime("%d %B %Y at %H:%M UTC")
-    data_as_of = score_payload.get("score_last_calculated_at") or now.isoformat()
+    now = generated_at or datetime.now(timezone.utc)
+    # Date only: cached copies are reused for the rest of the UTC day (services.report_service)
+    now_str = now.strftime("%d %B %Y")
+    data_as_of = score_payload.get("score_last_calculated_at") or now.date().isoformat()
     if isinstance(data_as_of, str) and len(data_as_of) > 19:
         data_as_of = data_as_of[:19].replace("T", " ")
 
@@ -506,7 +511,7 @@ def build_property_report(client_id: str, property_id: str, report_data: dict) -
     elements.append(Paragraph("Evidence Readiness Report", styles["title"]))
     scope_line = f"Scope: property (Property: {property_id})"
     elements.append(Paragraph(
-        f"{company_name}<br/>CRN: {crn}<br/>{scope_line}<br/>Generated: {now.strftime('%d %B %Y at %H:%M UTC')}",
+        f"{company_name}<br/>CRN: {crn}<br/>{scope_line}<br/>Generated: {now.strftime('%d %B %Y')}",
         styles["subtitle"],
     ))
     elements.append(Spacer(1, 40))
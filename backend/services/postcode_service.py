@@ -0,0 +1,287 @@
+"""
+Postcode Service - cached UK postcode lookup and autocomplete.
+
+Used by the intake wizard (GET /api/intake/postcode-lookup/{postcode} and
+/api/intake/postcode-autocomplete). Sits between the routes and postcodes.io:
+- Lookups and autocomplete results are cached in-process with TTL + LRU eviction.
+- Concurrent identical requests share one in-flight upstream call (request coalescing).
+- Every postcode seen (lookup or autocomplete) goes into a sorted prefix index, so
+  autocomplete for a longer query is answered locally when a shorter cached query
+  already returned its complete result set, or when the index holds enough matches.
+- The upstream is pluggable: PostcodesIoUpstream (default, one shared HTTP client) or
+  StaticPostcodeUpstream (local fixture; set POSTCODE_LOOKUP_STUB_FILE to a JSON file)
+  for offline development and tests.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional
+from utils.ttl_cache import TTLCache
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+POSTCODES_IO_BASE_URL = "https://api.postcodes.io"
+POSTCODE_LOOKUP_TIMEOUT_SECONDS = 10.0
+POSTCODE_AUTOCOMPLETE_TIMEOUT_SECONDS = 5.0
+
+# Positive results change rarely; not-found results are cached briefly (new postcodes do appear)
+LOOKUP_TTL_SECONDS = 24 * 3600
+NOT_FOUND_TTL_SECONDS = 600
+AUTOCOMPLETE_TTL_SECONDS = 6 * 3600
+LOOKUP_CACHE_MAX_ENTRIES = 20000
+AUTOCOMPLETE_CACHE_MAX_ENTRIES = 5000
+PREFIX_INDEX_MAX_ENTRIES = 50000
+
+AUTOCOMPLETE_LIMIT = 10
+
+_NOT_FOUND = {"_not_found": True}
+
+
+class PostcodeUpstreamError(Exception):
+    """Upstream postcode service failed or returned an unexpected response."""
+    pass
+
+
+class PostcodeUpstreamTimeout(PostcodeUpstreamError):
+    """Upstream postcode service did not respond in time."""
+    pass
+
+
+def compact_postcode(value: Any) -> str:
+    """'sw1a 1aa' -> 'SW1A1AA' (cache/index key)."""
+    return "".join(str(value or "").split()).upper()
+
+
+class PostcodeUpstream(ABC):
+    """Source of postcode data (postcodes.io result shape)."""
+
+    @abstractmethod
+    async def lookup(self, postcode: str) -> Optional[Dict[str, Any]]:
+        """Full result for a compact postcode, or None when it does not exist."""
+        pass
+
+    @abstractmethod
+    async def autocomplete(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Postcodes starting with query (up to limit)."""
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+class PostcodesIoUpstream(PostcodeUpstream):
+    """postcodes.io over a single shared httpx.AsyncClient (connection reuse across requests)."""
+
+    def __init__(self, base_url: str = POSTCODES_IO_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+        self._client = None
+
+    def _get_client(self):
+        import httpx
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=POSTCODE_LOOKUP_TIMEOUT_SECONDS)
+        return self._client
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None):
+        import httpx
+
+        try:
+            return await self._get_client().get(f"{self.base_url}{path}", params=params, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise PostcodeUpstreamTimeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise PostcodeUpstreamError(str(e)) from e
+
+    async def lookup(self, postcode: str) -> Optional[Dict[str, Any]]:
+        response = await self._get(f"/postcodes/{postcode}")
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise PostcodeUpstreamError(f"postcodes.io status {response.status_code}")
+        data = response.json()
+        if data.get("status") != 200 or not data.get("result"):
+            return None
+        return data["result"]
+
+    async def autocomplete(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        response = await self._get(
+            "/postcodes",
+            params={"q": query, "limit": limit},
+            timeout=POSTCODE_AUTOCOMPLETE_TIMEOUT_SECONDS,
+        )
+        if response.status_code != 200:
+            raise PostcodeUpstreamError(f"postcodes.io status {response.status_code}")
+        data = response.json()
+        if data.get("status") != 200 or not data.get("result"):
+            return []
+        return list(data["result"])[:limit]
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+class StaticPostcodeUpstream(PostcodeUpstream):
+    """In-memory postcode data (offline/dev/tests). Counts calls for coalescing checks."""
+
+    def __init__(self, results: Iterable[Dict[str, Any]]):
+        self._by_key = {compact_postcode(r.get("postcode")): r for r in results if r.get("postcode")}
+        self._keys = sorted(self._by_key)
+        self.lookup_calls = 0
+        self.autocomplete_calls = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "StaticPostcodeUpstream":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data.get("postcodes", data) if isinstance(data, dict) else data)
+
+    async def lookup(self, postcode: str) -> Optional[Dict[str, Any]]:
+        self.lookup_calls += 1
+        return self._by_key.get(compact_postcode(postcode))
+
+    async def autocomplete(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        self.autocomplete_calls += 1
+        key = compact_postcode(query)
+        start = bisect_left(self._keys, key)
+        out = []
+        for k in self._keys[start:]:
+            if not k.startswith(key) or len(out) >= limit:
+                break
+            out.append(self._by_key[k])
+        return out
+
+
+class PostcodePrefixIndex:
+    """Sorted compact postcodes -> result item; prefix queries via bisect."""
+
+    def __init__(self, max_entries: int = PREFIX_INDEX_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._keys: List[str] = []
+        self._items: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, item: Dict[str, Any]) -> None:
+        key = compact_postcode(item.get("postcode"))
+        if not key:
+            return
+        if key not in self._items:
+            if len(self._keys) >= self.max_entries:
+                # Bounded: start over rather than track recency for every key
+                self.clear()
+            insort(self._keys, key)
+        self._items[key] = item
+
+    def prefix(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        key = compact_postcode(query)
+        start = bisect_left(self._keys, key)
+        out = []
+        for k in self._keys[start:start + limit]:
+            if not k.startswith(key):
+                break
+            out.append(self._items[k])
+        return out
+
+    def clear(self) -> None:
+        self._keys = []
+        self._items = {}
+
+
+class PostcodeService:
+    """Cached, coalesced postcode lookup/autocomplete over a pluggable upstream."""
+
+    def __init__(self, upstream: Optional[PostcodeUpstream] = None):
+        self.upstream = upstream or _default_upstream()
+        self.lookup_cache = TTLCache(LOOKUP_CACHE_MAX_ENTRIES, LOOKUP_TTL_SECONDS)
+        self.autocomplete_cache = TTLCache(AUTOCOMPLETE_CACHE_MAX_ENTRIES, AUTOCOMPLETE_TTL_SECONDS)
+        self.prefix_index = PostcodePrefixIndex()
+
+    def set_upstream(self, upstream: PostcodeUpstream) -> None:
+        """Swap the upstream (e.g. a StaticPostcodeUpstream in tests) and drop cached data."""
+        self.upstream = upstream
+        self.clear()
+
+    def clear(self) -> None:
+        self.lookup_cache.clear()
+        self.autocomplete_cache.clear()
+        self.prefix_index.clear()
+
+    async def lookup(self, postcode: str) -> Optional[Dict[str, Any]]:
+        """Full postcodes.io-style result, or None when not found. Raises PostcodeUpstreamError."""
+        key = compact_postcode(postcode)
+
+        async def _load():
+            result = await self.upstream.lookup(key)
+            if result is None:
+                return _NOT_FOUND
+            self.prefix_index.add(result)
+            return result
+
+        value = await self.lookup_cache.get_or_load(
+            key, _load, ttl_for=lambda v: NOT_FOUND_TTL_SECONDS if v is _NOT_FOUND else None
+        )
+        return None if value is _NOT_FOUND else value
+
+    def _autocomplete_from_cache(self, key: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        # A shorter cached query whose result was not truncated contains every match for key
+        for n in range(len(key) - 1, 1, -1):
+            cached = self.autocomplete_cache.get(key[:n], None, record=False)
+            if cached is not None and len(cached) < limit:
+                return [item for item in cached if compact_postcode(item.get("postcode")).startswith(key)]
+        indexed = self.prefix_index.prefix(key, limit)
+        if len(indexed) >= limit:
+            return indexed
+        return None
+
+    async def autocomplete(self, query: str, limit: int = AUTOCOMPLETE_LIMIT) -> List[Dict[str, Any]]:
+        """Raw result items for postcodes starting with query. Raises PostcodeUpstreamError."""
+        key = compact_postcode(query)
+        if len(key) < 2:
+            return []
+        cached = self.autocomplete_cache.get(key, None)
+        if cached is not None:
+            return cached[:limit]
+        local = self._autocomplete_from_cache(key, limit)
+        if local is not None:
+            self.autocomplete_cache.set(key, local)
+            return local[:limit]
+
+        async def _load():
+            items = await self.upstream.autocomplete(query.strip().upper(), limit)
+            for item in items:
+                self.prefix_index.add(item)
+            return items
+
+        items = await self.autocomplete_cache.get_or_load(key, _load)
+        return items[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookup_cache": self.lookup_cache.stats(),
+            "autocomplete_cache": self.autocomplete_cache.stats(),
+            "prefix_index_size": len(self.prefix_index),
+        }
+
+    async def aclose(self) -> None:
+        await self.upstream.aclose()
+
+
+def _default_upstream() -> PostcodeUpstream:
+    stub_file = (os.getenv("POSTCODE_LOOKUP_STUB_FILE") or "").strip()
+    if stub_file:
+        try:
+            upstream = StaticPostcodeUpstream.from_file(stub_file)
+            logger.info("Postcode lookups served from stub file %s", stub_file)
+            return upstream
+        except Exception as e:
+            logger.error("Failed to load postcode stub file %s: %s; using postcodes.io", stub_file, e)
+    return PostcodesIoUpstream()
+
+
+postcode_service = PostcodeService()
@@ -31,6 +31,7 @@ from models.prompts import (
     OutputSchema,
 )
 from database import database
+from utils.metrics import LLM_CALL_SECONDS, time_call
 
 logger = logging.getLogger(__name__)
 
@@ -127,15 +128,16 @@ class OpenAIProvider(LLMProviderInterface):
         except ImportError:
             raise ValueError("openai package not installed. pip install openai")
         client = AsyncOpenAI(api_key=api_key)
-        response = await client.chat.completions.create(
-            model=self._model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=min(max(temperature, 0.0), 2.0),
-            max_tokens=max_tokens,
-        )
+        with time_call(LLM_CALL_SECONDS, "openai", "prompt"):
+            response = await client.chat.completions.create(
+                model=self._model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=min(max(temperature, 0.0), 2.0),
+                max_tokens=max_tokens,
+            )
         text = (response.choices[0].message.content or "").strip()
         usage = getattr(response, "usage", None)
         tokens = {
@@ -0,0 +1,389 @@
+"""
+Bulk property import (POST /api/properties/bulk-import).
+
+The body is parsed as it streams in (CSV, NDJSON, or the JSON {"properties": [...]} the portal
+sends) and every row is validated in a first pass: required fields, duplicates within the file
+and against the client's existing properties (one read). Valid rows are then written in chunks of
+BULK_IMPORT_CHUNK_SIZE, each chunk with one write per collection:
+- properties and their generated requirements are built in memory (provisioning.plan_requirements,
+  requirement rules read once per import) and written with insert_many;
+- REQUIREMENTS_GENERATED audit entries are written with one insert_many;
+- compliance recalcs are enqueued with one enqueue_compliance_recalcs call.
+The search index is rebuilt once at the end.
+
+Progress is kept in property_import_jobs (processed / successful / failed, row errors, created
+properties) and served by GET /api/properties/bulk-import/jobs/{job_id}. Imports larger than
+BULK_IMPORT_BACKGROUND_ROWS run in the background and the endpoint returns the job id straight away;
+a background job with no progress for BULK_IMPORT_STALE_SECONDS is reported FAILED.
+"""
+import codecs
+import csv
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel, ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from database import database
+from models import AuditAction, ComplianceStatus, Property, UserRole
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOBS_COLLECTION = "property_import_jobs"
+
+JOB_QUEUED = "QUEUED"
+JOB_RUNNING = "RUNNING"
+JOB_COMPLETED = "COMPLETED"
+JOB_FAILED = "FAILED"
+
+BULK_IMPORT_CHUNK_SIZE = 100
+# A QUEUED / RUNNING job with no progress for this long lost its worker (e.g. a restart): report it FAILED
+BULK_IMPORT_STALE_SECONDS = 600
+BULK_IMPORT_MAX_ROWS = 5000
+# JSON bodies are not streamed row by row; cap what is buffered
+BULK_IMPORT_MAX_JSON_BYTES = 10 * 1024 * 1024
+
+MISSING_FIELDS_ERROR = "Missing required field (address_line_1, city, or postcode)"
+
+
+class BulkImportError(Exception):
+    """The body cannot be imported at all (bad format, too many rows)."""
+
+
+class BulkPropertyItem(BaseModel):
+    address_line_1: str
+    address_line_2: Optional[str] = None
+    city: str
+    postcode: str
+    property_type: str = "residential"
+    number_of_units: int = 1
+
+
+def background_threshold() -> int:
+    value = (os.environ.get("BULK_IMPORT_BACKGROUND_ROWS") or "").strip()
+    return int(value) if value.isdigit() else 500
+
+
+def _check_row_count(count: int) -> None:
+    if count > BULK_IMPORT_MAX_ROWS:
+        raise BulkImportError(f"Too many rows: at most {BULK_IMPORT_MAX_ROWS} properties per import")
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # Incremental: a multi-byte character may be split across chunks
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+async def _csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    header: Optional[List[str]] = None
+    record = ""
+    async for line in _lines(chunks):
+        # A quoted field may contain newlines: wait until the quotes balance
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        values, record = next(csv.reader([record]), []), ""
+        if not any(v.strip() for v in values):
+            continue
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        yield dict(zip(header, values))
+
+
+async def _ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+    async for line in _lines(chunks):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield {"_parse_error": "Invalid JSON line"}
+
+
+async def read_rows(chunks: AsyncIterator[bytes], content_type: str) -> List[Dict[str, Any]]:
+    """Parse a request body stream into raw row dicts by content type."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        rows_iter = _csv_rows(chunks)
+    elif content_type in ("application/x-ndjson", "application/jsonl", "application/json-lines"):
+        rows_iter = _ndjson_rows(chunks)
+    else:
+        body = b""
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > BULK_IMPORT_MAX_JSON_BYTES:
+                raise BulkImportError("Request body too large; send CSV or NDJSON for large imports")
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            raise BulkImportError("Request body is not valid JSON")
+        rows = data.get("properties") if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise BulkImportError('Expected {"properties": [...]} or a list of properties')
+        _check_row_count(len(rows))
+        return rows
+    rows: List[Dict[str, Any]] = []
+    async for row in rows_iter:
+        rows.append(row)
+        _check_row_count(len(rows))
+    return rows
+
+
+def _address_key(address_line_1: str, postcode: str) -> Tuple[str, str]:
+    return (address_line_1, postcode)
+
+
+def validate_rows(
+    rows: List[Any], existing_keys: Set[Tuple[str, str]]
+) -> Tuple[List[Tuple[int, BulkPropertyItem]], List[Dict[str, Any]]]:
+    """First pass: (row number, item) for importable rows and an error entry for the others."""
+    items: List[Tuple[int, BulkPropertyItem]] = []
+    errors: List[Dict[str, Any]] = []
+    seen = set(existing_keys)
+    for idx, raw in enumerate(rows):
+        row = idx + 1
+        if not isinstance(raw, dict) or raw.get("_parse_error"):
+            errors.append({"row": row, "error": (raw or {}).get("_parse_error") if isinstance(raw, dict) else "Not an object"})
+            continue
+        # CSV gives "" for empty cells; drop them so optional fields take their defaults
+        cleaned = {k: v.strip() if isinstance(v, str) else v for k, v in raw.items() if k}
+        cleaned = {k: v for k, v in cleaned.items() if v not in ("", None)}
+        if not cleaned.get("address_line_1") or not cleaned.get("city") or not cleaned.get("postcode"):
+            errors.append({"row": row, "error": MISSING_FIELDS_ERROR})
+            continue
+        try:
+            item = BulkPropertyItem(**cleaned)
+        except ValidationError as e:
+            first = e.errors()[0]
+            errors.append({"row": row, "error": f"{'.'.join(str(p) for p in first['loc'])}: {first['msg']}"})
+            continue
+        key = _address_key(item.address_line_1, item.postcode)
+        if key in seen:
+            errors.append({
+                "row": row,
+                "address": f"{item.address_line_1}, {item.postcode}",
+                "error": "Property already exists",
+            })
+            continue
+        seen.add(key)
+        items.append((row, item))
+    return items, errors
+
+
+async def existing_address_keys(db, client_id: str) -> Set[Tuple[str, str]]:
+    docs = await db.properties.find(
+        {"client_id": client_id}, {"_id": 0, "address_line_1": 1, "postcode": 1}
+    ).to_list(None)
+    return {_address_key(d.get("address_line_1"), d.get("postcode")) for d in docs}
+
+
+async def create_import_job(db, client_id: str, actor_id: Optional[str], total: int,
+                            errors: List[Dict[str, Any]]) -> str:
+    now = datetime.now(timezone.utc).isoformat()
+    job_id = str(uuid.uuid4())
+    await db[IMPORT_JOBS_COLLECTION].insert_one({
+        "job_id": job_id,
+        "client_id": client_id,
+        "actor_id": actor_id,
+        "status": JOB_QUEUED,
+        "total": total,
+        "processed": len(errors),
+        "successful": 0,
+        "failed": len(errors),
+        "errors": list(errors),
+        "created_properties": [],
+        "created_at": now,
+        "updated_at": now,
+        "completed_at": None,
+    })
+    return job_id
+
+
+def build_chunk(client_id: str, chunk: List[Tuple[int, BulkPropertyItem]], db_rules: List[Dict]):
+    """Property documents and their requirement documents for a chunk, built in memory."""
+    from services.provisioning import build_requirement_doc, compliance_status_for, plan_requirements
+
+    properties, requirements = [], {}
+    for _, item in chunk:
+        property_obj = Property(client_id=client_id, compliance_status=ComplianceStatus.RED, **item.model_dump())
+        prop_doc = property_obj.model_dump()
+        reqs = [
+            build_requirement_doc(client_id, property_obj.property_id, **spec)
+            for spec in plan_requirements(prop_doc, db_rules)
+        ]
+        prop_doc["compliance_status"] = compliance_status_for(reqs).value
+        for key in ["created_at", "updated_at"]:
+            if prop_doc.get(key):
+                prop_doc[key] = prop_doc[key].isoformat()
+        properties.append(prop_doc)
+        requirements[property_obj.property_id] = reqs
+    return properties, requirements
+
+
+async def _write_chunk(db, client_id: str, actor_id: Optional[str], chunk: List[Tuple[int, BulkPropertyItem]],
+                       db_rules: List[Dict]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    from services.compliance_recalc_queue import ACTOR_CLIENT, TRIGGER_PROPERTY_CREATED, enqueue_compliance_recalcs
+    from services.provisioning import requirements_generated_metadata
+    from utils.audit import create_audit_logs
+
+    properties, requirements = build_chunk(client_id, chunk, db_rules)
+    failed_at: Dict[int, str] = {}
+    try:
+        await db.properties.insert_many(properties, ordered=False)
+    except BulkWriteError as e:
+        failed_at = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+    errors = [{"row": chunk[i][0], "error": msg} for i, msg in sorted(failed_at.items())]
+    created = [p for i, p in enumerate(properties) if i not in failed_at]
+    if not created:
+        return [], errors
+
+    req_docs = [r for p in created for r in requirements[p["property_id"]]]
+    if req_docs:
+        await db.requirements.insert_many(req_docs, ordered=False)
+    await create_audit_logs([
+        {
+            "action": AuditAction.REQUIREMENTS_GENERATED,
+            "client_id": client_id,
+            "resource_type": "property",
+            "resource_id": p["property_id"],
+            "metadata": {**requirements_generated_metadata(p), "source": "bulk_import"},
+        }
+        for p in created
+    ])
+    await enqueue_compliance_recalcs(
+        [
+            {
+                "property_id": p["property_id"],
+                "client_id": client_id,
+                "correlation_id": f"PROPERTY_CREATED:{p['property_id']}",
+            }
+            for p in created
+        ],
+        trigger_reason=TRIGGER_PROPERTY_CREATED,
+        actor_type=ACTOR_CLIENT,
+        actor_id=actor_id,
+    )
+    summaries = [
+        {
+            "property_id": p["property_id"],
+            "address": f"{p['address_line_1']}, {p['city']}",
+            "requirements_created": len(requirements[p["property_id"]]),
+        }
+        for p in created
+    ]
+    return summaries, errors
+
+
+async def run_import(job_id: str, client_id: str, actor: Dict[str, Any],
+                     items: List[Tuple[int, BulkPropertyItem]]) -> Dict[str, Any]:
+    """Write the validated rows chunk by chunk, recording progress on the job. Returns the job."""
+    from services.client_search_index import reindex_client
+    from utils.audit import create_audit_log
+
+    db = database.get_db()
+    jobs = db[IMPORT_JOBS_COLLECTION]
+    await jobs.update_one(
+        {"job_id": job_id}, {"$set": {"status": JOB_RUNNING, "updated_at": datetime.now(timezone.utc).isoformat()}},
+    )
+    try:
+        db_rules = await db.requirement_rules.find({"is_active": True}, {"_id": 0}).to_list(100)
+        for start in range(0, len(items), BULK_IMPORT_CHUNK_SIZE):
+            chunk = items[start:start + BULK_IMPORT_CHUNK_SIZE]
+            created, errors = await _write_chunk(db, client_id, actor.get("portal_user_id"), chunk, db_rules)
+            await jobs.update_one(
+                {"job_id": job_id},
+                {
+                    "$inc": {"processed": len(chunk), "successful": len(created), "failed": len(errors)},
+                    "$push": {"created_properties": {"$each": created}, "errors": {"$each": errors}},
+                    "$set": {"updated_at": datetime.now(timezone.utc).isoformat()},
+                },
+            )
+    except Exception as e:
+        logger.error(f"Bulk import job {job_id} failed: {e}")
+        await jobs.update_one(
+            {"job_id": job_id},
+            {"$set": {"status": JOB_FAILED, "last_error": str(e), "completed_at": datetime.now(timezone.utc).isoformat()}},
+        )
+        raise
+    finally:
+        await reindex_client(client_id)
+
+    job = await jobs.find_one_and_update(
+        {"job_id": job_id},
+        {"$set": {"status": JOB_COMPLETED, "completed_at": datetime.now(timezone.utc).isoformat()}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+    await create_audit_log(
+        action=AuditAction.ADMIN_ACTION,
+        actor_role=UserRole(actor["role"]) if actor.get("role") else None,
+        actor_id=actor.get("portal_user_id"),
+        client_id=client_id,
+        resource_type="property",
+        metadata={
+            "action": "bulk_import",
+            "job_id": job_id,
+            "total": job["total"],
+            "successful": job["successful"],
+            "failed": job["failed"],
+        },
+    )
+    logger.info(f"Bulk import {job_id}: {job['successful']}/{job['total']} properties created for {client_id}")
+    return job
+
+
+async def run_import_in_background(job_id: str, client_id: str, actor: Dict[str, Any],
+                                   items: List[Tuple[int, BulkPropertyItem]]) -> None:
+    try:
+        await run_import(job_id, client_id, actor, items)
+    except Exception:
+        pass  # recorded on the job by run_import
+
+
+async def fail_if_stale(db, job: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Mark a QUEUED / RUNNING job FAILED once it has made no progress for BULK_IMPORT_STALE_SECONDS.
+
+    Background imports run in the API process, so a restart leaves their job RUNNING forever. The
+    update only matches the updated_at that was read, so a job that just progressed is left alone.
+    Returns the job as it now stands.
+    """
+    if job.get("status") not in (JOB_QUEUED, JOB_RUNNING):
+        return job
+    now = now or datetime.now(timezone.utc)
+    updated_at = job.get("updated_at")
+    if updated_at and updated_at > (now - timedelta(seconds=BULK_IMPORT_STALE_SECONDS)).isoformat():
+        return job
+    update = {"status": JOB_FAILED, "last_error": f"Import stopped making progress (last update {updated_at})",
+              "completed_at": now.isoformat()}
+    result = await db[IMPORT_JOBS_COLLECTION].update_one(
+        {"job_id": job["job_id"], "status": job["status"], "updated_at": updated_at}, {"$set": update},
+    )
+    if not result.modified_count:
+        return job
+    logger.warning(f"Bulk import job {job['job_id']} marked failed: no progress since {updated_at}")
+    return {**job, **update}
+
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """The summary shape the import endpoint has always returned."""
+    return {
+        "total": job["total"],
+        "successful": job["successful"],
+        "failed": job["failed"],
+        "errors": sorted(job.get("errors") or [], key=lambda e: e.get("row", 0)),
+        "created_properties": job.get("created_properties") or [],
+    }
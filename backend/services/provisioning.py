@@ -5,6 +5,7 @@ from models import (
     AuditAction, SubscriptionStatus
 )
 from utils.audit import create_audit_log
+from utils.expiry_utils import get_transition_fields
 from auth import generate_secure_token, hash_token
 from datetime import datetime, timedelta, timezone
 import os
@@ -104,6 +105,125 @@ LOCATION_RULES = {
     ]
 }
 
+
+def plan_requirements(property_doc: Dict, db_rules: List[Dict]) -> List[Dict]:
+    """Requirements a property should have, as kwargs for build_requirement_doc.
+
+    Uses the active requirement_rules (filtered by property type) when there are any, otherwise
+    the fallback rules, which consider property type, HMO status, building age and location.
+    Pure, so bulk imports can plan many properties from one rules read.
+    """
+    property_id = property_doc.get("property_id")
+    property_type = (property_doc.get("property_type") or "residential").upper()
+    specs: List[Dict] = []
+
+    def add(requirement_type: str, description: str, frequency_days: int, warning_days: int = 30):
+        specs.append({
+            "requirement_type": requirement_type,
+            "description": description,
+            "frequency_days": frequency_days,
+            "warning_days": warning_days,
+        })
+
+    if db_rules:
+        for rule in db_rules:
+            # Check if rule applies to this property type
+            applicable_to = rule.get("applicable_to", "ALL")
+            if applicable_to != "ALL" and applicable_to != property_type:
+                continue
+            add(rule["rule_type"], rule["name"], rule["frequency_days"], rule.get("warning_days", 30))
+        return specs
+
+    has_gas_supply = property_doc.get("has_gas_supply", True)
+    building_age_years = property_doc.get("building_age_years")
+    local_authority = (property_doc.get("local_authority") or "").upper()
+
+    # 1. Apply base requirements
+    for rule in FALLBACK_REQUIREMENT_RULES:
+        # Check gas supply condition
+        if rule.get("condition") == "has_gas_supply" and not has_gas_supply:
+            logger.info(f"Skipping {rule['type']} - no gas supply")
+            continue
+        
+        # Calculate frequency based on building age for EICR
+        frequency_days = rule["frequency_days"]
+        if rule["type"] == "eicr" and building_age_years:
+            if building_age_years > 50:
+                frequency_days = rule.get("frequency_by_age", {}).get("old", 1095)
+                logger.info(f"Using shorter EICR frequency ({frequency_days} days) for old building")
+        add(rule["type"], rule["description"], frequency_days)
+
+    # 2. Apply HMO-specific requirements
+    if property_doc.get("is_hmo", False) or property_type == "HMO":
+        logger.info(f"Applying HMO requirements for property {property_id}")
+        for rule in HMO_REQUIREMENTS:
+            # Check HMO license condition
+            if rule.get("condition") == "hmo_license_required" and not property_doc.get("hmo_license_required", False):
+                continue
+            add(rule["type"], rule["description"], rule["frequency_days"])
+
+    # 3. Apply communal area requirements
+    if property_doc.get("has_communal_areas", False):
+        logger.info(f"Applying communal area requirements for property {property_id}")
+        for rule in COMMUNAL_REQUIREMENTS:
+            add(rule["type"], rule["description"], rule["frequency_days"])
+
+    # 4. Apply location-specific requirements
+    if local_authority and local_authority in LOCATION_RULES:
+        logger.info(f"Applying {local_authority} location-specific requirements")
+        for rule in LOCATION_RULES[local_authority]:
+            add(rule["type"], rule["description"], rule["frequency_days"])
+    return specs
+
+
+def build_requirement_doc(
+    client_id: str,
+    property_id: str,
+    requirement_type: str,
+    description: str,
+    frequency_days: int,
+    warning_days: int = 30
+) -> Dict:
+    """New PENDING requirement document, ready to insert."""
+    requirement = Requirement(
+        client_id=client_id,
+        property_id=property_id,
+        requirement_type=requirement_type,
+        description=description,
+        frequency_days=frequency_days,
+        due_date=datetime.now(timezone.utc) + timedelta(days=warning_days),
+        status=RequirementStatus.PENDING
+    )
+    
+    doc = requirement.model_dump()
+    for key in ["due_date", "created_at", "updated_at"]:
+        if doc.get(key):
+            doc[key] = doc[key].isoformat()
+    doc.update(get_transition_fields(doc))
+    return doc
+
+
+def requirements_generated_metadata(property_doc: Dict) -> Dict:
+    """Metadata of the REQUIREMENTS_GENERATED audit entry."""
+    return {
+        "property_type": (property_doc.get("property_type") or "residential").upper(),
+        "is_hmo": property_doc.get("is_hmo", False),
+        "has_gas_supply": property_doc.get("has_gas_supply", True),
+        "building_age_years": property_doc.get("building_age_years"),
+        "local_authority": (property_doc.get("local_authority") or "").upper()
+    }
+
+
+def compliance_status_for(requirements: List[Dict]) -> ComplianceStatus:
+    """Deterministic compliance logic: OVERDUE → RED; EXPIRING_SOON or PENDING (missing evidence) → AMBER; else GREEN."""
+    statuses = [r["status"] for r in requirements]
+    if RequirementStatus.OVERDUE.value in statuses:
+        return ComplianceStatus.RED
+    if RequirementStatus.EXPIRING_SOON.value in statuses or RequirementStatus.PENDING.value in statuses:
+        return ComplianceStatus.AMBER
+    return ComplianceStatus.GREEN
+
+
 class ProvisioningService:
     async def provision_client_portal_core(
         self, client_id: str
@@ -301,147 +421,22 @@ class ProvisioningService:
             logger.warning(f"Property {property_id} not found for requirement generation")
             return
         
-        property_type = (property_doc.get("property_type") or "residential").upper()
-        is_hmo = property_doc.get("is_hmo", False)
-        hmo_license_required = property_doc.get("hmo_license_required", False)
-        has_gas_supply = property_doc.get("has_gas_supply", True)
-        building_age_years = property_doc.get("building_age_years")
-        has_communal_areas = property_doc.get("has_communal_areas", False)
-        local_authority = (property_doc.get("local_authority") or "").upper()
-        
-        # Try to get rules from database first
+        # Try to get rules from database first; otherwise enhanced fallback rules with dynamic conditions
         db_rules = await db.requirement_rules.find(
             {"is_active": True},
             {"_id": 0}
         ).to_list(100)
-        
-        if db_rules:
-            # Use database rules with property type filtering
-            await self._apply_db_rules(db_rules, client_id, property_id, property_type)
-        else:
-            # Use enhanced fallback rules with dynamic conditions
-            await self._apply_dynamic_rules(
-                client_id, 
-                property_id, 
-                property_type,
-                is_hmo,
-                hmo_license_required,
-                has_gas_supply,
-                building_age_years,
-                has_communal_areas,
-                local_authority
-            )
+        for spec in plan_requirements(property_doc, db_rules):
+            await self._create_requirement_if_not_exists(client_id, property_id, **spec)
         
         await create_audit_log(
             action=AuditAction.REQUIREMENTS_GENERATED,
             client_id=client_id,
             resource_type="property",
             resource_id=property_id,
-            metadata={
-                "property_type": property_type,
-                "is_hmo": is_hmo,
-                "has_gas_supply": has_gas_supply,
-                "building_age_years": building_age_years,
-                "local_authority": local_authority
-            }
+            metadata=requirements_generated_metadata(property_doc)
         )
     
-    async def _apply_db_rules(self, rules: List[Dict], client_id: str, property_id: str, property_type: str):
-        """Apply database rules to generate requirements."""
-        db = database.get_db()
-        
-        for rule in rules:
-            # Check if rule applies to this property type
-            applicable_to = rule.get("applicable_to", "ALL")
-            if applicable_to != "ALL" and applicable_to != property_type:
-                continue
-            
-            await self._create_requirement_if_not_exists(
-                client_id,
-                property_id,
-                rule["rule_type"],
-                rule["name"],
-                rule["frequency_days"],
-                rule.get("warning_days", 30)
-            )
-    
-    async def _apply_dynamic_rules(
-        self,
-        client_id: str,
-        property_id: str,
-        property_type: str,
-        is_hmo: bool,
-        hmo_license_required: bool,
-        has_gas_supply: bool,
-        building_age_years: Optional[int],
-        has_communal_areas: bool,
-        local_authority: str
-    ):
-        """Apply enhanced dynamic rules based on property attributes."""
-        db = database.get_db()
-        
-        # 1. Apply base requirements
-        for rule in FALLBACK_REQUIREMENT_RULES:
-            # Check gas supply condition
-            if rule.get("condition") == "has_gas_supply" and not has_gas_supply:
-                logger.info(f"Skipping {rule['type']} - no gas supply")
-                continue
-            
-            # Calculate frequency based on building age for EICR
-            frequency_days = rule["frequency_days"]
-            if rule["type"] == "eicr" and building_age_years:
-                if building_age_years > 50:
-                    frequency_days = rule.get("frequency_by_age", {}).get("old", 1095)
-                    logger.info(f"Using shorter EICR frequency ({frequency_days} days) for old building")
-            
-            await self._create_requirement_if_not_exists(
-                client_id,
-                property_id,
-                rule["type"],
-                rule["description"],
-                frequency_days
-            )
-        
-        # 2. Apply HMO-specific requirements
-        if is_hmo or property_type == "HMO":
-            logger.info(f"Applying HMO requirements for property {property_id}")
-            for rule in HMO_REQUIREMENTS:
-                # Check HMO license condition
-                if rule.get("condition") == "hmo_license_required" and not hmo_license_required:
-                    continue
-                
-                await self._create_requirement_if_not_exists(
-                    client_id,
-                    property_id,
-                    rule["type"],
-                    rule["description"],
-                    rule["frequency_days"]
-                )
-        
-        # 3. Apply communal area requirements
-        if has_communal_areas:
-            logger.info(f"Applying communal area requirements for property {property_id}")
-            for rule in COMMUNAL_REQUIREMENTS:
-                await self._create_requirement_if_not_exists(
-                    client_id,
-                    property_id,
-                    rule["type"],
-                    rule["description"],
-                    rule["frequency_days"]
-                )
-        
-        # 4. Apply location-specific requirements
-        if local_authority and local_authority in LOCATION_RULES:
-            logger.info(f"Applying {local_authority} location-specific requirements")
-            for rule in LOCATION_RULES[local_authority]:
-                await self._create_requirement_if_not_exists(
-                    client_id,
-                    property_id,
-                    rule["type"],
-                    rule["description"],
-                    rule["frequency_days"]
-                )
-    
     async def _create_requirement_if_not_exists(
         self,
         client_id: str,
@@ -464,22 +459,9 @@ class ProvisioningService:
         if existing:
             return
         
-        # Create new requirement
-        requirement = Requirement(
-            client_id=client_id,
-            property_id=property_id,
-            requirement_type=requirement_type,
-            description=description,
-            frequency_days=frequency_days,
-            due_date=datetime.now(timezone.utc) + timedelta(days=warning_days),
-            status=RequirementStatus.PENDING
+        doc = build_requirement_doc(
+            client_id, property_id, requirement_type, description, frequency_days, warning_days
         )
-        
-        doc = requirement.model_dump()
-        for key in ["due_date", "created_at", "updated_at"]:
-            if doc.get(key):
-                doc[key] = doc[key].isoformat()
-        
         await db.requirements.insert_one(doc)
     
     async def _update_property_compliance(self, property_id: str):
@@ -491,17 +473,7 @@ class ProvisioningService:
             {"_id": 0}
         ).to_list(100)
         
-        # Deterministic compliance logic: OVERDUE → RED; EXPIRING_SOON or PENDING (missing evidence) → AMBER; else GREEN
-        red_count = sum(1 for r in requirements if r["status"] == RequirementStatus.OVERDUE.value)
-        amber_count = sum(1 for r in requirements if r["status"] == RequirementStatus.EXPIRING_SOON.value)
-        pending_count = sum(1 for r in requirements if r["status"] == RequirementStatus.PENDING.value)
-
-        if red_count > 0:
-            status = ComplianceStatus.RED
-        elif amber_count > 0 or pending_count > 0:
-            status = ComplianceStatus.AMBER
-        else:
-            status = ComplianceStatus.GREEN
+        status = compliance_status_for(requirements)
         
         await db.properties.update_one(
             {"property_id": property_id},
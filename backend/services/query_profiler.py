@@ -0,0 +1,367 @@
+"""
+Mongo command profiler: a pymongo CommandListener that attributes every command to the request
+(X-Correlation-Id) or job run that issued it.
+
+Per profile we keep aggregates per query shape (command, collection, filter with values replaced
+by "?"): count, total/max ms, docs returned. On finish a profile is flagged for
+- slow: any command >= QUERY_PROFILER_SLOW_MS (default 100)
+- n_plus_one: the same shape issued >= QUERY_PROFILER_N_PLUS_ONE times (default 5), e.g. a
+  find_one per item in a loop
+- collscan: the winning plan of a slow / repeated shape is a COLLSCAN (checked with one
+  queryPlanner explain per shape, cached for PLAN_CACHE_SECONDS)
+Flagged profiles are stored in query_profiles (7-day TTL); recent profiles and slow commands
+are also kept in memory. Viewed at /api/admin/observability/query-profiles etc.
+
+Off unless QUERY_PROFILER_SAMPLE_RATE > 0: requests are sampled at that rate; job runs are always
+profiled while it is on. The same listener feeds mongo_command_duration_seconds (utils.metrics)
+for every command unless METRICS_ENABLED=false; unsampled fast commands cost one histogram write.
+Motor copies contextvars into its executor threads, so the listener sees the caller's profile.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from utils.metrics import MONGO_COMMAND_FAILURES, MONGO_COMMAND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLLECTION = "query_profiles"
+RECENT_PROFILES = 200
+RECENT_SLOW_COMMANDS = 500
+SLOWEST_PER_PROFILE = 10
+MAX_EXPLAINS_PER_PROFILE = 5
+PLAN_CACHE_SECONDS = 3600
+
+FLAG_SLOW = "slow"
+FLAG_N_PLUS_ONE = "n_plus_one"
+FLAG_COLLSCAN = "collscan"
+
+# Handshake, auth, cursor housekeeping and our own explains
+_IGNORED_COMMANDS = frozenset({
+    "hello", "ismaster", "isMaster", "ping", "buildInfo", "buildinfo", "saslStart", "saslContinue",
+    "authenticate", "getnonce", "endSessions", "killCursors", "explain", "listIndexes", "createIndexes",
+})
+# Commands whose filter can be explained as a find
+_FILTER_FIELDS = {
+    "find": "filter", "count": "query", "distinct": "query", "findAndModify": "query", "findandmodify": "query",
+}
+
+_current_profile: contextvars.ContextVar[Optional["QueryProfile"]] = contextvars.ContextVar("query_profile", default=None)
+# Correlation id of the request being served (set by CorrelationIdMiddleware)
+current_correlation_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def query_shape(value: Any) -> Any:
+    """Filter with literal values replaced by "?" (operators and field names kept; no PII)."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and / $or of sub-filters keep their structure; value lists collapse
+        if value and all(isinstance(v, dict) for v in value):
+            return [query_shape(v) for v in value]
+        return "?"
+    return "?"
+
+
+def command_collection(name: str, command: Dict[str, Any]) -> Optional[str]:
+    if name == "getMore":
+        return command.get("collection")
+    target = command.get(name)
+    return target if isinstance(target, str) else None
+
+
+def command_filter(name: str, command: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    if name in _FILTER_FIELDS:
+        return command.get(_FILTER_FIELDS[name]) or {}
+    if name == "aggregate":
+        pipeline = command.get("pipeline") or []
+        if pipeline and "$match" in pipeline[0]:
+            return pipeline[0]["$match"]
+        return {}
+    if name in ("update", "delete"):
+        statements = command.get("updates" if name == "update" else "deletes") or []
+        return (statements[0].get("q") or {}) if statements else {}
+    return None
+
+
+def docs_returned(reply: Dict[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    value = reply.get("value")
+    if value is not None:
+        return 1
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+def plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Stage names of an explain winningPlan (classic and SBE layouts)."""
+    stages = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, dict):
+            continue
+        if "stage" in node:
+            stages.append(node["stage"])
+        for key in ("inputStage", "queryPlan"):
+            if key in node:
+                stack.append(node[key])
+        stack.extend(node.get("inputStages") or [])
+    return stages
+
+
+class QueryProfile:
+    """Commands issued by one request or job run, aggregated per query shape."""
+
+    def __init__(self, kind: str, key: str, label: str):
+        self.kind = kind
+        self.key = key
+        self.label = label
+        self.started_at = datetime.now(timezone.utc)
+        self.command_count = 0
+        self.total_ms = 0.0
+        self.failed_count = 0
+        self.shapes: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self.slowest: List[Dict[str, Any]] = []
+        self.flags: List[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, name: str, collection: Optional[str], shape: str, filter_doc: Optional[Dict[str, Any]],
+               duration_ms: float, docs: int, failed: bool = False) -> None:
+        with self._lock:
+            self.command_count += 1
+            self.total_ms += duration_ms
+            if failed:
+                self.failed_count += 1
+            stat = self.shapes.get((name, collection or "", shape))
+            if stat is None:
+                stat = {"command": name, "collection": collection, "shape": shape, "count": 0,
+                        "total_ms": 0.0, "max_ms": 0.0, "docs": 0, "_filter": filter_doc}
+                self.shapes[(name, collection or "", shape)] = stat
+            stat["count"] += 1
+            stat["total_ms"] += duration_ms
+            stat["max_ms"] = max(stat["max_ms"], duration_ms)
+            stat["docs"] += docs
+            entry = {"command": name, "collection": collection, "shape": shape, "ms": round(duration_ms, 2), "docs": docs}
+            if len(self.slowest) < SLOWEST_PER_PROFILE:
+                self.slowest.append(entry)
+            elif duration_ms > self.slowest[-1]["ms"]:
+                self.slowest[-1] = entry
+            else:
+                return
+            self.slowest.sort(key=lambda e: e["ms"], reverse=True)
+
+    def shape_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = [{k: v for k, v in stat.items() if not k.startswith("_")} for stat in self.shapes.values()]
+        for row in rows:
+            row["total_ms"] = round(row["total_ms"], 2)
+            row["max_ms"] = round(row["max_ms"], 2)
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "label": self.label,
+            "started_at": self.started_at.isoformat(),
+            "command_count": self.command_count,
+            "failed_count": self.failed_count,
+            "db_time_ms": round(self.total_ms, 2),
+            "flags": sorted(set(self.flags)),
+            "shapes": self.shape_stats()[:50],
+            "slowest": list(self.slowest),
+        }
+
+
+class _ProfilingListener(monitoring.CommandListener):
+    def __init__(self, profiler: "QueryProfiler"):
+        self.profiler = profiler
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Optional[str], Optional[dict], Optional[QueryProfile], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event) -> None:
+        name = event.command_name
+        if name in _IGNORED_COMMANDS:
+            return
+        profile = _current_profile.get()
+        correlation_id = current_correlation_id.get()
+        command = event.command
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                name, command_collection(name, command), command_filter(name, command), profile, correlation_id,
+            )
+
+    def _finish(self, event, reply: Optional[Dict[str, Any]], failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        name, collection, filter_doc, profile, correlation_id = pending
+        duration_ms = event.duration_micros / 1000
+        MONGO_COMMAND_SECONDS.observe(duration_ms / 1000, name, collection or "")
+        if failed:
+            MONGO_COMMAND_FAILURES.inc(name)
+        if profile is None and duration_ms < self.profiler.slow_ms:
+            return  # metrics only: no shape work for unsampled, fast commands
+        shape = repr(query_shape(filter_doc)) if filter_doc is not None else ""
+        docs = docs_returned(reply) if reply else 0
+        if profile is not None:
+            profile.record(name, collection, shape, filter_doc, duration_ms, docs, failed=failed)
+        if duration_ms >= self.profiler.slow_ms:
+            self.profiler.slow_commands.append({
+                "at": datetime.now(timezone.utc).isoformat(),
+                "command": name,
+                "collection": collection,
+                "shape": shape,
+                "ms": round(duration_ms, 2),
+                "docs": docs,
+                "failed": failed,
+                "correlation_id": correlation_id,
+                "profile_key": profile.key if profile else None,
+            })
+
+    def succeeded(self, event) -> None:
+        self._finish(event, event.reply, failed=False)
+
+    def failed(self, event) -> None:
+        self._finish(event, None, failed=True)
+
+
+class QueryProfiler:
+    def __init__(self):
+        self.sample_rate = min(1.0, max(0.0, _env_float("QUERY_PROFILER_SAMPLE_RATE", 0.0)))
+        self.slow_ms = _env_float("QUERY_PROFILER_SLOW_MS", 100.0)
+        self.n_plus_one_threshold = int(_env_float("QUERY_PROFILER_N_PLUS_ONE", 5))
+        self.listener = _ProfilingListener(self)
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_PROFILES)
+        self.slow_commands: Deque[Dict[str, Any]] = deque(maxlen=RECENT_SLOW_COMMANDS)
+        self._plan_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def client_listeners(self) -> List[monitoring.CommandListener]:
+        """event_listeners for AsyncIOMotorClient: needed for profiling or Mongo latency metrics."""
+        metrics_on = (os.environ.get("METRICS_ENABLED") or "true").strip().lower() != "false"
+        return [self.listener] if self.enabled or metrics_on else []
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    @contextmanager
+    def scope(self, kind: str, key: str, label: str, sampled: bool = True):
+        """Profile Mongo commands issued inside this block (request or job run). Yields the profile or None."""
+        if not (self.enabled and sampled):
+            yield None
+            return
+        profile = QueryProfile(kind, key, label)
+        token = _current_profile.set(profile)
+        try:
+            yield profile
+        finally:
+            _current_profile.reset(token)
+
+    def analyze(self, profile: QueryProfile) -> List[Dict[str, Any]]:
+        """Set slow / n_plus_one flags; return the shapes worth an explain (slowest first)."""
+        candidates = []
+        with profile._lock:
+            stats = list(profile.shapes.values())
+        for stat in sorted(stats, key=lambda s: s["total_ms"], reverse=True):
+            slow = stat["max_ms"] >= self.slow_ms
+            repeated = stat["command"] != "getMore" and stat["count"] >= self.n_plus_one_threshold
+            if slow:
+                profile.flags.append(FLAG_SLOW)
+            if repeated:
+                profile.flags.append(FLAG_N_PLUS_ONE)
+                stat["n_plus_one"] = True
+            if (slow or repeated) and stat.get("_filter") is not None and stat["collection"]:
+                candidates.append(stat)
+        return candidates[:MAX_EXPLAINS_PER_PROFILE]
+
+    async def explain_shape(self, db, stat: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        cache_key = (stat["collection"], stat["shape"])
+        cached = self._plan_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+        try:
+            result = await db.command(
+                {"explain": {"find": stat["collection"], "filter": stat["_filter"]}, "verbosity": "queryPlanner"}
+            )
+        except Exception as e:
+            logger.debug("Query profiler explain failed for %s: %s", cache_key, e)
+            return None
+        stages = plan_stages((result.get("queryPlanner") or {}).get("winningPlan") or {})
+        plan = {"stages": stages, "collscan": "COLLSCAN" in stages}
+        self._plan_cache[cache_key] = (time.monotonic() + PLAN_CACHE_SECONDS, plan)
+        return plan
+
+    async def finish(self, profile: Optional[QueryProfile], db=None, store: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+        """Analyze a finished profile, explain suspicious shapes, keep it in memory and store it if flagged."""
+        if profile is None or not profile.command_count:
+            return None
+        candidates = self.analyze(profile)
+        if db is None:
+            from database import database
+            db = database.get_db()
+        if db is not None:
+            for stat in candidates:
+                plan = await self.explain_shape(db, stat)
+                if plan:
+                    stat["plan"] = plan["stages"]
+                    if plan["collscan"]:
+                        stat["collscan"] = True
+                        profile.flags.append(FLAG_COLLSCAN)
+        doc = profile.as_dict()
+        self.recent.appendleft(doc)
+        if store is None:
+            store = bool(doc["flags"])
+        if store and db is not None:
+            try:
+                await db[PROFILE_COLLECTION].insert_one({**doc, "created_at": datetime.now(timezone.utc)})
+            except Exception as e:
+                logger.debug("Query profile not stored: %s", e)
+        return doc
+
+    def finish_in_background(self, profile: Optional[QueryProfile]) -> None:
+        """Explains and storage run after the response; never on the request path."""
+        if profile is None or not profile.command_count:
+            return
+        try:
+            asyncio.get_running_loop().create_task(self.finish(profile))
+        except RuntimeError:
+            pass
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "n_plus_one_threshold": self.n_plus_one_threshold,
+            "recent_profiles": len(self.recent),
+            "recent_slow_commands": len(self.slow_commands),
+            "cached_plans": len(self._plan_cache),
+        }
+
+
+query_profiler = QueryProfiler()
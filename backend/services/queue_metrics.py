@@ -0,0 +1,65 @@
+"""
+Queue depth and lag for /api/metrics, computed at scrape time (utils.metrics collector).
+
+- depth: documents waiting (PENDING)
+- lag: seconds since the oldest due item became runnable (0 when nothing is overdue)
+Each queue costs one indexed count and one indexed find_one per scrape.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import database
+from utils.metrics import REGISTRY, family
+
+# name -> (collection, pending filter, due-time field, field stores ISO strings)
+QUEUES: Dict[str, Tuple[str, Dict[str, Any], str, bool]] = {
+    "compliance_recalc": ("compliance_recalc_queue", {"status": "PENDING"}, "next_run_at", True),
+    "notification_retry": ("notification_retry_queue", {"status": "PENDING"}, "next_run_at", False),
+    "document_extraction": ("extracted_documents", {"status": "PENDING"}, "audit.created_at", False),
+    "order_pipeline": ("order_pipeline_queue", {"status": "pending"}, "available_at", False),
+    "stripe_events": ("stripe_events", {"status": "QUEUED"}, "available_at", False),
+}
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return None
+
+
+async def queue_stats(db, now: Optional[datetime] = None) -> Dict[str, Dict[str, float]]:
+    now = now or datetime.now(timezone.utc)
+    stats = {}
+    for name, (collection, pending, due_field, iso) in QUEUES.items():
+        depth = await db[collection].count_documents(pending)
+        oldest = None
+        if depth:
+            due_filter = {**pending, due_field: {"$lte": now.isoformat() if iso else now}}
+            doc = await db[collection].find_one(due_filter, {"_id": 0, due_field: 1}, sort=[(due_field, 1)])
+            if doc:
+                value: Any = doc
+                for part in due_field.split("."):
+                    value = value.get(part) if isinstance(value, dict) else None
+                oldest = _as_datetime(value)
+        lag = max(0.0, (now - oldest).total_seconds()) if oldest else 0.0
+        stats[name] = {"depth": depth, "lag_seconds": round(lag, 3)}
+    return stats
+
+
+@REGISTRY.register_collector
+async def collect_queue_metrics() -> List[tuple]:
+    db = database.get_db()
+    if db is None:
+        return []
+    stats = await queue_stats(db)
+    return [
+        family("queue_depth", "gauge", "Pending items per background queue",
+               [({"queue": name}, s["depth"]) for name, s in stats.items()]),
+        family("queue_lag_seconds", "gauge", "Age of the oldest due item per background queue",
+               [({"queue": name}, s["lag_seconds"]) for name, s in stats.items()]),
+    ]
@@ -4,6 +4,7 @@ Enterprise-grade report with cover, executive summary, portfolio breakdown,
 property requirement matrix, methodology, audit snapshot, and disclaimer.
 Data loading is async; PDF build is delegated to pdf_report_builder (sync).
 """
+import asyncio
 from database import database
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional
@@ -298,3 +299,51 @@ async def load_evidence_readiness_data(
                 report_data["score_change_summary"] = reason[:80] if reason else None
 
     return report_data
+
+
+async def render_evidence_readiness_pdf(
+    client_id: str,
+    scope: str,
+    property_id: Optional[str],
+    report_data: Dict[str, Any],
+):
+    """
+    Evidence Readiness PDF from load_evidence_readiness_data() output, via the artifact cache:
+    unchanged data (same UTC day: the report prints the date of report_data["now_iso"]) is streamed from
+    storage instead of rebuilt. Returns an artifact_cache.Artifact.
+    """
+    from services.artifact_cache import artifact_key, get_or_render
+    from services.pdf_report_builder import REPORT_TEMPLATE_VERSION, build_portfolio_report, build_property_report
+
+    if scope == "portfolio":
+        kind, build, args = "evidence_readiness_portfolio", build_portfolio_report, (client_id, report_data)
+    else:
+        kind, build, args = "evidence_readiness_property", build_property_report, (client_id, property_id, report_data)
+    inputs = {**report_data, "now_iso": (report_data.get("now_iso") or "")[:10], "property_id": property_id}
+    key = artifact_key(kind, client_id, REPORT_TEMPLATE_VERSION, inputs)
+    return await get_or_render(kind, key, client_id, lambda: asyncio.to_thread(build, *args))
+
+
+async def render_score_explanation_pdf(
+    client_id: str,
+    score_payload: Dict[str, Any],
+    client_doc: Dict[str, Any],
+    branding: Dict[str, Any],
+):
+    """Compliance Score Summary PDF via the artifact cache (same rules as render_evidence_readiness_pdf)."""
+    from services.artifact_cache import artifact_key, get_or_render
+    from services.pdf_report_builder import REPORT_TEMPLATE_VERSION, build_score_explanation_report
+
+    kind = "score_explanation"
+    now = datetime.now(timezone.utc)
+    inputs = {
+        "score": score_payload,
+        "client": client_doc,
+        "branding": branding,
+        "date": now.date().isoformat(),
+    }
+    key = artifact_key(kind, client_id, REPORT_TEMPLATE_VERSION, inputs)
+    return await get_or_render(
+        kind, key, client_id,
+        lambda: asyncio.to_thread(build_score_explanation_report, client_id, score_payload, client_doc, branding, now),
+    )
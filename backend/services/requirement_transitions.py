@@ -0,0 +1,120 @@
+"""
+Requirement expiry transition index.
+
+Every requirement carries two denormalized fields (utils.expiry_utils.get_transition_fields):
+- effective_expiry_at: effective expiry (confirmed, else extracted, else due_date) as UTC ISO,
+  null when NOT_REQUIRED or undated; reminders query it by range instead of loading every
+  requirement of a client.
+- next_transition_at: when get_computed_status() will next change on its own
+  (COMPLIANT -> EXPIRING_SOON -> OVERDUE); null when it will not.
+
+Writers call sync_requirement_transitions() after changing dates/applicability (inserts set
+the fields directly). The daily jobs (send_daily_reminders, run_expiry_rollover_recalc) call
+process_due_transitions(), which reads only requirements whose next_transition_at is at or
+before now, so daily work follows the number of state changes, not the portfolio size.
+Requirements written before the fields existed: run scripts/backfill_requirement_transitions.py
+once after deploy.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+import logging
+
+from pymongo import UpdateOne
+
+from models import RequirementStatus
+from utils.expiry_utils import get_computed_status, get_transition_fields
+
+logger = logging.getLogger(__name__)
+
+TRANSITION_BATCH_SIZE = 500
+
+# Fields needed to recompute effective expiry / computed status
+TRANSITION_PROJECTION = {
+    "_id": 0, "requirement_id": 1, "property_id": 1, "client_id": 1, "status": 1, "applicability": 1,
+    "confirmed_expiry_date": 1, "extracted_expiry_date": 1, "due_date": 1,
+}
+
+_TIME_DRIVEN_STATUSES = (RequirementStatus.EXPIRING_SOON.value, RequirementStatus.OVERDUE.value)
+
+
+async def sync_requirement_transitions(db, query: Dict[str, Any], as_of: Optional[datetime] = None) -> int:
+    """Recompute effective_expiry_at / next_transition_at for requirements matching query. Returns count."""
+    count = 0
+    ops = []
+    async for req in db.requirements.find(query, TRANSITION_PROJECTION):
+        if not req.get("requirement_id"):
+            continue
+        ops.append(UpdateOne({"requirement_id": req["requirement_id"]}, {"$set": get_transition_fields(req, as_of)}))
+        count += 1
+        if len(ops) >= TRANSITION_BATCH_SIZE:
+            await db.requirements.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.requirements.bulk_write(ops, ordered=False)
+    return count
+
+
+async def process_due_transitions(
+    db,
+    correlation_prefix: str = "EXPIRY_JOB",
+    as_of: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Apply time-driven status changes for requirements whose next_transition_at has passed:
+    set status to EXPIRING_SOON/OVERDUE when it changed, advance the transition fields and
+    enqueue one compliance recalc per affected property. Idempotent: a second run the same
+    day finds nothing due.
+    """
+    from services.compliance_recalc_queue import enqueue_compliance_recalc, TRIGGER_EXPIRY_JOB, ACTOR_SYSTEM
+
+    now = as_of or datetime.now(timezone.utc)
+    now_iso = now.astimezone(timezone.utc).isoformat()
+    query = {"next_transition_at": {"$lte": now_iso}}
+
+    processed = 0
+    status_changes = 0
+    properties: Dict[str, str] = {}
+    ops = []
+    async for req in db.requirements.find(query, TRANSITION_PROJECTION):
+        requirement_id = req.get("requirement_id")
+        if not requirement_id:
+            continue
+        processed += 1
+        update = get_transition_fields(req, now)
+        computed = get_computed_status(req, now)
+        if computed in _TIME_DRIVEN_STATUSES and req.get("status") != computed:
+            update["status"] = computed
+            status_changes += 1
+        if req.get("property_id") and req.get("client_id"):
+            properties[req["property_id"]] = req["client_id"]
+        ops.append(UpdateOne({"requirement_id": requirement_id}, {"$set": update}))
+        if len(ops) >= TRANSITION_BATCH_SIZE:
+            await db.requirements.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.requirements.bulk_write(ops, ordered=False)
+
+    date_str = now.strftime("%Y-%m-%d")
+    enqueued = 0
+    for property_id, client_id in properties.items():
+        if await enqueue_compliance_recalc(
+            property_id=property_id,
+            client_id=client_id,
+            trigger_reason=TRIGGER_EXPIRY_JOB,
+            actor_type=ACTOR_SYSTEM,
+            actor_id=None,
+            correlation_id=f"{correlation_prefix}:{property_id}:{date_str}",
+        ):
+            enqueued += 1
+
+    if processed:
+        logger.info(
+            "Requirement transitions: %s due, %s status change(s), %s recalc(s) enqueued",
+            processed, status_changes, enqueued,
+        )
+    return {
+        "processed": processed,
+        "status_changes": status_changes,
+        "properties": len(properties),
+        "enqueued": enqueued,
+    }
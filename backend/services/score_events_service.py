@@ -9,6 +9,7 @@ Event types: DOCUMENT_UPLOADED, DOCUMENT_CONFIRMED, REQUIREMENT_STATUS_CHANGED,
 PROPERTY_ADDED, PROPERTY_UPDATED, REMINDER_SENT, SCORE_RECALCULATED.
 """
 from database import database
+from services.score_history_retention import before_raw_window, rollup_rows
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional, List
 import logging
@@ -110,6 +111,14 @@ async def get_timeline(
         {"_id": 0, "created_at": 1, "score_after": 1},
     ).sort("created_at", 1)
     events = await cursor.to_list(5000)
+    # Days past the raw window survive as rollups (last score of the day)
+    start_day = start.strftime("%Y-%m-%d")
+    if before_raw_window("score_events", start_day):
+        rolled = [
+            {"created_at": r["created_at"], "score_after": r["score_after"]}
+            for r in await rollup_rows(db, "score_events", client_id, start_day)
+        ]
+        events = rolled + events
 
     # Bucket by date (day or week start)
     buckets: Dict[str, int] = {}
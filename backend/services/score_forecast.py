@@ -0,0 +1,322 @@
+"""
+Vectorized Compliance Score v1 over many properties x many dates (NumPy).
+
+compute_property_score() scores one property at one as_of date. Everything that does not
+depend on the date (applicable weights, multipliers, evidence document per requirement key,
+NOT_REQUIRED/UNKNOWN handling, unverified/low-confidence downgrade) is resolved once per
+property by encode_property(); only the expiry comparison varies with the date. The encoded
+portfolio is a set of (properties x slots) arrays, one slot per applicable requirement key in
+the same order compute_property_score sums them, so score_matrix() evaluates every
+(property, date) pair in one pass and returns exactly the score_0_100 / risk_level that
+compute_property_score would (tests/test_score_forecast.py checks parity).
+
+Used by:
+- GET /api/client/compliance-score/forecast (30/60/90-day outlook)
+- compliance_trending.backfill_property_daily_snapshots (fill missed nightly rows)
+"""
+from database import database
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from services.compliance_scoring import (
+    CRITICAL_KEYS,
+    _applicable_weights,
+    _multiplier,
+    _req_type_to_key,
+)
+from services.document_status_service import (
+    EXPIRING_SOON_DAYS,
+    STATUS_EXPIRED,
+    STATUS_NEEDS_REVIEW,
+    STATUS_TO_FRACTION,
+    STATUS_VALID,
+    STATUS_EXPIRING_SOON,
+    _doc_expiry_date,
+    compute_requirement_status,
+    pick_evidence_document,
+)
+from services.requirement_catalog import REQUIREMENT_KEY_TO_DOCUMENT_TYPE
+
+logger = logging.getLogger(__name__)
+
+RISK_LEVELS = ("Low risk", "Medium risk", "High risk", "Critical risk")
+FORECAST_HORIZONS_DAYS = (30, 60, 90)
+MAX_FORECAST_DAYS = 366
+
+# Same property fields calculate_property_compliance loads for scoring
+PROPERTY_SCORING_PROJECTION = {
+    "_id": 0, "property_id": 1, "client_id": 1, "is_hmo": 1, "bedrooms": 1, "occupancy": 1,
+    "licence_required": 1, "licence_type": 1, "cert_gas_safety": 1, "cert_licence": 1,
+    "has_gas_supply": 1, "has_gas": 1, "tenancy_active": 1, "deposit_taken": 1, "created_at": 1,
+}
+
+_EXPECTS_EXPIRY_KEYS = {"GAS_SAFETY_CERT", "EICR_CERT", "EPC_CERT", "PROPERTY_LICENCE"}
+_FRACTION_EXPIRED = STATUS_TO_FRACTION[STATUS_EXPIRED]
+_FRACTION_EXPIRING = STATUS_TO_FRACTION[STATUS_EXPIRING_SOON]
+_FRACTION_VALID = STATUS_TO_FRACTION[STATUS_VALID]
+_FRACTION_REVIEW = STATUS_TO_FRACTION[STATUS_NEEDS_REVIEW]
+
+
+def _is_downgraded(doc: Dict[str, Any], expiry: date, expects_expiry: bool) -> bool:
+    """
+    True when compute_requirement_status turns VALID/EXPIRING_SOON into NEEDS_REVIEW for this
+    doc (unverified or low confidence). Probed on a date where the doc is plainly VALID so the
+    rule stays defined in one place.
+    """
+    try:
+        probe = expiry - timedelta(days=EXPIRING_SOON_DAYS + 1)
+    except OverflowError:
+        probe = date.min
+    return compute_requirement_status(probe, doc, expects_expiry, EXPIRING_SOON_DAYS)["status"] == STATUS_NEEDS_REVIEW
+
+
+def encode_property(
+    property_doc: Dict[str, Any],
+    requirements: List[Dict[str, Any]],
+    documents: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Date-independent part of compute_property_score for one property.
+    Returns {property_id, empty, slots: [{key, wn, dated, fixed, expiry_ordinal, downgraded, critical}]}
+    where wn is the renormalized weight (100 * we / We_total) and, for dated slots, the status
+    fraction is derived from expiry_ordinal at evaluation time.
+    """
+    prop_id = property_doc.get("property_id", "")
+    applicable_w = _applicable_weights(property_doc)
+    if not applicable_w:
+        return {"property_id": prop_id, "empty": True, "slots": []}
+
+    req_id_to_key: Dict[str, str] = {}
+    req_id_to_applicability: Dict[str, str] = {}
+    for r in requirements:
+        key = _req_type_to_key(r.get("requirement_type") or r.get("requirement_code"))
+        if key is not None and key in applicable_w:
+            rid = r.get("requirement_id") or r.get("id")
+            if rid:
+                req_id_to_key[rid] = key
+                app = r.get("applicability") or "UNKNOWN"
+                req_id_to_applicability[rid] = app.strip().upper() if isinstance(app, str) else "UNKNOWN"
+
+    is_hmo = bool(property_doc.get("is_hmo", False))
+    occupancy = property_doc.get("occupancy")
+    bedrooms = property_doc.get("bedrooms")
+    critical_keys = {k for k in CRITICAL_KEYS if k in applicable_w}
+
+    slots = []
+    We_total = 0.0
+    for key in applicable_w:
+        we = applicable_w[key] * _multiplier(key, is_hmo, occupancy, bedrooms)
+        We_total += we
+        slot = {"key": key, "we": we, "dated": False, "fixed": 0.0, "expiry_ordinal": 0,
+                "downgraded": False, "critical": key in critical_keys}
+        slots.append(slot)
+
+        req_ids_for_key = [rid for rid, k in req_id_to_key.items() if k == key]
+        applicability_for_key = [req_id_to_applicability.get(rid, "UNKNOWN") for rid in req_ids_for_key]
+        if "NOT_REQUIRED" in applicability_for_key:
+            slot["fixed"] = 1.0
+            continue
+        candidate_docs = [d for d in documents if d.get("requirement_id") in req_ids_for_key]
+        evidence_doc = pick_evidence_document(candidate_docs, REQUIREMENT_KEY_TO_DOCUMENT_TYPE.get(key, ""))
+        expects_expiry = key in _EXPECTS_EXPIRY_KEYS
+        expiry = _doc_expiry_date(evidence_doc) if evidence_doc is not None else None
+        if expiry is not None:
+            slot["dated"] = True
+            slot["expiry_ordinal"] = expiry.toordinal()
+            slot["downgraded"] = _is_downgraded(evidence_doc, expiry, expects_expiry)
+            continue
+        # No doc, or no expiry: status does not depend on the date
+        status = compute_requirement_status(date.today(), evidence_doc, expects_expiry, EXPIRING_SOON_DAYS)["status"]
+        fraction = STATUS_TO_FRACTION.get(status, 0.0)
+        if "UNKNOWN" in applicability_for_key and fraction <= 0.0 and not evidence_doc:
+            fraction = 0.5
+        slot["fixed"] = fraction
+
+    if We_total <= 0:
+        return {"property_id": prop_id, "empty": True, "slots": []}
+    for slot in slots:
+        slot["wn"] = 100.0 * slot.pop("we") / We_total
+    return {"property_id": prop_id, "empty": False, "slots": slots}
+
+
+class EncodedPortfolio:
+    """(properties x slots) arrays for score_matrix(). Unused slots have wn=0 and a fixed fraction."""
+
+    def __init__(self, encoded: Sequence[Dict[str, Any]], properties: Optional[Sequence[Dict[str, Any]]] = None):
+        self.property_ids = [e["property_id"] for e in encoded]
+        self.properties = list(properties) if properties is not None else None
+        n = len(encoded)
+        width = max((len(e["slots"]) for e in encoded), default=0)
+        self.wn = np.zeros((n, width), dtype=np.float64)
+        self.fixed = np.zeros((n, width), dtype=np.float64)
+        self.expiry_ordinal = np.zeros((n, width), dtype=np.int64)
+        self.dated = np.zeros((n, width), dtype=bool)
+        self.downgraded = np.zeros((n, width), dtype=bool)
+        self.critical = np.zeros((n, width), dtype=bool)
+        self.empty = np.array([bool(e["empty"]) for e in encoded], dtype=bool)
+        for i, e in enumerate(encoded):
+            for j, slot in enumerate(e["slots"]):
+                self.wn[i, j] = slot["wn"]
+                self.fixed[i, j] = slot["fixed"]
+                self.expiry_ordinal[i, j] = slot["expiry_ordinal"]
+                self.dated[i, j] = slot["dated"]
+                self.downgraded[i, j] = slot["downgraded"]
+                self.critical[i, j] = slot["critical"]
+
+    def __len__(self) -> int:
+        return len(self.property_ids)
+
+
+def encode_portfolio(
+    items: Iterable[Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]],
+) -> EncodedPortfolio:
+    """Encode (property_doc, requirements, documents) triples."""
+    properties = []
+    encoded = []
+    for property_doc, requirements, documents in items:
+        properties.append(property_doc)
+        encoded.append(encode_property(property_doc, requirements, documents))
+    return EncodedPortfolio(encoded, properties)
+
+
+def _date_ordinals(dates: Sequence[Any]) -> np.ndarray:
+    # compute_property_score evaluates at as_of.date()
+    return np.array(
+        [(d.date() if isinstance(d, datetime) else d).toordinal() for d in dates],
+        dtype=np.int64,
+    )
+
+
+def score_matrix(portfolio: EncodedPortfolio, dates: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Scores (int, properties x dates) and risk indexes into RISK_LEVELS (same shape) for every
+    property at every date (date or datetime).
+    """
+    n, width = portfolio.wn.shape
+    ordinals = _date_ordinals(dates)
+    days = portfolio.expiry_ordinal[:, :, None] - ordinals[None, None, :]
+    downgraded = portfolio.downgraded[:, :, None]
+    dated_fraction = np.where(
+        days < 0,
+        _FRACTION_EXPIRED,
+        np.where(
+            downgraded,
+            _FRACTION_REVIEW,
+            np.where(days <= EXPIRING_SOON_DAYS, _FRACTION_EXPIRING, _FRACTION_VALID),
+        ),
+    )
+    fraction = np.where(portfolio.dated[:, :, None], dated_fraction, portfolio.fixed[:, :, None])
+
+    # Accumulate slot by slot (not np.sum) so float rounding matches the scalar loop exactly
+    score_sum = np.zeros((n, len(ordinals)), dtype=np.float64)
+    for j in range(width):
+        score_sum = score_sum + portfolio.wn[:, j, None] * fraction[:, j, :]
+    scores = np.rint(np.clip(score_sum, 0, 100)).astype(np.int64)
+
+    critical = portfolio.critical[:, :, None]
+    critical_missing = np.any(critical & (fraction <= 0.0), axis=1)
+    critical_overdue = np.any(critical & ((fraction == 0.25) | (fraction == _FRACTION_EXPIRED)), axis=1)
+    risk = np.where(
+        critical_missing | (scores < 40), 3,
+        np.where(critical_overdue | (scores < 60), 2, np.where(scores < 80, 1, 0)),
+    ).astype(np.int8)
+
+    scores[portfolio.empty, :] = 100
+    risk[portfolio.empty, :] = 0
+    return scores, risk
+
+
+def portfolio_series(properties: Sequence[Dict[str, Any]], scores: np.ndarray, risk: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    portfolio_score_and_risk() for every date column: E(p)-weighted mean score and worst risk.
+    Like the scalar version, a property scoring 0 is skipped in the weighted mean.
+    """
+    dates = scores.shape[1]
+    if not len(properties):
+        return np.full(dates, 100, dtype=np.int64), np.zeros(dates, dtype=np.int8)
+    weighted_sum = np.zeros(dates, dtype=np.float64)
+    weight_sum = np.zeros(dates, dtype=np.float64)
+    for i, p in enumerate(properties):
+        bedrooms = p.get("bedrooms") or 0
+        occupancy = (p.get("occupancy") or "").strip().lower()
+        e = 1.0 + (0.5 if bool(p.get("is_hmo", False)) else 0) + (0.2 if bedrooms >= 4 else 0) + (0.2 if occupancy != "single_family" else 0)
+        counted = scores[i] != 0
+        weighted_sum = weighted_sum + np.where(counted, scores[i].astype(np.float64) * e, 0.0)
+        weight_sum = weight_sum + np.where(counted, e, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(weight_sum > 0, np.rint(weighted_sum / np.where(weight_sum > 0, weight_sum, 1.0)), 100)
+    return np.clip(mean, 0, 100).astype(np.int64), risk.max(axis=0).astype(np.int8)
+
+
+def date_range(start: date, days: int) -> List[date]:
+    """start, start+1, ... (days entries)."""
+    return [start + timedelta(days=i) for i in range(max(0, days))]
+
+
+async def load_client_portfolio(client_id: str, property_ids: Optional[List[str]] = None) -> EncodedPortfolio:
+    """Load properties, requirements and documents for a client (three queries) and encode them."""
+    db = database.get_db()
+    query: Dict[str, Any] = {"client_id": client_id}
+    if property_ids is not None:
+        query["property_id"] = {"$in": list(property_ids)}
+    properties = await db.properties.find(query, PROPERTY_SCORING_PROJECTION).to_list(5000)
+    ids = [p["property_id"] for p in properties if p.get("property_id")]
+    requirements_by_property: Dict[str, List[Dict[str, Any]]] = {pid: [] for pid in ids}
+    documents_by_property: Dict[str, List[Dict[str, Any]]] = {pid: [] for pid in ids}
+    if ids:
+        async for r in db.requirements.find({"property_id": {"$in": ids}}, {"_id": 0}):
+            requirements_by_property.get(r.get("property_id"), []).append(r)
+        async for d in db.documents.find({"property_id": {"$in": ids}}, {"_id": 0}):
+            documents_by_property.get(d.get("property_id"), []).append(d)
+    return encode_portfolio(
+        (p, requirements_by_property.get(p.get("property_id"), []), documents_by_property.get(p.get("property_id"), []))
+        for p in properties
+    )
+
+
+async def forecast_client_scores(
+    client_id: str,
+    days: int = 90,
+    horizons: Sequence[int] = FORECAST_HORIZONS_DAYS,
+) -> Dict[str, Any]:
+    """
+    Projected daily scores for the next `days` days from current evidence (no new uploads
+    or renewals assumed). Returns the portfolio series, per-property horizon scores and the
+    first date each property's score drops.
+    """
+    days = min(max(1, days), MAX_FORECAST_DAYS)
+    portfolio = await load_client_portfolio(client_id)
+    today = datetime.now(timezone.utc).date()
+    dates = date_range(today, days + 1)
+    scores, risk = score_matrix(portfolio, dates)
+    portfolio_scores, portfolio_risk = portfolio_series(portfolio.properties or [], scores, risk)
+
+    horizons = [h for h in horizons if 0 <= h <= days]
+    properties = []
+    for i, property_id in enumerate(portfolio.property_ids):
+        drops = np.nonzero(scores[i, 1:] < scores[i, :-1])[0]
+        properties.append({
+            "property_id": property_id,
+            "current_score": int(scores[i, 0]),
+            "current_risk_level": RISK_LEVELS[risk[i, 0]],
+            "horizons": {
+                str(h): {"score": int(scores[i, h]), "risk_level": RISK_LEVELS[risk[i, h]]} for h in horizons
+            },
+            "next_drop_date": dates[int(drops[0]) + 1].isoformat() if len(drops) else None,
+        })
+    return {
+        "as_of": today.isoformat(),
+        "days": days,
+        "points": [
+            {"date": d.isoformat(), "score": int(portfolio_scores[k]), "risk_level": RISK_LEVELS[portfolio_risk[k]]}
+            for k, d in enumerate(dates)
+        ],
+        "horizons": {
+            str(h): {"score": int(portfolio_scores[h]), "risk_level": RISK_LEVELS[portfolio_risk[h]]} for h in horizons
+        },
+        "properties": properties,
+        "assumptions": "Current documents only; no renewals or new uploads.",
+    }
@@ -0,0 +1,383 @@
+"""
+Tiered retention for the score history collections.
+
+Every recalc writes property_compliance_score_history, score_change_log, score_ledger_events and
+score_events rows, and the nightly snapshot job adds compliance_score_history and
+property_score_daily rows. The nightly score_history_retention job (partitioned by client) keeps
+three tiers per collection (POLICIES):
+
+- raw: rows newer than the policy's raw window stay untouched (SCORE_HISTORY_RAW_DAYS for the
+  daily series, SCORE_EVENTS_RAW_DAYS for the event logs). keep_latest additionally keeps the
+  newest N rows per property raw whatever their age, so "last N" reads never change;
+- daily / weekly: for collections with a score, older rows are folded into per-day aggregates in
+  score_history_rollups (count, avg / min / max, last score and the last row's display fields).
+  Daily buckets older than SCORE_HISTORY_DAILY_DAYS are folded again into ISO-week buckets
+  (Monday start, like score_events_service.get_timeline);
+- archive: the raw rows themselves are written to gzip NDJSON segments in GridFS
+  (ARCHIVE_BUCKET, utils.ndjson_archive) and then deleted.
+
+Readers stay transparent: rollup_rows() returns rolled-up buckets shaped like raw rows for the
+trend queries (one row per day, so the daily tier returns exactly what the raw rows did), and
+archived_rows() / filter_rows() let the ledger page past the raw window.
+
+Re-runs are safe: each rollup records the last row merged ("through", rows are processed in
+(time, _id) order) and skips anything at or before it. Each archive batch is journalled
+(ARCHIVE_BATCHES_COLLECTION: its row _ids, and whether its segment is complete) before the
+segment is written and removed once the rows are deleted; the next run for that client finishes
+an interrupted batch first (deletes the rows of a complete one, drops the segment of an
+incomplete one), so no row is archived twice and segment counts stay exact.
+"""
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from database import database
+from utils.ndjson_archive import delete_segments, find_segments, match_query, overlap_filter, read_segment, write_segment
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_COLLECTION = "score_history_rollups"
+ARCHIVE_BUCKET = "score_history_archive"
+# Write-ahead entries for archive batches in flight: {_id: batch_id, collection, client_id, ids, segment_complete}
+ARCHIVE_BATCHES_COLLECTION = "score_history_archive_batches"
+
+TIME_DATE = "date"  # "YYYY-MM-DD" strings
+TIME_ISO = "iso"  # ISO 8601 strings (UTC)
+TIME_DATETIME = "datetime"  # BSON dates
+
+
+def _env_days(name: str, default: int) -> int:
+    value = (os.environ.get(name) or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else default
+
+
+SCORE_HISTORY_RAW_DAYS = _env_days("SCORE_HISTORY_RAW_DAYS", 35)
+SCORE_EVENTS_RAW_DAYS = _env_days("SCORE_EVENTS_RAW_DAYS", 180)
+SCORE_HISTORY_DAILY_DAYS = _env_days("SCORE_HISTORY_DAILY_DAYS", 400)
+RETENTION_BATCH = 2000
+
+
+@dataclass(frozen=True)
+class HistoryPolicy:
+    collection: str
+    time_field: str
+    time_kind: str
+    raw_days: int
+    series_field: Optional[str] = None  # series key besides client_id (e.g. property_id)
+    score_field: Optional[str] = None  # None: archive only, no rollups
+    rollup_event_type: Optional[str] = None  # only rows of this event_type feed rollups
+    keep_fields: Tuple[str, ...] = ()  # display fields copied from the bucket's last row
+    keep_latest: int = 0  # newest N rows per series_field always stay raw
+
+
+POLICIES: Dict[str, HistoryPolicy] = {p.collection: p for p in (
+    HistoryPolicy(
+        "compliance_score_history", "date_key", TIME_DATE, SCORE_HISTORY_RAW_DAYS, score_field="score",
+        keep_fields=("snapshot_id", "grade", "color", "breakdown", "stats", "timestamp", "created_at", "updated_at"),
+    ),
+    HistoryPolicy(
+        "property_score_daily", "date", TIME_DATE, SCORE_HISTORY_RAW_DAYS, series_field="property_id",
+        score_field="score", keep_fields=("source", "created_at", "updated_at"),
+    ),
+    # Admin property history reads up to the last 200 rows
+    HistoryPolicy(
+        "property_compliance_score_history", "created_at", TIME_ISO, SCORE_HISTORY_RAW_DAYS,
+        series_field="property_id", score_field="score", keep_fields=("breakdown_summary", "reason", "actor"),
+        keep_latest=200,
+    ),
+    HistoryPolicy(
+        "score_events", "created_at", TIME_DATETIME, SCORE_EVENTS_RAW_DAYS, score_field="score_after",
+        rollup_event_type="SCORE_RECALCULATED",
+    ),
+    HistoryPolicy("score_ledger_events", "created_at", TIME_ISO, SCORE_EVENTS_RAW_DAYS),
+    # Property score-history endpoint and report deltas read the latest 50 / latest 1
+    HistoryPolicy("score_change_log", "created_at", TIME_ISO, SCORE_EVENTS_RAW_DAYS, series_field="property_id", keep_latest=50),
+)}
+
+
+def raw_cutoff_date(policy: HistoryPolicy, today: Optional[date] = None) -> date:
+    return (today or datetime.now(timezone.utc).date()) - timedelta(days=policy.raw_days)
+
+
+def _cutoff_value(policy: HistoryPolicy, day: date) -> Any:
+    if policy.time_kind == TIME_DATE:
+        return day.isoformat()
+    midnight = datetime.combine(day, time(0), tzinfo=timezone.utc)
+    return midnight if policy.time_kind == TIME_DATETIME else midnight.isoformat()
+
+
+def _time_str(value: Any) -> str:
+    """Sortable string form of a stored time (BSON dates come back naive UTC)."""
+    if isinstance(value, datetime):
+        return (value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value).isoformat()
+    return str(value or "")
+
+
+def _week_start(day: str) -> str:
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def before_raw_window(collection: str, start_date: str, today: Optional[date] = None) -> bool:
+    """True if a read from start_date ("YYYY-MM-DD") reaches past the collection's raw window."""
+    return start_date < raw_cutoff_date(POLICIES[collection], today).isoformat()
+
+
+# ---- Rollups -------------------------------------------------------------------------------
+
+def _rollup_id(collection: str, granularity: str, client_id: str, series: Optional[str], bucket: str) -> str:
+    return f"{collection}|{granularity}|{client_id}|{series or '-'}|{bucket}"
+
+
+def _merge(doc: Optional[Dict[str, Any]], point: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a later point (a raw row's score, or a daily rollup) into a bucket aggregate."""
+    if doc is None:
+        return dict(point)
+    doc = dict(doc)
+    doc["count"] += point["count"]
+    doc["score_sum"] += point["score_sum"]
+    doc["score_min"] = min(doc["score_min"], point["score_min"])
+    doc["score_max"] = max(doc["score_max"], point["score_max"])
+    for field in ("score_last", "last_at", "last_date", "fields", "through"):
+        doc[field] = point[field]
+    return doc
+
+
+async def _write_rollups(db, docs: Dict[str, Dict[str, Any]]) -> None:
+    now = datetime.now(timezone.utc)
+    ops = []
+    for rollup_id, doc in docs.items():
+        doc["score_avg"] = round(doc["score_sum"] / doc["count"], 2)
+        doc["updated_at"] = now
+        ops.append(UpdateOne({"_id": rollup_id}, {"$set": doc}, upsert=True))
+    if ops:
+        await db[ROLLUPS_COLLECTION].bulk_write(ops, ordered=False)
+
+
+async def _roll_up_rows(db, policy: HistoryPolicy, client_id: str, rows: List[Dict[str, Any]]) -> int:
+    points = []
+    for row in rows:
+        score = row.get(policy.score_field)
+        if score is None or (policy.rollup_event_type and row.get("event_type") != policy.rollup_event_type):
+            continue
+        at = row[policy.time_field]
+        series = row.get(policy.series_field) if policy.series_field else None
+        day = _time_str(at)[:10]
+        points.append((_rollup_id(policy.collection, "day", client_id, series, day), series, day, {
+            "count": 1,
+            "score_sum": score,
+            "score_min": score,
+            "score_max": score,
+            "score_last": score,
+            "last_at": at,
+            "last_date": day,
+            "fields": {f: row[f] for f in policy.keep_fields if f in row},
+            "through": [_time_str(at), str(row["_id"])],
+        }))
+    if not points:
+        return 0
+    ids = list({p[0] for p in points})
+    existing = {d["_id"]: d for d in await db[ROLLUPS_COLLECTION].find({"_id": {"$in": ids}}).to_list(len(ids))}
+    docs: Dict[str, Dict[str, Any]] = {}
+    for rollup_id, series, day, point in points:
+        current = docs.get(rollup_id) or existing.get(rollup_id)
+        if current and point["through"] <= current["through"]:
+            continue  # merged by an earlier, interrupted run
+        if current is None:
+            point = {**point, "collection": policy.collection, "granularity": "day", "client_id": client_id, "bucket": day}
+            if policy.series_field:
+                point[policy.series_field] = series
+        docs[rollup_id] = _merge(current and {k: v for k, v in current.items() if k != "_id"}, point)
+    await _write_rollups(db, docs)
+    return len(docs)
+
+
+async def _downsample_to_weeks(db, policy: HistoryPolicy, client_id: str, before_day: str) -> int:
+    """Fold daily buckets older than before_day into weekly buckets."""
+    folded = 0
+    query = {"collection": policy.collection, "client_id": client_id, "granularity": "day", "bucket": {"$lt": before_day}}
+    while True:
+        days = await db[ROLLUPS_COLLECTION].find(query).sort("bucket", 1).limit(RETENTION_BATCH).to_list(RETENTION_BATCH)
+        if not days:
+            return folded
+        keyed = []
+        for d in days:
+            series = d.get(policy.series_field) if policy.series_field else None
+            week = _week_start(d["bucket"])
+            keyed.append((_rollup_id(policy.collection, "week", client_id, series, week), series, week, d))
+        ids = list({k[0] for k in keyed})
+        existing = {w["_id"]: w for w in await db[ROLLUPS_COLLECTION].find({"_id": {"$in": ids}}).to_list(len(ids))}
+        weeks: Dict[str, Dict[str, Any]] = {}
+        for rollup_id, series, week, d in keyed:
+            current = weeks.get(rollup_id) or existing.get(rollup_id)
+            point = {k: d[k] for k in ("count", "score_sum", "score_min", "score_max", "score_last", "last_at", "last_date", "fields")}
+            point["through"] = [d["bucket"], ""]
+            if current and point["through"] <= current["through"]:
+                continue
+            if current is None:
+                point.update({"collection": policy.collection, "granularity": "week", "client_id": client_id, "bucket": week})
+                if policy.series_field:
+                    point[policy.series_field] = series
+            weeks[rollup_id] = _merge(current and {k: v for k, v in current.items() if k != "_id"}, point)
+        await _write_rollups(db, weeks)
+        await db[ROLLUPS_COLLECTION].delete_many({"_id": {"$in": [d["_id"] for d in days]}})
+        folded += len(days)
+
+
+# ---- Archive -------------------------------------------------------------------------------
+
+async def _expired_filters(db, policy: HistoryPolicy, client_id: str, cutoff: Any) -> List[Dict[str, Any]]:
+    """Filters selecting the client's rows past the raw window (one per series with keep_latest)."""
+    expired = {"client_id": client_id, policy.time_field: {"$lt": cutoff}}
+    if not policy.keep_latest:
+        return [expired]
+    filters = []
+    collection = db[policy.collection]
+    for series in await collection.distinct(policy.series_field, expired):
+        nth_newest = await collection.find(
+            {"client_id": client_id, policy.series_field: series}, {"_id": 0, policy.time_field: 1},
+        ).sort(policy.time_field, -1).skip(policy.keep_latest - 1).limit(1).to_list(1)
+        if not nth_newest:
+            continue  # fewer than keep_latest rows: all stay raw
+        bound = min(cutoff, nth_newest[0][policy.time_field])
+        filters.append({"client_id": client_id, policy.series_field: series, policy.time_field: {"$lt": bound}})
+    return filters
+
+
+async def _recover_batches(db, policy: HistoryPolicy, client_id: str) -> None:
+    """Finish archive batches an interrupted run left in flight for this client (see module docstring)."""
+    batches = db[ARCHIVE_BATCHES_COLLECTION]
+    for batch in await batches.find({"collection": policy.collection, "client_id": client_id}).to_list(None):
+        if batch.get("segment_complete"):
+            await db[policy.collection].delete_many({"_id": {"$in": batch["ids"]}})
+        else:
+            await delete_segments(db, ARCHIVE_BUCKET, {"batch_id": batch["_id"]})
+        logger.info("Score history retention: recovered %s batch %s of %s (client %s)",
+                    "complete" if batch.get("segment_complete") else "incomplete", batch["_id"], policy.collection, client_id)
+        await batches.delete_one({"_id": batch["_id"]})
+
+
+async def apply_retention(db, policy: HistoryPolicy, client_id: str, today: Optional[date] = None) -> Dict[str, int]:
+    """Roll up, archive and delete one client's rows past the policy's raw window; downsample old daily buckets."""
+    await _recover_batches(db, policy, client_id)
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = _cutoff_value(policy, raw_cutoff_date(policy, today))
+    stats = {"archived": 0, "rolled_up": 0, "downsampled": 0}
+    for flt in await _expired_filters(db, policy, client_id, cutoff):
+        while True:
+            rows = await db[policy.collection].find(flt).sort(
+                [(policy.time_field, 1), ("_id", 1)]
+            ).limit(RETENTION_BATCH).to_list(RETENTION_BATCH)
+            if not rows:
+                break
+            if policy.score_field:
+                stats["rolled_up"] += await _roll_up_rows(db, policy, client_id, rows)
+            first_at, last_at = _time_str(rows[0][policy.time_field]), _time_str(rows[-1][policy.time_field])
+            batch_id = uuid.uuid4().hex[:12]
+            ids = [r["_id"] for r in rows]
+            batches = db[ARCHIVE_BATCHES_COLLECTION]
+            await batches.insert_one({"_id": batch_id, "collection": policy.collection, "client_id": client_id,
+                                      "ids": ids, "segment_complete": False, "created_at": datetime.now(timezone.utc)})
+            await write_segment(
+                db, ARCHIVE_BUCKET, f"{policy.collection}/{client_id}/{first_at[:10]}_{batch_id}.ndjson.gz", rows,
+                {"collection": policy.collection, "client_id": client_id, "first_at": first_at, "last_at": last_at,
+                 "batch_id": batch_id},
+            )
+            await batches.update_one({"_id": batch_id}, {"$set": {"segment_complete": True}})
+            await db[policy.collection].delete_many({"_id": {"$in": ids}})
+            await batches.delete_one({"_id": batch_id})
+            stats["archived"] += len(rows)
+            if len(rows) < RETENTION_BATCH:
+                break
+    if policy.score_field:
+        weekly_before = (today - timedelta(days=SCORE_HISTORY_DAILY_DAYS)).isoformat()
+        stats["downsampled"] = await _downsample_to_weeks(db, policy, client_id, weekly_before)
+    return stats
+
+
+async def run_retention(shard=None) -> Dict[str, Any]:
+    """Apply every policy to every client (of the shard). Per-client failures are counted, not raised."""
+    db = database.get_db()
+    clients = await db.clients.find({}, {"_id": 0, "client_id": 1}).to_list(None)
+    if shard is not None:
+        clients = shard.filter_clients(clients)
+    totals = {"archived": 0, "rolled_up": 0, "downsampled": 0}
+    errors = []
+    for client in clients:
+        try:
+            for policy in POLICIES.values():
+                for key, value in (await apply_retention(db, policy, client["client_id"])).items():
+                    totals[key] += value
+        except Exception as e:
+            logger.warning("Score history retention failed for client %s: %s", client["client_id"], e)
+            errors.append({"client_id": client["client_id"], "error": str(e)})
+    logger.info("Score history retention: %s clients, %s (%s errors)", len(clients), totals, len(errors))
+    return {"clients": len(clients), **totals, "error_count": len(errors), "errors": errors[:10]}
+
+
+# ---- Tier-aware reads ----------------------------------------------------------------------
+
+def _rollup_as_row(policy: HistoryPolicy, doc: Dict[str, Any]) -> Dict[str, Any]:
+    row = {**(doc.get("fields") or {}), "client_id": doc["client_id"], policy.score_field: doc["score_last"]}
+    row[policy.time_field] = doc["last_date"] if policy.time_kind == TIME_DATE else doc["last_at"]
+    if policy.series_field:
+        row[policy.series_field] = doc.get(policy.series_field)
+    row["rollup"] = {k: doc.get(k) for k in ("granularity", "bucket", "count", "score_avg", "score_min", "score_max")}
+    return row
+
+
+async def rollup_rows(
+    db, collection: str, client_id: str, start_date: str, series: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Rolled-up buckets whose last row is on or after start_date, shaped like raw rows, oldest first."""
+    policy = POLICIES[collection]
+    query = {"collection": collection, "client_id": client_id, "last_date": {"$gte": start_date}}
+    if policy.series_field and series is not None:
+        query[policy.series_field] = series
+    docs = await db[ROLLUPS_COLLECTION].find(query).sort("last_date", 1).to_list(None)
+    return [_rollup_as_row(policy, d) for d in docs]
+
+
+async def latest_rollup_row(
+    db, collection: str, client_id: str, on_or_before: Optional[str] = None, series: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    policy = POLICIES[collection]
+    query: Dict[str, Any] = {"collection": collection, "client_id": client_id}
+    if on_or_before:
+        query["last_date"] = {"$lte": on_or_before}
+    if policy.series_field and series is not None:
+        query[policy.series_field] = series
+    doc = await db[ROLLUPS_COLLECTION].find_one(query, sort=[("last_date", -1)])
+    return _rollup_as_row(policy, doc) if doc else None
+
+
+async def archived_rows(
+    db, collection: str, client_id: str, start: Optional[str] = None, end: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Archived raw rows of segments overlapping [start, end], de-duplicated by _id, oldest first."""
+    segments = await find_segments(
+        db, ARCHIVE_BUCKET, {"collection": collection, "client_id": client_id, **overlap_filter(start, end)},
+    )
+    rows, seen = [], set()
+    for segment in segments:
+        for row in await read_segment(db, ARCHIVE_BUCKET, segment["_id"]):
+            if row.get("_id") in seen:
+                continue
+            seen.add(row.get("_id"))
+            rows.append(row)
+    return rows
+
+
+async def archived_count(db, collection: str, client_id: str) -> int:
+    segments = await find_segments(db, ARCHIVE_BUCKET, {"collection": collection, "client_id": client_id})
+    return sum((s.get("metadata") or {}).get("count", 0) for s in segments)
+
+
+def filter_rows(rows: List[Dict[str, Any]], query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Apply a Mongo filter to archived rows (see utils.ndjson_archive.match_query)."""
+    return [r for r in rows if match_query(r, query)]
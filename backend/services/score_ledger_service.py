@@ -4,8 +4,12 @@ Score Ledger Service - Enterprise-grade log of every score change.
 Each recalc writes one immutable ledger entry with before/after, delta,
 trigger_type, trigger_label, driver breakdown, and rule_version.
 Used by GET /api/client/ledger and GET /api/admin/ledger.
+Entries past the raw window are archived by score_history_retention; list_ledger and
+list_ledger_export continue into the archive once the live rows run out.
 """
 from database import database
+from services.score_history_retention import archived_count, archived_rows, before_raw_window, filter_rows
+from utils.pagination import count_cache
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 import logging
@@ -56,6 +60,17 @@ def _normalize_date_range(from_date: Optional[str], to_date: Optional[str]):
     return start, end
 
 
+async def _archived_entries(db, client_id: str, query: Dict[str, Any], start: Optional[str], end: Optional[str]) -> List[Dict[str, Any]]:
+    """Archived entries matching query, newest first ([] when the range stays inside the raw window)."""
+    if start and not before_raw_window(COLLECTION, start[:10]):
+        return []
+    rows = filter_rows(await archived_rows(db, COLLECTION, client_id, start, end), query)
+    for row in rows:
+        row.pop("_id", None)
+    rows.sort(key=lambda r: r.get("created_at") or "", reverse=True)
+    return rows
+
+
 def _drivers_from_breakdown(breakdown: Dict[str, Any]) -> Dict[str, Optional[float]]:
     """Map legacy breakdown keys to task driver names."""
     if not breakdown:
@@ -175,6 +190,8 @@ async def list_ledger(
             query["created_at"]["$gte"] = start
         if end:
             query["created_at"]["$lte"] = end
+    # Filter without the page cursor: what total counts
+    count_query = {**query, "created_at": dict(query["created_at"])} if "created_at" in query else dict(query)
     if cursor:
         try:
             query["created_at"] = query.get("created_at") or {}
@@ -184,11 +201,23 @@ async def list_ledger(
     limit = min(max(1, limit), 200)
     cursor_cur = db[COLLECTION].find(query, {"_id": 0}).sort("created_at", -1).limit(limit + 1)
     items = await cursor_cur.to_list(limit + 1)
+    filtered = bool(property_id or trigger_type or from_date or to_date)
+    total = await db[COLLECTION].count_documents(count_query if filtered else {"client_id": client_id})
+    if filtered:
+        # Counting archived matches means reading every segment in range: keep it in the count cache
+        async def _archived_total() -> int:
+            return len(await _archived_entries(db, client_id, count_query, start, end))
+        total += await count_cache.get_or_compute(f"{COLLECTION}:archive", count_query, _archived_total)
+    else:
+        total += await archived_count(db, COLLECTION, client_id)
+    if len(items) <= limit:
+        # Live rows ran out: continue into the archive
+        archived = await _archived_entries(db, client_id, query, start, end)
+        items = items + archived[: limit + 1 - len(items)]
     has_more = len(items) > limit
     if has_more:
         items = items[:limit]
     next_cursor = items[-1]["created_at"] if items and has_more else None
-    total = await db[COLLECTION].count_documents({"client_id": client_id} if not (property_id or trigger_type or from_date or to_date) else query)
     return {"items": items, "next_cursor": next_cursor, "has_more": has_more, "total": total}
 
 
@@ -217,4 +246,7 @@ async def list_ledger_export(
             query["created_at"]["$lte"] = end
     limit = min(max(1, limit), 10000)
     cursor = db[COLLECTION].find(query, {"_id": 0}).sort("created_at", -1).limit(limit)
-    return await cursor.to_list(limit)
+    items = await cursor.to_list(limit)
+    if len(items) < limit:
+        items = items + (await _archived_entries(db, client_id, query, start, end))[: limit - len(items)]
+    return items
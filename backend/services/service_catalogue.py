@@ -13,6 +13,7 @@ from typing import Optional, List, Dict, Any
 from enum import Enum
 from datetime import datetime, timezone
 from database import database
+from utils.response_cache import response_cache, NS_CATALOGUE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -289,6 +290,7 @@ class ServiceCatalogueService:
         entry.updated_by = created_by
         
         await db[self.COLLECTION].insert_one(entry.to_dict())
+        await response_cache.bump(NS_CATALOGUE)
         logger.info(f"Service created: {entry.service_code} by {created_by}")
         
         return entry
@@ -321,6 +323,7 @@ class ServiceCatalogueService:
         if result.modified_count == 0:
             return None
         
+        await response_cache.bump(NS_CATALOGUE)
         logger.info(f"Service updated: {service_code} by {updated_by}")
         return await self.get_service(service_code)
     
@@ -340,6 +343,7 @@ class ServiceCatalogueService:
         )
         
         if result.modified_count > 0:
+            await response_cache.bump(NS_CATALOGUE)
             logger.info(f"Service deactivated: {service_code} by {updated_by}")
             return True
         return False
@@ -360,6 +364,7 @@ class ServiceCatalogueService:
         )
         
         if result.modified_count > 0:
+            await response_cache.bump(NS_CATALOGUE)
             logger.info(f"Service activated: {service_code} by {updated_by}")
             return True
         return False
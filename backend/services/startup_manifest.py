@@ -0,0 +1,432 @@
+"""
+Startup schema/seed manifest.
+
+The API lifespan used to await ~250 create_index calls one after another and re-run every seed
+on each boot. The manifest lists that work as phases; each phase has a fingerprint (hash of its
+index specs, or of the source of the seed code) stored in the startup_manifest collection after
+a successful run. On boot:
+- one find() loads stored fingerprints; phases whose fingerprint matches (and is younger than
+  STARTUP_MANIFEST_MAX_AGE_HOURS) are skipped,
+- remaining index phases run concurrently (shared semaphore, STARTUP_INDEX_CONCURRENCY),
+- remaining seed phases run sequentially in their original order (later seeds read earlier ones),
+- per-phase timings are logged and kept in last_boot_report (GET /api/admin/observability/boot-report).
+
+STARTUP_MANIFEST_FORCE=1 re-runs every phase. A failed phase keeps its old fingerprint, so it
+runs again on the next boot. Scripts that call database.connect() still build core indexes directly.
+"""
+import asyncio
+import hashlib
+import inspect
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from database import database, CORE_INDEXES
+from utils.mongo_indexes import DEFAULT_INDEX_CONCURRENCY, ensure_indexes, fingerprint_indexes, index
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_COLLECTION = "startup_manifest"
+DEFAULT_MAX_AGE_HOURS = 24 * 7
+
+# Index groups formerly created inline in server.py lifespan
+CMS_INDEXES = [
+    index("cms_pages", "page_id", unique=True),
+    index("cms_pages", "slug", unique=True),
+    index("cms_pages", "status"),
+    index("cms_revisions", "revision_id", unique=True),
+    index("cms_revisions", [("page_id", 1), ("version", -1)]),
+    index("cms_media", "media_id", unique=True),
+    index("cms_media", "media_type"),
+    index("cms_media", [("file_name", "text"), ("alt_text", "text")]),
+]
+
+PROMPT_MANAGER_INDEXES = [
+    index("prompt_templates", "template_id", unique=True),
+    index("prompt_templates", [("service_code", 1), ("doc_type", 1), ("status", 1)]),
+    index("prompt_templates", [("service_code", 1), ("doc_type", 1), ("version", -1)]),
+    index("prompt_templates", "status"),
+    index("prompt_templates", "tags"),
+    index("prompt_test_results", "test_id", unique=True),
+    index("prompt_test_results", [("template_id", 1), ("executed_at", -1)]),
+    index("prompt_audit_log", "audit_id", unique=True),
+    index("prompt_audit_log", [("template_id", 1), ("performed_at", -1)]),
+    index("prompt_audit_log", "performed_at"),
+    # Prompt execution metrics indexes for analytics
+    index("prompt_execution_metrics", [("template_id", 1), ("executed_at", -1)]),
+    index("prompt_execution_metrics", [("service_code", 1), ("executed_at", -1)]),
+    index("prompt_execution_metrics", "executed_at"),
+]
+
+DOCUMENT_PACK_INDEXES = [
+    index("document_pack_items", "item_id", unique=True),
+    index("document_pack_items", [("order_id", 1), ("canonical_index", 1)]),
+    index("document_pack_items", "order_id"),
+    index("document_pack_items", "status"),
+    index("document_pack_items", "doc_type"),
+    index("document_pack_items", "doc_key"),
+]
+
+DOCUMENT_TEMPLATE_INDEXES = [
+    index("document_templates", "template_id", unique=True),
+    index("document_templates", [("service_code", 1), ("doc_type", 1)], unique=True),
+    index("document_templates", "service_code"),
+]
+
+CLEARFORM_INDEXES = [
+    # Users
+    index("clearform_users", "user_id", unique=True),
+    index("clearform_users", "email", unique=True),
+    index("clearform_users", "stripe_customer_id", sparse=True),
+    # Documents
+    index("clearform_documents", "document_id", unique=True),
+    index("clearform_documents", [("user_id", 1), ("created_at", -1)]),
+    index("clearform_documents", [("user_id", 1), ("created_at", -1), ("document_id", -1)]),  # Vault keyset pagination
+    index("clearform_documents", "status"),
+    index("clearform_documents", "document_type"),
+    # Credit transactions
+    index("clearform_credit_transactions", "transaction_id", unique=True),
+    index("clearform_credit_transactions", [("user_id", 1), ("created_at", -1)]),
+    index("clearform_credit_transactions", "transaction_type"),
+    # Credit expiry
+    index("clearform_credit_expiry", "expiry_id", unique=True),
+    index("clearform_credit_expiry", [("user_id", 1), ("expires_at", 1)]),
+    index("clearform_credit_expiry", "expired"),
+    index("clearform_credit_expiry", [("user_id", 1), ("expired", 1), ("expires_at", 1)]),  # FIFO consumption
+    # Subscriptions
+    index("clearform_subscriptions", "subscription_id", unique=True),
+    index("clearform_subscriptions", "user_id"),
+    index("clearform_subscriptions", "stripe_subscription_id", sparse=True),
+    # Top-ups
+    index("clearform_credit_topups", "topup_id", unique=True),
+    index("clearform_credit_topups", "stripe_checkout_session_id", sparse=True),
+    # Document types (admin-configurable)
+    index("clearform_document_types", "type_id", unique=True),
+    index("clearform_document_types", "code", unique=True),
+    index("clearform_document_types", "category"),
+    index("clearform_document_types", "is_active"),
+    # Document categories
+    index("clearform_document_categories", "category_id", unique=True),
+    index("clearform_document_categories", "code", unique=True),
+    # User templates
+    index("clearform_templates", "template_id", unique=True),
+    index("clearform_templates", [("user_id", 1), ("document_type_code", 1)]),
+    index("clearform_templates", "workspace_id", sparse=True),
+    # Workspaces
+    index("clearform_workspaces", "workspace_id", unique=True),
+    index("clearform_workspaces", "owner_id"),
+    # Smart profiles
+    index("clearform_profiles", "profile_id", unique=True),
+    index("clearform_profiles", [("user_id", 1), ("profile_type", 1)]),
+    # Organizations
+    index("clearform_organizations", "org_id", unique=True),
+    index("clearform_organizations", "slug", unique=True),
+    index("clearform_organizations", "owner_id"),
+    # Organization members
+    index("clearform_org_members", "member_id", unique=True),
+    index("clearform_org_members", [("org_id", 1), ("user_id", 1)], unique=True),
+    index("clearform_org_members", "user_id"),
+    # Organization invitations
+    index("clearform_org_invitations", "invitation_id", unique=True),
+    index("clearform_org_invitations", [("org_id", 1), ("email", 1), ("status", 1)]),
+    # Audit logs
+    index("clearform_audit_logs", "log_id", unique=True),
+    index("clearform_audit_logs", [("user_id", 1), ("created_at", -1)]),
+    index("clearform_audit_logs", [("org_id", 1), ("created_at", -1)]),
+    index("clearform_audit_logs", "action"),
+    index("clearform_audit_logs", "created_at"),
+    # Compliance packs
+    index("clearform_compliance_packs", "pack_id", unique=True),
+    index("clearform_compliance_packs", "code", unique=True),
+]
+
+class StartupPhase(NamedTuple):
+    name: str
+    kind: str  # "indexes" | "seed"
+    fingerprint: Callable[[], str]
+    run: Optional[Callable[[], Awaitable[Any]]] = None  # seed phases
+    specs: Optional[list] = None  # index phases
+
+
+def _source_fingerprint(*objects) -> str:
+    """Hash of the source of modules/functions; a code change to a seed re-runs it."""
+    digest = hashlib.sha256()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _index_phase(name: str, specs) -> StartupPhase:
+    return StartupPhase(name, "indexes", lambda: fingerprint_indexes(specs), specs=specs)
+
+
+def _consent_indexes():
+    from services.consent_service import CONSENT_INDEXES
+    return CONSENT_INDEXES
+
+
+def _enablement_indexes():
+    from services.enablement_templates import ENABLEMENT_INDEXES
+    return ENABLEMENT_INDEXES
+
+
+def _index_groups() -> Dict[str, list]:
+    return {
+        "core_indexes": CORE_INDEXES,
+        "consent_indexes": _consent_indexes(),
+        "cms_indexes": CMS_INDEXES,
+        "enablement_indexes": _enablement_indexes(),
+        "prompt_manager_indexes": PROMPT_MANAGER_INDEXES,
+        "document_pack_indexes": DOCUMENT_PACK_INDEXES,
+        "document_template_indexes": DOCUMENT_TEMPLATE_INDEXES,
+        "clearform_indexes": CLEARFORM_INDEXES,
+    }
+
+
+async def _seed_enablement_templates():
+    from services.enablement_templates import seed_enablement_templates
+    return await seed_enablement_templates()
+
+
+async def _seed_service_catalogue():
+    from services.service_catalogue import seed_service_catalogue
+    return await seed_service_catalogue()
+
+
+async def _seed_service_catalogue_v2():
+    from services.service_definitions_v2 import seed_service_catalogue_v2
+    return await seed_service_catalogue_v2()
+
+
+async def _seed_cms_pages():
+    from scripts.seed_cms_pages import seed_cms_pages
+    return await seed_cms_pages()
+
+
+async def _initialize_clearform_document_types():
+    from clearform.services.document_type_service import document_type_service
+    return await document_type_service.initialize_defaults()
+
+
+def _fp_reference_data():
+    from database import Database
+    return _source_fingerprint(Database._seed_notification_templates, Database._seed_requirements_catalog)
+
+
+def _fp_enablement_templates():
+    import services.enablement_templates as module
+    return _source_fingerprint(module)
+
+
+def _fp_service_catalogue():
+    import services.service_catalogue as module
+    return _source_fingerprint(module)
+
+
+def _fp_service_catalogue_v2():
+    import services.service_definitions_v2 as module
+    return _source_fingerprint(module)
+
+
+def _fp_cms_pages():
+    # CMS pages are derived from the service catalogue: re-seed when either changes
+    import scripts.seed_cms_pages as seeder
+    import services.service_catalogue as v1
+    import services.service_definitions_v2 as v2
+    return _source_fingerprint(seeder, v1, v2)
+
+
+def _fp_clearform_document_types():
+    import clearform.services.document_type_service as module
+    return _source_fingerprint(module)
+
+
+def build_phases() -> List[StartupPhase]:
+    """Manifest in boot order: index phases (run concurrently), then seeds (run sequentially)."""
+    phases = [_index_phase(name, specs) for name, specs in _index_groups().items()]
+    phases += [
+        StartupPhase("reference_data", "seed", _fp_reference_data, lambda: database.seed_reference_data()),
+        StartupPhase("enablement_templates", "seed", _fp_enablement_templates, _seed_enablement_templates),
+        StartupPhase("service_catalogue", "seed", _fp_service_catalogue, _seed_service_catalogue),
+        StartupPhase("service_catalogue_v2", "seed", _fp_service_catalogue_v2, _seed_service_catalogue_v2),
+        StartupPhase("cms_pages", "seed", _fp_cms_pages, _seed_cms_pages),
+        StartupPhase("clearform_document_types", "seed", _fp_clearform_document_types, _initialize_clearform_document_types),
+    ]
+    return phases
+
+
+class BootReport:
+    """Per-phase boot timings (manifest phases and other lifespan steps)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.phases: List[Dict[str, Any]] = []
+
+    def add(self, name: str, status: str, duration_ms: float, **detail) -> None:
+        self.phases.append({"phase": name, "status": status, "duration_ms": round(duration_ms, 1), **detail})
+
+    def timed(self, name: str):
+        return _TimedStep(self, name)
+
+    def as_dict(self) -> Dict[str, Any]:
+        ran = [p for p in self.phases if p["status"] == "ran"]
+        return {
+            "started_at": self.started_at,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "ran": len(ran),
+            "skipped": sum(1 for p in self.phases if p["status"] == "skipped"),
+            "failed": sum(1 for p in self.phases if p["status"] == "failed"),
+            "phases": list(self.phases),
+        }
+
+    def log_summary(self) -> None:
+        report = self.as_dict()
+        for p in self.phases:
+            logger.info("Boot phase %-28s %-8s %8.1f ms", p["phase"], p["status"], p["duration_ms"])
+        logger.info(
+            "Boot complete in %.1f ms (%s ran, %s skipped, %s failed)",
+            report["total_ms"], report["ran"], report["skipped"], report["failed"],
+        )
+
+
+class _TimedStep:
+    def __init__(self, report: BootReport, name: str):
+        self.report = report
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        status = "failed" if exc_type else "ran"
+        detail = {"error": str(exc)} if exc else {}
+        self.report.add(self.name, status, (time.perf_counter() - self.start) * 1000, **detail)
+        return False
+
+
+boot_report = BootReport()
+last_boot_report: Optional[Dict[str, Any]] = None
+
+
+def finish_boot(report: BootReport) -> Dict[str, Any]:
+    """Publish the final boot report (after scheduler start) and log per-phase timings."""
+    global last_boot_report
+    last_boot_report = report.as_dict()
+    report.log_summary()
+    return last_boot_report
+
+
+def _force() -> bool:
+    return os.environ.get("STARTUP_MANIFEST_FORCE", "").strip().lower() in ("1", "true", "yes")
+
+
+def _max_age() -> timedelta:
+    try:
+        hours = float(os.environ.get("STARTUP_MANIFEST_MAX_AGE_HOURS", DEFAULT_MAX_AGE_HOURS))
+    except ValueError:
+        hours = DEFAULT_MAX_AGE_HOURS
+    return timedelta(hours=hours)
+
+
+def _is_current(stored: Optional[Dict[str, Any]], fingerprint: str, now: datetime) -> bool:
+    if not stored or stored.get("fingerprint") != fingerprint:
+        return False
+    try:
+        completed = datetime.fromisoformat(stored["completed_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return now - completed < _max_age()
+
+
+async def _record_safe(db, name: str, fingerprint: Optional[str], duration_ms: float) -> None:
+    """Store the fingerprint of a phase that completed; best-effort (next boot just re-runs it)."""
+    if not fingerprint:
+        return
+    try:
+        await db[MANIFEST_COLLECTION].update_one(
+            {"phase": name},
+            {"$set": {
+                "phase": name,
+                "fingerprint": fingerprint,
+                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "duration_ms": round(duration_ms, 1),
+            }},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning("Startup manifest record failed for %s: %s", name, e)
+
+
+async def run_startup_manifest(
+    db=None,
+    phases: Optional[List[StartupPhase]] = None,
+    report: Optional[BootReport] = None,
+    concurrency: Optional[int] = None,
+    force: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Run pending manifest phases; never raises (a failing phase is reported and retried next boot)."""
+    global last_boot_report
+    db = db if db is not None else database.get_db()
+    phases = phases if phases is not None else build_phases()
+    report = report or boot_report
+    force = _force() if force is None else force
+    if concurrency is None:
+        concurrency = int(os.environ.get("STARTUP_INDEX_CONCURRENCY", DEFAULT_INDEX_CONCURRENCY))
+    now = datetime.now(timezone.utc)
+
+    stored: Dict[str, Dict[str, Any]] = {}
+    if not force:
+        try:
+            rows = await db[MANIFEST_COLLECTION].find({}, {"_id": 0}).to_list(200)
+            stored = {row["phase"]: row for row in rows if row.get("phase")}
+        except Exception as e:
+            logger.warning("Startup manifest unavailable, running all phases: %s", e)
+
+    pending: List[tuple] = []
+    for phase in phases:
+        try:
+            fingerprint = phase.fingerprint()
+        except Exception as e:
+            logger.warning("Startup phase %s: fingerprint failed (%s), running it", phase.name, e)
+            fingerprint = None
+        if fingerprint and _is_current(stored.get(phase.name), fingerprint, now):
+            report.add(phase.name, "skipped", 0.0, kind=phase.kind)
+        else:
+            pending.append((phase, fingerprint))
+
+    # Index phases: all concurrently, bounded by one shared semaphore
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run_indexes(phase: StartupPhase, fingerprint: Optional[str]):
+        start = time.perf_counter()
+        result = await ensure_indexes(db, phase.specs or [], semaphore=semaphore)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result["failed"]:
+            report.add(phase.name, "failed", elapsed, kind="indexes", errors=result["errors"][:5])
+            return
+        report.add(phase.name, "ran", elapsed, kind="indexes", indexes=result["created"] + result["tolerated"])
+        await _record_safe(db, phase.name, fingerprint, elapsed)
+
+    await asyncio.gather(*(_run_indexes(p, fp) for p, fp in pending if p.kind == "indexes"))
+
+    # Seeds: sequential, original order
+    for phase, fingerprint in pending:
+        if phase.kind == "indexes":
+            continue
+        start = time.perf_counter()
+        try:
+            await phase.run()
+        except Exception as e:
+            logger.error("Startup phase %s failed: %s", phase.name, e)
+            report.add(phase.name, "failed", (time.perf_counter() - start) * 1000, kind=phase.kind, error=str(e))
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        report.add(phase.name, "ran", elapsed, kind=phase.kind)
+        await _record_safe(db, phase.name, fingerprint, elapsed)
+
+    last_boot_report = report.as_dict()
+    return last_boot_report
@@ -0,0 +1,322 @@
+"""
+Asynchronous Stripe webhook processing (STRIPE_WEBHOOK_MODE=async).
+
+Ingest (in the webhook request): after signature verification the event is inserted into
+stripe_events with status QUEUED and the raw payload; the unique event_id index makes Stripe
+redeliveries no-ops. The endpoint then acknowledges without running any handler. The raw payload
+is removed once the event is PROCESSED and kept only on dead letters (for requeue).
+
+Consume (StripeEventConsumer, in worker.py or the embedded-scheduler API; started only when
+STRIPE_WEBHOOK_MODE=async, see consumers_enabled()):
+- events are applied in order per ordering_key (Stripe customer, else subscription, else the event
+  itself), oldest Stripe `created` first. Only the head of a key is claimable and a key with a
+  running event is skipped, so a customer's checkout, subscription and invoice events never race;
+- claims are leases, so a crashed consumer's event is reclaimed when its lease expires;
+- a failing event is retried with backoff (STRIPE_EVENT_RETRY_BACKOFF_SECONDS) and blocks its key
+  meanwhile; after STRIPE_EVENT_MAX_ATTEMPTS it is dead-lettered (status DEAD, audit logged) and
+  later events for the key proceed. requeue_dead_events() puts dead letters back on the queue.
+Metrics: stripe_event_apply_lag_seconds (ingest to applied), stripe_event_outcomes, and
+queue_depth / queue_lag_seconds{queue="stripe_events"}.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import database
+from services.leader_lock import default_owner_id
+from utils.metrics import STRIPE_EVENT_APPLY_LAG_SECONDS, STRIPE_EVENT_OUTCOMES
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUEUED = "QUEUED"
+EVENT_PROCESSING = "PROCESSING"
+EVENT_PROCESSED = "PROCESSED"
+EVENT_FAILED = "FAILED"
+EVENT_DEAD = "DEAD"
+
+STRIPE_EVENT_LEASE_SECONDS = 120
+STRIPE_EVENT_MAX_ATTEMPTS = 6
+# Backoff before attempt 2, 3, ...
+STRIPE_EVENT_RETRY_BACKOFF_SECONDS = [10, 30, 120, 600, 1800]
+HEADS_PER_ROUND = 20
+
+_local_consumers: List["StripeEventConsumer"] = []
+
+
+def ordering_key(event: Dict[str, Any]) -> str:
+    obj = (event.get("data") or {}).get("object") or {}
+    customer = obj.get("customer")
+    if isinstance(customer, dict):
+        customer = customer.get("id")
+    if customer:
+        return f"customer:{customer}"
+    subscription = obj.get("subscription")
+    if isinstance(subscription, dict):
+        subscription = subscription.get("id")
+    if not subscription and obj.get("object") == "subscription":
+        subscription = obj.get("id")
+    if subscription:
+        return f"subscription:{subscription}"
+    return f"event:{event.get('id')}"
+
+
+async def ingest_event(event: Dict[str, Any], payload: bytes, raw_minimal: Optional[Dict] = None) -> str:
+    """Record a verified event for the consumer. Returns "Queued" or "Already received"."""
+    db = database.get_db()
+    now = datetime.now(timezone.utc)
+    event_id = event.get("id")
+    queued = {
+        "status": EVENT_QUEUED,
+        "processed_at": None,
+        "error": None,
+        "payload_json": payload.decode("utf-8") if isinstance(payload, bytes) else payload,
+        "ordering_key": ordering_key(event),
+        "stripe_created": int(event.get("created") or now.timestamp()),
+        "received_at": now,
+        "available_at": now,
+        "attempts": 0,
+        "lease_owner": None,
+        "lease_expires_at": None,
+    }
+    try:
+        await db.stripe_events.insert_one({
+            "event_id": event_id,
+            "type": event.get("type"),
+            "created": now,
+            "related_client_id": None,
+            "related_subscription_id": None,
+            "raw_minimal": raw_minimal,
+            **queued,
+        })
+    except DuplicateKeyError:
+        # Stripe redelivery; only an event that failed inline earlier is queued again
+        retried = await db.stripe_events.update_one({"event_id": event_id, "status": EVENT_FAILED}, {"$set": queued})
+        if not retried.modified_count:
+            logger.info("Stripe event %s already received - skipping", event_id)
+            return "Already received"
+    for consumer in _local_consumers:
+        consumer.wake()
+    logger.info("WEBHOOK_QUEUED event_id=%s event_type=%s key=%s", event_id, event.get("type"), queued["ordering_key"])
+    return "Queued"
+
+
+async def claim_next_event(db, owner_id: str, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """Lease the oldest runnable head among keys that have no event running."""
+    now = now or datetime.now(timezone.utc)
+    heads = await db.stripe_events.aggregate([
+        {"$match": {"status": {"$in": [EVENT_QUEUED, EVENT_PROCESSING]}}},
+        {"$project": {"payload_json": 0, "raw_minimal": 0}},
+        {"$sort": {"stripe_created": 1, "received_at": 1}},
+        {"$group": {
+            "_id": "$ordering_key",
+            "head": {"$first": "$$ROOT"},
+            "busy": {"$max": {"$cond": [
+                {"$and": [{"$eq": ["$status", EVENT_PROCESSING]}, {"$gt": ["$lease_expires_at", now]}]}, 1, 0,
+            ]}},
+        }},
+        {"$match": {"busy": 0}},
+        {"$sort": {"head.stripe_created": 1, "head.received_at": 1}},
+        {"$limit": HEADS_PER_ROUND},
+    ]).to_list(HEADS_PER_ROUND)
+    for group in heads:
+        head = group["head"]
+        if head["status"] == EVENT_QUEUED:
+            if head.get("available_at") and head["available_at"] > now:
+                continue  # waiting out a retry backoff; later events for the key wait too
+            condition: Dict[str, Any] = {"status": EVENT_QUEUED}
+        else:
+            condition = {"status": EVENT_PROCESSING, "lease_expires_at": {"$lte": now}}
+        claimed = await db.stripe_events.find_one_and_update(
+            {"_id": head["_id"], **condition},
+            {
+                "$set": {
+                    "status": EVENT_PROCESSING,
+                    "lease_owner": owner_id,
+                    "lease_expires_at": now + timedelta(seconds=STRIPE_EVENT_LEASE_SECONDS),
+                },
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+        if claimed:
+            return claimed
+    return None
+
+
+async def _renew_lease(db, doc_id: Any, owner_id: str) -> None:
+    """Heartbeat until cancelled. A failed renewal is logged and retried on the next beat; returns only
+    once renewals have failed for a whole lease, when another consumer may already have claimed the event."""
+    renewed_at = time.monotonic()
+    while True:
+        await asyncio.sleep(STRIPE_EVENT_LEASE_SECONDS / 3)
+        try:
+            await db.stripe_events.update_one(
+                {"_id": doc_id, "lease_owner": owner_id},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=STRIPE_EVENT_LEASE_SECONDS)}},
+            )
+            renewed_at = time.monotonic()
+        except Exception as e:
+            logger.warning("Stripe event %s: lease renewal failed: %s", doc_id, e)
+            if time.monotonic() - renewed_at >= STRIPE_EVENT_LEASE_SECONDS:
+                return
+
+
+async def apply_claimed_event(db, doc: Dict[str, Any], owner_id: str) -> bool:
+    """Run the handler for a leased event; retry with backoff or dead-letter on failure."""
+    from services.stripe_webhook_service import stripe_webhook_service
+
+    event_id = doc["event_id"]
+    attempts = doc.get("attempts", 1)
+    error: Optional[str] = None
+    heartbeat = asyncio.create_task(_renew_lease(db, doc["_id"], owner_id))
+    apply = asyncio.create_task(stripe_webhook_service.apply_event(json.loads(doc["payload_json"])))
+    try:
+        await asyncio.wait({apply, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+        if not apply.done():
+            # The lease lapsed: abort rather than keep applying an event another consumer may now hold
+            apply.cancel()
+            error = "LeaseLost: lease renewal failed for longer than the lease"
+        else:
+            apply.result()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        heartbeat.cancel()
+        if not apply.done():
+            apply.cancel()
+
+    if error is not None:
+        now = datetime.now(timezone.utc)
+        if attempts >= STRIPE_EVENT_MAX_ATTEMPTS:
+            update = {"status": EVENT_DEAD, "processed_at": now, "dead_lettered_at": now}
+            outcome = "dead_lettered"
+        else:
+            backoff = STRIPE_EVENT_RETRY_BACKOFF_SECONDS[min(attempts, len(STRIPE_EVENT_RETRY_BACKOFF_SECONDS)) - 1]
+            update = {"status": EVENT_QUEUED, "available_at": now + timedelta(seconds=backoff)}
+            outcome = "retried"
+        await db.stripe_events.update_one(
+            {"_id": doc["_id"], "lease_owner": owner_id},
+            {"$set": {**update, "error": error, "lease_owner": None, "lease_expires_at": None}},
+        )
+        STRIPE_EVENT_OUTCOMES.inc(outcome)
+        logger.error(
+            "WEBHOOK_PROCESSING_FAILED event_id=%s event_type=%s attempt=%s outcome=%s error=%s",
+            event_id, doc.get("type"), attempts, outcome, error,
+        )
+        if outcome == "dead_lettered":
+            from models import AuditAction
+            from utils.audit import create_audit_log
+            await create_audit_log(
+                action=AuditAction.ADMIN_ACTION,
+                actor_role="SYSTEM",
+                metadata={
+                    "action_type": "STRIPE_EVENT_DEAD_LETTERED",
+                    "event_id": event_id,
+                    "event_type": doc.get("type"),
+                    "attempts": attempts,
+                    "error": error,
+                },
+            )
+        return False
+    await db.stripe_events.update_one(
+        {"_id": doc["_id"], "lease_owner": owner_id},
+        {"$set": {"lease_owner": None, "lease_expires_at": None, "applied_attempts": attempts}},
+    )
+    received_at = doc.get("received_at")
+    if isinstance(received_at, datetime):
+        if received_at.tzinfo is None:
+            received_at = received_at.replace(tzinfo=timezone.utc)
+        STRIPE_EVENT_APPLY_LAG_SECONDS.observe(
+            (datetime.now(timezone.utc) - received_at).total_seconds(), doc.get("type") or "unknown",
+        )
+    STRIPE_EVENT_OUTCOMES.inc("applied")
+    return True
+
+
+async def requeue_dead_events(event_ids: Optional[List[str]] = None) -> int:
+    """Put dead-lettered events (all, or the given event_ids) back on the queue with fresh attempts."""
+    db = database.get_db()
+    query: Dict[str, Any] = {"status": EVENT_DEAD}
+    if event_ids:
+        query["event_id"] = {"$in": list(event_ids)}
+    result = await db.stripe_events.update_many(
+        query,
+        {"$set": {"status": EVENT_QUEUED, "attempts": 0, "available_at": datetime.now(timezone.utc),
+                  "processed_at": None}},
+    )
+    if result.modified_count:
+        for consumer in _local_consumers:
+            consumer.wake()
+    return result.modified_count
+
+
+def consumers_enabled() -> bool:
+    """Consumers only run in async mode; inline mode handles events in the webhook request."""
+    from services.stripe_webhook_service import WEBHOOK_MODE_ASYNC, webhook_mode
+    return webhook_mode() == WEBHOOK_MODE_ASYNC
+
+
+def default_concurrency() -> int:
+    value = (os.environ.get("STRIPE_EVENT_CONSUMERS") or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else 2
+
+
+class StripeEventConsumer:
+    """N consumer loops in this process; keys are serialized across all processes by the claim."""
+
+    def __init__(self, concurrency: Optional[int] = None, owner_id: Optional[str] = None,
+                 poll_seconds: float = 2.0):
+        self.concurrency = concurrency or default_concurrency()
+        self.owner_id = owner_id or default_owner_id()
+        self.poll_seconds = poll_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    async def run_once(self) -> bool:
+        db = database.get_db()
+        doc = await claim_next_event(db, self.owner_id)
+        if not doc:
+            return False
+        await apply_claimed_event(db, doc, self.owner_id)
+        return True
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            # Cleared before claiming so an ingest during the claim still wakes us
+            self._wake.clear()
+            try:
+                if await self.run_once():
+                    continue
+            except Exception as e:
+                logger.warning("Stripe event consumer round failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+        _local_consumers.append(self)
+
+    async def stop(self, grace_seconds: float = 30) -> None:
+        """Let in-flight events finish (a cancelled one is reclaimed after its lease expires)."""
+        self._stopping.set()
+        self._wake.set()
+        if self in _local_consumers:
+            _local_consumers.remove(self)
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=grace_seconds)
+        for task in pending:
+            task.cancel()
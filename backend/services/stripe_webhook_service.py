@@ -17,6 +17,9 @@ Events Handled:
 - invoice.paid
 - invoice.payment_failed
 - charge.refunded (normalized payment status = refunded)
+
+STRIPE_WEBHOOK_MODE=async acknowledges after verifying and recording the event; handlers then
+run in services.stripe_event_queue, in order per customer / subscription.
 """
 import stripe
 from pymongo.errors import DuplicateKeyError
@@ -48,6 +51,16 @@ def _get_webhook_secret() -> str:
     return ""
 
 
+WEBHOOK_MODE_INLINE = "inline"
+WEBHOOK_MODE_ASYNC = "async"
+
+
+def webhook_mode() -> str:
+    """STRIPE_WEBHOOK_MODE: inline (default; handle before responding) | async (record, ack, consume later)."""
+    mode = (os.getenv("STRIPE_WEBHOOK_MODE") or WEBHOOK_MODE_INLINE).strip().lower()
+    return mode if mode in (WEBHOOK_MODE_INLINE, WEBHOOK_MODE_ASYNC) else WEBHOOK_MODE_INLINE
+
+
 def _extract_webhook_context(event: Dict) -> Dict[str, Any]:
     """Extract safe fields for structured logging (event_id, event_type, livemode, client_id, subscription_id, checkout_session_id)."""
     obj = event.get("data", {}).get("object", {}) or {}
@@ -109,6 +122,12 @@ class StripeWebhookService:
             event_id, event_type, ctx.get("livemode"), ctx.get("client_id"), ctx.get("subscription_id"), ctx.get("checkout_session_id"),
         )
         
+        # Async mode: durably record and acknowledge; services.stripe_event_queue applies it
+        if webhook_mode() == WEBHOOK_MODE_ASYNC:
+            from services.stripe_event_queue import ingest_event
+            outcome = await ingest_event(event, payload, raw_minimal=self._extract_safe_data(event))
+            return True, outcome, {"event_id": event_id}
+
         # Step 2: Idempotency check
         db = database.get_db()
         existing = await db.stripe_events.find_one({"event_id": event_id})
@@ -146,25 +165,7 @@ class StripeWebhookService:
 
         # Step 4: Process event
         try:
-            result = await self._handle_event(event)
-            
-            # Update event record
-            await db.stripe_events.update_one(
-                {"event_id": event_id},
-                {
-                    "$set": {
-                        "status": "PROCESSED",
-                        "processed_at": datetime.now(timezone.utc),
-                        "related_client_id": result.get("client_id"),
-                        "related_subscription_id": result.get("subscription_id"),
-                    }
-                }
-            )
-
-            logger.info(
-                "WEBHOOK_PROCESSED_OK event_id=%s event_type=%s client_id=%s",
-                event_id, event_type, result.get("client_id"),
-            )
+            result = await self.apply_event(event)
             return True, "Processed", result
 
         except Exception as e:
@@ -199,6 +200,29 @@ class StripeWebhookService:
             # Return 200 to prevent Stripe retries (we've logged the failure)
             return True, "Event logged with error", {"error": str(e), "event_id": event_id}
     
+    async def apply_event(self, event: Dict) -> Dict:
+        """Run the handler for a recorded event and mark it PROCESSED (raises on handler failure)."""
+        event_id = event.get("id")
+        result = await self._handle_event(event)
+        await database.get_db().stripe_events.update_one(
+            {"event_id": event_id},
+            {
+                "$set": {
+                    "status": "PROCESSED",
+                    "processed_at": datetime.now(timezone.utc),
+                    "related_client_id": result.get("client_id"),
+                    "related_subscription_id": result.get("subscription_id"),
+                },
+                # The queued raw payload carries customer PII; only dead letters keep it (for requeue)
+                "$unset": {"payload_json": ""},
+            }
+        )
+        logger.info(
+            "WEBHOOK_PROCESSED_OK event_id=%s event_type=%s client_id=%s",
+            event_id, event.get("type"), result.get("client_id"),
+        )
+        return result
+    
     # =========================================================================
     # Event Handlers
     # =========================================================================
@@ -10,7 +10,6 @@ Supports events:
 Webhooks are sent as POST requests with JSON payload and HMAC-SHA256 signature.
 Implements exponential backoff retries (3 attempts) and comprehensive logging.
 """
-import aiohttp
 import asyncio
 import hashlib
 import hmac
@@ -21,9 +20,12 @@ from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from database import database
 from models import WebhookEventType, AuditAction
+from utils.lazy_import import lazy_import
 
 logger = logging.getLogger(__name__)
 
+aiohttp = lazy_import("aiohttp")  # only needed when a webhook is delivered
+
 # Rate limiting and retry configuration
 MAX_RETRIES = 3
 INITIAL_BACKOFF_SECONDS = 1
@@ -35,8 +37,9 @@ MAX_WEBHOOKS_PER_MINUTE = 100  # Per client rate limit
 class WebhookService:
     """Manages webhook delivery for compliance events."""
     
-    def __init__(self):
-        self.timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+    @property
+    def timeout(self):
+        return aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
     
     async def trigger_webhooks(
         self,
@@ -1041,13 +1041,40 @@ class WorkflowAutomationService:
         return {"success": True, "workflow": "WF10", "results": results}
     
     # =========================================================================
-    # BATCH PROCESSING
+    # PIPELINE / BATCH PROCESSING
     # =========================================================================
     
+    async def advance_order(self, order: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Run the automated step for the order's current status (one order pipeline work item).
+        
+        - QUEUED → document generation (WF2 + WF3)
+        - DRAFT_READY → move to review (WF3)
+        - REGEN_REQUESTED → regenerate documents (WF4)
+        - FINALISING → deliver (WF7)
+        Returns the workflow result, or None when the status has no automated step.
+        """
+        order_id = order["order_id"]
+        status = order.get("status")
+        if status == OrderStatus.QUEUED.value:
+            gen_result = await self.wf2_queue_to_generation(order_id)
+            if not gen_result.get("success"):
+                return gen_result
+            return await self.wf3_draft_to_review(order_id)
+        if status == OrderStatus.DRAFT_READY.value:
+            return await self.wf3_draft_to_review(order_id)
+        if status == OrderStatus.REGEN_REQUESTED.value:
+            regen_notes = order.get("regeneration_notes", "Automated regeneration")
+            return await self.wf4_regeneration(order_id, regen_notes)
+        if status == OrderStatus.FINALISING.value:
+            return await self.wf7_finalization_to_delivery(order_id)
+        return None
+    
     async def process_queued_orders(self, limit: int = 10) -> Dict[str, Any]:
         """
-        Process orders needing automated workflow advancement.
-        Called by background job every 10 minutes.
+        Process orders needing automated workflow advancement, inline and serially.
+        Manual fallback: orders are normally advanced by the order pipeline workers
+        (services.order_pipeline_queue) as soon as they change status.
         
         Handles:
         - QUEUED → document generation (WF2 + WF3)
@@ -0,0 +1,91 @@
+"""
+Rendered artifact cache (services.artifact_cache): content-hash keys, render-once-then-stream from
+GridFS, LRU eviction by stored size, and the Evidence Readiness report key ignoring the clock time.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import artifact_cache as ac
+from services.report_service import render_evidence_readiness_pdf
+from utils.metrics import ARTIFACT_CACHE_REQUESTS
+
+
+class _Download:
+    def __init__(self, body):
+        self._chunks = [body[:4], body[4:], b""]
+
+    async def readchunk(self):
+        return self._chunks.pop(0)
+
+
+def _db(entry=None, totals=()):
+    entries = MagicMock()
+    entries.find_one_and_update = AsyncMock(return_value=entry)
+    entries.update_one = AsyncMock(return_value=MagicMock(upserted_id="k"))
+    entries.delete_one = AsyncMock(return_value=MagicMock(deleted_count=1))
+    entries.aggregate.return_value.to_list = AsyncMock(return_value=list(totals))
+    db = MagicMock()
+    db.__getitem__.return_value = entries
+    return db, entries
+
+
+def test_key_depends_on_content_not_dict_order():
+    a = ac.artifact_key("pack", "c1", "1", {"x": 1, "branding": {"primary_color": "#000", "logo": None}})
+    b = ac.artifact_key("pack", "c1", "1", {"branding": {"logo": None, "primary_color": "#000"}, "x": 1})
+    assert a == b
+    assert a != ac.artifact_key("pack", "c1", "2", {"x": 1, "branding": {"primary_color": "#000", "logo": None}})
+    assert a != ac.artifact_key("pack", "c2", "1", {"x": 1, "branding": {"primary_color": "#000", "logo": None}})
+
+
+def test_miss_renders_and_stores_then_hit_streams_from_gridfs():
+    bucket = MagicMock()
+    bucket.upload_from_stream = AsyncMock(return_value="f1")
+    bucket.open_download_stream = AsyncMock(side_effect=lambda file_id: _Download(b"%PDF-body"))
+    render = AsyncMock(return_value=b"%PDF-body")
+    db, entries = _db()
+    hits_before = ARTIFACT_CACHE_REQUESTS.values().get(("pack", "hit"), 0)
+
+    async def scenario():
+        with patch.object(ac.database, "get_db", return_value=db), patch.object(ac, "_bucket", return_value=bucket):
+            first = await ac.get_or_render("pack", "k", "c1", render)
+            assert not first.cache_hit and await first.read() == b"%PDF-body"
+            stored = entries.update_one.await_args.args[1]["$setOnInsert"]
+            assert stored["file_id"] == "f1" and stored["size"] == 9 and stored["client_id"] == "c1"
+
+            entries.find_one_and_update = AsyncMock(return_value={"_id": "k", "file_id": "f1", "size": 9})
+            second = await ac.get_or_render("pack", "k", "c1", render)
+            assert second.cache_hit and second.size == 9
+            assert [chunk async for chunk in second.chunks()] == [b"%PDF", b"-body"]
+
+    asyncio.run(scenario())
+    render.assert_awaited_once()
+    assert ARTIFACT_CACHE_REQUESTS.values()[("pack", "hit")] == hits_before + 1
+
+
+def test_eviction_drops_least_recently_used_until_under_target():
+    db, entries = _db(totals=[{"_id": "pack", "entries": 3, "bytes": 300, "hits": 0}])
+    cursor = MagicMock()
+    lru = [{"_id": "old", "file_id": "f-old", "size": 120, "kind": "pack"},
+           {"_id": "mid", "file_id": "f-mid", "size": 100, "kind": "pack"},
+           {"_id": "new", "file_id": "f-new", "size": 80, "kind": "pack"}]
+    cursor.__aiter__.return_value = iter(lru)
+    entries.find.return_value.sort.return_value = cursor
+    bucket = MagicMock()
+    bucket.delete = AsyncMock()
+    with patch.object(ac, "_bucket", return_value=bucket):
+        assert asyncio.run(ac.evict(db, max_bytes=150)) == 2  # 300 -> 180 -> 80, under the 135 target
+    entries.find.return_value.sort.assert_called_once_with("last_accessed_at", 1)
+    assert [c.args[0] for c in bucket.delete.await_args_list] == ["f-old", "f-mid"]
+    assert entries.delete_one.await_args_list[0].args[0] == {"_id": "old", "file_id": "f-old"}
+
+
+def test_report_key_ignores_time_of_day():
+    report_data = {"client": {"full_name": "Jo"}, "properties": [], "requirements": [], "audit_logs": [],
+                   "branding": {"primary_color": "#0B1D3A"}}
+    get_or_render = AsyncMock()
+    with patch.object(ac, "get_or_render", get_or_render):
+        for now_iso in ("2026-03-01T09:00:00+00:00", "2026-03-01T17:30:00+00:00", "2026-03-02T09:00:00+00:00"):
+            asyncio.run(render_evidence_readiness_pdf("c1", "portfolio", None, {**report_data, "now_iso": now_iso}))
+    keys = [c.args[1] for c in get_or_render.await_args_list]
+    assert keys[0] == keys[1] != keys[2]
+    assert get_or_render.await_args.args[0] == "evidence_readiness_portfolio"
@@ -0,0 +1,65 @@
+"""
+Offline benchmark suite (scripts.benchmark_suite): in-memory Mongo stand-in semantics, a tiny
+end-to-end run over every benchmark, and baseline comparison.
+"""
+import asyncio
+
+from scripts.benchmark_data import InMemoryDatabase, generate_portfolio
+from scripts.benchmark_suite import BENCHMARKS, compare, run
+
+
+def test_in_memory_database_query_and_update_semantics():
+    db = InMemoryDatabase()
+
+    async def scenario():
+        await db.items.insert_many([
+            {"k": "a", "n": 3, "tags": ["x"], "meta": {"due": "2026-01-02"}},
+            {"k": "b", "n": 1, "tags": ["y"], "meta": {"due": "2026-01-01"}},
+            {"k": "c", "n": 2},
+        ])
+        found = await db.items.find({"n": {"$gte": 2}}, {"_id": 0, "k": 1}).sort("n", -1).to_list(10)
+        assert found == [{"k": "a"}, {"k": "c"}]
+        assert await db["items"].count_documents({"$or": [{"tags": "y"}, {"meta.due": {"$exists": False}}]}) == 2
+        first = await db.items.find_one({"meta.due": {"$lte": "2026-01-05"}}, {"_id": 0, "meta.due": 1},
+                                        sort=[("meta.due", 1)])
+        assert first == {"meta": {"due": "2026-01-01"}}
+        await db.items.update_one({"k": "c"}, {"$inc": {"n": 5}, "$set": {"meta.due": "2026-02-01"}})
+        res = await db.items.update_one({"k": "d"}, {"$setOnInsert": {"n": 0}}, upsert=True)
+        assert res.upserted_id is not None
+        return await db.items.find({}, {"_id": 0, "k": 1, "n": 1}).to_list(None)
+
+    docs = asyncio.run(scenario())
+    assert {d["k"]: d["n"] for d in docs} == {"a": 3, "b": 1, "c": 7, "d": 0}
+
+
+def test_generate_portfolio_is_deterministic():
+    a = generate_portfolio(3, 2, seed=7)
+    b = generate_portfolio(3, 2, seed=7)
+    assert len(a["properties"]) == 6 and len(a["requirements"]) == 6 * 7
+    assert [r["status"] for r in a["requirements"]] == [r["status"] for r in b["requirements"]]
+
+
+def test_run_all_benchmarks_and_compare():
+    result = run(clients=2, properties=1, repeat=1)
+    assert set(result["results"]) == set(BENCHMARKS)
+    assert result["meta"]["backend"] == "in_memory"
+    assert all(r["n"] > 0 and r["p50_ms"] >= 0 for r in result["results"].values())
+
+    baseline = {"results": {name: dict(r) for name, r in result["results"].items()}}
+    baseline["results"]["template_pdf"]["p50_ms"] = result["results"]["template_pdf"]["p50_ms"] / 2
+    baseline["results"]["load_kb_snippets"]["p50_ms"] = result["results"]["load_kb_snippets"]["p50_ms"] / 2
+    rows = {row["benchmark"]: row for row in compare(result, baseline, threshold=0.25, min_delta_ms=0.5)}
+    assert rows["template_pdf"]["regressed"]
+    # 2x slower but below the absolute noise floor
+    assert not rows["load_kb_snippets"]["regressed"]
+    assert not rows["compute_property_score"]["regressed"]
+
+
+def test_notification_benchmark_does_not_import_email_service():
+    """The built-in HTML templates in services.email_service need Python 3.12 (backslash in f-string)."""
+    import sys
+    from unittest.mock import patch
+
+    with patch.dict(sys.modules, {"services.email_service": None}):
+        result = run(clients=2, properties=1, repeat=1, only=["notification_send"])
+    assert result["results"]["notification_send"]["n"] == 2
@@ -0,0 +1,143 @@
+"""
+ICS calendar feed (services.calendar_feed): cached per-client artifact rebuilt only when stale,
+ETag / Last-Modified conditional GETs, and revocable feed tokens for calendar subscriptions.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth import hash_token
+from routes.calendar import router
+from services import calendar_feed as cf
+from services.compliance_recalc_queue import enqueue_compliance_recalc
+
+CLIENT = {"full_name": "Jo Bloggs", "customer_reference": "PLE-CVP-2026-00001"}
+PROPS = [{"property_id": "p1", "address_line_1": "1 Quay St", "city": "Bristol", "postcode": "BS1 1AA"}]
+
+
+def _db(feed_doc, requirements):
+    feeds = MagicMock()
+    feeds.find_one = AsyncMock(return_value=feed_doc)
+    feeds.update_one = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = feeds
+    db.clients.find_one = AsyncMock(return_value=CLIENT)
+    db.properties.find.return_value.to_list = AsyncMock(return_value=PROPS)
+    db.requirements.find.return_value.sort.return_value.to_list = AsyncMock(return_value=requirements)
+    return db, feeds
+
+
+def _requirements():
+    due = (datetime.now(timezone.utc) + timedelta(days=20)).isoformat()
+    return [{"requirement_id": "r1", "property_id": "p1", "requirement_type": "gas_safety",
+             "status": "EXPIRING_SOON", "description": "Gas Safety", "due_date": due}]
+
+
+def test_artifact_is_reused_until_invalidated():
+    db, feeds = _db(None, _requirements())
+    with patch.object(cf.database, "get_db", return_value=db):
+        built = asyncio.run(cf._load_feed("c1", 365))
+        assert b"UID:r1@pleerityenterprise.co.uk" in built.body and b"TRIGGER:-P7D" in built.body
+        flt, update = feeds.update_one.await_args.args
+        assert flt == {"_id": "c1:365"} and update["$setOnInsert"] == {"generation": 0}
+        doc = {**update["$set"], "generation": 0}
+
+        # Fresh artifact: served without reading requirements
+        feeds.find_one = AsyncMock(return_value=doc)
+        db.requirements.find.reset_mock()
+        assert asyncio.run(cf._load_feed("c1", 365)) == built
+        db.requirements.find.assert_not_called()
+
+        # Invalidated, same content on rebuild: Last-Modified does not move
+        old = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        feeds.find_one = AsyncMock(return_value={**doc, "generation": 1, "last_modified": old})
+        rebuilt = asyncio.run(cf._load_feed("c1", 365))
+        assert rebuilt.etag == built.etag and rebuilt.last_modified == old
+        flt, update = feeds.update_one.await_args.args
+        assert flt == {"_id": "c1:365", "generation": 1} and update["$set"]["built_generation"] == 1
+
+
+def test_conditional_requests_get_304():
+    feed = cf.CalendarFeed(b"BEGIN:VCALENDAR\r\nEND:VCALENDAR", '"abc"',
+                           datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc), "compliance_expiries_x.ics")
+    app = FastAPI()
+    app.include_router(router)
+    resolve = AsyncMock(side_effect=lambda token: "c1" if token == "good" else None)
+    with patch.object(cf, "resolve_feed_token", resolve), \
+            patch.object(cf, "get_calendar_feed", AsyncMock(return_value=feed)) as get_feed:
+        client = TestClient(app)
+        first = client.get("/api/calendar/feed/good.ics")
+        assert first.status_code == 200 and first.content == feed.body
+        assert first.headers["etag"] == '"abc"'
+        assert first.headers["last-modified"] == "Sun, 01 Mar 2026 09:30:00 GMT"
+        assert first.headers["content-type"].startswith("text/calendar")
+
+        assert client.get("/api/calendar/feed/good.ics", headers={"If-None-Match": '"abc"'}).status_code == 304
+        since = {"If-Modified-Since": "Sun, 01 Mar 2026 09:30:00 GMT"}
+        assert client.get("/api/calendar/feed/good.ics", headers=since).status_code == 304
+        # If-None-Match wins over If-Modified-Since
+        changed = {**since, "If-None-Match": '"old"'}
+        assert client.get("/api/calendar/feed/good.ics", headers=changed).status_code == 200
+        assert client.get("/api/calendar/feed/revoked.ics").status_code == 404
+    get_feed.assert_awaited_with("c1", 365)
+
+
+def test_feed_tokens_are_hashed_cached_and_revocable():
+    tokens = MagicMock()
+    tokens.find_one = AsyncMock(return_value={"client_id": "c1"})
+    tokens.update_one = AsyncMock()
+    tokens.find.return_value.to_list = AsyncMock(return_value=[{"token_hash": hash_token("tok")}])
+    tokens.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+    db = MagicMock()
+    db.__getitem__.return_value = tokens
+
+    async def scenario():
+        with patch.object(cf.database, "get_db", return_value=db), \
+                patch.object(cf, "_tokens", cf.TTLCache(ttl_seconds=60)):
+            assert await cf.resolve_feed_token("tok") == "c1"
+            assert await cf.resolve_feed_token("tok") == "c1"
+            assert tokens.find_one.await_count == 1
+            assert tokens.find_one.await_args.args[0] == {"token_hash": hash_token("tok"), "revoked_at": None}
+
+            assert await cf.revoke_feed_tokens("c1") == 1
+            tokens.find_one = AsyncMock(return_value=None)
+            assert await cf.resolve_feed_token("tok") is None
+
+    asyncio.run(scenario())
+
+
+def test_recalc_enqueue_invalidates_client_feed():
+    db = MagicMock()
+    db.compliance_recalc_queue.insert_one = AsyncMock()
+    db.properties.update_one = AsyncMock()
+    db.calendar_feeds.update_many = AsyncMock()
+    db.__getitem__.side_effect = lambda name: getattr(db, name)
+    cf._feeds.set(("c1", 365), "cached")
+    cf._feeds.set(("c2", 365), "other")
+    with patch("services.compliance_recalc_queue.database.get_db", return_value=db):
+        asyncio.run(enqueue_compliance_recalc("p1", "c1", "DOC_UPLOADED", "CLIENT", correlation_id="x"))
+    db.calendar_feeds.update_many.assert_awaited_once_with({"client_id": "c1"}, {"$inc": {"generation": 1}})
+    assert ("c1", 365) not in cf._feeds and ("c2", 365) in cf._feeds
+    cf._feeds.clear()
+
+
+def test_crn_assignment_invalidates_client_feed():
+    from services import crn_service
+
+    db = MagicMock()
+    db.clients.find_one = AsyncMock(return_value={"client_id": "c1"})
+    db.clients.update_one = AsyncMock()
+    invalidate = AsyncMock()
+    with patch.object(crn_service.database, "get_db", return_value=db), \
+            patch.object(crn_service, "get_next_crn", AsyncMock(return_value="PLE-CVP-2026-00002")), \
+            patch.object(crn_service, "create_audit_log", AsyncMock()), \
+            patch("services.client_search_index.reindex_client", AsyncMock()), \
+            patch.object(cf, "invalidate_calendar_feed", invalidate):
+        asyncio.run(crn_service.ensure_client_crn("c1"))
+    invalidate.assert_awaited_once_with("c1")
+    # The feed prints the CRN, client name and property address
+    assert {"customer_reference", "company_name"} <= cf.CALENDAR_FEED_CLIENT_FIELDS
+    assert {"address_line_1", "city", "postcode"} == cf.CALENDAR_FEED_PROPERTY_FIELDS
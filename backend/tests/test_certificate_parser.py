@@ -0,0 +1,82 @@
+"""Tests for the local certificate parser and the LLM fast path in ai_provider."""
+from pathlib import Path
+from unittest.mock import patch
+
+SAMPLE = Path(__file__).resolve().parents[2] / "test_data" / "gas_safety_test.txt"
+
+EICR_TEXT = """Electrical Installation Condition Report
+Report Number: EICR/2023/0042
+Installation address: Flat 2, 10 High Road, Leeds LS1 4AB
+Date of inspection: 3rd March 2023
+Recommended date for next inspection: 03/03/2028
+NICEIC Enrolment number: 600123
+Contractor: Sparks Electrical Ltd
+"""
+
+EPC_TEXT = """Energy Performance Certificate
+Address of dwelling
+5 Park Lane
+Bristol
+BS1 5TR
+Current energy rating: C
+Valid until: 12 May 2034
+Certificate number: 1234-5678-9012-3456-7890
+Date of assessment: 10 May 2024
+Assessor accreditation number: EES/012345
+"""
+
+
+def test_parses_gas_safety_sample_file():
+    from services.certificate_parser import parse_certificate_text, is_confident
+
+    result = parse_certificate_text(SAMPLE.read_text(), SAMPLE.name)
+    assert result["doc_type"] == "GAS_SAFETY"
+    assert result["requirement_key"] == "gas_safety"
+    assert result["certificate_number"] == "GS-2024-12345"
+    assert (result["issue_date"], result["expiry_date"]) == ("2024-12-15", "2025-12-15")
+    assert result["inspector_id"] == "1234567"
+    assert result["inspector_company"] == "Safe Gas Services Ltd"
+    assert (result["address_line_1"], result["postcode"]) == ("123 Test Street", "SW1A 1AA")
+    assert is_confident(result, 0.85)
+
+
+def test_parses_eicr_and_epc_layouts():
+    from services.certificate_parser import parse_certificate_text
+
+    eicr = parse_certificate_text(EICR_TEXT, "report.pdf")
+    assert eicr["doc_type"] == "EICR"
+    assert (eicr["issue_date"], eicr["expiry_date"]) == ("2023-03-03", "2028-03-03")
+    assert eicr["address_line_1"] == "Flat 2, 10 High Road"
+    assert eicr["postcode"] == "LS1 4AB"
+
+    epc = parse_certificate_text(EPC_TEXT, "upload.pdf")
+    assert epc["doc_type"] == "EPC"
+    assert epc["certificate_number"] == "1234-5678-9012-3456-7890"
+    assert epc["expiry_date"] == "2034-05-12"
+    assert epc["inspector_id"] == "EES/012345"
+
+
+def test_derived_or_inconsistent_expiry_is_not_confident():
+    from services.certificate_parser import parse_certificate_text, is_confident
+
+    no_expiry = SAMPLE.read_text().replace("Next Check Due: 2025-12-15\n", "")
+    derived = parse_certificate_text(no_expiry, "cp12.pdf")
+    assert derived["expiry_date"] == "2025-12-15"
+    assert not is_confident(derived, 0.85)
+
+    wrong = SAMPLE.read_text().replace("Next Check Due: 2025-12-15", "Next Check Due: 2031-12-15")
+    assert not is_confident(parse_certificate_text(wrong, "cp12.pdf"), 0.85)
+    assert not is_confident(parse_certificate_text("hello world", "x.pdf"), 0.85)
+
+
+def test_extract_compliance_fields_skips_llm_when_confident():
+    from services import ai_provider
+
+    with patch.object(ai_provider, "_call_openai") as call, \
+            patch.object(ai_provider.ai_config, "is_configured", return_value=True):
+        result = ai_provider.extract_compliance_fields(SAMPLE.read_text(), SAMPLE.name)
+    call.assert_not_called()
+    assert result["success"] is True
+    assert result["provider"] == "local_parser"
+    assert result["extracted"]["expiry_date"] == "2025-12-15"
+    assert result["extracted"]["confidence"]["overall"] >= 0.85
@@ -0,0 +1,156 @@
+"""
+Tests for the ClearForm credit ledger: guarded atomic deduction, bulk FIFO expiry consumption
+under contention, atomic org pool deduction and balance reconciliation.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+def _cursor(rows):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=rows)
+    return cursor
+
+
+def _async_iter(rows):
+    async def _gen():
+        for row in rows:
+            yield row
+    return _gen()
+
+
+def _service(db):
+    from clearform.services.credit_service import CreditService
+
+    service = CreditService()
+    service.db = db
+    return service
+
+
+def test_deduct_uses_single_guarded_update():
+    from clearform.models.credits import CreditTransactionType
+
+    db = MagicMock()
+    db.clearform_users.find_one_and_update = AsyncMock(return_value={"credit_balance": 7})
+    db.clearform_credit_expiry.find.return_value = _cursor([{"expiry_id": "E1", "remaining_amount": 10}])
+    db.clearform_credit_expiry.bulk_write = AsyncMock(return_value=MagicMock(modified_count=1))
+    db.clearform_credit_transactions.insert_one = AsyncMock()
+
+    txn, ok = asyncio.run(_service(db).deduct_credits("U1", 3, CreditTransactionType.DOCUMENT_GENERATION, "doc"))
+
+    assert ok and txn.balance_after == 7 and txn.amount == -3
+    query, update = db.clearform_users.find_one_and_update.call_args[0][:2]
+    assert query == {"user_id": "U1", "credit_balance": {"$gte": 3}}
+    assert update["$inc"] == {"credit_balance": -3, "lifetime_credits_used": 3}
+    assert "$set" in update and "credit_balance" not in update["$set"]
+    ops = db.clearform_credit_expiry.bulk_write.call_args[0][0]
+    assert ops[0]._filter == {"expiry_id": "E1", "expired": False, "remaining_amount": {"$gte": 3}}
+    assert ops[0]._doc["$inc"] == {"remaining_amount": -3}
+
+
+def test_deduct_insufficient_and_unknown_user():
+    from clearform.models.credits import CreditTransactionType
+
+    db = MagicMock()
+    db.clearform_users.find_one_and_update = AsyncMock(return_value=None)
+    db.clearform_users.find_one = AsyncMock(return_value={"credit_balance": 1})
+    service = _service(db)
+    assert asyncio.run(service.deduct_credits("U1", 5, CreditTransactionType.DOCUMENT_GENERATION, "doc")) == (None, False)
+    db.clearform_credit_expiry.bulk_write.assert_not_called()
+
+    db.clearform_users.find_one = AsyncMock(return_value=None)
+    with pytest.raises(ValueError):
+        asyncio.run(service.deduct_credits("missing", 1, CreditTransactionType.DOCUMENT_GENERATION, "doc"))
+
+
+def test_fifo_consumption_retries_batches_lost_to_contention():
+    """First pass: E1 lost to a concurrent deduction, E2 applied; second pass takes the rest from E3."""
+    db = MagicMock()
+    # find order: pass-1 batches, "applied" lookup after the partial bulk_write, pass-2 batches
+    finds = iter([
+        _cursor([{"expiry_id": "E1", "remaining_amount": 2}, {"expiry_id": "E2", "remaining_amount": 2}]),
+        _cursor([{"expiry_id": "E2"}]),
+        _cursor([{"expiry_id": "E3", "remaining_amount": 5}]),
+    ])
+    db.clearform_credit_expiry.find.side_effect = lambda *a, **k: next(finds)
+    db.clearform_credit_expiry.bulk_write = AsyncMock(side_effect=[
+        MagicMock(modified_count=1),
+        MagicMock(modified_count=1),
+    ])
+
+    left = asyncio.run(_service(db)._consume_expiry_fifo("U1", 4, "CTX-1"))
+
+    assert left == 0
+    second_ops = db.clearform_credit_expiry.bulk_write.call_args_list[1][0][0]
+    assert [(op._filter["expiry_id"], op._doc["$inc"]["remaining_amount"]) for op in second_ops] == [("E3", -2)]
+    applied_query = db.clearform_credit_expiry.find.call_args_list[1][0][0]
+    assert applied_query["consumed_by"] == "CTX-1:0"
+
+
+def test_fifo_does_not_recount_batches_from_an_earlier_pass():
+    """E1 was applied in pass 1 and loses in pass 2; the pass-2 lookup must not count it again."""
+    db = MagicMock()
+    finds = iter([
+        _cursor([{"expiry_id": "E0", "remaining_amount": 1}, {"expiry_id": "E1", "remaining_amount": 3}]),
+        _cursor([{"expiry_id": "E1"}]),
+        _cursor([{"expiry_id": "E1", "remaining_amount": 1}, {"expiry_id": "E2", "remaining_amount": 5}]),
+        _cursor([]),
+        _cursor([]),
+    ])
+    db.clearform_credit_expiry.find.side_effect = lambda *a, **k: next(finds)
+    db.clearform_credit_expiry.bulk_write = AsyncMock(side_effect=[
+        MagicMock(modified_count=1),
+        MagicMock(modified_count=0),
+    ])
+
+    left = asyncio.run(_service(db)._consume_expiry_fifo("U1", 4, "CTX-1"))
+
+    assert left == 1
+    second_lookup = db.clearform_credit_expiry.find.call_args_list[3][0][0]
+    assert second_lookup["consumed_by"] == "CTX-1:1"
+    tags = {op._doc["$push"]["consumed_by"]["$each"][0] for call in db.clearform_credit_expiry.bulk_write.call_args_list
+            for op in call[0][0]}
+    assert tags == {"CTX-1:0", "CTX-1:1"}
+
+
+def test_org_deduct_is_one_conditional_update():
+    from clearform.services.organization_service import OrganizationService
+
+    db = MagicMock()
+    db.clearform_organizations.find_one_and_update = AsyncMock(return_value=None)
+    db.clearform_org_members.find_one = AsyncMock(return_value=None)
+    service = OrganizationService()
+    service.db = db
+    service.get_member = AsyncMock(return_value=None)
+
+    assert asyncio.run(service.deduct_org_credits("ORG1", "U1", 4, "doc")) is False
+    query, update = db.clearform_organizations.find_one_and_update.call_args[0][:2]
+    assert query == {"org_id": "ORG1", "credit_balance": {"$gte": 4}}
+    assert update["$inc"]["credit_balance"] == -4
+
+
+def test_reconcile_reports_drift_only():
+    db = MagicMock()
+    db.clearform_credit_transactions.aggregate.return_value = _async_iter([
+        {"_id": "U1", "total": 5}, {"_id": "U2", "total": 3},
+    ])
+    db.clearform_credit_expiry.aggregate.return_value = _async_iter([
+        {"_id": "U1", "total": 5}, {"_id": "U2", "total": 3},
+    ])
+    db.clearform_users.find.return_value = _async_iter([
+        {"user_id": "U1", "credit_balance": 5},
+        {"user_id": "U2", "credit_balance": 4},
+    ])
+    reports = MagicMock()
+    reports.insert_one = AsyncMock()
+    db.__getitem__.return_value = reports
+
+    report = asyncio.run(_service(db).reconcile_balances())
+
+    assert report["users_checked"] == 2
+    assert report["drift"] == [{"user_id": "U2", "credit_balance": 4, "ledger_balance": 3, "expiry_balance": 3}]
+    db.clearform_users.update_one.assert_not_called()
+    reports.insert_one.assert_awaited_once()
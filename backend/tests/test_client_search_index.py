@@ -0,0 +1,138 @@
+"""
+Tests for the admin client search index: tokenization, edge n-grams, ranking and indexed query.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def _client(**kw):
+    base = {
+        "client_id": "c1",
+        "customer_reference": "PLE-CVP-2026-00012",
+        "email": "jane.doe@example.com",
+        "full_name": "Jane Doe",
+        "company_name": "Doe Lettings Ltd",
+    }
+    base.update(kw)
+    return base
+
+
+def _index_db(docs):
+    coll = MagicMock()
+    coll.find.return_value.__aiter__.return_value = docs
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+    return db, coll
+
+
+def test_tokenize_folds_case_and_accents():
+    from services.client_search_index import tokenize, compact
+
+    assert tokenize("José  O'Neil") == ["jose", "o", "neil"]
+    assert compact("SW1A 1AA") == "sw1a1aa"
+
+
+def test_build_index_doc_includes_postcodes_and_prefixes():
+    from services.client_search_index import build_index_doc
+
+    doc = build_index_doc(_client(), ["sw1a 1aa", "M1 1AE", None, ""])
+    assert doc["client_id"] == "c1"
+    assert doc["postcodes"] == ["M1 1AE", "SW1A 1AA"]
+    # CRN compact form and its prefixes are searchable
+    assert "plecvp202600012" in doc["tokens"]
+    assert "plecvp" in doc["prefixes"]
+    # Postcode compact form
+    assert "sw1a1aa" in doc["field_tokens"]["postcode"]
+    assert "sw1a1" in doc["prefixes"]
+    # Email local part and domain
+    assert "jane" in doc["field_tokens"]["email"]
+    assert "example" in doc["field_tokens"]["email"]
+
+
+def test_query_terms_dedupes_and_truncates():
+    from services.client_search_index import query_terms, MAX_PREFIX_LEN
+
+    assert query_terms("Jane jane DOE") == ["jane", "doe"]
+    long_term = "a" * (MAX_PREFIX_LEN + 5)
+    assert query_terms(long_term) == ["a" * MAX_PREFIX_LEN]
+
+
+def test_ranking_prefers_exact_and_crn_over_name():
+    from services.client_search_index import build_index_doc, score_index_doc
+
+    exact = build_index_doc(_client(client_id="a", full_name="Smith"), [])
+    prefix = build_index_doc(_client(client_id="b", full_name="Smithson"), [])
+    assert score_index_doc(exact, ["smith"])["score"] > score_index_doc(prefix, ["smith"])["score"]
+
+    by_crn = build_index_doc(_client(client_id="c"), [])
+    result = score_index_doc(by_crn, ["plecvp202600012"])
+    assert result["matched_via"] == "crn"
+
+
+def test_search_clients_queries_prefix_index_and_ranks():
+    from services.client_search_index import build_index_doc, search_clients
+
+    docs = [
+        build_index_doc(_client(client_id="b", full_name="Ann Smithson", email="b@x.com"), []),
+        build_index_doc(_client(client_id="a", full_name="Ann Smith", email="a@x.com"), []),
+    ]
+    db, coll = _index_db(docs)
+
+    with patch("services.client_search_index.database.get_db", return_value=db):
+        ranked = asyncio.run(search_clients("ann smith", limit=10))
+
+    query = coll.find.call_args[0][0]
+    assert query == {"prefixes": {"$all": ["ann", "smith"]}}
+    assert [r["client_id"] for r in ranked] == ["a", "b"]
+
+
+def test_search_clients_ranks_every_match_before_limiting():
+    from services.client_search_index import build_index_doc, search_clients
+
+    # The exact match comes last from the index; it must still win
+    docs = [
+        build_index_doc(_client(client_id=f"w{i:03d}", full_name=f"Ann Smithers{i}", email=f"w{i}@x.com"), [])
+        for i in range(300)
+    ] + [build_index_doc(_client(client_id="z", full_name="Ann Smith", email="z@x.com"), [])]
+    db, coll = _index_db(docs)
+
+    with patch("services.client_search_index.database.get_db", return_value=db):
+        ranked = asyncio.run(search_clients("ann smith", limit=3))
+
+    assert [r["client_id"] for r in ranked] == ["z", "w000", "w001"]
+    coll.find.return_value.limit.assert_not_called()
+
+
+def test_index_is_ready_only_after_a_completed_backfill():
+    from services import client_search_index as csi
+
+    db = MagicMock()
+    meta = MagicMock()
+    meta.find_one = AsyncMock(return_value=None)
+    db.__getitem__.side_effect = lambda name: meta if name == csi.SEARCH_INDEX_META_COLLECTION else MagicMock()
+
+    with patch.object(csi.database, "get_db", return_value=db):
+        assert asyncio.run(csi.is_search_index_ready()) is False
+        meta.find_one = AsyncMock(return_value={"_id": csi.BUILD_MARKER_ID})
+        assert asyncio.run(csi.is_search_index_ready()) is True
+
+
+def test_search_clients_reports_matched_postcode():
+    from services.client_search_index import build_index_doc, search_clients
+
+    doc = build_index_doc(_client(client_id="p"), ["SW1A 1AA", "E1 6AN"])
+    db, _ = _index_db([doc])
+
+    with patch("services.client_search_index.database.get_db", return_value=db):
+        ranked = asyncio.run(search_clients("E1 6AN"))
+
+    assert ranked[0]["matched_via"] == "postcode"
+    assert ranked[0]["matched_postcode"] == "E1 6AN"
+
+
+def test_empty_query_returns_no_results_without_db():
+    from services.client_search_index import search_clients
+
+    with patch("services.client_search_index.database.get_db") as get_db:
+        assert asyncio.run(search_clients("  --  ")) == []
+        get_db.assert_not_called()
@@ -120,7 +120,11 @@ class TestExpiryRolloverJob:
     async def test_run_expiry_rollover_recalc_enqueues_for_affected_properties(self):
         from job_runner import run_expiry_rollover_recalc
 
-        items = [{"property_id": "p1"}, {"property_id": "p2"}]
+        past_due = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        items = [
+            {"requirement_id": "r1", "property_id": "p1", "client_id": "c1", "status": "COMPLIANT", "due_date": past_due},
+            {"requirement_id": "r2", "property_id": "p2", "client_id": "c2", "status": "OVERDUE", "due_date": past_due},
+        ]
 
         class AsyncIterCursor:
             def __aiter__(self):
@@ -136,7 +140,8 @@ class TestExpiryRolloverJob:
 
         db = MagicMock()
         db.requirements.find = MagicMock(return_value=AsyncIterCursor())
-        db.properties.find_one = AsyncMock(side_effect=[{"client_id": "c1"}, {"client_id": "c2"}])
+        db.requirements.bulk_write = AsyncMock()
+        db.properties.find_one = AsyncMock()
 
         with patch("job_runner.database.get_db", return_value=db):
             with patch("services.compliance_recalc_queue.enqueue_compliance_recalc", new_callable=AsyncMock, return_value=True) as enqueue:
@@ -144,6 +149,9 @@ class TestExpiryRolloverJob:
         assert enqueue.await_count == 2
         assert result.get("count") == 2
         assert "enqueued" in result.get("message", "")
+        # Only due transitions are read; client_id comes from the requirement (no per-property lookup)
+        assert "next_transition_at" in db.requirements.find.call_args[0][0]
+        db.properties.find_one.assert_not_called()
 
 
 class TestDashboardReadsStoredScore:
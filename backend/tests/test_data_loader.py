@@ -0,0 +1,73 @@
+"""
+Request-scoped batched loaders (utils.data_loader, services.client_data_loaders): lookups issued
+together coalesce into one query, values are memoized per request, and the catalog portfolio
+summary reads a fixed number of queries regardless of property count.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from services.catalog_compliance import get_portfolio_compliance_from_catalog
+from services.client_data_loaders import ClientDataLoaders
+from utils.data_loader import DataLoader
+
+
+def test_loads_coalesce_into_one_batch_and_are_memoized():
+    calls = []
+
+    async def fetch(keys):
+        calls.append(list(keys))
+        return {k: k.upper() for k in keys if k != "missing"}
+
+    async def scenario():
+        loader = DataLoader(fetch, list)
+        a, b, a_again, missing = await asyncio.gather(
+            loader.load("a"), loader.load("b"), loader.load("a"), loader.load("missing")
+        )
+        assert (a, b, a_again, missing) == ("A", "B", "A", [])
+        assert await loader.load_many(["b", "c"]) == ["B", "C"]
+        return loader
+
+    loader = asyncio.run(scenario())
+    assert calls == [["a", "b", "missing"], ["c"]] and loader.batches == 2
+
+
+def test_failed_batch_is_retried_on_next_load():
+    fetch = AsyncMock(side_effect=[RuntimeError("mongo down"), {"a": 1}])
+
+    async def scenario():
+        loader = DataLoader(fetch, max_batch_size=1)
+        try:
+            await loader.load("a")
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
+        return await loader.load("a")
+
+    assert asyncio.run(scenario()) == 1
+    assert fetch.await_count == 2
+
+
+def test_portfolio_summary_uses_batched_queries():
+    props = [{"property_id": f"p{i}", "client_id": "c1", "address_line_1": f"{i} High St"} for i in range(3)]
+    reqs = [
+        {"property_id": "p0", "requirement_id": "r0", "requirement_type": "GAS_SAFETY", "status": "COMPLIANT",
+         "due_date": "2099-01-01T00:00:00+00:00"},
+        {"property_id": "p1", "requirement_id": "r1", "requirement_code": "gas_safety", "status": "OVERDUE"},
+    ]
+    db = MagicMock()
+    db.requirements_catalog.find.return_value.sort.return_value.to_list = AsyncMock(
+        return_value=[{"code": "gas_safety", "title": "Gas", "criticality": "HIGH", "weight": 1}]
+    )
+    db.properties.find.return_value.to_list = AsyncMock(return_value=props)
+    db.requirements.find.return_value.to_list = AsyncMock(return_value=reqs)
+    db.documents.find.return_value.to_list = AsyncMock(return_value=[{"property_id": "p0", "requirement_id": "r0", "document_id": "d0"}])
+
+    result = asyncio.run(get_portfolio_compliance_from_catalog("c1", ClientDataLoaders("c1", db)))
+
+    # One query per collection, however many properties
+    assert db.properties.find.call_count == 1
+    assert db.requirements.find.call_count == 1 and db.documents.find.call_count == 1
+    assert db.requirements.find.call_args.args[0] == {"client_id": "c1", "property_id": {"$in": ["p0", "p1", "p2"]}}
+    by_id = {p["property_id"]: p for p in result["properties"]}
+    assert by_id["p0"]["overdue_count"] == 0 and by_id["p1"]["overdue_count"] == 1
+    assert by_id["p2"]["missing_count"] == 1
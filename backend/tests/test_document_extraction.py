@@ -65,9 +65,13 @@ def test_confirm_endpoint_sets_confirmed_and_updates_requirement():
 
     with patch("routes.documents.admin_route_guard", AsyncMock()):
         with patch("routes.documents.database.get_db", return_value=db):
-            with patch("routes.documents.create_audit_log", AsyncMock()):
+            with patch("routes.documents.create_audit_log", AsyncMock()), \
+                    patch("routes.documents.invalidate_calendar_feed", AsyncMock()) as invalidate:
                 result = asyncio.run(admin_confirm_extraction(req, body))
     assert result["message"] == "Extraction applied"
+    # The requirement's due date changed: the cached calendar feed is dropped
+    db.requirements.update_one.assert_awaited_once()
+    invalidate.assert_awaited_once_with("c1")
     assert result["document_id"] == "doc-123"
     db.extracted_documents.update_one.assert_called_once()
     call_args = db.extracted_documents.update_one.call_args
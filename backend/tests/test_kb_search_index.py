@@ -0,0 +1,115 @@
+"""
+Tests for the BM25 knowledge-base index: analysis, ranking, per-document updates and kb_articles sync.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+def test_analyze_drops_stop_words_and_stems():
+    from services.kb_search_index import analyze, stem
+
+    assert analyze("How do I upload the Documents?") == ["upload", "document"]
+    assert stem("uploading") == stem("uploaded") == stem("uploads") == "upload"
+    assert stem("properties") == "property"
+    assert stem("gas") == "gas"
+
+
+def test_bm25_ranks_title_and_rare_terms_higher():
+    from services.kb_search_index import build_index
+
+    index = build_index([
+        ("a", {"title": "Gas safety certificate", "content": "Annual CP12 check by an engineer."}),
+        ("b", {"title": "Uploading documents", "content": "Upload any certificate from the portal."}),
+        ("c", {"title": "Glossary", "content": "Certificate, tenancy, landlord, HMO."}),
+    ])
+    ranked = index.search("gas certificate")
+    assert ranked[0][0] == "a"
+    assert {doc_id for doc_id, _ in ranked} == {"a", "b", "c"}
+    assert index.search("CP12", top_k=1) == [("a", index.search("CP12")[0][1])]
+    assert index.search("the and of") == []
+
+
+def test_bm25_remove_and_readd_updates_postings():
+    from services.kb_search_index import BM25Index
+
+    index = BM25Index()
+    index.add("x", {"title": "EICR electrical report"})
+    index.add("y", {"title": "EPC energy rating"})
+    assert [d for d, _ in index.search("electrical")] == ["x"]
+
+    index.add("x", {"title": "Legionella risk assessment"})
+    assert index.search("electrical") == []
+    assert [d for d, _ in index.search("legionella")] == ["x"]
+
+    index.remove("x")
+    assert "x" not in index and len(index) == 1
+    assert index.search("legionella") == []
+
+
+def _articles_db(articles):
+    coll = MagicMock()
+
+    def _find(query, projection=None):
+        marker = (query.get("updated_at") or {}).get("$gt")
+        rows = [a for a in articles if marker is None or a.get("updated_at", "") > marker]
+
+        async def _iter():
+            for row in rows:
+                yield dict(row)
+
+        return _iter()
+
+    coll.find.side_effect = _find
+    coll.find_one = AsyncMock(side_effect=lambda q, p=None: next(
+        (dict(a) for a in articles if a["article_id"] == q["article_id"]), None
+    ))
+    db = MagicMock()
+    db.__getitem__.return_value = coll
+    return db, coll
+
+
+def test_article_index_only_published_active_and_syncs_incrementally():
+    from services.kb_search_index import ArticleSearchIndex
+
+    articles = [
+        {"article_id": "KB-1", "title": "Gas safety", "content": "CP12", "status": "published",
+         "is_active": True, "updated_at": "2026-01-01T00:00:00"},
+        {"article_id": "KB-2", "title": "Gas draft", "content": "CP12", "status": "draft",
+         "is_active": True, "updated_at": "2026-01-01T00:00:00"},
+        {"article_id": "KB-3", "title": "Gas old", "content": "CP12", "status": "published",
+         "is_active": False, "updated_at": "2026-01-01T00:00:00"},
+    ]
+    db, coll = _articles_db(articles)
+    idx = ArticleSearchIndex()
+
+    async def _run():
+        first = await idx.search("gas")
+        # Another replica publishes KB-2
+        articles[1] = {**articles[1], "status": "published", "updated_at": "2026-01-02T00:00:00"}
+        await idx.ensure_current(force=True)
+        return first, await idx.search("gas")
+
+    with patch("services.kb_search_index.database.get_db", return_value=db):
+        first, second = asyncio.run(_run())
+
+    assert [d for d, _ in first] == ["KB-1"]
+    assert {d for d, _ in second} == {"KB-1", "KB-2"}
+    assert coll.find.call_args_list[-1][0][0] == {"updated_at": {"$gt": "2026-01-01T00:00:00"}}
+
+
+def test_refresh_article_drops_unpublished():
+    from services.kb_search_index import ArticleSearchIndex
+
+    articles = [{"article_id": "KB-1", "title": "EICR", "status": "published", "is_active": True,
+                 "updated_at": "2026-01-01T00:00:00"}]
+    db, _ = _articles_db(articles)
+    idx = ArticleSearchIndex()
+
+    async def _run():
+        await idx.ensure_current()
+        articles[0] = {**articles[0], "status": "draft"}
+        await idx.refresh_article("KB-1")
+        return idx.index.search("eicr")
+
+    with patch("services.kb_search_index.database.get_db", return_value=db):
+        assert asyncio.run(_run()) == []
@@ -0,0 +1,127 @@
+"""
+Hot/cold log archival (services.log_archive): old rows move to segment files with a sidecar index
+by client_id and day (journalled per batch, so an interrupted run never archives a row twice), and
+find_logs / count_logs page and count across the hot collection and the archive with the same filters.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import log_archive as la
+from utils.ndjson_archive import match_query
+from utils.pagination import encode_cursor
+
+
+def _message(i, client_id, day, hour=10):
+    return {"_id": f"oid{i}", "message_id": f"m{i}", "client_id": client_id, "status": "SENT" if i % 2 else "FAILED",
+            "created_at": datetime(2026, 1, day, hour), "template_key": "digest"}
+
+
+def _hot(rows, count=None):
+    hot = MagicMock()
+    hot.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=rows)
+    hot.find.return_value.sort.return_value.skip.return_value.limit.return_value.to_list = AsyncMock(return_value=rows)
+    hot.count_documents = AsyncMock(return_value=len(rows) if count is None else count)
+    hot.delete_many = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: db.batches if name == la.ARCHIVE_BATCHES_COLLECTION else hot
+    db.batches.find.return_value.to_list = AsyncMock(return_value=[])
+    db.batches.insert_one = AsyncMock()
+    db.batches.update_one = AsyncMock()
+    db.batches.delete_one = AsyncMock()
+    return db, hot
+
+
+def _archive(tmp_path, rows):
+    db, hot = _hot(rows)
+    with patch.object(la, "LOG_ARCHIVE_DIR", tmp_path):
+        archived = asyncio.run(la.archive_collection(la.LOG_COLLECTIONS["message_logs"], datetime(2026, 6, 1, tzinfo=timezone.utc), db))
+    return archived, hot
+
+
+def test_archive_writes_segment_with_sidecar_blocks_and_deletes_rows(tmp_path):
+    rows = [_message(1, "c1", 5), _message(2, "c2", 5), _message(3, "c1", 6), _message(4, "c1", 5, hour=12)]
+    archived, hot = _archive(tmp_path, rows)
+
+    assert archived == 4
+    hot.delete_many.assert_awaited_once_with({"_id": {"$in": ["oid1", "oid2", "oid3", "oid4"]}})
+    assert len(list((tmp_path / "message_logs" / "2026-01").glob("*.ndjson.gz"))) == 1
+    (sidecar_path,) = (tmp_path / "message_logs" / "2026-01").glob("*.idx.json")
+    sidecar = json.loads(sidecar_path.read_text())
+    assert sidecar["count"] == 4 and sidecar["first_at"] == "2026-01-05T10:00:00"
+    assert [(b["client_id"], b["date"], b["count"]) for b in sidecar["blocks"]] == [
+        ("c1", "2026-01-05", 2), ("c1", "2026-01-06", 1), ("c2", "2026-01-05", 1),
+    ]
+    # Each block decompresses on its own; datetimes come back as datetimes, _id is dropped
+    block = la._read_block(sidecar_path.with_name(sidecar["segment"]), sidecar["blocks"][1])
+    assert block == [{k: v for k, v in rows[2].items() if k != "_id"}]
+
+
+def test_find_and_count_continue_from_hot_into_archive(tmp_path):
+    _archive(tmp_path, [_message(i, "c1" if i < 6 else "c2", i) for i in range(1, 9)])
+    hot_rows = [{"message_id": "m20", "client_id": "c1", "created_at": datetime(2026, 5, 30)}]
+    db, hot = _hot(hot_rows)
+    query = {"client_id": "c1"}
+
+    with patch.object(la, "LOG_ARCHIVE_DIR", tmp_path), patch.object(la.database, "get_db", return_value=db), \
+            patch.object(la, "_read_block", wraps=la._read_block) as read_block:
+        first = asyncio.run(la.find_logs("message_logs", query, limit=3, projection={"_id": 0, "message_id": 1}))
+        hot.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+        cursor = encode_cursor(datetime(2026, 1, 4, 10), "m4")
+        rest = asyncio.run(la.find_logs("message_logs", query, limit=3, cursor=cursor))
+        total = asyncio.run(la.count_logs("message_logs", query))
+        failed = asyncio.run(la.count_logs("message_logs", {"client_id": "c1", "status": "FAILED"}))
+
+    assert [r["message_id"] for r in first] == ["m20", "m5", "m4"]
+    assert first[1] == {"message_id": "m5"}
+    assert [r["message_id"] for r in rest] == ["m3", "m2", "m1"]
+    assert total == 1 + 5 and failed == 1 + 2
+    # Blocks of other clients are never decompressed
+    assert all(call.args[1]["client_id"] == "c1" for call in read_block.call_args_list)
+
+
+def test_interrupted_batches_are_finished_without_archiving_twice(tmp_path):
+    rows = [_message(1, "c1", 5), _message(2, "c1", 6)]
+    db, hot = _hot(rows)
+    with patch.object(la, "LOG_ARCHIVE_DIR", tmp_path):
+        # Crash after the segments were written, before the delete
+        la._write_segment(la.LOG_COLLECTIONS["message_logs"], rows, "aaaaaaaaaaaa")
+        # Crash while writing: files exist but the batch never completed
+        la._write_segment(la.LOG_COLLECTIONS["message_logs"], [_message(3, "c2", 7)], "bbbbbbbbbbbb")
+        db.batches.find.return_value.to_list = AsyncMock(return_value=[
+            {"_id": "aaaaaaaaaaaa", "collection": "message_logs", "ids": ["oid1", "oid2"], "segments_complete": True},
+            {"_id": "bbbbbbbbbbbb", "collection": "message_logs", "ids": ["oid3"], "segments_complete": False},
+        ])
+        hot.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+        asyncio.run(la.archive_collection(la.LOG_COLLECTIONS["message_logs"], datetime(2026, 6, 1, tzinfo=timezone.utc), db))
+
+        hot.delete_many.assert_awaited_once_with({"_id": {"$in": ["oid1", "oid2"]}})
+        assert [c.args[0] for c in db.batches.delete_one.await_args_list] == [{"_id": "aaaaaaaaaaaa"}, {"_id": "bbbbbbbbbbbb"}]
+        assert not list(tmp_path.glob("message_logs/*/*_bbbbbbbbbbbb.*"))
+        assert la._archive_totals(la.LOG_COLLECTIONS["message_logs"])["rows"] == 2
+
+
+def test_filtered_archive_counts_are_cached(tmp_path):
+    _archive(tmp_path, [_message(i, "c1", i) for i in range(1, 5)])
+    db, _ = _hot([])
+    query = {"client_id": "c1", "status": "FAILED"}
+    la.count_cache.clear()
+    with patch.object(la, "LOG_ARCHIVE_DIR", tmp_path), patch.object(la.database, "get_db", return_value=db), \
+            patch.object(la, "_read_block", wraps=la._read_block) as read_block:
+        assert asyncio.run(la.count_logs("message_logs", query)) == 2
+        reads = read_block.call_count
+        assert asyncio.run(la.count_logs("message_logs", query)) == 2
+    assert reads and read_block.call_count == reads
+    la.count_cache.clear()
+
+
+def test_match_query_follows_mongo_semantics():
+    row = {"status": "BLOCKED_PREFS", "created_at": datetime(2026, 1, 5), "timestamp": "2026-01-05T10:00:00+00:00",
+           "metadata": {"template": "digest"}}
+    since = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert match_query(row, {"created_at": {"$gte": since}, "status": {"$regex": "^blocked", "$options": "i"}})
+    assert match_query(row, {"metadata.template": "digest", "$or": [{"channel": {"$exists": False}}, {"channel": "EMAIL"}]})
+    # A string never compares with a date, as in Mongo
+    assert not match_query(row, {"timestamp": {"$gte": since}})
+    assert not match_query(row, {"status": {"$in": ["SENT", "FAILED"]}})
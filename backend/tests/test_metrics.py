@@ -0,0 +1,106 @@
+"""
+Metrics registry (utils.metrics): per-thread cells summed at scrape, Prometheus text format,
+route-template request latency (MetricsMiddleware), queue depth/lag collector.
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware import MetricsMiddleware
+from services.queue_metrics import queue_stats
+from utils.metrics import HTTP_REQUEST_SECONDS, MetricsRegistry
+
+
+def test_counter_and_histogram_sum_across_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("things", "Things done", ("kind",))
+    histogram = registry.histogram("op_seconds", "Op latency", ("op",), buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc("a")
+            histogram.observe(0.05, "x")
+        histogram.observe(5.0, "x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.values()[("a",)] == 4000
+    text = asyncio.run(registry.render())
+    assert "# TYPE things counter" in text
+    assert 'things_total{kind="a"} 4000' in text
+    assert 'op_seconds_bucket{op="x",le="0.1"} 4000' in text
+    assert 'op_seconds_bucket{op="x",le="1"} 4000' in text
+    assert 'op_seconds_bucket{op="x",le="+Inf"} 4004' in text
+    assert 'op_seconds_count{op="x"} 4004' in text
+
+
+def test_failing_collector_does_not_break_scrape():
+    registry = MetricsRegistry()
+    registry.counter("ok", "Still exported").inc()
+
+    @registry.register_collector
+    async def broken():
+        raise RuntimeError("db down")
+
+    text = asyncio.run(registry.render())
+    assert "ok_total 1" in text
+    assert 'metrics_collector_errors{collector="broken"} 1' in text
+
+
+def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/api/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for i in range(3):
+        assert client.get(f"/api/items/{i}").status_code == 200
+    client.get("/nope")
+
+    # cell = per-bucket counts + [sum]; the request count is the sum of the bucket counts
+    series = {key: sum(cell[:-1]) for key, cell in HTTP_REQUEST_SECONDS.merged().items()}
+    assert series[("GET", "/api/items/{item_id}", "200")] >= 3
+    assert series[("GET", "unmatched", "404")] >= 1
+
+
+def test_queue_stats_depth_and_lag():
+    now = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    collections = {}
+
+    def collection(name):
+        if name not in collections:
+            coll = MagicMock()
+            coll.count_documents = AsyncMock(return_value=0)
+            coll.find_one = AsyncMock(return_value=None)
+            collections[name] = coll
+        return collections[name]
+
+    db = MagicMock()
+    db.__getitem__.side_effect = collection
+    collection("compliance_recalc_queue").count_documents = AsyncMock(return_value=4)
+    collection("compliance_recalc_queue").find_one = AsyncMock(
+        return_value={"next_run_at": (now - timedelta(seconds=90)).isoformat()}
+    )
+    collection("extracted_documents").count_documents = AsyncMock(return_value=1)
+    collection("extracted_documents").find_one = AsyncMock(
+        return_value={"audit": {"created_at": now - timedelta(seconds=30)}}
+    )
+
+    stats = asyncio.run(queue_stats(db, now=now))
+    assert stats["compliance_recalc"] == {"depth": 4, "lag_seconds": 90.0}
+    assert stats["document_extraction"] == {"depth": 1, "lag_seconds": 30.0}
+    assert stats["notification_retry"] == {"depth": 0, "lag_seconds": 0.0}
+    # ISO-string due times are compared as strings, datetimes as datetimes
+    recalc_filter = collection("compliance_recalc_queue").find_one.await_args.args[0]
+    assert recalc_filter["next_run_at"] == {"$lte": now.isoformat()}
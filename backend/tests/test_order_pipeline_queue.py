@@ -0,0 +1,146 @@
+"""
+Order pipeline (services.order_pipeline_queue): priority and eligibility, enqueue on status
+events with per-order dedupe, running a leased item (rerun, retry) and status dispatch.
+"""
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import DuplicateKeyError
+
+from services import order_pipeline_queue as opq
+from services.order_service import _enqueue_for_pipeline
+from services.order_workflow import OrderStatus
+from services.workflow_automation_service import WorkflowAutomationService
+
+PAID = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _db(queue):
+    db = MagicMock()
+    db.__getitem__.return_value = queue
+    return db
+
+
+def test_priority_matches_former_poll_order():
+    assert opq.order_priority({"queue_priority": 10, "fast_track": True}) == 10
+    assert opq.order_priority({"priority": True}) == 10
+    assert opq.order_priority({"fast_track": True}) == 5
+    assert opq.order_priority({}) == 0
+
+
+def test_enqueue_new_running_and_ineligible_orders():
+    queue = MagicMock()
+    queue.update_one = AsyncMock(return_value=MagicMock(matched_count=0))
+    pool = opq.OrderPipelinePool(concurrency=1)
+    order = {"order_id": "ORD-1", "status": "QUEUED", "paid_at": PAID, "fast_track": True, "created_at": PAID}
+
+    async def scenario():
+        opq._local_pools.append(pool)
+        try:
+            with patch.object(opq.database, "get_db", return_value=_db(queue)):
+                assert await opq.enqueue_order("ORD-1", "QUEUED", order=order) == "enqueued"
+                assert pool._wake.is_set()
+                flt, update = queue.update_one.await_args.args
+                assert flt == {"_id": "ORD-1", "status": {"$in": ["done", "failed"]}}
+                assert update["$set"]["priority"] == 5 and update["$set"]["status"] == "pending"
+
+                # Already held by a worker: flag it for a rerun instead of running it twice
+                queue.update_one = AsyncMock(side_effect=[
+                    MagicMock(matched_count=0), DuplicateKeyError("E11000"), MagicMock(matched_count=1),
+                ])
+                assert await opq.enqueue_order("ORD-1", "REGEN_REQUESTED", order=order) == "rerun"
+                assert queue.update_one.await_args.args[1]["$set"]["rerun"] is True
+
+                unpaid = {**order, "paid_at": None}
+                assert await opq.enqueue_order("ORD-1", "QUEUED", order=unpaid) is None
+                locked = {**order, "status": "FINALISING", "version_locked": False}
+                assert await opq.enqueue_order("ORD-1", "FINALISING", order=locked) is None
+        finally:
+            opq._local_pools.remove(pool)
+
+    asyncio.run(scenario())
+
+
+def test_transitions_by_the_pipeline_worker_do_not_requeue():
+    enqueue = AsyncMock(return_value="enqueued")
+
+    async def scenario():
+        with patch.object(opq, "enqueue_order", enqueue):
+            token = opq.current_pipeline_order.set("ORD-1")
+            try:
+                await _enqueue_for_pipeline("ORD-1", OrderStatus.DRAFT_READY, {})
+            finally:
+                opq.current_pipeline_order.reset(token)
+            await _enqueue_for_pipeline("ORD-1", OrderStatus.IN_PROGRESS, {})
+            await _enqueue_for_pipeline("ORD-2", OrderStatus.REGEN_REQUESTED, {"order_id": "ORD-2"})
+
+    asyncio.run(scenario())
+    enqueue.assert_awaited_once_with("ORD-2", reason="REGEN_REQUESTED", order={"order_id": "ORD-2"})
+
+
+def test_run_claimed_item_records_outcome_and_reruns():
+    order = {"order_id": "ORD-1", "status": "QUEUED", "paid_at": PAID}
+    queue = MagicMock()
+    queue.find_one_and_update = AsyncMock(return_value={"_id": "ORD-1", "rerun": True})
+    db = _db(queue)
+    db.orders.find_one = AsyncMock(return_value=order)
+    seen = []
+
+    async def advance(o):
+        seen.append(opq.current_pipeline_order.get())
+        return {"success": True, "status": "INTERNAL_REVIEW"}
+
+    service = MagicMock(advance_order=AsyncMock(side_effect=advance))
+    with patch("services.workflow_automation_service.workflow_automation_service", service), \
+            patch.object(opq, "enqueue_order", AsyncMock()) as enqueue:
+        result = asyncio.run(opq.run_claimed_item(db, {"_id": "ORD-1", "attempts": 1}, "w1"))
+        assert result["status"] == "INTERNAL_REVIEW" and seen == ["ORD-1"]
+        flt, update = queue.find_one_and_update.await_args.args
+        assert flt == {"_id": "ORD-1", "lease_owner": "w1"}
+        assert update["$set"]["status"] == "done" and update["$set"]["lease_owner"] is None
+        enqueue.assert_awaited_once_with("ORD-1", reason="rerun", rerun_if_running=False)
+
+        # A raising step is retried after a backoff
+        service.advance_order = AsyncMock(side_effect=RuntimeError("LLM timeout"))
+        queue.find_one_and_update = AsyncMock(return_value={"_id": "ORD-1"})
+        asyncio.run(opq.run_claimed_item(db, {"_id": "ORD-1", "attempts": 1}, "w1"))
+        update = queue.find_one_and_update.await_args.args[1]["$set"]
+        assert update["status"] == "pending" and "LLM timeout" in update["last_error"]
+        assert update["available_at"] > datetime.now(timezone.utc)
+
+
+def test_lease_heartbeat_survives_a_failed_renewal():
+    queue = MagicMock()
+
+    async def _update(flt, update):
+        if queue.update_one.await_count == 1:
+            raise RuntimeError("not primary")
+    queue.update_one = AsyncMock(side_effect=_update)
+
+    async def _beat():
+        heartbeat = asyncio.create_task(opq._renew_lease(_db(queue), "o1", "w1"))
+        await asyncio.sleep(0.05)
+        heartbeat.cancel()
+        return heartbeat
+
+    with patch.object(opq, "ITEM_LEASE_SECONDS", 0.03):
+        heartbeat = asyncio.run(_beat())
+    assert heartbeat.cancelled()
+    assert queue.update_one.await_count >= 2
+    assert queue.update_one.await_args.args[0] == {"_id": "o1", "lease_owner": "w1"}
+
+
+def test_advance_order_dispatches_by_status():
+    service = WorkflowAutomationService()
+    with patch.object(service, "wf2_queue_to_generation", AsyncMock(return_value={"success": True})), \
+            patch.object(service, "wf3_draft_to_review", AsyncMock(return_value={"success": True, "status": "INTERNAL_REVIEW"})), \
+            patch.object(service, "wf4_regeneration", AsyncMock(return_value={"success": True})) as wf4, \
+            patch.object(service, "wf7_finalization_to_delivery", AsyncMock(return_value={"success": True})) as wf7:
+        assert asyncio.run(service.advance_order({"order_id": "A", "status": "QUEUED"}))["status"] == "INTERNAL_REVIEW"
+        service.wf2_queue_to_generation.assert_awaited_once_with("A")
+        asyncio.run(service.advance_order({"order_id": "B", "status": "REGEN_REQUESTED", "regeneration_notes": "fix"}))
+        wf4.assert_awaited_once_with("B", "fix")
+        asyncio.run(service.advance_order({"order_id": "C", "status": "FINALISING"}))
+        wf7.assert_awaited_once_with("C")
+        assert asyncio.run(service.advance_order({"order_id": "D", "status": "IN_PROGRESS"})) is None
@@ -0,0 +1,124 @@
+"""
+Tests for keyset pagination helpers: cursor encode/decode, keyset filter, next cursor, count cache.
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+def test_cursor_roundtrip_preserves_datetime_and_id():
+    """A datetime sort value survives encode/decode so range filters compare as dates."""
+    from utils.pagination import encode_cursor, decode_cursor
+
+    ts = datetime(2026, 3, 1, 12, 30, 0)
+    token = encode_cursor(ts, "ORD-2026-ABC123")
+    sort_value, unique_id = decode_cursor(token)
+    assert sort_value == ts
+    assert unique_id == "ORD-2026-ABC123"
+
+
+def test_cursor_roundtrip_string_sort_value():
+    from utils.pagination import encode_cursor, decode_cursor
+
+    token = encode_cursor("2026-01-01T00:00:00+00:00", "LEAD-1")
+    assert decode_cursor(token) == ("2026-01-01T00:00:00+00:00", "LEAD-1")
+
+
+def test_decode_invalid_cursor_raises():
+    from utils.pagination import decode_cursor, InvalidCursorError
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("not-a-cursor!!")
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("")
+
+
+def test_keyset_filter_descending_and_preserves_or():
+    """Existing $or (search) is kept by wrapping both conditions in $and."""
+    from utils.pagination import encode_cursor, keyset_filter
+
+    token = encode_cursor("2026-02-01", "c-5")
+    query = {"$or": [{"email": "a"}, {"full_name": "a"}]}
+    out = keyset_filter(query, token, "created_at", "client_id")
+    assert out["$and"][0] == query
+    after = out["$and"][1]["$or"]
+    assert after[0] == {"created_at": {"$lt": "2026-02-01"}}
+    assert after[1] == {"created_at": "2026-02-01", "client_id": {"$lt": "c-5"}}
+    # Original query not mutated
+    assert "$and" not in query
+
+
+def test_keyset_filter_empty_cursor_is_first_page():
+    from utils.pagination import keyset_filter
+
+    assert keyset_filter({"status": "PAID"}, "", "created_at", "order_id") == {"status": "PAID"}
+    assert keyset_filter({}, None, "created_at", "order_id") == {}
+
+
+def test_next_cursor_only_when_page_full():
+    from utils.pagination import next_cursor_for, decode_cursor
+
+    items = [{"created_at": "t2", "lead_id": "b"}, {"created_at": "t1", "lead_id": "a"}]
+    assert next_cursor_for(items, 3, "created_at", "lead_id") is None
+    token = next_cursor_for(items, 2, "created_at", "lead_id")
+    assert decode_cursor(token) == ("t1", "a")
+
+
+def test_keyset_pages_match_offset_pages():
+    """Walking keyset pages over an in-memory list yields the same order as offset paging."""
+    from utils.pagination import decode_cursor, next_cursor_for
+
+    rows = [{"created_at": f"2026-01-{d:02d}", "order_id": f"o{i}"} for d in range(1, 6) for i in range(3)]
+    ordered = sorted(rows, key=lambda r: (r["created_at"], r["order_id"]), reverse=True)
+
+    def page_after(token, limit):
+        if not token:
+            return ordered[:limit]
+        sv, uid = decode_cursor(token)
+        rest = [r for r in ordered if (r["created_at"], r["order_id"]) < (sv, uid)]
+        return rest[:limit]
+
+    walked, token = [], ""
+    while True:
+        page = page_after(token, 4)
+        walked.extend(page)
+        token = next_cursor_for(page, 4, "created_at", "order_id")
+        if not token:
+            break
+    assert walked == ordered
+
+
+def test_cached_count_uses_estimate_for_empty_query_and_caches():
+    from utils.pagination import CountCache
+    import utils.pagination as pagination
+
+    coll = MagicMock()
+    coll.name = "audit_logs"
+    coll.estimated_document_count = AsyncMock(return_value=1000)
+    coll.count_documents = AsyncMock(return_value=7)
+    original = pagination.count_cache
+    pagination.count_cache = CountCache(ttl_seconds=60)
+    try:
+        assert asyncio.run(pagination.cached_count(coll, {})) == 1000
+        assert asyncio.run(pagination.cached_count(coll, {"action": "X"})) == 7
+        assert asyncio.run(pagination.cached_count(coll, {"action": "X"})) == 7
+        coll.estimated_document_count.assert_awaited_once()
+        coll.count_documents.assert_awaited_once()
+    finally:
+        pagination.count_cache = original
+
+
+def test_clearform_vault_bad_cursor_is_400():
+    from fastapi import HTTPException
+    from clearform.routes import documents
+    from utils.pagination import InvalidCursorError
+    from unittest.mock import patch
+
+    user = MagicMock(user_id="u1")
+    with patch.object(documents.document_service, "get_vault", AsyncMock(side_effect=InvalidCursorError("Invalid cursor"))):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(documents.get_vault(page=1, page_size=20, document_type=None, status=None, search=None,
+                                            cursor="bad", user=user))
+    assert exc.value.status_code == 400
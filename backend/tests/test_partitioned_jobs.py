@@ -0,0 +1,134 @@
+"""
+Partitioned per-client jobs (services.partitioned_jobs): stable hash shards, shard outcome
+transitions (done / retry with backoff / failed), per-client checkpoints, coordinator aggregation.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services import partitioned_jobs as pj
+from services.partitioned_jobs import Shard, client_shard
+
+
+def _shard_doc(attempts=1, job_name="test_job"):
+    return {"_id": "run1:2", "job_run_id": "run1", "job_name": job_name, "shard_index": 2,
+            "shard_count": 4, "attempts": attempts}
+
+
+def _db():
+    db = MagicMock()
+    coll = MagicMock()
+    coll.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+    db.__getitem__.return_value = coll
+    return db, coll
+
+
+def test_shards_cover_every_client_exactly_once():
+    clients = [{"client_id": f"client-{i}"} for i in range(500)]
+    shards = [Shard(i, 4) for i in range(4)]
+    owned = [c["client_id"] for s in shards for c in s.filter_clients(clients)]
+    assert sorted(owned) == sorted(c["client_id"] for c in clients)
+    # Stable across processes (crc32, not salted hash()) and reasonably even
+    assert client_shard("client-1", 4) == client_shard("client-1", 4)
+    assert all(len(s.filter_clients(clients)) > 60 for s in shards)
+
+
+def test_shard_success_records_count_and_aggregates():
+    db, coll = _db()
+    seen = []
+
+    async def fn(shard):
+        seen.append(shard)
+        return 7
+
+    with patch.dict(pj.PARTITIONED_JOBS, {"test_job": fn}), \
+            patch.object(pj, "aggregate_job_run", new=AsyncMock()) as aggregate:
+        assert asyncio.run(pj.run_claimed_shard(db, _shard_doc(), "me")) is True
+    assert seen == [Shard(2, 4, "run1:2")]
+    filt, update = coll.update_one.call_args[0]
+    assert filt == {"_id": "run1:2", "lease_owner": "me"}
+    assert update["$set"]["status"] == pj.SHARD_DONE and update["$set"]["count"] == 7
+    aggregate.assert_awaited_once_with(db, "run1")
+
+
+def test_shard_failure_retries_then_fails():
+    async def fn(shard):
+        raise RuntimeError("smtp down")
+
+    for attempts, expected in ((1, pj.SHARD_PENDING), (pj.SHARD_MAX_ATTEMPTS, pj.SHARD_FAILED)):
+        db, coll = _db()
+        with patch.dict(pj.PARTITIONED_JOBS, {"test_job": fn}), \
+                patch.object(pj, "aggregate_job_run", new=AsyncMock()):
+            assert asyncio.run(pj.run_claimed_shard(db, _shard_doc(attempts=attempts), "me")) is False
+        update = coll.update_one.call_args[0][1]["$set"]
+        assert update["status"] == expected
+        assert "smtp down" in update["last_error"]
+        if expected == pj.SHARD_PENDING:
+            assert "available_at" in update  # backoff before the next claim
+
+
+def test_coordinator_runs_shards_and_raises_on_failed_shard():
+    claims = [_shard_doc(), None]
+    summary = {"remaining": 0, pj.SHARD_FAILED: 0, "count": 12}
+    with patch.dict(pj.PARTITIONED_JOBS, {"test_job": AsyncMock(return_value=12)}), \
+            patch.object(pj.database, "get_db", return_value=MagicMock()), \
+            patch.object(pj, "create_shards", new=AsyncMock()) as create, \
+            patch.object(pj, "claim_shard", new=AsyncMock(side_effect=claims)), \
+            patch.object(pj, "run_claimed_shard", new=AsyncMock(return_value=True)) as run_shard, \
+            patch.object(pj, "aggregate_job_run", new=AsyncMock(return_value=summary)):
+        result = asyncio.run(pj.run_partitioned("test_job", 4, job_run_id="run1", owner_id="me"))
+    assert result == {"count": 12, "shards": 4}
+    assert create.await_args.args[1:] == ("test_job", "run1", 4)
+    run_shard.assert_awaited_once()
+
+    failed = {"remaining": 0, pj.SHARD_FAILED: 1, "count": 9}
+    with patch.dict(pj.PARTITIONED_JOBS, {"test_job": AsyncMock()}), \
+            patch.object(pj.database, "get_db", return_value=MagicMock()), \
+            patch.object(pj, "create_shards", new=AsyncMock()), \
+            patch.object(pj, "claim_shard", new=AsyncMock(return_value=None)), \
+            patch.object(pj, "aggregate_job_run", new=AsyncMock(return_value=failed)):
+        with pytest.raises(pj.ShardsFailed):
+            asyncio.run(pj.run_partitioned("test_job", 4, job_run_id="run1", owner_id="me"))
+
+
+def test_retried_shard_skips_checkpointed_clients():
+    db, coll = _db()
+    clients = [{"client_id": f"client-{i}"} for i in range(40)]
+    mine = Shard(2, 4).filter_clients(clients)
+    handled = []
+    fail_on = {mine[2]["client_id"]}
+
+    async def fn(shard):
+        async for client in pj.checkpointed(shard.filter_clients(clients), shard):
+            if client["client_id"] in fail_on:
+                raise RuntimeError("smtp down")
+            handled.append(client["client_id"])
+        return len(handled)
+
+    with patch.dict(pj.PARTITIONED_JOBS, {"test_job": fn}), \
+            patch.object(pj.database, "get_db", return_value=db), \
+            patch.object(pj, "aggregate_job_run", new=AsyncMock()):
+        assert asyncio.run(pj.run_claimed_shard(db, _shard_doc(), "me")) is False
+        done = [c.args[1]["$addToSet"]["done_clients"] for c in coll.update_one.call_args_list if "$addToSet" in c.args[1]]
+        # The failing client is not checkpointed, so only it and later clients run again
+        assert done == [mine[0]["client_id"], mine[1]["client_id"]]
+        handled.clear()
+        fail_on.clear()
+        assert asyncio.run(pj.run_claimed_shard(db, {**_shard_doc(attempts=2), "done_clients": done}, "me")) is True
+    assert handled == [c["client_id"] for c in mine[2:]]
+
+
+def test_lease_heartbeat_survives_a_failed_renewal():
+    db, coll = _db()
+    coll.update_one = AsyncMock(side_effect=[RuntimeError("primary stepped down"), MagicMock(), MagicMock()])
+
+    async def scenario():
+        with patch.object(pj, "SHARD_LEASE_SECONDS", 0.003):
+            task = asyncio.create_task(pj._renew_lease(db, "run1:2", "me"))
+            while coll.update_one.await_count < 3:
+                await asyncio.sleep(0.001)
+            task.cancel()
+
+    asyncio.run(scenario())
+    assert coll.update_one.await_count == 3
@@ -54,3 +54,21 @@ def test_footer_disclaimer_constant():
     """Footer disclaimer is the short legal line."""
     assert "legal advice" in PDF_FOOTER_DISCLAIMER.lower()
     assert "This report does not constitute" in PDF_FOOTER_DISCLAIMER
+
+
+def test_cover_prints_date_only_for_day_keyed_cache():
+    """Cached reports are reused for the whole UTC day, so the cover must not print the time of day."""
+    from unittest.mock import patch
+    from services import pdf_report_builder
+
+    texts = []
+    real_paragraph = pdf_report_builder.Paragraph
+
+    def _capture(text, *args, **kwargs):
+        texts.append(text)
+        return real_paragraph(text, *args, **kwargs)
+
+    with patch.object(pdf_report_builder, "Paragraph", side_effect=_capture):
+        build_portfolio_report("client-1", _minimal_report_data(now_iso="2025-02-20T12:34:00+00:00"))
+    cover = next(t for t in texts if "Generated:" in t)
+    assert "Generated: 20 February 2025" in cover and "12:34" not in cover
@@ -0,0 +1,106 @@
+"""
+Tests for the cached postcode service (TTL/LRU cache, request coalescing, prefix index)
+and the intake council index.
+"""
+import asyncio
+
+
+def _item(postcode, district="Westminster"):
+    return {"postcode": postcode, "admin_district": district, "region": "London", "country": "England"}
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    from utils.ttl_cache import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now most recently used
+    cache.set("c", 3)
+    assert "b" not in cache and cache.get("a") == 1 and cache.get("c") == 3
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+def test_concurrent_lookups_share_one_upstream_call():
+    from services.postcode_service import PostcodeService, StaticPostcodeUpstream
+
+    upstream = StaticPostcodeUpstream([_item("SW1A 1AA")])
+    original = upstream.lookup
+
+    async def slow_lookup(postcode):
+        await asyncio.sleep(0.01)
+        return await original(postcode)
+
+    upstream.lookup = slow_lookup
+    service = PostcodeService(upstream)
+
+    async def _run():
+        return await asyncio.gather(*(service.lookup("sw1a 1aa") for _ in range(20)))
+
+    results = asyncio.run(_run())
+    assert all(r["postcode"] == "SW1A 1AA" for r in results)
+    assert upstream.lookup_calls == 1
+    # Served from cache afterwards
+    asyncio.run(service.lookup("SW1A1AA"))
+    assert upstream.lookup_calls == 1
+
+
+def test_not_found_is_cached_and_errors_are_not():
+    from services.postcode_service import PostcodeService, StaticPostcodeUpstream, PostcodeUpstreamError
+
+    upstream = StaticPostcodeUpstream([])
+    service = PostcodeService(upstream)
+    assert asyncio.run(service.lookup("ZZ99 9ZZ")) is None
+    assert asyncio.run(service.lookup("ZZ99 9ZZ")) is None
+    assert upstream.lookup_calls == 1
+
+    calls = []
+
+    async def failing(postcode):
+        calls.append(postcode)
+        raise PostcodeUpstreamError("down")
+
+    upstream.lookup = failing
+    for _ in range(2):
+        try:
+            asyncio.run(service.lookup("E1 6AN"))
+        except PostcodeUpstreamError:
+            pass
+    assert len(calls) == 2
+
+
+def test_autocomplete_refines_from_shorter_cached_query():
+    from services.postcode_service import PostcodeService, StaticPostcodeUpstream
+
+    upstream = StaticPostcodeUpstream([_item("SW1A 1AA"), _item("SW1A 2AA"), _item("SW1P 3BU")])
+    service = PostcodeService(upstream)
+
+    first = asyncio.run(service.autocomplete("sw1"))
+    assert [i["postcode"] for i in first] == ["SW1A 1AA", "SW1A 2AA", "SW1P 3BU"]
+    narrowed = asyncio.run(service.autocomplete("SW1A 2"))
+    assert [i["postcode"] for i in narrowed] == ["SW1A 2AA"]
+    assert upstream.autocomplete_calls == 1
+    assert asyncio.run(service.autocomplete("s")) == []
+
+
+def test_council_index_matches_linear_scan():
+    from routes.intake import _load_councils
+    from services.council_index import CouncilIndex
+
+    councils = _load_councils()
+    index = CouncilIndex(councils)
+    for q, nation in [("ham", None), ("BOROUGH", None), ("on", "england"), (None, "Wales"), ("zzz", None)]:
+        expected = [
+            c for c in councils
+            if (not q or q.lower() in c["name"].lower())
+            and (not nation or c.get("nation", "").lower() == nation.lower())
+        ]
+        assert index.search(q=q, nation=nation) == expected
+
+    for district in ["Camden", "camden", "Bristol, City of", "Westminster", "Nowhere"]:
+        lower = district.lower()
+        exact = next((c for c in councils if c["name"].lower() == lower), None)
+        partial = next((c for c in councils if lower in c["name"].lower() or c["name"].lower() in lower), None)
+        assert (index.find_exact(district) or index.find_partial(district)) == (exact or partial)
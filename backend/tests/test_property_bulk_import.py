@@ -0,0 +1,160 @@
+"""
+Bulk property import (services.property_bulk_import): streamed CSV / NDJSON / JSON parsing,
+first-pass validation, chunked batch writes with one recalc enqueue per chunk, job progress.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import BulkWriteError
+
+from services import property_bulk_import as bulk
+from services.compliance_recalc_queue import enqueue_compliance_recalcs
+from services.provisioning import plan_requirements
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def _rows(content_type, *chunks):
+    return asyncio.run(bulk.read_rows(_stream(*chunks), content_type))
+
+
+def test_csv_is_parsed_across_chunk_boundaries():
+    body = (
+        "﻿address_line_1,address_line_2,city,postcode,property_type,number_of_units\r\n"
+        '"1 Quay St, Flat ""A""",,Bristol,BS1 1AA,hmo,4\r\n'
+        '"2 Mill\nLane",Unit 2,Leeds,LS1 1AA,,\r\n'
+        "\r\n"
+        "3 Café Row,,York,YO1 1AA,residential,1"
+    ).encode("utf-8")
+    # Split inside the BOM, a quoted newline and the two-byte e-acute
+    cut = [2, 120, body.index("é".encode()) + 1]
+    chunks = [body[i:j] for i, j in zip([0] + cut, cut + [len(body)])]
+    rows = _rows("text/csv; charset=utf-8", *chunks)
+    assert [r["address_line_1"] for r in rows] == ['1 Quay St, Flat "A"', "2 Mill\nLane", "3 Café Row"]
+    assert rows[0]["number_of_units"] == "4" and rows[1]["address_line_2"] == "Unit 2"
+
+
+def test_ndjson_and_json_bodies():
+    rows = _rows("application/x-ndjson", b'{"address_line_1": "1 A St"}\n{bad\n', b'{"city": "Leeds"}')
+    assert rows == [{"address_line_1": "1 A St"}, {"_parse_error": "Invalid JSON line"}, {"city": "Leeds"}]
+    assert _rows("application/json", b'{"properties": [{"city": "Leeds"}]}') == [{"city": "Leeds"}]
+    with patch.object(bulk, "BULK_IMPORT_MAX_ROWS", 1):
+        try:
+            _rows("application/json", b"[{}, {}]")
+            assert False, "expected BulkImportError"
+        except bulk.BulkImportError as e:
+            assert "Too many rows" in str(e)
+
+
+def test_validation_pass_reports_each_bad_row():
+    rows = [
+        {"address_line_1": "1 A St", "city": "Leeds", "postcode": "LS1 1AA", "number_of_units": "2", "address_line_2": ""},
+        {"address_line_1": "1 A St", "city": "Leeds", "postcode": "LS1 1AA"},
+        {"address_line_1": "2 B St", "city": " ", "postcode": "LS1 1AB"},
+        {"address_line_1": "3 C St", "city": "Leeds", "postcode": "LS1 1AC", "number_of_units": "two"},
+        {"address_line_1": "4 D St", "city": "Leeds", "postcode": "LS1 1AD"},
+        "not a row",
+    ]
+    items, errors = bulk.validate_rows(rows, existing_keys={("4 D St", "LS1 1AD")})
+    assert [(row, item.number_of_units, item.address_line_2) for row, item in items] == [(1, 2, None)]
+    assert [e["row"] for e in errors] == [2, 3, 4, 5, 6]
+    assert errors[0]["error"] == "Property already exists" and errors[1]["error"] == bulk.MISSING_FIELDS_ERROR
+    assert errors[2]["error"].startswith("number_of_units") and errors[3]["error"] == "Property already exists"
+
+
+def test_run_import_writes_in_chunks_and_records_progress():
+    items, _ = bulk.validate_rows(
+        [{"address_line_1": f"{i} High St", "city": "Leeds", "postcode": "LS1 1AA"} for i in range(5)], set()
+    )
+    jobs = MagicMock()
+    jobs.update_one = AsyncMock()
+    jobs.find_one_and_update = AsyncMock(return_value={"total": 5, "successful": 4, "failed": 1})
+    db = MagicMock()
+    db.__getitem__.return_value = jobs
+    db.requirement_rules.find.return_value.to_list = AsyncMock(return_value=[])
+    # Second chunk: the third property fails (e.g. a racing import)
+    db.properties.insert_many = AsyncMock(side_effect=[
+        None, BulkWriteError({"writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000"}], "nInserted": 1}), None,
+    ])
+    db.requirements.insert_many = AsyncMock()
+    enqueue, audit_many = AsyncMock(return_value=2), AsyncMock(return_value=2)
+    user = {"portal_user_id": "u1", "role": "ROLE_CLIENT_ADMIN"}
+
+    with patch.object(bulk, "BULK_IMPORT_CHUNK_SIZE", 2), patch.object(bulk.database, "get_db", return_value=db), \
+            patch("services.compliance_recalc_queue.enqueue_compliance_recalcs", enqueue), \
+            patch("utils.audit.create_audit_logs", audit_many), \
+            patch("utils.audit.create_audit_log", AsyncMock()), \
+            patch("services.client_search_index.reindex_client", AsyncMock()) as reindex:
+        asyncio.run(bulk.run_import("job-1", "c1", user, items))
+
+    assert db.properties.insert_many.await_count == 3  # chunks of 2, 2, 1
+    assert db.requirements.insert_many.await_count == 3
+    db.requirement_rules.find.assert_called_once()
+    reindex.assert_awaited_once_with("c1")
+    # The failed property gets no requirements, audit entry or recalc
+    second_chunk = [p["property_id"] for p in db.properties.insert_many.await_args_list[1].args[0]]
+    recalcs = enqueue.await_args_list[1].args[0]
+    assert [r["property_id"] for r in recalcs] == second_chunk[1:]
+    assert recalcs[0]["correlation_id"] == f"PROPERTY_CREATED:{second_chunk[1]}"
+    assert all(r["property_id"] != second_chunk[0] for r in db.requirements.insert_many.await_args_list[1].args[0])
+    assert db.properties.insert_many.await_args_list[0].args[0][0]["compliance_status"] == "AMBER"
+
+    progress = [c.args[1] for c in jobs.update_one.await_args_list if "$inc" in c.args[1]]
+    assert [p["$inc"] for p in progress] == [
+        {"processed": 2, "successful": 2, "failed": 0},
+        {"processed": 2, "successful": 1, "failed": 1},
+        {"processed": 1, "successful": 1, "failed": 0},
+    ]
+    assert progress[1]["$push"]["errors"]["$each"] == [{"row": 3, "error": "E11000"}]
+
+
+def test_bulk_recalc_enqueue_skips_duplicates():
+    db = MagicMock()
+    db.compliance_recalc_queue.insert_many = AsyncMock(side_effect=BulkWriteError(
+        {"writeErrors": [{"index": 1, "code": 11000}], "nInserted": 1}
+    ))
+    db.properties.update_many = AsyncMock()
+    items = [{"property_id": "p1", "client_id": "c1"}, {"property_id": "p2", "client_id": "c1"}]
+    with patch("services.compliance_recalc_queue.database.get_db", return_value=db):
+        assert asyncio.run(enqueue_compliance_recalcs(items, "PROPERTY_CREATED", "CLIENT")) == 1
+    docs = db.compliance_recalc_queue.insert_many.await_args.args[0]
+    assert docs[0]["correlation_id"] == "PROPERTY_CREATED:p1" and docs[0]["status"] == "PENDING"
+    assert db.properties.update_many.await_args.args[0] == {"property_id": {"$in": ["p1"]}}
+
+
+def test_plan_requirements_follows_property_attributes():
+    base = {"property_id": "p1", "property_type": "residential"}
+    no_gas = plan_requirements({**base, "has_gas_supply": False}, [])
+    hmo = plan_requirements({**base, "is_hmo": True, "local_authority": "london"}, [])
+    assert "gas_safety" not in {s["requirement_type"] for s in no_gas}
+    assert {"selective_license"} <= {s["requirement_type"] for s in hmo} and len(hmo) > len(no_gas)
+    rules = [{"rule_type": "epc", "name": "EPC", "frequency_days": 3650, "applicable_to": "ALL", "warning_days": 60},
+             {"rule_type": "hmo_licence", "name": "HMO", "frequency_days": 1825, "applicable_to": "HMO"}]
+    assert plan_requirements(base, rules) == [
+        {"requirement_type": "epc", "description": "EPC", "frequency_days": 3650, "warning_days": 60}
+    ]
+
+
+def test_job_without_progress_past_the_stale_window_reads_as_failed():
+    now = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+    jobs = MagicMock()
+    jobs.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+    db = MagicMock()
+    db.__getitem__.return_value = jobs
+    fresh = {"job_id": "j1", "status": "RUNNING", "updated_at": (now - timedelta(seconds=30)).isoformat()}
+    assert asyncio.run(bulk.fail_if_stale(db, fresh, now=now)) is fresh
+    done = {"job_id": "j1", "status": "COMPLETED", "updated_at": (now - timedelta(days=1)).isoformat()}
+    assert asyncio.run(bulk.fail_if_stale(db, done, now=now)) is done
+    jobs.update_one.assert_not_awaited()
+
+    stale = {"job_id": "j1", "status": "RUNNING", "updated_at": (now - timedelta(hours=1)).isoformat()}
+    job = asyncio.run(bulk.fail_if_stale(db, stale, now=now))
+    assert job["status"] == "FAILED" and "stopped making progress" in job["last_error"]
+    # Only the progress that was read is overwritten: a job that just moved on is left alone
+    assert jobs.update_one.await_args.args[0] == {"job_id": "j1", "status": "RUNNING", "updated_at": stale["updated_at"]}
+    jobs.update_one = AsyncMock(return_value=MagicMock(modified_count=0))
+    assert asyncio.run(bulk.fail_if_stale(db, stale, now=now))["status"] == "RUNNING"
@@ -0,0 +1,103 @@
+"""
+Mongo command profiler (services.query_profiler): listener attribution to the active profile,
+query shapes without values, N+1 / slow / COLLSCAN flags, sampling off by default.
+"""
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.query_profiler import (
+    FLAG_COLLSCAN,
+    FLAG_N_PLUS_ONE,
+    FLAG_SLOW,
+    QueryProfiler,
+    current_correlation_id,
+    plan_stages,
+    query_shape,
+)
+
+
+def _profiler(sample_rate="1", slow_ms="100"):
+    with patch.dict(os.environ, {"QUERY_PROFILER_SAMPLE_RATE": sample_rate, "QUERY_PROFILER_SLOW_MS": slow_ms,
+                                 "QUERY_PROFILER_N_PLUS_ONE": "5"}):
+        return QueryProfiler()
+
+
+def _run_command(profiler, request_id, name, command, duration_ms, reply):
+    listener = profiler.listener
+    listener.started(SimpleNamespace(command_name=name, command=command, connection_id=("h", 1), request_id=request_id))
+    listener.succeeded(SimpleNamespace(command_name=name, connection_id=("h", 1), request_id=request_id,
+                                       duration_micros=int(duration_ms * 1000), reply=reply))
+
+
+def test_query_shape_strips_values():
+    shape = query_shape({"client_id": "c-1", "status": {"$in": ["A", "B"]},
+                         "$or": [{"a": 1}, {"b": {"$gt": 2}}]})
+    assert shape == {"client_id": "?", "status": {"$in": "?"}, "$or": [{"a": "?"}, {"b": {"$gt": "?"}}]}
+
+
+def test_listener_attributes_commands_and_flags_n_plus_one():
+    profiler = _profiler()
+    with profiler.scope("request", "corr-1", "GET /api/client/dashboard") as profile:
+        for i in range(6):
+            # find_one per property in a loop: same shape, different values
+            _run_command(profiler, i, "find", {"find": "properties", "filter": {"property_id": f"p{i}"}, "limit": 1},
+                         2.0, {"cursor": {"firstBatch": [{}]}})
+        _run_command(profiler, 99, "aggregate", {"aggregate": "requirements", "pipeline": [{"$match": {"client_id": "c"}}]},
+                     5.0, {"cursor": {"firstBatch": [{}, {}]}})
+    # Commands outside the scope are not attributed
+    _run_command(profiler, 100, "find", {"find": "clients", "filter": {}}, 1.0, {"cursor": {"firstBatch": []}})
+
+    assert profile.command_count == 7
+    candidates = profiler.analyze(profile)
+    assert FLAG_N_PLUS_ONE in profile.flags and FLAG_SLOW not in profile.flags
+    assert [c["collection"] for c in candidates] == ["properties"]
+    doc = profile.as_dict()
+    top = next(s for s in doc["shapes"] if s["collection"] == "properties")
+    assert top["count"] == 6 and top["docs"] == 6
+    assert "p0" not in str(doc)  # filter values never leave the process
+
+
+def test_slow_command_logged_with_correlation_id_even_unsampled():
+    profiler = _profiler(slow_ms="50")
+    token = current_correlation_id.set("corr-slow")
+    try:
+        _run_command(profiler, 1, "find", {"find": "documents", "filter": {"client_id": "c"}}, 80.0,
+                     {"cursor": {"firstBatch": []}})
+    finally:
+        current_correlation_id.reset(token)
+    assert profiler.slow_commands[-1]["correlation_id"] == "corr-slow"
+    assert profiler.slow_commands[-1]["profile_key"] is None
+
+
+def test_finish_explains_slow_shape_and_flags_collscan():
+    profiler = _profiler(slow_ms="50")
+    db = MagicMock()
+    db.command = AsyncMock(return_value={"queryPlanner": {"winningPlan": {"stage": "LIMIT", "inputStage": {"stage": "COLLSCAN"}}}})
+    db.__getitem__.return_value.insert_one = AsyncMock()
+    with profiler.scope("job", "run-1", "daily_reminders") as profile:
+        _run_command(profiler, 1, "find", {"find": "requirements", "filter": {"due_date": {"$lte": "x"}}}, 120.0,
+                     {"cursor": {"firstBatch": []}})
+    doc = asyncio.run(profiler.finish(profile, db=db))
+    assert set(doc["flags"]) == {FLAG_SLOW, FLAG_COLLSCAN}
+    explain = db.command.await_args.args[0]
+    assert explain["explain"] == {"find": "requirements", "filter": {"due_date": {"$lte": "x"}}}
+    db.__getitem__.return_value.insert_one.assert_awaited_once()
+    # Plan cached per shape: a second slow profile does not explain again
+    with profiler.scope("job", "run-2", "daily_reminders") as profile2:
+        _run_command(profiler, 2, "find", {"find": "requirements", "filter": {"due_date": {"$lte": "y"}}}, 120.0,
+                     {"cursor": {"firstBatch": []}})
+    asyncio.run(profiler.finish(profile2, db=db))
+    assert db.command.await_count == 1
+    assert plan_stages({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}) == ["FETCH", "IXSCAN"]
+
+
+def test_profiler_off_by_default():
+    profiler = _profiler(sample_rate="0")
+    with patch.dict(os.environ, {"METRICS_ENABLED": "false"}):
+        assert profiler.client_listeners() == []
+    # Still registered for Mongo latency metrics unless those are off too
+    assert profiler.client_listeners() == [profiler.listener]
+    with profiler.scope("request", "corr", "GET /", sampled=profiler.should_sample()) as profile:
+        assert profile is None
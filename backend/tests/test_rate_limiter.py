@@ -0,0 +1,75 @@
+"""
+Rate limiter (utils.rate_limiter): sliding-window counter semantics, LRU-bounded memory store,
+shared MongoDB counters and fallback to process-local limits.
+"""
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from utils.rate_limiter import MemoryRateLimitStore, MongoRateLimitStore, RateLimiter, retry_after_seconds
+
+
+def test_memory_store_limits_and_decays_across_windows():
+    store = MemoryRateLimitStore(max_keys=10)
+    # 3 per 60s window, all in the first window
+    assert [store.hit("k", 3, 60, now=1200.0)[0] for _ in range(4)] == [True, True, True, False]
+    allowed, retry_after = store.hit("k", 3, 60, now=1210.0)
+    # Rest of this window (50s), then 20s until the previous 3 decay to 2
+    assert not allowed and retry_after == 70
+    # 30s into the next window the previous 3 weigh 1.5: one more fits, a second does not
+    assert store.hit("k", 3, 60, now=1290.0) == (True, None)
+    allowed, _ = store.hit("k", 3, 60, now=1290.0)
+    assert not allowed
+    # Two windows later nothing is carried over
+    assert store.hit("k", 3, 60, now=1400.0) == (True, None)
+
+
+def test_memory_store_evicts_least_recently_used_keys():
+    store = MemoryRateLimitStore(max_keys=2)
+    store.hit("a", 5, 60, now=0.0)
+    store.hit("b", 5, 60, now=0.0)
+    store.hit("a", 5, 60, now=1.0)
+    store.hit("c", 5, 60, now=2.0)
+    assert len(store) == 2
+    assert set(store._entries) == {"a", "c"}
+
+
+def test_retry_after_when_current_window_is_full():
+    # 10 hits in the current window with limit 10: next window at 60s, then previous weight 10 must decay below 9
+    assert retry_after_seconds(0, 10, elapsed=20, window=60, limit=10) == 40 + 6
+
+
+def test_mongo_store_increments_shared_counter_and_refunds_denied():
+    collection = MagicMock()
+    collection.find_one = AsyncMock(return_value={"count": 4})
+    collection.find_one_and_update = AsyncMock(return_value={"count": 3})
+    collection.update_one = AsyncMock()
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    store = MongoRateLimitStore(db)
+
+    # 4 in the previous window at 45/60s weigh 1; 1 + 3 <= 5 allowed
+    assert asyncio.run(store.hit("ip", 5, 60, now=6045.0)) == (True, None)
+    flt, update = collection.find_one_and_update.await_args.args
+    assert flt == {"_id": "ip|6000"}
+    assert update["$inc"] == {"count": 1} and "expires_at" in update["$setOnInsert"]
+    assert collection.find_one.await_args.args[0] == {"_id": "ip|5940"}
+    collection.update_one.assert_not_awaited()
+
+    collection.find_one_and_update = AsyncMock(return_value={"count": 5})
+    allowed, retry_after = asyncio.run(store.hit("ip", 5, 60, now=6045.0))
+    assert not allowed and retry_after >= 1
+    collection.update_one.assert_awaited_once_with({"_id": "ip|6000"}, {"$inc": {"count": -1}})
+
+
+def test_rate_limiter_falls_back_to_memory_when_mongo_fails():
+    db = MagicMock()
+    db.__getitem__.return_value.find_one = AsyncMock(side_effect=RuntimeError("no primary"))
+    db.__getitem__.return_value.find_one_and_update = AsyncMock(side_effect=RuntimeError("no primary"))
+    limiter = RateLimiter(memory=MemoryRateLimitStore(max_keys=100))
+    with patch("utils.rate_limiter.database") as database, patch.dict(os.environ, {"RATE_LIMIT_BACKEND": "auto"}):
+        database.get_db.return_value = db
+        results = [asyncio.run(limiter.check_rate_limit("reset:a@b.com", 2, 10)) for _ in range(3)]
+    assert results[0] == (True, None) and results[1] == (True, None)
+    assert results[2][0] is False and results[2][1].startswith("Rate limit exceeded. Try again in ")
+    assert len(limiter.memory) == 1
@@ -0,0 +1,118 @@
+"""
+Requirement expiry transition index: next_transition_at matches get_computed_status boundaries,
+the daily pass reads only due transitions, updates status once and enqueues recalc per property.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from utils.expiry_utils import (
+    EXPIRING_SOON_DAYS,
+    get_computed_status,
+    get_next_transition_at,
+    get_transition_fields,
+)
+
+NOW = datetime(2026, 10, 18, 9, 30, tzinfo=timezone.utc)
+
+
+def _cursor(rows):
+    async def _iter():
+        for row in rows:
+            yield row
+
+    cursor = MagicMock()
+    cursor.__aiter__ = lambda self: _iter()
+    return cursor
+
+
+def test_next_transition_is_exact_status_boundary():
+    for days in (400, 45, EXPIRING_SOON_DAYS + 1, EXPIRING_SOON_DAYS, 3, 0):
+        req = {"due_date": (NOW + timedelta(days=days, hours=5)).isoformat()}
+        at = get_next_transition_at(req, NOW)
+        assert at is not None and at > NOW - timedelta(seconds=1)
+        before = get_computed_status(req, at - timedelta(seconds=1))
+        after = get_computed_status(req, at + timedelta(seconds=1))
+        assert before != after
+        assert get_computed_status(req, NOW) == before
+
+
+def test_terminal_statuses_have_no_transition():
+    overdue = {"due_date": (NOW - timedelta(days=2)).isoformat()}
+    not_required = {"applicability": "NOT_REQUIRED", "due_date": (NOW + timedelta(days=90)).isoformat()}
+    assert get_next_transition_at(overdue, NOW) is None
+    assert get_next_transition_at({}, NOW) is None
+    assert get_transition_fields(not_required, NOW) == {"effective_expiry_at": None, "next_transition_at": None}
+    fields = get_transition_fields({"confirmed_expiry_date": "2026-12-01", "due_date": "2027-06-01"}, NOW)
+    assert fields["effective_expiry_at"].startswith("2026-12-01T00:00:00")
+    assert fields["next_transition_at"] < fields["effective_expiry_at"]
+
+
+def test_process_due_transitions_updates_status_and_enqueues_once_per_property():
+    from services.requirement_transitions import process_due_transitions
+
+    rows = [
+        # crossed into EXPIRING_SOON
+        {"requirement_id": "r1", "property_id": "p1", "client_id": "c1", "status": "COMPLIANT",
+         "due_date": (NOW + timedelta(days=20)).isoformat()},
+        # crossed into OVERDUE
+        {"requirement_id": "r2", "property_id": "p1", "client_id": "c1", "status": "EXPIRING_SOON",
+         "due_date": (NOW - timedelta(hours=3)).isoformat()},
+        # already marked by a writer: status untouched, fields still advanced
+        {"requirement_id": "r3", "property_id": "p2", "client_id": "c2", "status": "OVERDUE",
+         "due_date": (NOW - timedelta(days=1)).isoformat()},
+    ]
+    db = MagicMock()
+    db.requirements.find = MagicMock(return_value=_cursor(rows))
+    db.requirements.bulk_write = AsyncMock()
+
+    with patch("services.compliance_recalc_queue.enqueue_compliance_recalc", new_callable=AsyncMock, return_value=True) as enqueue:
+        result = asyncio.run(process_due_transitions(db, correlation_prefix="EXPIRY_JOB", as_of=NOW))
+
+    query = db.requirements.find.call_args[0][0]
+    assert query == {"next_transition_at": {"$lte": NOW.isoformat()}}
+    ops = db.requirements.bulk_write.await_args[0][0]
+    updates = {op._filter["requirement_id"]: op._doc["$set"] for op in ops}
+    assert updates["r1"]["status"] == "EXPIRING_SOON"
+    assert updates["r1"]["next_transition_at"] > NOW.isoformat()
+    assert updates["r2"]["status"] == "OVERDUE"
+    assert updates["r2"]["next_transition_at"] is None
+    assert "status" not in updates["r3"]
+    assert result["status_changes"] == 2
+    assert enqueue.await_count == 2
+    correlation_ids = {c.kwargs["correlation_id"] for c in enqueue.await_args_list}
+    assert correlation_ids == {"EXPIRY_JOB:p1:2026-10-18", "EXPIRY_JOB:p2:2026-10-18"}
+
+
+def test_daily_reminders_query_by_expiry_window():
+    with patch.dict("os.environ", {"MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "test"}):
+        from services.jobs import JobScheduler
+        scheduler = JobScheduler()
+    scheduler.db = MagicMock()
+    scheduler.db.clients.find = MagicMock(return_value=MagicMock(to_list=AsyncMock(return_value=[
+        {"client_id": "c1", "email": "c1@test.com"},
+    ])))
+    scheduler.db.notification_preferences.find_one = AsyncMock(return_value={"reminder_days_before": 45})
+    scheduler.db.properties.find = MagicMock(return_value=_cursor([]))
+    scheduler._send_reminder_email = AsyncMock()
+    scheduler._resolve_reminder_recipients = AsyncMock(return_value=["c1@test.com"])
+
+    transitions = AsyncMock(return_value={"processed": 0})
+    due = (datetime.now(timezone.utc) + timedelta(days=10)).isoformat()
+    client_requirements = MagicMock(to_list=AsyncMock(return_value=[
+        {"requirement_id": "r1", "property_id": "p1", "due_date": due, "description": "Gas"},
+    ]))
+    scheduler.db.requirements.find = MagicMock(return_value=client_requirements)
+    scheduler.db.requirements.update_one = AsyncMock()
+
+    with patch("services.requirement_transitions.process_due_transitions", transitions), \
+         patch("services.plan_registry.plan_registry", MagicMock(enforce_feature=AsyncMock(return_value=(False, None, None)))):
+        count = asyncio.run(scheduler.send_daily_reminders())
+
+    transitions.assert_awaited_once()
+    query = scheduler.db.requirements.find.call_args[0][0]
+    assert query["client_id"] == "c1"
+    assert {"effective_expiry_at": {"$exists": False}} in query["$or"]
+    scheduler.db.requirements.update_one.assert_not_called()
+    scheduler._send_reminder_email.assert_awaited_once()
+    assert count == 1
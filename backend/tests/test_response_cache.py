@@ -0,0 +1,107 @@
+"""
+Public response cache (utils.response_cache): strong ETags with If-None-Match / 304, invalidation
+by namespace version bumps shared through MongoDB, and routes that raise or redirect.
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from fastapi.testclient import TestClient
+
+from utils import response_cache as rc
+from utils.response_cache import ResponseCache, etag_matches, cached_response
+
+
+def _app(cache, calls):
+    app = FastAPI()
+
+    @app.get("/services")
+    @cached_response("catalogue")
+    async def services(category: str = "all"):
+        calls.append(category)
+        if category == "missing":
+            raise HTTPException(status_code=404, detail="Category not found")
+        if category == "moved":
+            return RedirectResponse("/services")
+        return {"category": category, "services": [{"code": "FRA", "price": 150}]}
+
+    @app.get("/page")
+    @cached_response("cms")
+    async def page(request: Request):
+        calls.append(request.url.path)
+        return {"page": "home"}
+
+    return app
+
+
+def test_etag_and_if_none_match_return_304():
+    cache, calls = ResponseCache(max_entries=10, ttl_seconds=60, version_check_seconds=60), []
+    with patch.object(rc, "response_cache", cache), patch.object(rc.database, "get_db", return_value=None):
+        client = TestClient(_app(cache, calls))
+        first = client.get("/services", params={"category": "hmo"})
+        etag = first.headers["etag"]
+        assert first.json() == {"category": "hmo", "services": [{"code": "FRA", "price": 150}]}
+        assert first.headers["cache-control"] == "public, no-cache"
+
+        again = client.get("/services", params={"category": "hmo"}, headers={"If-None-Match": f'"stale", W/{etag}'})
+        assert again.status_code == 304 and again.headers["etag"] == etag and again.content == b""
+        assert client.get("/services", params={"category": "hmo"}).content == first.content
+        assert client.get("/page").json() == {"page": "home"}
+        client.get("/page")
+    # One build per distinct path + query
+    assert calls == ["hmo", "/page"]
+
+
+def test_errors_and_redirects_are_not_cached():
+    cache, calls = ResponseCache(max_entries=10, ttl_seconds=60, version_check_seconds=60), []
+    with patch.object(rc, "response_cache", cache), patch.object(rc.database, "get_db", return_value=None):
+        client = TestClient(_app(cache, calls))
+        assert client.get("/services", params={"category": "missing"}).status_code == 404
+        assert client.get("/services", params={"category": "missing"}).status_code == 404
+        moved = client.get("/services", params={"category": "moved"}, follow_redirects=False)
+        assert moved.status_code == 307
+    assert calls == ["missing", "missing", "moved"]
+    assert len(cache.cache) == 0
+
+
+def test_version_bump_invalidates_across_replicas():
+    versions = MagicMock()
+    versions.find_one_and_update = AsyncMock(return_value={"_id": "catalogue", "version": 7})
+    versions.find.return_value.to_list = AsyncMock(return_value=[{"_id": "catalogue", "version": 7}])
+    db = MagicMock()
+    db.__getitem__.return_value = versions
+    writer = ResponseCache(version_check_seconds=60)
+    reader = ResponseCache(version_check_seconds=0)
+
+    async def scenario():
+        with patch.object(rc.database, "get_db", return_value=db):
+            assert await writer.bump("catalogue") == 7
+            assert await reader.versions(("catalogue", "cms")) == (7, 0)
+        # Mongo unreachable: the bump still applies locally
+        with patch.object(rc.database, "get_db", return_value=None):
+            assert await writer.bump("catalogue") == 8
+
+    asyncio.run(scenario())
+    flt, update = versions.find_one_and_update.await_args.args
+    assert flt == {"_id": "catalogue"} and update["$inc"] == {"version": 1}
+
+
+def test_bumped_namespace_rebuilds_response():
+    cache, calls = ResponseCache(max_entries=10, ttl_seconds=60, version_check_seconds=60), []
+    with patch.object(rc, "response_cache", cache), patch.object(rc.database, "get_db", return_value=None):
+        client = TestClient(_app(cache, calls))
+        etag = client.get("/services").headers["etag"]
+        asyncio.run(cache.bump("cms"))
+        assert client.get("/services", headers={"If-None-Match": etag}).status_code == 304
+        asyncio.run(cache.bump("catalogue"))
+        # Rebuilt (same body, so the client's copy is still valid)
+        assert client.get("/services", headers={"If-None-Match": etag}).status_code == 304
+    assert calls == ["all", "all"]
+
+
+def test_etag_matching_rules():
+    assert etag_matches("*", '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
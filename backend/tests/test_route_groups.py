@@ -0,0 +1,58 @@
+"""
+Route groups (route_groups.py) and deferred heavy imports (utils.lazy_import): role presets,
+ROUTE_GROUPS override, include order preserved, disabled groups never imported.
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import route_groups
+from route_groups import ALL_GROUPS, ROUTERS, enabled_route_groups, include_routers, routers_for
+from utils.lazy_import import lazy_import
+
+
+def test_role_presets_and_override():
+    assert enabled_route_groups(role="api", groups_env="") == ALL_GROUPS
+    assert enabled_route_groups(role="worker", groups_env="") == ()
+    assert enabled_route_groups(role="client", groups_env="") == ("auth", "client")
+    # ROUTE_GROUPS wins over the role and is returned in canonical order
+    assert enabled_route_groups(role="worker", groups_env="admin, auth") == ("auth", "admin")
+    assert enabled_route_groups(role="worker", groups_env="all") == ALL_GROUPS
+    with pytest.raises(ValueError):
+        enabled_route_groups(role="worker", groups_env="admn")
+    with pytest.raises(ValueError):
+        enabled_route_groups(role="scheduler", groups_env="")
+
+
+def test_subset_keeps_original_include_order():
+    subset = routers_for(("public", "admin"))
+    positions = [ROUTERS.index(entry) for entry in subset]
+    assert positions == sorted(positions)
+    assert {entry.group for entry in subset} == {"public", "admin"}
+    # Every router is in exactly one known group
+    assert {entry.group for entry in ROUTERS} == set(ALL_GROUPS)
+
+
+def test_include_routers_imports_only_enabled_groups():
+    app = MagicMock()
+    imported = []
+
+    def fake_import(name):
+        imported.append(name)
+        return MagicMock()
+
+    with patch.object(route_groups.importlib, "import_module", side_effect=fake_import):
+        include_routers(app, groups=("clearform",))
+
+    assert imported and all(name.startswith("clearform.routes") for name in imported)
+    assert app.include_router.call_count == len(routers_for(("clearform",)))
+
+
+def test_lazy_import_defers_until_attribute_access():
+    with patch("utils.lazy_import.importlib.import_module") as import_module:
+        import_module.return_value = MagicMock(ClientTimeout="timeout-cls")
+        aiohttp = lazy_import("aiohttp")
+        import_module.assert_not_called()
+        assert aiohttp.ClientTimeout == "timeout-cls"
+        assert aiohttp.ClientTimeout == "timeout-cls"
+    import_module.assert_called_once_with("aiohttp")
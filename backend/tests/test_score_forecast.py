@@ -0,0 +1,168 @@
+"""
+Vectorized score forecast (services.score_forecast): parity with compute_property_score and
+portfolio_score_and_risk over randomized portfolios and date ranges.
+"""
+import asyncio
+import random
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.compliance_scoring import compute_property_score, portfolio_score_and_risk
+from services.score_forecast import (
+    RISK_LEVELS,
+    date_range,
+    encode_portfolio,
+    portfolio_series,
+    score_matrix,
+)
+
+_REQ_TYPES = ["gas_safety", "eicr", "epc", "hmo_licence", "tenancy_agreement", "how_to_rent", "deposit_protection"]
+
+
+def _random_property(rng, idx, today):
+    prop = {
+        "property_id": f"p{idx}",
+        "is_hmo": rng.random() < 0.3,
+        "bedrooms": rng.choice([None, 1, 2, 4, 6]),
+        "occupancy": rng.choice(["single_family", "multi_family", None]),
+        "cert_gas_safety": rng.choice(["YES", "NO", ""]),
+        "licence_required": rng.choice(["YES", "NO", ""]),
+        "tenancy_active": rng.random() < 0.5,
+        "deposit_taken": rng.random() < 0.5,
+    }
+    requirements = []
+    documents = []
+    for n, req_type in enumerate(_REQ_TYPES):
+        if rng.random() < 0.15:
+            continue
+        rid = f"{prop['property_id']}-r{n}"
+        requirements.append({
+            "requirement_id": rid,
+            "requirement_type": req_type,
+            "applicability": rng.choice(["REQUIRED", "REQUIRED", "UNKNOWN", "NOT_REQUIRED", None]),
+        })
+        for m in range(rng.choice([0, 1, 1, 2])):
+            doc = {
+                "document_id": f"{rid}-d{m}",
+                "requirement_id": rid,
+                "status": rng.choice(["VERIFIED", "VERIFIED", "UPLOADED", "DISABLED"]),
+                "uploaded_at": (datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=rng.randint(0, 300))).isoformat(),
+            }
+            if rng.random() < 0.8:
+                doc["expiry_date"] = (today + timedelta(days=rng.randint(-120, 500))).isoformat()
+            documents.append(doc)
+    return prop, requirements, documents
+
+
+def test_score_matrix_matches_compute_property_score():
+    rng = random.Random(20261018)
+    today = date.today()
+    items = [_random_property(rng, i, today) for i in range(150)]
+    dates = date_range(today - timedelta(days=30), 200)
+
+    portfolio = encode_portfolio(items)
+    scores, risk = score_matrix(portfolio, dates)
+
+    assert scores.shape == (150, 200)
+    for i, (prop, requirements, documents) in enumerate(items):
+        for k in range(0, len(dates), 7):
+            as_of = datetime.combine(dates[k], datetime.min.time(), tzinfo=timezone.utc)
+            expected = compute_property_score(prop, requirements, documents, as_of=as_of)
+            assert scores[i, k] == expected["score_0_100"], (prop["property_id"], dates[k])
+            assert RISK_LEVELS[risk[i, k]] == expected["risk_level"], (prop["property_id"], dates[k])
+
+
+def test_score_matrix_tracks_expiry_boundaries():
+    today = date(2026, 10, 18)
+    expiry = today + timedelta(days=61)
+    prop = {"property_id": "p1", "cert_gas_safety": "YES"}
+    requirements = [{"requirement_id": "r1", "requirement_type": "gas_safety", "applicability": "REQUIRED"}]
+    documents = [{"requirement_id": "r1", "status": "VERIFIED", "expiry_date": expiry.isoformat()}]
+    dates = [today, today + timedelta(days=1), expiry, expiry + timedelta(days=1)]
+
+    scores, risk = score_matrix(encode_portfolio([(prop, requirements, documents)]), dates)
+
+    for k, d in enumerate(dates):
+        as_of = datetime.combine(d, datetime.min.time(), tzinfo=timezone.utc)
+        expected = compute_property_score(prop, requirements, documents, as_of=as_of)
+        assert (scores[0, k], RISK_LEVELS[risk[0, k]]) == (expected["score_0_100"], expected["risk_level"])
+    assert scores[0, 0] > scores[0, 1] > scores[0, 3]
+    assert RISK_LEVELS[risk[0, 3]] in ("High risk", "Critical risk")
+
+
+def test_portfolio_series_matches_portfolio_score_and_risk():
+    rng = random.Random(7)
+    today = date.today()
+    items = [_random_property(rng, i, today) for i in range(40)]
+    dates = date_range(today, 120)
+    portfolio = encode_portfolio(items)
+    scores, risk = score_matrix(portfolio, dates)
+
+    p_scores, p_risk = portfolio_series(portfolio.properties, scores, risk)
+
+    for k in range(len(dates)):
+        rows = [
+            {**prop, "score_0_100": int(scores[i, k]), "risk_level": RISK_LEVELS[risk[i, k]]}
+            for i, (prop, _, _) in enumerate(items)
+        ]
+        expected = portfolio_score_and_risk(rows)
+        assert p_scores[k] == expected["portfolio_score"]
+        assert RISK_LEVELS[p_risk[k]] == expected["portfolio_risk_level"]
+
+
+def _cursor(rows):
+    cursor = MagicMock()
+    cursor.to_list = AsyncMock(return_value=rows)
+
+    async def _iter():
+        for row in rows:
+            yield row
+
+    cursor.__aiter__ = lambda self: _iter()
+    return cursor
+
+
+def test_backfill_inserts_only_missing_days():
+    from services.compliance_trending import backfill_property_daily_snapshots
+
+    today = datetime.now(timezone.utc).date()
+    existing_day = (today - timedelta(days=2)).isoformat()
+    prop = {"property_id": "p1", "client_id": "c1", "cert_gas_safety": "YES"}
+    requirement = {"requirement_id": "r1", "property_id": "p1", "requirement_type": "gas_safety", "applicability": "REQUIRED"}
+    document = {"requirement_id": "r1", "property_id": "p1", "status": "VERIFIED",
+                "expiry_date": (today + timedelta(days=200)).isoformat()}
+
+    daily = MagicMock()
+    daily.find = MagicMock(return_value=_cursor([{"property_id": "p1", "date": existing_day}]))
+    daily.bulk_write = AsyncMock(side_effect=lambda ops, ordered: MagicMock(upserted_count=len(ops)))
+    db = MagicMock()
+    db.__getitem__ = MagicMock(return_value=daily)
+    db.properties.find = MagicMock(return_value=_cursor([prop]))
+    db.requirements.find = MagicMock(return_value=_cursor([requirement]))
+    db.documents.find = MagicMock(return_value=_cursor([document]))
+
+    with patch("services.compliance_trending.database.get_db", return_value=db), \
+         patch("services.score_forecast.database.get_db", return_value=db):
+        result = asyncio.run(backfill_property_daily_snapshots("c1", days=7))
+
+    assert result["inserted"] == 6
+    daily.bulk_write.assert_awaited_once()
+    ops = daily.bulk_write.await_args.args[0]
+    written = {op._filter["date"] for op in ops}
+    assert len(written) == 6 and existing_day not in written
+    assert all(op._upsert and "$set" not in op._doc for op in ops)
+    expected = compute_property_score(prop, [requirement], [document])["score_0_100"]
+    assert {op._doc["$setOnInsert"]["score"] for op in ops} == {expected}
+
+    # A property added three days ago gets no rows for the days before it existed
+    created = (today - timedelta(days=3)).isoformat()
+    daily.find = MagicMock(return_value=_cursor([]))
+    daily.bulk_write.reset_mock()
+    db.properties.find = MagicMock(return_value=_cursor([{**prop, "created_at": f"{created}T09:30:00+00:00"}]))
+    db.requirements.find = MagicMock(return_value=_cursor([requirement]))
+    db.documents.find = MagicMock(return_value=_cursor([document]))
+    with patch("services.compliance_trending.database.get_db", return_value=db), \
+         patch("services.score_forecast.database.get_db", return_value=db):
+        result = asyncio.run(backfill_property_daily_snapshots("c1", days=7))
+    written = sorted(op._filter["date"] for op in daily.bulk_write.await_args.args[0])
+    assert result["inserted"] == 3 and written[0] == created
@@ -0,0 +1,178 @@
+"""
+Score history retention (services.score_history_retention): rows past the raw window are rolled up,
+archived and deleted (re-runs skip what a rollup already merged and finish journalled archive
+batches), old daily rollups fold into weeks, and the trend / ledger reads return the same rows
+across the tiers.
+"""
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services import compliance_trending, score_ledger_service
+from services import score_history_retention as shr
+
+
+def _rollups(existing=()):
+    rollups = MagicMock()
+    rollups.find.return_value.to_list = AsyncMock(return_value=list(existing))
+    rollups.bulk_write = AsyncMock()
+    rollups.delete_many = AsyncMock()
+    return rollups
+
+
+def _batches(pending=()):
+    batches = MagicMock()
+    batches.find.return_value.to_list = AsyncMock(return_value=list(pending))
+    batches.insert_one = AsyncMock()
+    batches.update_one = AsyncMock()
+    batches.delete_one = AsyncMock()
+    return batches
+
+
+def _upserts(rollups):
+    return {op._filter["_id"]: op._doc["$set"] for op in rollups.bulk_write.await_args.args[0]}
+
+
+def test_expired_rows_are_rolled_up_archived_and_deleted():
+    rows = [
+        {"_id": "a", "client_id": "c1", "property_id": "p1", "date": "2026-01-05", "score": 70, "source": "nightly"},
+        {"_id": "b", "client_id": "c1", "property_id": "p1", "date": "2026-01-06", "score": 80, "source": "nightly"},
+    ]
+    source = MagicMock()
+    source.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=rows)
+    source.delete_many = AsyncMock()
+    # Day 05 was merged by an interrupted earlier run
+    rollups = _rollups([{"_id": "property_score_daily|day|c1|p1|2026-01-05", "count": 1, "score_sum": 70,
+                         "score_min": 70, "score_max": 70, "through": ["2026-01-05", "a"]}])
+    rollups.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+    batches = _batches()
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: {shr.ROLLUPS_COLLECTION: rollups,
+                                               shr.ARCHIVE_BATCHES_COLLECTION: batches}.get(name, source)
+    write_segment = AsyncMock()
+
+    with patch.object(shr, "write_segment", write_segment):
+        stats = asyncio.run(shr.apply_retention(db, shr.POLICIES["property_score_daily"], "c1", today=date(2026, 3, 1)))
+
+    assert source.find.call_args.args[0] == {"client_id": "c1", "date": {"$lt": "2026-01-25"}}
+    assert stats == {"archived": 2, "rolled_up": 1, "downsampled": 0}
+    upserts = _upserts(rollups)
+    assert list(upserts) == ["property_score_daily|day|c1|p1|2026-01-06"]
+    day = upserts["property_score_daily|day|c1|p1|2026-01-06"]
+    assert day["score_last"] == 80 and day["property_id"] == "p1" and day["fields"] == {"source": "nightly"}
+    metadata = write_segment.await_args.args[4]
+    assert write_segment.await_args.args[3] == rows
+    batch_id = batches.insert_one.await_args.args[0]["_id"]
+    assert batches.insert_one.await_args.args[0]["ids"] == ["a", "b"]
+    assert metadata == {"collection": "property_score_daily", "client_id": "c1", "first_at": "2026-01-05", "last_at": "2026-01-06",
+                        "batch_id": batch_id}
+    assert write_segment.await_args.args[2].endswith(f"_{batch_id}.ndjson.gz")
+    source.delete_many.assert_awaited_once_with({"_id": {"$in": ["a", "b"]}})
+    batches.update_one.assert_awaited_once_with({"_id": batch_id}, {"$set": {"segment_complete": True}})
+    batches.delete_one.assert_awaited_once_with({"_id": batch_id})
+
+
+def test_interrupted_archive_batches_are_finished_before_archiving():
+    source = MagicMock()
+    source.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+    source.delete_many = AsyncMock()
+    batches = _batches([
+        {"_id": "done1", "collection": "score_ledger_events", "client_id": "c1", "ids": ["x", "y"], "segment_complete": True},
+        {"_id": "half1", "collection": "score_ledger_events", "client_id": "c1", "ids": ["z"], "segment_complete": False},
+    ])
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: batches if name == shr.ARCHIVE_BATCHES_COLLECTION else source
+    delete_segments = AsyncMock(return_value=1)
+
+    with patch.object(shr, "delete_segments", delete_segments):
+        asyncio.run(shr.apply_retention(db, shr.POLICIES["score_ledger_events"], "c1", today=date(2026, 9, 1)))
+
+    assert batches.find.call_args.args[0] == {"collection": "score_ledger_events", "client_id": "c1"}
+    # Complete batch: its rows are deleted; incomplete batch: its segment is dropped (rows stay hot)
+    source.delete_many.assert_awaited_once_with({"_id": {"$in": ["x", "y"]}})
+    delete_segments.assert_awaited_once_with(db, shr.ARCHIVE_BUCKET, {"batch_id": "half1"})
+    assert [c.args[0] for c in batches.delete_one.await_args_list] == [{"_id": "done1"}, {"_id": "half1"}]
+
+
+def test_old_daily_rollups_fold_into_weeks():
+    days = [
+        {"_id": f"d{i}", "client_id": "c1", "bucket": d, "count": 1, "score_sum": s, "score_min": s, "score_max": s,
+         "score_last": s, "last_at": d, "last_date": d, "fields": {}, "through": [d, "x"]}
+        for i, (d, s) in enumerate([("2025-01-06", 60), ("2025-01-08", 90), ("2025-01-13", 50)])
+    ]
+    rollups = _rollups()
+    rollups.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(side_effect=[days, []])
+    db = MagicMock()
+    db.__getitem__.return_value = rollups
+
+    folded = asyncio.run(shr._downsample_to_weeks(db, shr.POLICIES["compliance_score_history"], "c1", "2025-02-01"))
+
+    assert folded == 3
+    weeks = _upserts(rollups)
+    first = weeks["compliance_score_history|week|c1|-|2025-01-06"]
+    assert (first["count"], first["score_avg"], first["score_min"], first["score_max"], first["score_last"]) == (2, 75.0, 60, 90, 90)
+    assert first["last_date"] == "2025-01-08" and first["granularity"] == "week"
+    assert weeks["compliance_score_history|week|c1|-|2025-01-13"]["score_last"] == 50
+    rollups.delete_many.assert_awaited_once_with({"_id": {"$in": ["d0", "d1", "d2"]}})
+
+
+def test_property_trend_merges_rolled_up_days():
+    raw = [{"date": "2026-02-20", "score": 80, "created_at": "x"}]
+    rolled = [{"date": "2026-01-10", "score": 60, "client_id": "c1", "property_id": "p1", "rollup": {}}]
+    db = MagicMock()
+    db.__getitem__.return_value.find.return_value.sort.return_value.to_list = AsyncMock(return_value=raw)
+    rollup_rows = AsyncMock(return_value=rolled)
+
+    with patch.object(compliance_trending.database, "get_db", return_value=db), \
+            patch.object(compliance_trending, "rollup_rows", rollup_rows):
+        result = asyncio.run(compliance_trending.get_property_trend_with_summary("c1", "p1", days=90))
+
+    assert [p["date"] for p in result["points"]] == ["2026-01-10", "2026-02-20"]
+    assert rollup_rows.await_args.args[1:] == ("property_score_daily", "c1", rollup_rows.await_args.args[3], "p1")
+
+
+def test_ledger_continues_into_archive():
+    raw = [{"client_id": "c1", "property_id": "p1", "created_at": "2026-09-01T10:00:00+00:00", "after_score": 90}]
+    archived = [
+        {"_id": "x1", "client_id": "c1", "property_id": "p1", "created_at": "2026-01-01T10:00:00+00:00", "after_score": 70},
+        {"_id": "x2", "client_id": "c1", "property_id": "p2", "created_at": "2026-02-01T10:00:00+00:00", "after_score": 75},
+        {"_id": "x3", "client_id": "c1", "property_id": "p1", "created_at": "2026-03-01T10:00:00+00:00", "after_score": 80},
+    ]
+    db = MagicMock()
+    ledger = db.__getitem__.return_value
+    ledger.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=raw)
+    ledger.count_documents = AsyncMock(return_value=1)
+
+    score_ledger_service.count_cache.clear()
+    with patch.object(score_ledger_service.database, "get_db", return_value=db), \
+            patch.object(score_ledger_service, "archived_rows", AsyncMock(side_effect=lambda *a: [dict(r) for r in archived])):
+        page = asyncio.run(score_ledger_service.list_ledger("c1", property_id="p1", limit=2))
+        rest = asyncio.run(score_ledger_service.list_ledger("c1", property_id="p1", limit=2, cursor=page["next_cursor"]))
+
+    assert [i["after_score"] for i in page["items"]] == [90, 80] and page["has_more"] and page["total"] == 3
+    assert "_id" not in page["items"][1]
+    assert [i["after_score"] for i in rest["items"]][-1] == 70
+    assert rest["total"] == 3
+
+
+def test_ledger_full_live_page_uses_cached_archive_count():
+    raw = [{"client_id": "c1", "property_id": "p1", "created_at": f"2026-09-0{d}T10:00:00+00:00", "after_score": 90}
+           for d in (3, 2, 1)]
+    db = MagicMock()
+    ledger = db.__getitem__.return_value
+    ledger.find.return_value.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=raw)
+    ledger.count_documents = AsyncMock(return_value=3)
+    archived_rows = AsyncMock(return_value=[
+        {"_id": "x1", "client_id": "c1", "property_id": "p1", "created_at": "2026-01-01T10:00:00+00:00", "after_score": 70},
+    ])
+    score_ledger_service.count_cache.clear()
+
+    with patch.object(score_ledger_service.database, "get_db", return_value=db), \
+            patch.object(score_ledger_service, "archived_rows", archived_rows):
+        first = asyncio.run(score_ledger_service.list_ledger("c1", property_id="p1", limit=2))
+        again = asyncio.run(score_ledger_service.list_ledger("c1", property_id="p1", limit=2))
+
+    assert first["total"] == again["total"] == 4
+    # Live page was full both times; the archive was read once, for the cached count
+    assert archived_rows.await_count == 1
+    score_ledger_service.count_cache.clear()
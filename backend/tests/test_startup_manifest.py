@@ -0,0 +1,120 @@
+"""
+Startup manifest (services.startup_manifest): unchanged phases are skipped by stored fingerprint,
+changed or failed phases re-run, index builds run concurrently and tolerated errors do not fail a phase.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from services.startup_manifest import BootReport, StartupPhase, run_startup_manifest
+from utils.mongo_indexes import ensure_indexes, fingerprint_indexes, index
+
+
+class _Collection:
+    """create_index records peak concurrency; optional failure per key."""
+
+    def __init__(self, state, fail_keys=()):
+        self.state = state
+        self.fail_keys = fail_keys
+
+    async def create_index(self, keys, **options):
+        self.state["active"] += 1
+        self.state["peak"] = max(self.state["peak"], self.state["active"])
+        await asyncio.sleep(0.01)
+        self.state["active"] -= 1
+        self.state["calls"].append(keys)
+        if keys in self.fail_keys:
+            raise RuntimeError("index conflict")
+
+
+def _db(stored_rows=(), fail_keys=()):
+    state = {"active": 0, "peak": 0, "calls": []}
+    manifest = MagicMock()
+    manifest.find = MagicMock(return_value=MagicMock(to_list=AsyncMock(return_value=list(stored_rows))))
+    manifest.update_one = AsyncMock()
+    collections = {}
+
+    def _getitem(name):
+        if name == "startup_manifest":
+            return manifest
+        return collections.setdefault(name, _Collection(state, fail_keys))
+
+    db = MagicMock()
+    db.__getitem__ = MagicMock(side_effect=_getitem)
+    return db, manifest, state
+
+
+def test_ensure_indexes_runs_concurrently_and_tolerates_flagged_errors():
+    specs = [index("c", f"f{i}") for i in range(10)] + [
+        index("c", "legacy", unique=True, tolerate_errors=True),
+        index("c", "broken"),
+    ]
+    db, _, state = _db(fail_keys=("legacy", "broken"))
+
+    result = asyncio.run(ensure_indexes(db, specs, concurrency=4))
+
+    assert len(state["calls"]) == 12
+    assert 1 < state["peak"] <= 4
+    assert (result["created"], result["tolerated"], result["failed"]) == (10, 1, 1)
+    assert "broken" in result["errors"][0]
+
+
+def test_unchanged_phases_are_skipped_and_changed_ones_rerun():
+    specs_a = [index("a", "x"), index("a", [("y", 1), ("z", -1)], unique=True)]
+    specs_b = [index("b", "x")]
+    seed = AsyncMock()
+    recent = datetime.now(timezone.utc).isoformat()
+    stored = [
+        {"phase": "a_indexes", "fingerprint": fingerprint_indexes(specs_a), "completed_at": recent},
+        {"phase": "b_indexes", "fingerprint": "stale", "completed_at": recent},
+        {"phase": "seed", "fingerprint": "v1", "completed_at": recent},
+    ]
+    phases = [
+        StartupPhase("a_indexes", "indexes", lambda: fingerprint_indexes(specs_a), specs=specs_a),
+        StartupPhase("b_indexes", "indexes", lambda: fingerprint_indexes(specs_b), specs=specs_b),
+        StartupPhase("seed", "seed", lambda: "v1", seed),
+    ]
+    db, manifest, state = _db(stored)
+
+    report = asyncio.run(run_startup_manifest(db, phases, report=BootReport(), force=False))
+
+    statuses = {p["phase"]: p["status"] for p in report["phases"]}
+    assert statuses == {"a_indexes": "skipped", "b_indexes": "ran", "seed": "skipped"}
+    assert state["calls"] == ["x"]
+    seed.assert_not_awaited()
+    recorded = [c.args[1]["$set"] for c in manifest.update_one.await_args_list]
+    assert recorded == [{**recorded[0], "phase": "b_indexes", "fingerprint": fingerprint_indexes(specs_b)}]
+
+    # An expired fingerprint (older than STARTUP_MANIFEST_MAX_AGE_HOURS) re-runs the phase
+    old = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    db, manifest, state = _db([{**row, "completed_at": old} for row in stored])
+    report = asyncio.run(run_startup_manifest(db, phases, report=BootReport(), force=False))
+    assert report["skipped"] == 0 and report["ran"] == 3
+    seed.assert_awaited_once()
+
+
+def test_failed_phase_keeps_old_fingerprint_and_later_seeds_still_run():
+    order = []
+
+    async def failing():
+        order.append("failing")
+        raise RuntimeError("seed exploded")
+
+    async def later():
+        order.append("later")
+
+    phases = [
+        StartupPhase("broken_indexes", "indexes", lambda: "i1", specs=[index("c", "broken")]),
+        StartupPhase("failing", "seed", lambda: "f1", failing),
+        StartupPhase("later", "seed", lambda: "l1", later),
+    ]
+    db, manifest, _ = _db(fail_keys=("broken",))
+
+    report = asyncio.run(run_startup_manifest(db, phases, report=BootReport(), force=True))
+
+    statuses = {p["phase"]: p["status"] for p in report["phases"]}
+    assert statuses == {"broken_indexes": "failed", "failing": "failed", "later": "ran"}
+    assert order == ["failing", "later"]
+    manifest.find.assert_not_called()
+    assert [c.args[0] for c in manifest.update_one.await_args_list] == [{"phase": "later"}]
+    assert report["failed"] == 2
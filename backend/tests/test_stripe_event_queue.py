@@ -0,0 +1,142 @@
+"""
+Async Stripe webhook ingestion (services.stripe_event_queue): fast-ack recording, per-customer
+ordered claims, retry with backoff, dead-lettering and ingest-to-applied lag.
+"""
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import DuplicateKeyError
+
+from services import stripe_event_queue as seq
+from services.stripe_webhook_service import StripeWebhookService
+from utils.metrics import STRIPE_EVENT_OUTCOMES
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _event(event_id, obj):
+    return {"id": event_id, "type": "invoice.paid", "created": 1772366400, "data": {"object": obj}}
+
+
+def test_ordering_key_prefers_customer_then_subscription():
+    assert seq.ordering_key(_event("ev_1", {"customer": "cus_1", "subscription": "sub_1"})) == "customer:cus_1"
+    assert seq.ordering_key(_event("ev_2", {"object": "subscription", "id": "sub_2"})) == "subscription:sub_2"
+    assert seq.ordering_key(_event("ev_3", {"object": "charge"})) == "event:ev_3"
+
+
+def test_async_mode_records_and_acks_without_handling():
+    payload = json.dumps(_event("ev_1", {"customer": "cus_1"})).encode()
+    db = MagicMock()
+    db.stripe_events.insert_one = AsyncMock()
+    svc = StripeWebhookService()
+    with patch.dict(os.environ, {"STRIPE_WEBHOOK_MODE": "async", "STRIPE_WEBHOOK_SECRET": "whsec_x"}), \
+            patch("services.stripe_webhook_service.stripe.Webhook.construct_event", return_value=json.loads(payload)), \
+            patch.object(seq.database, "get_db", return_value=db), \
+            patch.object(svc, "_handle_event", new_callable=AsyncMock) as handle:
+        ok, message, details = asyncio.run(svc.process_webhook(payload, "sig"))
+        assert (ok, message, details) == (True, "Queued", {"event_id": "ev_1"})
+        doc = db.stripe_events.insert_one.await_args.args[0]
+        assert doc["status"] == "QUEUED" and doc["ordering_key"] == "customer:cus_1"
+        assert json.loads(doc["payload_json"])["id"] == "ev_1"
+
+        # Redelivery of an event that is queued or done is acknowledged as a no-op
+        db.stripe_events.insert_one = AsyncMock(side_effect=DuplicateKeyError("E11000"))
+        db.stripe_events.update_one = AsyncMock(return_value=MagicMock(modified_count=0))
+        assert asyncio.run(svc.process_webhook(payload, "sig"))[1] == "Already received"
+    handle.assert_not_called()
+
+
+def test_claim_takes_runnable_heads_only():
+    later = NOW + timedelta(seconds=30)
+    db = MagicMock()
+    db.stripe_events.aggregate.return_value.to_list = AsyncMock(return_value=[
+        # Head of cus_1 is waiting out a retry: cus_1's later events must wait too
+        {"_id": "customer:cus_1", "busy": 0, "head": {"_id": 1, "status": "QUEUED", "available_at": later}},
+        {"_id": "customer:cus_2", "busy": 0, "head": {"_id": 2, "status": "QUEUED", "available_at": NOW}},
+    ])
+    db.stripe_events.find_one_and_update = AsyncMock(return_value={"_id": 2, "event_id": "ev_2", "attempts": 1})
+    claimed = asyncio.run(seq.claim_next_event(db, "w1", now=NOW))
+    assert claimed["event_id"] == "ev_2"
+    flt, update = db.stripe_events.find_one_and_update.await_args.args
+    assert flt == {"_id": 2, "status": "QUEUED"}
+    assert update["$set"]["lease_owner"] == "w1" and update["$inc"] == {"attempts": 1}
+    pipeline = db.stripe_events.aggregate.call_args.args[0]
+    assert pipeline[3]["$group"]["_id"] == "$ordering_key" and pipeline[4] == {"$match": {"busy": 0}}
+
+
+def test_apply_retries_then_dead_letters():
+    db = MagicMock()
+    db.stripe_events.update_one = AsyncMock()
+    doc = {"_id": 7, "event_id": "ev_7", "type": "invoice.paid", "payload_json": json.dumps(_event("ev_7", {})),
+           "received_at": datetime.now(timezone.utc) - timedelta(seconds=3), "attempts": 1}
+    service = MagicMock(apply_event=AsyncMock(side_effect=RuntimeError("Stripe API timeout")))
+    audit = AsyncMock()
+    with patch("services.stripe_webhook_service.stripe_webhook_service", service), \
+            patch("utils.audit.create_audit_log", audit):
+        assert asyncio.run(seq.apply_claimed_event(db, doc, "w1")) is False
+        update = db.stripe_events.update_one.await_args.args[1]["$set"]
+        assert update["status"] == "QUEUED" and "timeout" in update["error"] and update["lease_owner"] is None
+        audit.assert_not_awaited()
+
+        asyncio.run(seq.apply_claimed_event(db, {**doc, "attempts": seq.STRIPE_EVENT_MAX_ATTEMPTS}, "w1"))
+        assert db.stripe_events.update_one.await_args.args[1]["$set"]["status"] == "DEAD"
+        assert audit.await_args.kwargs["metadata"]["action_type"] == "STRIPE_EVENT_DEAD_LETTERED"
+
+        applied_before = STRIPE_EVENT_OUTCOMES.values().get(("applied",), 0)
+        service.apply_event = AsyncMock(return_value={"client_id": "c1"})
+        assert asyncio.run(seq.apply_claimed_event(db, doc, "w1")) is True
+        service.apply_event.assert_awaited_once_with(json.loads(doc["payload_json"]))
+        assert db.stripe_events.update_one.await_args.args[0] == {"_id": 7, "lease_owner": "w1"}
+        assert STRIPE_EVENT_OUTCOMES.values()[("applied",)] == applied_before + 1
+
+
+def test_processed_event_drops_raw_payload_and_inline_mode_starts_no_consumers():
+    db = MagicMock()
+    db.stripe_events.update_one = AsyncMock()
+    svc = StripeWebhookService()
+    with patch("services.stripe_webhook_service.database.get_db", return_value=db), \
+            patch.object(svc, "_handle_event", AsyncMock(return_value={"client_id": "c1"})):
+        asyncio.run(svc.apply_event(_event("ev_1", {"customer": "cus_1"})))
+    update = db.stripe_events.update_one.await_args.args[1]
+    assert update["$set"]["status"] == "PROCESSED" and update["$unset"] == {"payload_json": ""}
+
+    with patch.dict(os.environ, {"STRIPE_WEBHOOK_MODE": "inline"}):
+        assert not seq.consumers_enabled()
+    with patch.dict(os.environ, {"STRIPE_WEBHOOK_MODE": "async"}):
+        assert seq.consumers_enabled()
+
+
+def test_lease_renewal_survives_transient_errors_and_aborts_once_the_lease_lapses():
+    doc = {"_id": 9, "event_id": "ev_9", "type": "invoice.paid", "payload_json": json.dumps(_event("ev_9", {})),
+           "attempts": 1}
+    renewals, failing = [], set()
+
+    def _update(flt, update):
+        if set(update["$set"]) == {"lease_expires_at"}:
+            renewals.append(flt["_id"])
+            if len(renewals) in failing:
+                raise RuntimeError("not primary")
+        return MagicMock(modified_count=1)
+
+    async def _slow_apply(event):
+        await asyncio.sleep(0.15)
+
+    db = MagicMock()
+    db.stripe_events.update_one = AsyncMock(side_effect=_update)
+    service = MagicMock(apply_event=AsyncMock(side_effect=_slow_apply))
+    with patch("services.stripe_webhook_service.stripe_webhook_service", service), \
+            patch.object(seq, "STRIPE_EVENT_LEASE_SECONDS", 0.06):
+        # One failed beat is logged and the next one renews: the apply runs to completion
+        failing.add(1)
+        assert asyncio.run(seq.apply_claimed_event(db, doc, "w1")) is True
+        assert len(renewals) >= 3
+
+        # Renewals failing for a whole lease abort the apply and put the event back for a retry
+        renewals.clear()
+        failing.update(range(1, 100))
+        assert asyncio.run(seq.apply_claimed_event(db, doc, "w1")) is False
+        update = db.stripe_events.update_one.await_args.args[1]["$set"]
+        assert update["status"] == "QUEUED" and update["error"].startswith("LeaseLost")
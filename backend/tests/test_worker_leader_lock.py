@@ -0,0 +1,182 @@
+"""
+Background worker split: scheduled_jobs leader lock (services.leader_lock), leader-elected
+scheduler pause/resume (job_schedule), worker-mode extraction queue, shared DB client reuse.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pymongo.errors import DuplicateKeyError
+
+from job_runner import JOB_RUNNERS
+from job_schedule import SCHEDULED_JOBS, LeaderElectedScheduler, register_jobs
+from services.leader_lock import LOCK_COLLECTION, LeaderLock
+
+
+def _db_with_lock_collection(collection):
+    db = MagicMock()
+    db.__getitem__.side_effect = lambda name: collection if name == LOCK_COLLECTION else MagicMock()
+    return db
+
+
+def test_leader_lock_acquire_follow_and_release():
+    coll = MagicMock()
+    coll.find_one_and_update = AsyncMock(return_value={"_id": "scheduled_jobs", "owner": "a"})
+    coll.delete_one = AsyncMock()
+    lock = LeaderLock(_db_with_lock_collection(coll), owner_id="a", ttl_seconds=30)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    assert asyncio.run(lock.acquire(now=now)) is True
+    filt, update = coll.find_one_and_update.call_args[0]
+    # Only free/expired locks or our own can be taken
+    assert filt == {"_id": "scheduled_jobs", "$or": [{"owner": "a"}, {"expires_at": {"$lte": now}}]}
+    assert update["$set"]["expires_at"] == now + timedelta(seconds=30)
+    assert lock.renew_interval_seconds == 10
+
+    # Another owner holds an unexpired lock: the upsert collides on _id
+    coll.find_one_and_update = AsyncMock(side_effect=DuplicateKeyError("dup"))
+    assert asyncio.run(lock.acquire(now=now)) is False
+    asyncio.run(lock.release())
+    coll.delete_one.assert_not_called()  # followers never delete the holder's lock
+
+    coll.find_one_and_update = AsyncMock(return_value={"_id": "scheduled_jobs", "owner": "a"})
+    asyncio.run(lock.acquire(now=now))
+    asyncio.run(lock.release())
+    coll.delete_one.assert_awaited_once_with({"_id": "scheduled_jobs", "owner": "a"})
+    assert lock.is_leader is False
+
+
+def test_leader_lock_steps_down_on_db_error():
+    coll = MagicMock()
+    coll.find_one_and_update = AsyncMock(side_effect=RuntimeError("network"))
+    lock = LeaderLock(_db_with_lock_collection(coll), owner_id="a")
+    lock.is_leader = True
+    assert asyncio.run(lock.acquire()) is False
+    assert lock.is_leader is False
+
+
+def test_leader_elected_scheduler_pauses_and_resumes():
+    scheduler = MagicMock()
+    scheduler.state = 2  # paused
+    lock = MagicMock()
+    lock.acquire = AsyncMock(return_value=True)
+    leader = LeaderElectedScheduler(scheduler, lock)
+
+    assert asyncio.run(leader.step()) is True
+    scheduler.resume.assert_called_once()
+
+    scheduler.state = 1  # running
+    lock.acquire = AsyncMock(return_value=False)
+    assert asyncio.run(leader.step()) is False
+    scheduler.pause.assert_called_once()
+
+
+def test_register_jobs_worker_only_and_runner_coverage():
+    scheduler = MagicMock()
+    embedded = register_jobs(scheduler, include_worker_only=False)
+    ids = [c.kwargs["id"] for c in scheduler.add_job.call_args_list]
+    assert "extraction_queue_worker" not in ids
+    assert all(c.kwargs["replace_existing"] for c in scheduler.add_job.call_args_list)
+
+    scheduler = MagicMock()
+    assert register_jobs(scheduler, include_worker_only=True) == embedded + 1
+    # Every scheduled job has a runner (admin run-now and make_instrumented share JOB_RUNNERS)
+    assert {job.job_id for job in SCHEDULED_JOBS} <= set(JOB_RUNNERS)
+
+
+def test_registered_jobs_pickle_for_the_shared_job_store():
+    import pickle
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    async def scenario():
+        scheduler = AsyncIOScheduler()
+        register_jobs(scheduler, include_worker_only=True)
+        scheduler.start(paused=True)
+        try:
+            return scheduler.get_jobs()
+        finally:
+            scheduler.shutdown(wait=False)
+
+    jobs = asyncio.run(scenario())
+    assert len(jobs) == len(SCHEDULED_JOBS)
+    for job in jobs:
+        pickle.dumps(job.__getstate__())  # what MongoDBJobStore stores
+        assert job.func_ref == "job_runner:run_scheduled_job" and job.args == (job.id,)
+
+
+def test_worker_mode_enqueue_leaves_extraction_to_queue():
+    from services import document_extraction_service as svc
+
+    db = MagicMock()
+    db.documents.find_one = AsyncMock(return_value={"file_name": "gas.pdf", "mime_type": "application/pdf"})
+    db.documents.update_one = AsyncMock()
+    db.extracted_documents.insert_one = AsyncMock()
+    with patch("services.document_extraction_service.database.get_db", return_value=db), \
+            patch.object(svc, "create_audit_log", new=AsyncMock()), \
+            patch.object(svc, "_check_rate_limit", return_value=None), \
+            patch.object(svc, "_record_rate"), \
+            patch("job_schedule.background_jobs_in_worker", return_value=True), \
+            patch.object(svc.asyncio, "create_task") as create_task:
+        extraction_id = asyncio.run(svc.enqueue_extraction("doc-1", "client-1", "upload"))
+    assert extraction_id
+    create_task.assert_not_called()
+
+
+def test_process_extraction_queue_claims_each_record_once():
+    from services import document_extraction_service as svc
+
+    db = MagicMock()
+    db.extracted_documents.find_one_and_update = AsyncMock(
+        side_effect=[{"extraction_id": "e1"}, {"extraction_id": "e2"}, None]
+    )
+    with patch("services.document_extraction_service.database.get_db", return_value=db), \
+            patch.object(svc, "run_extraction_job", new=AsyncMock()) as run_job:
+        assert asyncio.run(svc.process_extraction_queue(limit=10)) == 2
+    assert [c.args[0] for c in run_job.await_args_list] == ["e1", "e2"]
+    filt = db.extracted_documents.find_one_and_update.call_args_list[0].args[0]
+    assert filt["status"] == "PENDING"
+
+
+def test_process_extraction_queue_fails_a_record_after_max_attempts():
+    from services import document_extraction_service as svc
+
+    db = MagicMock()
+    db.extracted_documents.find_one_and_update = AsyncMock(side_effect=[
+        {"extraction_id": "e1", "document_id": "d1", "client_id": "c1", "queue_attempts": 1},
+        {"extraction_id": "e2", "document_id": "d2", "client_id": "c1", "queue_attempts": svc.EXTRACTION_MAX_ATTEMPTS},
+        {"extraction_id": "e3", "document_id": "d3", "client_id": "c1",
+         "queue_attempts": svc.EXTRACTION_MAX_ATTEMPTS + 1, "queue_last_error": "worker killed"},
+        None,
+    ])
+    db.extracted_documents.update_one = AsyncMock()
+    set_failed = AsyncMock()
+    with patch("services.document_extraction_service.database.get_db", return_value=db), \
+            patch.object(svc, "run_extraction_job", new=AsyncMock(side_effect=RuntimeError("boom"))) as run_job, \
+            patch.object(svc, "_set_failed", new=set_failed):
+        asyncio.run(svc.process_extraction_queue(limit=10))
+
+    assert db.extracted_documents.find_one_and_update.call_args_list[0].args[1]["$inc"] == {"queue_attempts": 1}
+    # First failure: error kept, record stays PENDING for a later retry
+    db.extracted_documents.update_one.assert_awaited_once_with(
+        {"extraction_id": "e1"}, {"$set": {"queue_last_error": "RuntimeError: boom"}}
+    )
+    # Last attempt failed, and a record whose last attempt died: both marked FAILED
+    assert [c.args[1:] for c in set_failed.await_args_list] == [
+        ("e2", "d2", "c1", "MAX_ATTEMPTS", "RuntimeError: boom"),
+        ("e3", "d3", "c1", "MAX_ATTEMPTS", "worker killed"),
+    ]
+    assert [c.args[0] for c in run_job.await_args_list] == ["e1", "e2"]
+
+
+def test_job_scheduler_reuses_shared_client():
+    from services.jobs import JobScheduler
+
+    shared = MagicMock()
+    with patch("database.database.get_db", return_value=shared), \
+            patch("services.jobs.AsyncIOMotorClient") as client_cls, \
+            patch.dict("os.environ", {"MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "test"}):
+        js = JobScheduler()
+        asyncio.run(js.connect())
+        asyncio.run(js.close())
+    assert js.db is shared
+    client_cls.assert_not_called()
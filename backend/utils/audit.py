@@ -117,6 +117,28 @@ async def create_audit_log(
         # Never fail the main operation due to audit log failure
         return ""
 
+async def create_audit_logs(entries: List[Dict[str, Any]]) -> int:
+    """Insert many audit log entries in one write (bulk operations).
+    
+    Each entry takes the create_audit_log keyword arguments except auto_diff (no diff is
+    calculated). Returns the number written; like create_audit_log it never raises.
+    """
+    if not entries:
+        return 0
+    try:
+        db = database.get_db()
+        docs = []
+        for entry in entries:
+            doc = AuditLog(**entry).model_dump()
+            doc["timestamp"] = doc["timestamp"].isoformat() if isinstance(doc["timestamp"], datetime) else doc["timestamp"]
+            docs.append(doc)
+        await db.audit_logs.insert_many(docs, ordered=False)
+        logger.info(f"Audit logs created: {len(docs)} ({entries[0]['action'].value})")
+        return len(docs)
+    except Exception as e:
+        logger.error(f"Failed to create audit logs: {e}")
+        return 0
+
 async def get_audit_logs_for_resource(
     resource_type: str,
     resource_id: str,
@@ -0,0 +1,83 @@
+"""
+Request-scoped batching loader (DataLoader pattern).
+
+load(key) returns the value for key; every load() issued before the event loop next runs its
+scheduled callbacks (e.g. from coroutines started together with asyncio.gather) is answered by
+one call of the batch function with all the keys. Results are memoized per loader, so a key is
+fetched at most once. Create loaders per request; they are not invalidated by writes.
+
+    loader = DataLoader(fetch_properties)        # async (keys) -> {key: value}
+    a, b = await asyncio.gather(loader.load("p1"), loader.load("p2"))   # one query
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[List[Any]], Awaitable[Dict[Any, Any]]]
+
+
+class DataLoader(Generic[K, V]):
+    def __init__(self, batch_fn: BatchFn, default: Optional[Callable[[], V]] = None, max_batch_size: int = 500):
+        """batch_fn(keys) returns {key: value}; missing keys resolve to default() (or None)."""
+        self._batch_fn = batch_fn
+        self._default = default
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        self.batches = 0
+
+    def load(self, key: K) -> "asyncio.Future[V]":
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[key] = future
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(key)
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> List[V]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Seed a value already read elsewhere in the request (no-op if the key is known)."""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def _dispatch(self) -> None:
+        keys, self._queue = self._queue, []
+        for start in range(0, len(keys), self.max_batch_size):
+            asyncio.ensure_future(self._run_batch(keys[start:start + self.max_batch_size]))
+
+    async def _run_batch(self, keys: List[K]) -> None:
+        self.batches += 1
+        try:
+            values = await self._batch_fn(keys)
+        except Exception as e:
+            for key in keys:
+                # Not memoized: a later load() in the same request retries
+                future = self._futures.pop(key)
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark retrieved so an unawaited failure does not log "exception never retrieved"
+                    future.exception()
+            return
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(values[key] if key in values else (self._default() if self._default else None))
+
+
+def group_by(rows: Iterable[Dict[str, Any]], field: str) -> Dict[Any, List[Dict[str, Any]]]:
+    """Index rows by a field value (rows without it are dropped), keeping row order."""
+    grouped: Dict[Any, List[Dict[str, Any]]] = {}
+    for row in rows:
+        value = row.get(field)
+        if value is not None:
+            grouped.setdefault(value, []).append(row)
+    return grouped
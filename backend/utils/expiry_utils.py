@@ -3,7 +3,7 @@ Deterministic certificate expiry: single source of truth for effective date and
 Use confirmed_expiry_date if present, else extracted_expiry_date, else none.
 Calendar and reminders must use this same rule.
 """
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from models import Applicability, ExpirySource, RequirementStatus
@@ -19,7 +19,9 @@ def _parse_date(value: Any) -> Optional[datetime]:
         return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
     try:
         s = (value.replace("Z", "+00:00") if isinstance(value, str) else str(value)).strip()
-        return datetime.fromisoformat(s)
+        parsed = datetime.fromisoformat(s)
+        # Date-only / naive strings are UTC (same as naive datetimes above)
+        return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed
     except (TypeError, ValueError):
         return None
 
@@ -67,3 +69,34 @@ def is_included_for_calendar(requirement: Dict[str, Any]) -> bool:
     if applicability == "NOT_REQUIRED":
         return False
     return get_effective_expiry_date(requirement) is not None
+
+
+def get_next_transition_at(requirement: Dict[str, Any], as_of: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Next instant after which get_computed_status() returns a different value without any write:
+    COMPLIANT -> EXPIRING_SOON once fewer than EXPIRING_SOON_DAYS + 1 whole days remain,
+    EXPIRING_SOON -> OVERDUE once the effective expiry has passed. None when the status is
+    terminal for time (OVERDUE, UNKNOWN_DATE, NOT_REQUIRED).
+    """
+    status = get_computed_status(requirement, as_of)
+    if status == RequirementStatus.COMPLIANT.value:
+        return get_effective_expiry_date(requirement) - timedelta(days=EXPIRING_SOON_DAYS + 1)
+    if status == RequirementStatus.EXPIRING_SOON.value:
+        return get_effective_expiry_date(requirement)
+    return None
+
+
+def _iso_utc(value: Optional[datetime]) -> Optional[str]:
+    return value.astimezone(timezone.utc).isoformat() if value is not None else None
+
+
+def get_transition_fields(requirement: Dict[str, Any], as_of: Optional[datetime] = None) -> Dict[str, Optional[str]]:
+    """
+    Denormalized fields stored on every requirement (UTC ISO strings, comparable as strings):
+    effective_expiry_at (None when not shown in calendar/reminders) and next_transition_at.
+    """
+    effective = get_effective_expiry_date(requirement) if is_included_for_calendar(requirement) else None
+    return {
+        "effective_expiry_at": _iso_utc(effective),
+        "next_transition_at": _iso_utc(get_next_transition_at(requirement, as_of)),
+    }
@@ -0,0 +1,46 @@
+"""
+Deferred imports for heavy optional libraries (aiohttp, ReportLab, python-docx, openpyxl, ...).
+
+`aiohttp = lazy_import("aiohttp")` binds a module proxy: the real import happens on first
+attribute access, so processes that never call the code path (scheduler worker, scripts, API
+roles without that route group) never pay its import time or memory.
+Use scripts/profile_imports.py to see which heavy packages a process still loads.
+"""
+import importlib
+import threading
+from types import ModuleType
+from typing import Optional
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy for module `name`; importing is deferred until an attribute is used."""
+    return LazyModule(name)
@@ -8,6 +8,8 @@ import logging
 import os
 from typing import Optional
 
+from utils.metrics import LLM_CALL_SECONDS, time_call
+
 logger = logging.getLogger(__name__)
 
 # Single env var for Gemini/LLM (no Emergent-specific names)
@@ -34,15 +36,16 @@ def _sync_chat_openai(system_prompt: str, user_text: str) -> str:
     if not api_key:
         raise ValueError("OPENAI_API_KEY not set")
     client = OpenAI(api_key=api_key)
-    response = client.chat.completions.create(
-        model=ai_config.AI_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_text},
-        ],
-        temperature=ai_config.AI_TEMPERATURE,
-        max_tokens=ai_config.AI_MAX_OUTPUT_TOKENS,
-    )
+    with time_call(LLM_CALL_SECONDS, "openai", "chat"):
+        response = client.chat.completions.create(
+            model=ai_config.AI_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_text},
+            ],
+            temperature=ai_config.AI_TEMPERATURE,
+            max_tokens=ai_config.AI_MAX_OUTPUT_TOKENS,
+        )
     raw = (response.choices[0].message.content or "").strip()
     if not raw:
         raise ValueError("Empty response from OpenAI")
@@ -70,7 +73,8 @@ def _sync_chat(system_prompt: str, user_text: str, model: str = "gemini-2.0-flas
         model_name,
         system_instruction=system_prompt,
     )
-    response = gemini.generate_content(user_text)
+    with time_call(LLM_CALL_SECONDS, "gemini", "chat"):
+        response = gemini.generate_content(user_text)
     if not response or not response.text:
         raise ValueError("Empty response from LLM")
     return response.text
@@ -89,13 +93,14 @@ def _sync_chat_with_file(
     if not api_key:
         raise ValueError("LLM_API_KEY not found in environment")
     genai.configure(api_key=api_key)
-    uploaded = genai.upload_file(path=file_path, mime_type=mime_type)
     model_name = model if model and "gemini" in model else "gemini-2.0-flash"
-    gemini = genai.GenerativeModel(
-        model_name,
-        system_instruction=system_prompt,
-    )
-    response = gemini.generate_content([uploaded, user_text])
+    with time_call(LLM_CALL_SECONDS, "gemini", "chat_with_file"):
+        uploaded = genai.upload_file(path=file_path, mime_type=mime_type)
+        gemini = genai.GenerativeModel(
+            model_name,
+            system_instruction=system_prompt,
+        )
+        response = gemini.generate_content([uploaded, user_text])
     if not response or not response.text:
         raise ValueError("Empty response from LLM")
     return response.text
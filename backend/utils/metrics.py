@@ -0,0 +1,260 @@
+"""
+In-process metrics registry with Prometheus text exposition (served at GET /api/metrics).
+
+No prometheus_client dependency. Hot-path writes take no lock: every thread writes to its own
+cell map (the event loop thread for requests, Motor / to_thread executor threads for Mongo and
+LLM calls), and a scrape sums the per-thread cells. Histograms store per-bucket counts and are
+cumulated at exposition. Values derived from Mongo (queue depth and lag) are produced by async
+collectors at scrape time, so they cost nothing between scrapes.
+
+Label values must stay low-cardinality: route templates (not raw paths), command names,
+provider names, job ids.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; covers fast Mongo commands through slow LLM / PDF calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (name, type, help, [(suffix, labels, value)])
+Family = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+Collector = Callable[[], Awaitable[List[Family]]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._by_thread: Dict[int, Dict[Tuple[str, ...], Any]] = {}
+        self._register_lock = threading.Lock()
+
+    def _cells(self) -> Dict[Tuple[str, ...], Any]:
+        tid = threading.get_ident()
+        cells = self._by_thread.get(tid)
+        if cells is None:
+            with self._register_lock:  # once per thread
+                cells = self._by_thread.setdefault(tid, {})
+        return cells
+
+    def _key(self, label_values: Tuple[Any, ...]) -> Tuple[str, ...]:
+        if len(label_values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {label_values}")
+        return tuple(str(v) for v in label_values)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def _thread_cells(self) -> List[Dict[Tuple[str, ...], Any]]:
+        return [dict(cells) for cells in list(self._by_thread.values())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values: Any, amount: float = 1.0) -> None:
+        cells = self._cells()
+        key = self._key(label_values)
+        cells[key] = cells.get(key, 0.0) + amount
+
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        total: Dict[Tuple[str, ...], float] = {}
+        for cells in self._thread_cells():
+            for key, value in cells.items():
+                total[key] = total.get(key, 0.0) + value
+        return total
+
+    def samples(self):
+        return [("_total", self._labels(k), v) for k, v in sorted(self.values().items())]
+
+
+class Gauge(Counter):
+    """Up/down gauge (e.g. in-flight requests); per-thread deltas are summed like a counter."""
+    kind = "gauge"
+
+    def dec(self, *label_values: Any, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def samples(self):
+        return [("", self._labels(k), v) for k, v in sorted(self.values().items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *label_values: Any) -> None:
+        cells = self._cells()
+        key = self._key(label_values)
+        cell = cells.get(key)
+        if cell is None:
+            # [count per bucket..., +Inf bucket, sum]
+            cell = cells[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, *label_values: Any):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def merged(self) -> Dict[Tuple[str, ...], List[float]]:
+        total: Dict[Tuple[str, ...], List[float]] = {}
+        for cells in self._thread_cells():
+            for key, cell in cells.items():
+                acc = total.setdefault(key, [0] * len(cell))
+                for i, v in enumerate(list(cell)):
+                    acc[i] += v
+        return total
+
+    def samples(self):
+        out = []
+        for key, cell in sorted(self.merged().items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                cumulative += count
+                out.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append(("_sum", labels, cell[-1]))
+            out.append(("_count", labels, cumulative))
+        return out
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _add(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> Collector:
+        """Async callable returning metric families computed at scrape time."""
+        self._collectors.append(collector)
+        return collector
+
+    async def render(self, collector_timeout: float = 5.0) -> str:
+        families: List[Family] = [
+            (m.name, m.kind, m.documentation, m.samples()) for m in self._metrics.values()
+        ]
+        failed = []
+        for collector in self._collectors:
+            try:
+                families.extend(await asyncio.wait_for(collector(), timeout=collector_timeout))
+            except Exception:
+                failed.append(("", {"collector": getattr(collector, "__name__", "collector")}, 1))
+        if failed:
+            families.append(("metrics_collector_errors", "gauge", "Collectors that failed during this scrape", failed))
+        lines = []
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Hot-path metrics (labels kept low-cardinality)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being served")
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command", "collection"),
+)
+MONGO_COMMAND_FAILURES = REGISTRY.counter("mongo_command_failures", "Failed MongoDB commands", ("command",))
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_duration_seconds", "LLM provider call latency", ("provider", "operation", "outcome"),
+)
+EMAIL_PROVIDER_SECONDS = REGISTRY.histogram(
+    "email_provider_duration_seconds", "Email provider send latency", ("provider", "outcome"),
+)
+JOB_RUN_SECONDS = REGISTRY.histogram(
+    "job_run_duration_seconds", "Background job run duration", ("job", "status"),
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+RESPONSE_CACHE_REQUESTS = REGISTRY.counter(
+    "response_cache_requests", "Public response cache lookups", ("outcome",),
+)
+ARTIFACT_CACHE_REQUESTS = REGISTRY.counter(
+    "artifact_cache_requests", "Rendered PDF / pack cache lookups", ("kind", "outcome"),
+)
+ARTIFACT_CACHE_EVICTIONS = REGISTRY.counter(
+    "artifact_cache_evictions", "Rendered artifacts evicted from the cache (LRU by size)", ("kind",),
+)
+LOG_ARCHIVED_ROWS = REGISTRY.counter(
+    "log_archived_rows", "Log rows moved from the hot collection to archive segments", ("collection",),
+)
+STRIPE_EVENT_APPLY_LAG_SECONDS = REGISTRY.histogram(
+    "stripe_event_apply_lag_seconds", "Stripe webhook ingest-to-applied lag (async mode)", ("event_type",),
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600),
+)
+STRIPE_EVENT_OUTCOMES = REGISTRY.counter(
+    "stripe_event_outcomes", "Queued Stripe webhook events by consumer outcome", ("outcome",),
+)
+
+
+@contextmanager
+def time_call(histogram: Histogram, *label_values: Any):
+    """Time a block; the last label is the outcome ("ok" / "error")."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, *label_values, outcome)
+
+
+def family(name: str, kind: str, documentation: str,
+           samples: Iterable[Tuple[Dict[str, str], float]]) -> Family:
+    return (name, kind, documentation, [("", labels, value) for labels, value in samples])
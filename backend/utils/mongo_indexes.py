@@ -0,0 +1,73 @@
+"""
+Declarative MongoDB index specs.
+
+Index lists are plain data (IndexSpec tuples built with index()) so startup can fingerprint
+them and build them concurrently instead of awaiting create_index calls one after another.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_CONCURRENCY = 8
+
+
+class IndexSpec(NamedTuple):
+    collection: str
+    keys: Any
+    options: Tuple[Tuple[str, Any], ...]
+    tolerate_errors: bool
+
+
+def index(collection: str, keys: Any, tolerate_errors: bool = False, **options) -> IndexSpec:
+    """
+    One create_index call. tolerate_errors=True keeps the legacy behaviour of indexes that may
+    conflict with existing data or an older definition (failure is logged at debug, not counted).
+    """
+    return IndexSpec(collection, keys, tuple(sorted(options.items())), tolerate_errors)
+
+
+def fingerprint_indexes(specs: Iterable[IndexSpec]) -> str:
+    """Stable hash of an index list; changes when any key, option or collection changes."""
+    return hashlib.sha256(repr(list(specs)).encode("utf-8")).hexdigest()[:16]
+
+
+async def ensure_indexes(
+    db,
+    specs: Iterable[IndexSpec],
+    concurrency: int = DEFAULT_INDEX_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Dict[str, Any]:
+    """
+    Create indexes concurrently (bounded by concurrency, or by a semaphore shared across
+    several lists). Never raises: returns {"created", "tolerated", "failed", "errors"};
+    failed counts only non-tolerated errors.
+    """
+    specs = list(specs)
+    semaphore = semaphore or asyncio.Semaphore(max(1, concurrency))
+    errors: List[str] = []
+    tolerated = 0
+
+    async def _create(spec: IndexSpec) -> None:
+        nonlocal tolerated
+        async with semaphore:
+            try:
+                await db[spec.collection].create_index(spec.keys, **dict(spec.options))
+            except Exception as e:
+                if spec.tolerate_errors:
+                    tolerated += 1
+                    logger.debug("Index %s %s skipped: %s", spec.collection, spec.keys, e)
+                else:
+                    errors.append(f"{spec.collection} {spec.keys}: {e}")
+
+    await asyncio.gather(*(_create(spec) for spec in specs))
+    for message in errors:
+        logger.warning("Index creation failed: %s", message)
+    return {
+        "created": len(specs) - tolerated - len(errors),
+        "tolerated": tolerated,
+        "failed": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,196 @@
+"""
+Compressed NDJSON archive segments in GridFS.
+
+A segment is one gzip file of newline-delimited JSON rows; its GridFS metadata (collection,
+client_id, first_at / last_at of the rows, count) is what readers filter on, so a time-range read
+only downloads the segments that overlap it. Values that are not JSON-native are written as
+strings (datetimes as ISO 8601, ObjectIds as hex), so they read back as strings; with
+typed_dates=True datetimes are written as {"$date": ...} and read back as (naive UTC) datetimes,
+as Mongo returns them.
+
+match_query() evaluates the subset of Mongo filter syntax the archive readers need against
+decoded rows, with Mongo's type bracketing (a string never compares equal to or less than a date).
+"""
+import gzip
+import io
+import json
+import re
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _typed_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": _naive_utc(value).isoformat()}
+    return _default(value)
+
+
+def _object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode_rows(rows: Iterable[Dict[str, Any]], typed_dates: bool = False) -> bytes:
+    default = _typed_default if typed_dates else _default
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb") as gz:
+        for row in rows:
+            gz.write(json.dumps(row, default=default, separators=(",", ":")).encode("utf-8"))
+            gz.write(b"\n")
+    return buffer.getvalue()
+
+
+def decode_rows(data: bytes) -> List[Dict[str, Any]]:
+    """Rows of one gzip NDJSON blob (concatenated gzip members decode as one stream)."""
+    return [json.loads(line, object_hook=_object_hook) for line in gzip.decompress(data).splitlines() if line.strip()]
+
+
+async def write_segment(db, bucket_name: str, filename: str, rows: List[Dict[str, Any]], metadata: Dict[str, Any]):
+    """Store rows as one gzip NDJSON file; returns its GridFS file id."""
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+    return await bucket.upload_from_stream(
+        filename, io.BytesIO(encode_rows(rows)), metadata={**metadata, "count": len(rows), "format": "ndjson.gz"},
+    )
+
+
+async def find_segments(db, bucket_name: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """GridFS file documents whose metadata matches (keys are prefixed with "metadata.")."""
+    query = {f"metadata.{k}": v for k, v in metadata.items()}
+    return await db[f"{bucket_name}.files"].find(query, {"metadata": 1, "length": 1}).sort("metadata.first_at", 1).to_list(None)
+
+
+async def delete_segments(db, bucket_name: str, metadata: Dict[str, Any]) -> int:
+    """Delete the segments whose metadata matches; returns how many were deleted."""
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+    segments = await find_segments(db, bucket_name, metadata)
+    for segment in segments:
+        await bucket.delete(segment["_id"])
+    return len(segments)
+
+
+async def read_segment(db, bucket_name: str, file_id) -> List[Dict[str, Any]]:
+    stream = io.BytesIO()
+    await AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name).download_to_stream(file_id, stream)
+    return decode_rows(stream.getvalue())
+
+
+def overlap_filter(start: Optional[str], end: Optional[str]) -> Dict[str, Any]:
+    """Segment metadata filter for rows in [start, end] (ISO strings compare lexically)."""
+    query: Dict[str, Any] = {}
+    if start:
+        query["last_at"] = {"$gte": start}
+    if end:
+        query["first_at"] = {"$lte": end}
+    return query
+
+
+# ---- Matching decoded rows against Mongo filters --------------------------------------------
+
+_MISSING = object()
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _lookup(row: Dict[str, Any], path: str) -> Any:
+    cur: Any = row
+    for part in path.split("."):
+        if not isinstance(cur, dict) or part not in cur:
+            return _MISSING
+        cur = cur[part]
+    return cur
+
+
+def _bracket(value: Any) -> Any:
+    """(type family, comparable value), or None for values that only support equality."""
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    if isinstance(value, str):
+        return ("string", value)
+    if isinstance(value, datetime):
+        return ("date", _naive_utc(value))
+    return None
+
+
+def _equal(value: Any, operand: Any) -> bool:
+    if value is _MISSING:
+        return operand is None
+    if isinstance(value, list) and not isinstance(operand, list):
+        return any(_equal(v, operand) for v in value)
+    a, b = _bracket(value), _bracket(operand)
+    if a is not None and b is not None:
+        return a == b
+    return value == operand
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if isinstance(value, list):
+        return any(_compare(v, op, operand) for v in value)
+    a, b = _bracket(value), _bracket(operand)
+    if a is None or b is None or a[0] != b[0]:
+        return False
+    if op == "$gt":
+        return a[1] > b[1]
+    if op == "$gte":
+        return a[1] >= b[1]
+    if op == "$lt":
+        return a[1] < b[1]
+    return a[1] <= b[1]
+
+
+def _matches(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return _equal(value, condition)
+    for op, operand in condition.items():
+        if op == "$eq":
+            ok = _equal(value, operand)
+        elif op == "$ne":
+            ok = not _equal(value, operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = value is not _MISSING and _compare(value, op, operand)
+        elif op == "$in":
+            ok = any(_equal(value, o) for o in operand)
+        elif op == "$nin":
+            ok = not any(_equal(value, o) for o in operand)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(operand)
+        elif op == "$regex":
+            flags = sum(getattr(re, f.upper(), 0) for f in condition.get("$options", "") if f in "imsx")
+            ok = isinstance(value, str) and re.search(operand, value, flags) is not None
+        elif op == "$options":
+            ok = True
+        else:
+            raise ValueError(f"Unsupported operator for archived rows: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def match_query(row: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """True if row matches query (field conditions, $and / $or / $nor, common comparison operators)."""
+    for key, condition in query.items():
+        if key == "$and":
+            ok = all(match_query(row, q) for q in condition)
+        elif key == "$or":
+            ok = any(match_query(row, q) for q in condition)
+        elif key == "$nor":
+            ok = not any(match_query(row, q) for q in condition)
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported operator for archived rows: {key}")
+        else:
+            ok = _matches(_lookup(row, key), condition)
+        if not ok:
+            return False
+    return True
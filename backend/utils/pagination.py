@@ -0,0 +1,163 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+Cursor tokens are opaque to clients: base64(JSON) of the last row's sort value and
+unique id. The next page is fetched with a range filter on (sort_field, id_field),
+so deep pages cost the same as the first page instead of scanning O(offset) rows.
+Legacy skip/offset pagination remains supported by each endpoint; cursor mode is
+used only when a cursor parameter is present (an empty ``?cursor=`` requests the
+first keyset page).
+
+Totals in cursor mode come from a short-lived count cache (estimated count for an
+unfiltered collection), so paging does not re-run count_documents on every request.
+"""
+import base64
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached total stays valid (cursor mode only)
+COUNT_CACHE_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 512
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor token cannot be decoded. Callers should return 400."""
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    return {"t": "raw", "v": value}
+
+
+def _decode_value(payload: Dict[str, Any]) -> Any:
+    if payload.get("t") == "dt":
+        return datetime.fromisoformat(payload["v"])
+    return payload.get("v")
+
+
+def encode_cursor(sort_value: Any, unique_id: Any) -> str:
+    """Produce an opaque cursor token for the row with this sort value and unique id."""
+    payload = {"s": _encode_value(sort_value), "id": unique_id}
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Any, Any]:
+    """Return (sort_value, unique_id) from a cursor token. Raises InvalidCursorError."""
+    if not (token or "").strip():
+        raise InvalidCursorError("Empty cursor")
+    try:
+        padded = token.strip() + "=" * (-len(token.strip()) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return _decode_value(payload["s"]), payload["id"]
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+
+def keyset_sort(sort_field: str, id_field: str, direction: int = -1) -> List[Tuple[str, int]]:
+    """Sort spec for keyset pagination: sort field then unique id as tie-breaker."""
+    return [(sort_field, direction), (id_field, direction)]
+
+
+def keyset_filter(
+    query: Dict[str, Any],
+    cursor: Optional[str],
+    sort_field: str,
+    id_field: str,
+    direction: int = -1,
+) -> Dict[str, Any]:
+    """
+    Return query restricted to rows strictly after the cursor in (sort_field, id_field) order.
+    The original query is not mutated; an existing $or is preserved by wrapping in $and.
+    """
+    if not cursor:
+        return dict(query)
+    sort_value, unique_id = decode_cursor(cursor)
+    op = "$lt" if direction < 0 else "$gt"
+    after = {
+        "$or": [
+            {sort_field: {op: sort_value}},
+            {sort_field: sort_value, id_field: {op: unique_id}},
+        ]
+    }
+    if not query:
+        return after
+    return {"$and": [dict(query), after]}
+
+
+def next_cursor_for(
+    items: List[Dict[str, Any]],
+    limit: int,
+    sort_field: str,
+    id_field: str,
+) -> Optional[str]:
+    """Cursor for the page after items, or None when this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(_get_path(last, sort_field), _get_path(last, id_field))
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    cur: Any = doc
+    for part in path.split("."):
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(part)
+    return cur
+
+
+def _query_key(namespace: str, query: Any) -> str:
+    raw = json.dumps(query, sort_keys=True, default=str)
+    return f"{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+class CountCache:
+    """Small TTL cache for list totals, keyed by collection + query shape."""
+
+    def __init__(self, ttl_seconds: float = COUNT_CACHE_TTL_SECONDS, max_entries: int = COUNT_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, int]] = {}
+
+    async def get_or_compute(self, namespace: str, query: Any, compute: Callable[[], Awaitable[int]]) -> int:
+        key = _query_key(namespace, query)
+        now = time.monotonic()
+        hit = self._entries.get(key)
+        if hit and now - hit[0] < self.ttl_seconds:
+            return hit[1]
+        value = int(await compute())
+        if len(self._entries) >= self.max_entries:
+            # Drop expired entries first, then the oldest if still full
+            self._entries = {k: v for k, v in self._entries.items() if now - v[0] < self.ttl_seconds}
+            if len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                self._entries.pop(oldest, None)
+        self._entries[key] = (now, value)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache()
+
+
+async def cached_count(collection, query: Dict[str, Any]) -> int:
+    """
+    Total for query from the count cache. An empty query uses estimated_document_count
+    (collection metadata, no scan); otherwise count_documents is run at most once per TTL.
+    """
+    async def _compute() -> int:
+        if not query:
+            return await collection.estimated_document_count()
+        return await collection.count_documents(query)
+
+    return await count_cache.get_or_compute(getattr(collection, "name", "collection"), query, _compute)
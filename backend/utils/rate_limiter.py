@@ -1,15 +1,160 @@
-"""Rate limiting for sensitive operations - Compliance Vault Pro"""
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+"""Rate limiting for sensitive operations - Compliance Vault Pro
+
+Sliding-window counter: per key we keep only the count for the current fixed window and the
+previous one, and estimate the rolling count as previous * (1 - elapsed / window) + current.
+State is O(1) per key regardless of the limit, and denied attempts are not counted.
+
+Stores:
+- MemoryRateLimitStore: per process, LRU-bounded (RATE_LIMIT_MAX_KEYS idle keys are evicted first).
+- MongoRateLimitStore: one counter document per (key, window) in rate_limit_counters, bumped with
+  an atomic $inc upsert and removed by a TTL index, so limits hold across API replicas.
+
+RATE_LIMIT_BACKEND: auto (default; MongoDB when connected, else memory) | mongo | memory.
+If MongoDB errors, the check falls back to the process-local store rather than failing the request.
+"""
+import asyncio
 import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from database import database
 
 logger = logging.getLogger(__name__)
 
+RATE_LIMIT_COLLECTION = "rate_limit_counters"
+DEFAULT_MAX_KEYS = 100_000
+_FALLBACK_LOG_INTERVAL_SECONDS = 60
+
+
+def sliding_estimate(previous: int, current: int, elapsed: float, window: float) -> float:
+    """Rolling count at `elapsed` seconds into the current window."""
+    return previous * max(0.0, 1.0 - elapsed / window) + current
+
+
+def retry_after_seconds(previous: int, current: int, elapsed: float, window: float, limit: int) -> int:
+    """Seconds until one more attempt fits under `limit` (assuming no further attempts)."""
+    if current < limit and previous:
+        # Still inside this window: wait for the previous window's weight to decay
+        t = window * (1.0 - (limit - 1 - current) / previous)
+        if t <= window:
+            return max(1, math.ceil(t - elapsed))
+    # Next window: this window's count becomes the decaying "previous"
+    t_next = window * (1.0 - (limit - 1) / current) if current else 0.0
+    return max(1, math.ceil(window - elapsed + max(0.0, t_next)))
+
+
+class MemoryRateLimitStore:
+    """Process-local counters; an OrderedDict gives O(1) LRU touch and eviction."""
+
+    def __init__(self, max_keys: Optional[int] = None):
+        self.max_keys = max_keys or int(os.getenv("RATE_LIMIT_MAX_KEYS", str(DEFAULT_MAX_KEYS)))
+        # key -> [window_start, previous_count, current_count]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> Tuple[bool, Optional[int]]:
+        now = time.time() if now is None else now
+        window_start = (now // window) * window
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = [window_start, 0, 0]
+            self._entries[key] = entry
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+            if entry[0] != window_start:
+                entry[1] = entry[2] if entry[0] == window_start - window else 0
+                entry[2] = 0
+                entry[0] = window_start
+        elapsed = now - window_start
+        if sliding_estimate(entry[1], entry[2], elapsed, window) + 1 > limit:
+            return False, retry_after_seconds(entry[1], entry[2], elapsed, window, limit)
+        entry[2] += 1
+        return True, None
+
+
+class MongoRateLimitStore:
+    """Shared counters: {_id: "<key>|<window_start>", count, expires_at} with a TTL on expires_at."""
+
+    def __init__(self, db):
+        self.collection = db[RATE_LIMIT_COLLECTION]
+
+    async def _increment(self, doc_id: str, expires_at: datetime) -> int:
+        def bump():
+            return self.collection.find_one_and_update(
+                {"_id": doc_id},
+                {"$inc": {"count": 1}, "$setOnInsert": {"expires_at": expires_at}},
+                upsert=True,
+                projection={"count": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+
+        try:
+            doc = await bump()
+        except DuplicateKeyError:
+            # Two replicas upserted the same new window at once; the retry is a plain $inc
+            doc = await bump()
+        return int(doc["count"])
+
+    async def hit(self, key: str, limit: int, window: float, now: Optional[float] = None) -> Tuple[bool, Optional[int]]:
+        now = time.time() if now is None else now
+        window_start = int(now // window * window)
+        current_id = f"{key}|{window_start}"
+        # Kept one extra window so the next window can still read this one as "previous"
+        expires_at = datetime.fromtimestamp(window_start + 2 * window, tz=timezone.utc)
+        previous_doc, current = await asyncio.gather(
+            self.collection.find_one({"_id": f"{key}|{int(window_start - window)}"}, {"count": 1}),
+            self._increment(current_id, expires_at),
+        )
+        previous = int((previous_doc or {}).get("count") or 0)
+        elapsed = now - window_start
+        if sliding_estimate(previous, current, elapsed, window) > limit:
+            # Denied attempts do not count against the caller
+            await self.collection.update_one({"_id": current_id}, {"$inc": {"count": -1}})
+            return False, retry_after_seconds(previous, current - 1, elapsed, window, limit)
+        return True, None
+
+
 class RateLimiter:
-    def __init__(self):
-        # In-memory rate limiting (for production, use Redis)
-        self.attempts = {}
-    
+    def __init__(self, memory: Optional[MemoryRateLimitStore] = None):
+        self.memory = memory or MemoryRateLimitStore()
+        self._shared: Optional[MongoRateLimitStore] = None
+        self._shared_db = None
+        self._last_fallback_log = 0.0
+
+    def _shared_store(self) -> Optional[MongoRateLimitStore]:
+        if os.getenv("RATE_LIMIT_BACKEND", "auto").strip().lower() == "memory":
+            return None
+        db = database.get_db()
+        if db is None:
+            return None
+        if db is not self._shared_db:
+            self._shared, self._shared_db = MongoRateLimitStore(db), db
+        return self._shared
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> Tuple[bool, Optional[int]]:
+        """Record an attempt if it fits. Returns (allowed, retry_after_seconds when denied)."""
+        store = self._shared_store()
+        if store is not None:
+            try:
+                return await store.hit(f"{key}|{int(window_seconds)}", limit, window_seconds)
+            except Exception as e:
+                now = time.monotonic()
+                if now - self._last_fallback_log > _FALLBACK_LOG_INTERVAL_SECONDS:
+                    self._last_fallback_log = now
+                    logger.warning("Shared rate limit store unavailable, using process-local limits: %s", e)
+        return self.memory.hit(f"{key}|{int(window_seconds)}", limit, window_seconds)
+
     async def check_rate_limit(
         self,
         key: str,
@@ -18,31 +163,13 @@ class RateLimiter:
     ) -> tuple[bool, Optional[str]]:
         """
         Check if rate limit is exceeded.
-        
+
         Returns:
             (allowed: bool, error_message: Optional[str])
         """
-        now = datetime.now(timezone.utc)
-        
-        # Clean old entries
-        if key in self.attempts:
-            self.attempts[key] = [
-                timestamp for timestamp in self.attempts[key]
-                if now - timestamp < timedelta(minutes=window_minutes)
-            ]
-        else:
-            self.attempts[key] = []
-        
-        # Check limit
-        if len(self.attempts[key]) >= max_attempts:
-            oldest = min(self.attempts[key])
-            wait_until = oldest + timedelta(minutes=window_minutes)
-            wait_seconds = int((wait_until - now).total_seconds())
-            
-            return False, f"Rate limit exceeded. Try again in {wait_seconds} seconds"
-        
-        # Record attempt
-        self.attempts[key].append(now)
+        allowed, retry_after = await self.hit(key, max_attempts, window_minutes * 60)
+        if not allowed:
+            return False, f"Rate limit exceeded. Try again in {retry_after} seconds"
         return True, None
 
     async def check_rate_limit_daily(
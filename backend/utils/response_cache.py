@@ -0,0 +1,210 @@
+"""
+Response cache for anonymous read endpoints (public catalogue, plans, CMS / marketing pages).
+
+- Serialized JSON bytes are held in memory (utils.ttl_cache: LRU + TTL, concurrent misses
+  coalesced into one build) and served with a strong ETag; If-None-Match returns 304.
+- Cache keys include the version of every namespace the payload depends on. Writers call
+  bump(namespace) on publish / unpublish / catalogue edits, which $inc's cache_versions in
+  MongoDB, so replicas (and admin-only processes, see route_groups) invalidate together. Each
+  process re-reads the versions at most every RESPONSE_CACHE_VERSION_CHECK_SECONDS.
+- TTL (RESPONSE_CACHE_TTL_SECONDS) bounds staleness for writes that bypass bump() (seed scripts).
+
+Use the cached_response(*namespaces) decorator on a route; errors (HTTPException) are not cached.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from database import database
+from utils.metrics import RESPONSE_CACHE_REQUESTS
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = "cache_versions"
+
+# Namespaces: what a cached payload depends on
+NS_CATALOGUE = "catalogue"  # service_catalogue / service_catalogue_v2
+NS_CMS = "cms"  # cms_pages, cms_redirects
+NS_PLANS = "plans"  # plan_registry (code + env; TTL only)
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+
+
+class _Uncacheable(Exception):
+    """The endpoint returned its own Response (e.g. a redirect); pass it through uncached."""
+
+    def __init__(self, response: Response):
+        super().__init__("uncacheable response")
+        self.response = response
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        version_check_seconds: Optional[float] = None,
+    ):
+        self.cache = TTLCache(
+            max_entries=max_entries or int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")),
+            ttl_seconds=ttl_seconds if ttl_seconds is not None else float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300")),
+        )
+        self.version_check_seconds = (
+            version_check_seconds if version_check_seconds is not None
+            else float(os.getenv("RESPONSE_CACHE_VERSION_CHECK_SECONDS", "5"))
+        )
+        self.enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").strip().lower() != "false"
+        self._versions: Dict[str, int] = {}
+        self._versions_checked_at = float("-inf")
+        self._refresh: Optional[asyncio.Future] = None
+
+    async def _refresh_versions(self) -> None:
+        db = database.get_db()
+        if db is None:
+            return
+        try:
+            docs = await db[VERSIONS_COLLECTION].find({}, {"_id": 1, "version": 1}).to_list(100)
+        except Exception as e:
+            logger.warning("Response cache versions unavailable, keeping local versions: %s", e)
+            return
+        for doc in docs:
+            # Never go backwards: a local bump may be ahead of a lagging read
+            self._versions[doc["_id"]] = max(self._versions.get(doc["_id"], 0), int(doc.get("version") or 0))
+
+    async def versions(self, namespaces: Sequence[str]) -> tuple:
+        now = time.monotonic()
+        if now - self._versions_checked_at >= self.version_check_seconds:
+            if self._refresh is None:
+                self._refresh = asyncio.ensure_future(self._refresh_versions())
+                try:
+                    await self._refresh
+                finally:
+                    self._refresh = None
+                    self._versions_checked_at = time.monotonic()
+            else:
+                await asyncio.shield(self._refresh)
+        return tuple(self._versions.get(ns, 0) for ns in namespaces)
+
+    async def bump(self, namespace: str) -> int:
+        """Invalidate every cached response depending on namespace (all replicas)."""
+        version = self._versions.get(namespace, 0) + 1
+        db = database.get_db()
+        if db is not None:
+            try:
+                from pymongo import ReturnDocument
+                doc = await db[VERSIONS_COLLECTION].find_one_and_update(
+                    {"_id": namespace},
+                    {"$inc": {"version": 1}, "$currentDate": {"updated_at": True}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER,
+                )
+                version = max(version, int(doc["version"]))
+            except Exception as e:
+                logger.warning("Response cache version bump for %s not shared: %s", namespace, e)
+        self._versions[namespace] = version
+        return version
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: Sequence[str],
+        build: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        if not self.enabled:
+            payload = await build()
+            return payload if isinstance(payload, Response) else _json_response(_serialize(payload))
+
+        key = (
+            request.url.path,
+            tuple(sorted(request.query_params.multi_items())),
+            tuple(namespaces),
+            await self.versions(namespaces),
+        )
+        outcome = "hit" if key in self.cache else "miss"
+
+        async def load() -> CachedBody:
+            payload = await build()
+            if isinstance(payload, Response):
+                raise _Uncacheable(payload)
+            return _serialize(payload)
+
+        try:
+            cached = await self.cache.get_or_load(key, load)
+        except _Uncacheable as e:
+            RESPONSE_CACHE_REQUESTS.inc("bypass")
+            return e.response
+        headers = {"ETag": cached.etag, "Cache-Control": "public, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            RESPONSE_CACHE_REQUESTS.inc("not_modified")
+            return Response(status_code=304, headers=headers)
+        RESPONSE_CACHE_REQUESTS.inc(outcome)
+        return _json_response(cached, headers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "enabled": self.enabled, "versions": dict(self._versions)}
+
+
+def _serialize(payload: Any) -> CachedBody:
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return CachedBody(body=body, etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+
+def _json_response(cached: CachedBody, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=headers or {"ETag": cached.etag, "Cache-Control": "public, no-cache"},
+    )
+
+
+response_cache = ResponseCache()
+
+
+def cached_response(*namespaces: str):
+    """
+    Serve a GET route from response_cache; the key is path + query string + namespace versions.
+    Adds a Request parameter to the route signature when the endpoint does not take one.
+    """
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        request_param = next(
+            (name for name, p in signature.parameters.items() if p.annotation is Request), None,
+        )
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request = kwargs[request_param] if request_param else kwargs.pop("_cache_request")
+            return await response_cache.respond(request, namespaces, lambda: endpoint(*args, **kwargs))
+
+        if request_param is None:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("_cache_request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+            ])
+        return wrapper
+
+    return decorator
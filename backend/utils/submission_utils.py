@@ -115,28 +115,32 @@ def compute_dedupe_key(
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-# Rate limiting (in-memory, per endpoint key)
-_rate_limit_cache: dict = {}
+# Rate limiting (per endpoint key and IP; sliding-window counter in utils.rate_limiter)
 RATE_LIMIT_WINDOW_SEC = 60
 RATE_LIMIT_MAX_PER_WINDOW = 5
 
 
+def _rate_limit_key(ip: str, key: str) -> str:
+    return f"submission:{key}:{ip}"
+
+
 def check_rate_limit(ip: str, key: str = "default") -> bool:
     """
     Returns True if request is allowed. Uses key to separate e.g. contact vs talent.
+    Process-local; endpoints use allow_submission so the limit holds across replicas.
     """
-    now = datetime.now(timezone.utc).timestamp()
-    cache_key = f"{key}:{ip}"
-    if cache_key not in _rate_limit_cache:
-        _rate_limit_cache[cache_key] = []
-    _rate_limit_cache[cache_key] = [
-        ts for ts in _rate_limit_cache[cache_key]
-        if now - ts < RATE_LIMIT_WINDOW_SEC
-    ]
-    if len(_rate_limit_cache[cache_key]) >= RATE_LIMIT_MAX_PER_WINDOW:
-        return False
-    _rate_limit_cache[cache_key].append(now)
-    return True
+    from utils.rate_limiter import rate_limiter
+    allowed, _ = rate_limiter.memory.hit(
+        f"{_rate_limit_key(ip, key)}|{RATE_LIMIT_WINDOW_SEC}", RATE_LIMIT_MAX_PER_WINDOW, RATE_LIMIT_WINDOW_SEC,
+    )
+    return allowed
+
+
+async def allow_submission(ip: str, key: str = "default") -> bool:
+    """check_rate_limit against the shared (MongoDB) counters when connected."""
+    from utils.rate_limiter import rate_limiter
+    allowed, _ = await rate_limiter.hit(_rate_limit_key(ip, key), RATE_LIMIT_MAX_PER_WINDOW, RATE_LIMIT_WINDOW_SEC)
+    return allowed
 
 
 def _is_field_filled(value: Optional[str]) -> bool:
@@ -0,0 +1,116 @@
+"""
+In-process TTL cache with LRU eviction and request coalescing.
+
+- get/set: O(1); entries expire after their TTL and the least recently used entry is
+  evicted when max_entries is reached.
+- get_or_load: concurrent callers for the same key share one in-flight load, so a burst
+  of identical requests produces a single upstream call. Loader exceptions are not cached
+  and are raised to every waiter.
+
+Per-process only (each API worker holds its own cache).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire ttl_seconds after being set."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    def get(self, key: Hashable, default: Any = None, record: bool = True) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            if record:
+                self.misses += 1
+            return default
+        expires_at, value = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            if record:
+                self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        if record:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        self._entries[key] = (self._clock() + ttl, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches; returns how many were dropped."""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = self.loads = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_for: Optional[Callable[[Any], Optional[float]]] = None,
+    ) -> Any:
+        """
+        Cached value for key, or the result of loader() (cached with ttl_for(value) or the
+        default TTL). Identical concurrent misses await the same in-flight load.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.loads += 1
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure does not log "exception never retrieved"
+            future.exception()
+            raise
+        else:
+            self.set(key, value, ttl_for(value) if ttl_for else None)
+            future.set_result(value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses, "loads": self.loads}
@@ -0,0 +1,126 @@
+"""
+Background worker process: scheduled jobs and queues, no HTTP.
+
+    python worker.py            (from backend root; same env as the API)
+
+Run the API with SCHEDULER_MODE=worker and this process alongside it (the worker defaults to
+SCHEDULER_MODE=worker itself). The worker owns:
+- the APScheduler jobs in job_schedule.SCHEDULED_JOBS (digests, reminders, SLA monitors, ...)
+- the compliance recalc queue, notification retry outbox and document extraction queue
+- the order pipeline pool (services.order_pipeline_queue, ORDER_PIPELINE_CONCURRENCY workers)
+- the Stripe event consumer (services.stripe_event_queue, for STRIPE_WEBHOOK_MODE=async)
+- one pooled Motor client (MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE), shared with JobScheduler
+
+Any number of workers may run; the scheduled_jobs leader lock lets only one fire jobs while the
+others stand by and take over within the lock TTL (LEADER_LOCK_TTL_SECONDS, default 30).
+Every worker (leader or not) also claims shards of partitioned per-client jobs
+(services.partitioned_jobs), so nightly batches finish faster as workers are added.
+WORKER_METRICS_PORT serves this process's Prometheus metrics (job durations, Mongo/LLM/email
+latency, queue depth) at GET /metrics.
+"""
+import asyncio
+import logging
+import os
+import signal
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / ".env")
+os.environ.setdefault("PROCESS_ROLE", "worker")
+os.environ.setdefault("SCHEDULER_MODE", "worker")
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger("worker")
+
+from database import database  # noqa: E402
+from job_schedule import LeaderElectedScheduler, create_scheduler, register_jobs, scheduler_mode  # noqa: E402
+from services.leader_lock import DEFAULT_LOCK_TTL_SECONDS, LeaderLock  # noqa: E402
+from services.order_pipeline_queue import OrderPipelinePool  # noqa: E402
+from services.stripe_event_queue import StripeEventConsumer, consumers_enabled  # noqa: E402
+from services.partitioned_jobs import ShardWorker  # noqa: E402
+
+
+async def _serve_metrics(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Minimal HTTP/1.0 responder for Prometheus scrapes (the worker has no web framework loaded)."""
+    from utils.metrics import REGISTRY
+    import services.queue_metrics  # noqa: F401  registers the queue depth/lag collector
+    try:
+        request_line = (await reader.readline()).decode("latin-1")
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        if request_line.startswith("GET /metrics"):
+            body, status = (await REGISTRY.render()).encode(), "200 OK"
+        else:
+            body, status = b"not found\n", "404 Not Found"
+        writer.write(
+            f"HTTP/1.0 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def _lock_ttl_seconds() -> int:
+    value = (os.environ.get("LEADER_LOCK_TTL_SECONDS") or "").strip()
+    return int(value) if value.isdigit() and int(value) > 0 else DEFAULT_LOCK_TTL_SECONDS
+
+
+async def run_worker(stop_event: asyncio.Event) -> None:
+    # Indexes/seeds are owned by the API startup manifest
+    await database.connect(create_indexes=False)
+    scheduler = create_scheduler()
+    count = register_jobs(scheduler, include_worker_only=True)
+    leader = LeaderElectedScheduler(scheduler, LeaderLock(database.get_db(), ttl_seconds=_lock_ttl_seconds()))
+    shard_worker = ShardWorker()
+    order_pipeline = OrderPipelinePool()
+    stripe_events = StripeEventConsumer()
+    metrics_server = None
+    metrics_port = (os.environ.get("WORKER_METRICS_PORT") or "").strip()
+    if metrics_port.isdigit():
+        metrics_server = await asyncio.start_server(_serve_metrics, "0.0.0.0", int(metrics_port))
+        logger.info("Worker metrics on :%s/metrics", metrics_port)
+    try:
+        await leader.start()
+        shard_worker.start()
+        order_pipeline.start()
+        if consumers_enabled():
+            stripe_events.start()
+        logger.info(
+            "Worker started (SCHEDULER_MODE=%s): %s job(s), %s",
+            scheduler_mode(), count, "leader" if leader.is_leader else "standby",
+        )
+        await stop_event.wait()
+    finally:
+        logger.info("Worker stopping")
+        await stripe_events.stop()
+        await order_pipeline.stop()
+        await shard_worker.stop()
+        await leader.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+        await database.close()
+
+
+def main() -> None:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        loop.run_until_complete(run_worker(stop_event))
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()